@@ -0,0 +1,194 @@
+"""
+로그 전송 (monitoring-service 로 배치 전송)
+- LogShipper 는 logging.Handler: emit 은 레코드를 dict 로 만들어 메모리 큐(deque)에 넣기만 함 (네트워크/압축 없음)
+  큐가 LOG_SHIP_QUEUE 개로 차면 가장 오래된 레코드부터 버림 (dropped 로 셈)
+- 전송 스레드가 LOG_SHIP_SECONDS 마다, 또는 큐가 LOG_SHIP_BATCH 개 쌓이면 깨어나
+  NDJSON 으로 묶어 zstd(없으면 gzip) 로 압축해 POST {MONITORING_SERVICE_URL}/logs/push
+- 전송 실패 시 그 배치를 한 번 더 보관해 다음 주기에 재시도, 실패가 이어지면 최대 60초까지 간격을 늘림
+- 레코드의 request_id / user_id 는 extra= 로 준 값 → 요청 문맥(context.py) 순서로 채움
+- 종료 시 (logging.shutdown → close) 남은 레코드를 LOG_SHIP_CLOSE_TIMEOUT 초 안에서 마지막으로 보냄
+"""
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from .context import current_request_id, current_user_id
+
+try:
+    import zstandard
+except ImportError:  # 선택 의존성 (없으면 gzip)
+    zstandard = None
+
+MAX_MESSAGE_CHARS = 8192
+MAX_BACKOFF_SECONDS = 60.0
+
+
+class LogShipper(logging.Handler):
+    def __init__(
+        self,
+        service: str,
+        url: str,
+        batch_size: Optional[int] = None,
+        interval: Optional[float] = None,
+        queue_size: Optional[int] = None,
+        close_timeout: Optional[float] = None,
+    ):
+        super().__init__()
+        self.service = service
+        self.url = url
+        self.batch_size = batch_size or int(os.getenv("LOG_SHIP_BATCH", "500"))
+        self.interval = interval or float(os.getenv("LOG_SHIP_SECONDS", "2"))
+        self.close_timeout = close_timeout or float(os.getenv("LOG_SHIP_CLOSE_TIMEOUT", "3"))
+        self.queue: Deque[Dict[str, Any]] = deque(maxlen=queue_size or int(os.getenv("LOG_SHIP_QUEUE", "20000")))
+        self.encoding = "zstd" if zstandard is not None else "gzip"
+        self._compressor = zstandard.ZstdCompressor(level=3) if zstandard is not None else None
+        self._retry: Optional[List[Dict[str, Any]]] = None
+        self._backoff = 0.0
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.counts = {"queued": 0, "sent": 0, "dropped": 0, "batches": 0, "failures": 0, "bytes": 0}
+
+    def start(self) -> "LogShipper":
+        self._thread = threading.Thread(target=self._run, name="log-shipper", daemon=True)
+        self._thread.start()
+        return self
+
+    # ---- 수집 (호출한 스레드에서 실행, 블로킹 없음) ----------------------
+
+    def emit(self, record: logging.LogRecord):
+        # 전송 경로에서 나오는 로그는 다시 보내지 않음
+        if record.name == __name__:
+            return
+        try:
+            message = record.getMessage()
+            if record.exc_info:
+                message += "\n" + self.formatException(record.exc_info)
+            entry = {
+                "ts": record.created,
+                "service": self.service,
+                "level": record.levelname,
+                "logger": record.name,
+                "msg": message[:MAX_MESSAGE_CHARS],
+            }
+            request_id = getattr(record, "request_id", None) or current_request_id()
+            if request_id:
+                entry["request_id"] = request_id
+            user_id = getattr(record, "user_id", None) or current_user_id()
+            if user_id:
+                entry["user_id"] = str(user_id)
+            if len(self.queue) == self.queue.maxlen:
+                self.counts["dropped"] += 1
+            self.queue.append(entry)
+            self.counts["queued"] += 1
+            if len(self.queue) >= self.batch_size:
+                self._wake.set()
+        except Exception:
+            self.handleError(record)
+
+    def formatException(self, exc_info) -> str:
+        return (self.formatter or logging.Formatter()).formatException(exc_info)
+
+    # ---- 전송 (전송 스레드) ----------------------------------------------
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval + self._backoff)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            self.flush_pending()
+
+    def _take(self) -> List[Dict[str, Any]]:
+        batch = []
+        while self.queue and len(batch) < self.batch_size:
+            batch.append(self.queue.popleft())
+        return batch
+
+    def flush_pending(self, deadline: Optional[float] = None) -> bool:
+        """재시도 배치와 큐를 비울 때까지 전송, 실패하면 그 배치를 보관하고 False"""
+        while True:
+            batch = self._retry or self._take()
+            self._retry = None
+            if not batch:
+                return True
+            if not self._send(batch):
+                self._retry = batch
+                self._backoff = min(MAX_BACKOFF_SECONDS, max(self.interval, self._backoff * 2))
+                return False
+            self._backoff = 0.0
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+
+    def _encode(self, batch: List[Dict[str, Any]]) -> bytes:
+        body = "\n".join(json.dumps(entry, ensure_ascii=False) for entry in batch).encode("utf-8")
+        if self._compressor is not None:
+            return self._compressor.compress(body)
+        return gzip.compress(body, compresslevel=5)
+
+    def _send(self, batch: List[Dict[str, Any]]) -> bool:
+        try:
+            body = self._encode(batch)
+            request = urllib.request.Request(
+                self.url,
+                data=body,
+                method="POST",
+                headers={"Content-Type": "application/x-ndjson", "Content-Encoding": self.encoding},
+            )
+            with urllib.request.urlopen(request, timeout=5) as response:
+                response.read()
+        except Exception:
+            self.counts["failures"] += 1
+            return False
+        self.counts["sent"] += len(batch)
+        self.counts["batches"] += 1
+        self.counts["bytes"] += len(body)
+        return True
+
+    # ---- 종료 ------------------------------------------------------------
+
+    def close(self):
+        if self._thread is not None and not self._stopped.is_set():
+            self._stopped.set()
+            self._wake.set()
+            self._thread.join(self.close_timeout)
+            self.flush_pending(deadline=time.monotonic() + self.close_timeout)
+        super().close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "encoding": self.encoding,
+            "pending": len(self.queue) + len(self._retry or ()),
+            "backoff_seconds": self._backoff,
+            **self.counts,
+        }
+
+
+def install_log_shipping(service: str, level: int = logging.INFO) -> Optional[LogShipper]:
+    """
+    루트 로거에 LogShipper 를 붙임 (stdout 로그는 그대로)
+    LOG_SHIP_URL, 없으면 MONITORING_SERVICE_URL + /logs/push, 둘 다 없거나 LOG_SHIP_ENABLED=false 면 붙이지 않음
+    """
+    if os.getenv("LOG_SHIP_ENABLED", "true").lower() == "false":
+        return None
+    url = os.getenv("LOG_SHIP_URL")
+    if not url:
+        base = os.getenv("MONITORING_SERVICE_URL")
+        if not base:
+            return None
+        url = base.rstrip("/") + "/logs/push"
+    root = logging.getLogger()
+    for handler in root.handlers:
+        if isinstance(handler, LogShipper):
+            return handler
+    shipper = LogShipper(service, url)
+    shipper.setLevel(level)
+    root.addHandler(shipper.start())
+    return shipper
@@ -0,0 +1,19 @@
+from .middleware import TracingMiddleware, install_tracing
+from .span_exporter import SpanExporter
+from .tracer import NOOP_SPAN, TRACE_ID_HEADER, TRACEPARENT, Span, Tracer, upstream_trace
+
+# 프로세스에 하나 (install_tracing 이 서비스 이름과 전송을 설정)
+tracer = Tracer()
+
+__all__ = [
+    "NOOP_SPAN",
+    "TRACE_ID_HEADER",
+    "TRACEPARENT",
+    "Span",
+    "SpanExporter",
+    "Tracer",
+    "TracingMiddleware",
+    "install_tracing",
+    "tracer",
+    "upstream_trace",
+]
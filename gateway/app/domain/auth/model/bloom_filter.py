@@ -0,0 +1,94 @@
+"""
+Scalable Bloom Filter
+- 하위 필터가 가득 차면 용량을 growth 배로 늘린 필터를 추가하고,
+  오탐률은 tightening 비율로 줄여 전체 오탐률이 error_rate 이내로 유지됨
+- 삭제는 지원하지 않으므로 만료된 항목은 주기적으로 새 필터를 만들어 정리
+"""
+import hashlib
+import math
+from typing import List, Tuple
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, hashes: Tuple[int, int]):
+        h1, h2 = hashes
+        num_bits = self.num_bits
+        return ((h1 + i * h2) % num_bits for i in range(self.num_hashes))
+
+    def add(self, hashes: Tuple[int, int]) -> None:
+        for position in self._positions(hashes):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def contains(self, hashes: Tuple[int, int]) -> bool:
+        bits = self.bits
+        for position in self._positions(hashes):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    @property
+    def is_full(self) -> bool:
+        return self.count >= self.capacity
+
+
+class ScalableBloomFilter:
+    def __init__(
+        self,
+        initial_capacity: int = 10000,
+        error_rate: float = 0.001,
+        growth: int = 2,
+        tightening: float = 0.5,
+    ):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        # 하위 필터 오탐률 합이 error_rate 를 넘지 않도록 첫 필터는 (1 - r) 배로 시작
+        self._filters: List[BloomFilter] = [BloomFilter(initial_capacity, error_rate * (1 - tightening))]
+
+    @staticmethod
+    def _hashes(item: str) -> Tuple[int, int]:
+        """double hashing 용 64bit 해시 두 개"""
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    def add(self, item: str) -> None:
+        hashes = self._hashes(item)
+        if any(f.contains(hashes) for f in self._filters):
+            return
+        current = self._filters[-1]
+        if current.is_full:
+            current = BloomFilter(
+                current.capacity * self.growth,
+                current.error_rate * self.tightening,
+            )
+            self._filters.append(current)
+        current.add(hashes)
+
+    def __contains__(self, item: str) -> bool:
+        hashes = self._hashes(item)
+        # 최근 필터에 있을 확률이 높으므로 역순 검사
+        for bloom in reversed(self._filters):
+            if bloom.contains(hashes):
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return sum(f.count for f in self._filters)
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(len(f.bits) for f in self._filters)
+
+    @property
+    def num_filters(self) -> int:
+        return len(self._filters)
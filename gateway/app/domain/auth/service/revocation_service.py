@@ -0,0 +1,211 @@
+"""
+토큰 폐기(revocation) 확인 서비스
+- 폐기된 토큰 ID(jti) 원본은 Redis 의 revoked:{jti} (TTL) 에 있음 (account-service 가 로그아웃 시 기록)
+- 게이트웨이 레플리카마다 Scalable Bloom Filter 를 메모리에 두고 token:revoked 채널 델타로 동기화
+- 대부분의 요청(폐기되지 않은 토큰)은 Bloom 음성 → 네트워크 호출 없이 통과
+- Bloom 양성일 때만 Redis 로 정확히 확인하고 결과를 짧게 캐시
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from ..model.bloom_filter import ScalableBloomFilter
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # 선택 의존성
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+REVOKED_KEY_PREFIX = "revoked:"
+REVOCATION_CHANNEL = "token:revoked"
+
+
+def token_id(token: str) -> str:
+    """토큰 식별자 (account-service app.common.session.token_id 와 동일 규칙)"""
+    parts = token.split(".")
+    if len(parts) == 3:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4)))
+            if isinstance(payload, dict) and payload.get("jti"):
+                return str(payload["jti"])
+        except (ValueError, UnicodeDecodeError):
+            pass
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:32]
+
+
+class RevocationService:
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        initial_capacity: Optional[int] = None,
+        error_rate: Optional[float] = None,
+        rebuild_interval: Optional[float] = None,
+        exact_cache_size: int = 10000,
+        negative_cache_ttl: float = 30.0,
+    ):
+        self.redis_url = redis_url if redis_url is not None else os.getenv("REDIS_URL")
+        self.initial_capacity = initial_capacity or int(os.getenv("REVOCATION_BLOOM_CAPACITY", "10000"))
+        self.error_rate = error_rate or float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
+        self.rebuild_interval = rebuild_interval or float(os.getenv("REVOCATION_REBUILD_SECONDS", "3600"))
+        self.exact_cache_size = exact_cache_size
+        self.negative_cache_ttl = negative_cache_ttl
+
+        self._bloom = ScalableBloomFilter(self.initial_capacity, self.error_rate)
+        # 진행 중인 재구성마다 시작 시점부터 들어온 델타 (새 필터로 바꾸기 직전에 다시 반영)
+        # 주기 재구성과 구독 재연결 재구성이 겹칠 수 있어 재구성마다 따로 둠
+        self._rebuild_buffers: List[list] = []
+        # Bloom 양성 토큰의 정확 확인 결과 캐시 (jti -> (폐기 여부, 유효 시각))
+        self._exact: "OrderedDict[str, Tuple[bool, float]]" = OrderedDict()
+        self._redis = None
+        self._subscribed = asyncio.Event()
+        self._tasks: list = []
+        self.stats_counters: Dict[str, int] = {"checks": 0, "bloom_positive": 0, "revoked": 0, "false_positive": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self._redis is not None
+
+    async def start(self):
+        """Redis 연결 → 전체 로드 → 델타 구독 / 주기적 재구성 시작"""
+        if not self.redis_url or aioredis is None:
+            logger.warning("⚠️ REDIS_URL 미설정: 토큰 폐기 확인 비활성화")
+            return
+        try:
+            self._redis = aioredis.from_url(self.redis_url, decode_responses=True)
+            await self._redis.ping()
+        except Exception as e:
+            logger.warning(f"⚠️ Redis 연결 실패, 토큰 폐기 확인 비활성화: {e}")
+            self._redis = None
+            return
+        # 구독을 먼저 시작해야 전체 로드 중에 발생한 폐기도 놓치지 않음
+        self._tasks = [asyncio.create_task(self._subscribe_loop())]
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            logger.warning("⚠️ 토큰 폐기 채널 구독 지연, 전체 로드 먼저 진행")
+        await self._rebuild()
+        self._tasks.append(asyncio.create_task(self._rebuild_loop()))
+        logger.info(f"✅ 토큰 폐기 Bloom 필터 로드: {len(self._bloom)}건, {self._bloom.size_bytes} bytes")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    def add(self, jti: str, ttl: Optional[float] = None) -> None:
+        """폐기 델타 반영"""
+        self._bloom.add(jti)
+        for buffer in self._rebuild_buffers:
+            buffer.append(jti)
+        self._remember(jti, True, time.monotonic() + (ttl or self.rebuild_interval))
+
+    async def is_revoked(self, token: str) -> bool:
+        """토큰 폐기 여부 (대부분 Bloom 음성으로 즉시 반환)"""
+        if self._redis is None:
+            return False
+        self.stats_counters["checks"] += 1
+        jti = token_id(token)
+        if jti not in self._bloom:
+            return False
+
+        self.stats_counters["bloom_positive"] += 1
+        cached = self._exact.get(jti)
+        if cached is not None and cached[1] > time.monotonic():
+            self._exact.move_to_end(jti)
+            revoked = cached[0]
+        else:
+            try:
+                ttl = await self._redis.ttl(REVOKED_KEY_PREFIX + jti)
+            except Exception as e:
+                # Redis 장애 시에는 Bloom 양성을 폐기로 간주 (보수적으로 차단)
+                logger.error(f"❌ 토큰 폐기 확인 실패, 차단 처리: {e}")
+                return True
+            revoked = ttl is not None and ttl != -2
+            expires = time.monotonic() + (ttl if revoked and ttl > 0 else self.negative_cache_ttl)
+            self._remember(jti, revoked, expires)
+
+        self.stats_counters["revoked" if revoked else "false_positive"] += 1
+        return revoked
+
+    def _remember(self, jti: str, revoked: bool, expires_at: float) -> None:
+        self._exact[jti] = (revoked, expires_at)
+        self._exact.move_to_end(jti)
+        while len(self._exact) > self.exact_cache_size:
+            self._exact.popitem(last=False)
+
+    async def _rebuild(self):
+        """Redis 의 현재 폐기 목록으로 새 필터 생성 (만료 항목 정리)"""
+        buffer: list = []
+        self._rebuild_buffers.append(buffer)
+        try:
+            bloom = ScalableBloomFilter(self.initial_capacity, self.error_rate)
+            async for key in self._redis.scan_iter(match=REVOKED_KEY_PREFIX + "*", count=1000):
+                bloom.add(key[len(REVOKED_KEY_PREFIX):])
+            # SCAN 도중 들어온 델타를 반영한 뒤 교체 (둘 사이에 await 가 없어 그 사이 델타는 없음)
+            for jti in buffer:
+                bloom.add(jti)
+            self._bloom = bloom
+        finally:
+            self._rebuild_buffers.remove(buffer)
+
+    async def _rebuild_loop(self):
+        while True:
+            await asyncio.sleep(self.rebuild_interval)
+            try:
+                await self._rebuild()
+                logger.info(f"🔄 토큰 폐기 Bloom 필터 재구성: {len(self._bloom)}건")
+            except Exception as e:
+                logger.error(f"❌ 토큰 폐기 Bloom 필터 재구성 실패: {e}")
+
+    async def _subscribe_loop(self):
+        resync = False
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(REVOCATION_CHANNEL)
+                self._subscribed.set()
+                if resync:
+                    # 끊긴 동안 놓친 델타를 복구
+                    await self._rebuild()
+                    resync = False
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    jti, _, ttl = message["data"].partition(":")
+                    self.add(jti, float(ttl) if ttl else None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ 토큰 폐기 구독 오류, 재연결 후 전체 재구성: {e}")
+                resync = True
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "bloom_items": len(self._bloom),
+            "bloom_bytes": self._bloom.size_bytes,
+            "bloom_filters": self._bloom.num_filters,
+            **self.stats_counters,
+        }
+
+
+# 전역 토큰 폐기 서비스 인스턴스
+revocation_service = RevocationService()
@@ -4,6 +4,7 @@ from fastapi import Request, Response, HTTPException
 from fastapi.responses import StreamingResponse
 import json
 import logging
+from app.common.tracing import tracer, upstream_trace
 from ..model.service_registry import service_registry, ServiceInfo
 
 logger = logging.getLogger(__name__)
@@ -34,14 +35,19 @@ class ProxyController:
             # 요청 바디 읽기
             body = await request.body()
             
-            # 프록시 요청 수행
-            response = await self.client.request(
-                method=request.method,
-                url=target_url,
-                headers=headers,
-                content=body,
-                params=request.query_params
-            )
+            # 프록시 요청 수행 (traceparent 전달, 응답 헤더까지 upstream 스팬)
+            with tracer.span("upstream", kind="client", url=target_url, method=request.method, service=service_name) as span:
+                tracer.inject(headers)
+                hook = upstream_trace(tracer, span)
+                response = await self.client.request(
+                    method=request.method,
+                    url=target_url,
+                    headers=headers,
+                    content=body,
+                    params=request.query_params,
+                    extensions={"trace": hook} if hook else None,
+                )
+                span.set("http.status_code", response.status_code)
             
             # 응답 헤더 구성
             response_headers = dict(response.headers)
@@ -1,23 +1,39 @@
 # main.py (gateway) — CORS 보강 버전
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response, PlainTextResponse
+from fastapi.responses import JSONResponse, Response, PlainTextResponse, StreamingResponse
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.background import BackgroundTask
 from starlette.responses import Response as StarletteResponse
+from contextlib import asynccontextmanager
+import hmac
 import httpx
 import logging
 import os
 import time
 from typing import Optional
 
+from app.common.logs import REQUEST_ID_HEADER, RequestContextMiddleware, current_request_id, install_log_shipping
+from app.common.tracing import install_tracing, tracer, upstream_trace
+from app.domain.auth.service.revocation_service import revocation_service
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("gateway")
+# monitoring-service 로 로그 배치 전송 (MONITORING_SERVICE_URL 이 있을 때, stdout 로그는 그대로)
+install_log_shipping("gateway")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await revocation_service.start()
+    yield
+    await revocation_service.stop()
 
 app = FastAPI(
     title="MSA API Gateway",
     description="마이크로서비스 프록시 및 서비스 디스커버리",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # ===== CORS 설정 =====
@@ -58,6 +74,10 @@ app.add_middleware(
 
 def cors_headers_for(request: Request):
     """요청 Origin이 허용 목록에 있으면 해당 Origin을 그대로 반환."""
+    with tracer.span("cors"):
+        return _match_origin(request)
+
+def _match_origin(request: Request):
     import re
     
     origin = request.headers.get("origin")
@@ -99,29 +119,66 @@ class AuthMiddleware(BaseHTTPMiddleware):
             logger.info(f"🔓 PREFLIGHT 통과: {request.url.path}")
             return await call_next(request)
         
-        # 인증이 필요한 엔드포인트 체크
-        auth_required_paths = ["/api/account/profile", "/api/account/logout"]
-        if any(request.url.path.startswith(path) for path in auth_required_paths):
-            auth_header = request.headers.get("authorization")
-            if not auth_header:
-                logger.warning(f"🚫 인증 필요 경로에서 Authorization 헤더 누락: {request.url.path}")
-                return JSONResponse(
-                    status_code=401,
-                    content={"detail": "Authorization header required"}
-                )
+        denied = await self._check(request)
+        if denied is not None:
+            return denied
         
         logger.info(f"🔐 인증 미들웨어 통과: {request.method} {request.url.path}")
         return await call_next(request)
 
+    async def _check(self, request: Request) -> Optional[JSONResponse]:
+        """인증 헤더/폐기 토큰 검사, 막아야 하면 응답 (auth 스팬)"""
+        with tracer.span("auth") as span:
+            # 인증이 필요한 엔드포인트 체크
+            auth_required_paths = ["/api/account/profile", "/api/account/logout"]
+            if any(request.url.path.startswith(path) for path in auth_required_paths):
+                auth_header = request.headers.get("authorization")
+                if not auth_header:
+                    logger.warning(f"🚫 인증 필요 경로에서 Authorization 헤더 누락: {request.url.path}")
+                    span.set("denied", "missing_authorization")
+                    return JSONResponse(
+                        status_code=401,
+                        content={"detail": "Authorization header required"}
+                    )
+            
+            # 폐기된 토큰 차단 (Bloom 음성이면 네트워크 호출 없이 통과)
+            token = _extract_token(request)
+            if token and await revocation_service.is_revoked(token):
+                logger.warning(f"🚫 폐기된 토큰 사용 차단: {request.url.path}")
+                span.set("denied", "revoked")
+                return JSONResponse(
+                    status_code=401,
+                    content={"detail": "Token has been revoked"},
+                    headers=cors_headers_for(request)
+                )
+        return None
+
+def _extract_token(request: Request) -> Optional[str]:
+    """Authorization: Bearer 헤더 또는 session_token 쿠키에서 토큰 추출"""
+    auth_header = request.headers.get("authorization")
+    if auth_header:
+        scheme, _, value = auth_header.partition(" ")
+        if scheme.lower() == "bearer" and value.strip():
+            return value.strip()
+    return request.cookies.get("session_token")
+
 app.add_middleware(AuthMiddleware)
+# 요청마다 X-Request-ID (받거나 새로 만듦, 업스트림에도 전달) → 이 요청 중 남긴 로그에 request_id 로 붙음
+app.add_middleware(RequestContextMiddleware)
+# 분산 추적: traceparent 를 만들어(head 샘플링) _proxy/ProxyController 가 업스트림에 전달, 스팬은 monitoring-service 로
+# edge: 클라이언트가 보낸 traceparent 의 sampled 는 믿지 않고 여기서 다시 결정
+install_tracing(app, tracer, "gateway", edge=True)
 
 # 환경 변수
 ACCOUNT_SERVICE_URL = os.getenv("ACCOUNT_SERVICE_URL", "https://account-service-production-af71.up.railway.app")
 CHATBOT_SERVICE_URL = os.getenv("CHATBOT_SERVICE_URL", "http://chatbot-service:8001")
+MONITORING_SERVICE_URL = os.getenv("MONITORING_SERVICE_URL", "http://monitoring-service:8002")
+MONITORING_ADMIN_TOKEN = os.getenv("MONITORING_ADMIN_TOKEN", "")
 TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "20"))
 
 logger.info(f"🔧 ACCOUNT_SERVICE_URL: {ACCOUNT_SERVICE_URL}")
 logger.info(f"🔧 CHATBOT_SERVICE_URL: {CHATBOT_SERVICE_URL}")
+logger.info(f"🔧 MONITORING_SERVICE_URL: {MONITORING_SERVICE_URL}")
 
 # 헬스체크 엔드포인트
 @app.get("/health")
@@ -132,6 +189,14 @@ async def health():
 async def healthz():
     return {"status": "ok", "service": "gateway"}
 
+@app.get("/health/revocation")
+async def revocation_health():
+    return revocation_service.stats()
+
+@app.get("/health/tracing")
+async def tracing_health():
+    return {**tracer.stats(), "exporter": tracer.export.stats() if tracer.export else None}
+
 # CORS preflight 직접 처리
 @app.options("/{path:path}")
 async def options_handler(path: str, request: Request):
@@ -165,37 +230,72 @@ async def _proxy(request: Request, upstream_base: str, rest: str):
     ]
     for header in hop_by_hop_headers:
         headers.pop(header, None)
+    # 서비스 로그를 게이트웨이 로그와 같은 request_id 로 묶기 위해 전달
+    headers[REQUEST_ID_HEADER] = current_request_id()
+    # 게이트웨이가 직접 본 상대 주소를 맨 뒤에 붙임 (업스트림은 오른쪽부터 신뢰 프록시를 건너뛰어 클라이언트 IP 판단)
+    if request.client:
+        forwarded = headers.get("x-forwarded-for")
+        headers["x-forwarded-for"] = f"{forwarded}, {request.client.host}" if forwarded else request.client.host
     
     body = await request.body()
     params = dict(request.query_params)
 
-    try:
-        async with httpx.AsyncClient(timeout=TIMEOUT, follow_redirects=True) as client:
-            upstream = await client.request(
-                request.method, url, params=params, content=body, headers=headers
+    client = httpx.AsyncClient(timeout=TIMEOUT, follow_redirects=True)
+    # upstream 스팬: 응답 헤더를 받을 때까지 (자식: 연결, TTFB), 업스트림 서비스 스팬의 부모가 됨
+    with tracer.span("upstream", kind="client", url=url, method=request.method) as span:
+        tracer.inject(headers)
+        hook = upstream_trace(tracer, span)
+        try:
+            upstream = await client.send(
+                client.build_request(
+                    request.method, url, params=params, content=body, headers=headers,
+                    extensions={"trace": hook} if hook else None,
+                ),
+                stream=True,
             )
+            span.set("http.status_code", upstream.status_code)
             logger.info(f"✅ 프록시 응답: {upstream.status_code} {url}")
-    except httpx.HTTPError as e:
-        logger.error(f"❌ 프록시 HTTP 오류: {e} {url}")
-        # 예외를 다시 발생시켜서 fallback 로직이 실행되도록 함
-        raise e
-    except Exception as e:
-        logger.error(f"❌ 프록시 일반 오류: {e} {url}")
-        # 예외를 다시 발생시켜서 fallback 로직이 실행되도록 함
-        raise e
+        except httpx.HTTPError as e:
+            await client.aclose()
+            logger.error(f"❌ 프록시 HTTP 오류: {e} {url}")
+            # 예외를 다시 발생시켜서 fallback 로직이 실행되도록 함
+            raise e
+        except Exception as e:
+            await client.aclose()
+            logger.error(f"❌ 프록시 일반 오류: {e} {url}")
+            # 예외를 다시 발생시켜서 fallback 로직이 실행되도록 함
+            raise e
 
     # 업스트림 응답 전달
     passthrough = {}
     for k, v in upstream.headers.items():
         lk = k.lower()
-        if lk in ("content-type", "set-cookie", "cache-control"):
+        if lk in ("content-type", "set-cookie", "cache-control", "retry-after", "x-accel-buffering"):
             passthrough[k] = v
 
     # CORS 헤더를 명시적으로 덮어쓴다(항상 부착)
     passthrough.update(cors_headers_for(request))
 
+    async def close_upstream():
+        await upstream.aclose()
+        await client.aclose()
+
+    # SSE(채팅 토큰 스트림)는 모아 두지 않고 받는 대로 전달, 클라이언트가 끊으면 업스트림 연결도 닫음
+    if upstream.headers.get("content-type", "").startswith("text/event-stream"):
+        return StreamingResponse(
+            upstream.aiter_bytes(),
+            status_code=upstream.status_code,
+            headers=passthrough,
+            background=BackgroundTask(close_upstream),
+        )
+
+    try:
+        with tracer.span("upstream.body"):
+            content = await upstream.aread()
+    finally:
+        await close_upstream()
     return Response(
-        content=upstream.content,
+        content=content,
         status_code=upstream.status_code,
         headers=passthrough,
         media_type=upstream.headers.get("content-type"),
@@ -219,6 +319,26 @@ async def chatbot_root(request: Request):
 async def chatbot_any(path: str, request: Request):
     return await _proxy(request, CHATBOT_SERVICE_URL, path)
 
+# ---- monitoring-service 프록시 (운영자 전용) ----
+# MONITORING_ADMIN_TOKEN 이 없으면 게이트웨이로는 열지 않음 (404), 있으면 X-Admin-Token 헤더가 같아야 통과
+# 수집(/metrics/push, /logs/push, /traces/push)은 서비스끼리 내부망으로만 보내므로 게이트웨이로는 항상 막음
+def _monitoring_denied(request: Request, path: str) -> Optional[JSONResponse]:
+    if not MONITORING_ADMIN_TOKEN or "push" in [segment for segment in path.split("/") if segment]:
+        return JSONResponse(status_code=404, content={"detail": "Not Found"}, headers=cors_headers_for(request))
+    supplied = request.headers.get("x-admin-token", "")
+    if not hmac.compare_digest(supplied.encode(), MONITORING_ADMIN_TOKEN.encode()):
+        logger.warning(f"🚫 monitoring 프록시 관리자 토큰 불일치: {request.method} {request.url.path}")
+        return JSONResponse(status_code=403, content={"detail": "Admin token required"}, headers=cors_headers_for(request))
+    return None
+
+@app.api_route("/api/monitoring", methods=["GET","POST","DELETE"])
+async def monitoring_root(request: Request):
+    return _monitoring_denied(request, "/") or await _proxy(request, MONITORING_SERVICE_URL, "/")
+
+@app.api_route("/api/monitoring/{path:path}", methods=["GET","POST","DELETE"])
+async def monitoring_any(path: str, request: Request):
+    return _monitoring_denied(request, path) or await _proxy(request, MONITORING_SERVICE_URL, path)
+
 # 기존 경로 호환성 유지 (점진적 마이그레이션용)
 @app.post("/login")
 async def login_proxy(request: Request):
@@ -488,7 +608,8 @@ async def root():
         "version": "1.0.0",
         "services": {
             "account": ACCOUNT_SERVICE_URL,
-            "chatbot": CHATBOT_SERVICE_URL
+            "chatbot": CHATBOT_SERVICE_URL,
+            "monitoring": MONITORING_SERVICE_URL
         }
     }
 
@@ -0,0 +1,57 @@
+"""
+Account Service 서비스 초기화
+- 무거운 의존성(SQLAlchemy, redis, httpx)을 끌어오는 모듈은 여기서만 import 하고,
+  LazyStartup 이 uvicorn 시작 직후 백그라운드에서 이 모듈을 import 한 뒤 services() 에 진입
+"""
+import logging
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from fastapi import FastAPI
+
+from app.common.database import create_engine, init_models
+from app.common.session import SessionStore
+from app.common.security.login_throttle import LoginThrottle
+from app.common.security.password_hasher import PasswordHasher
+from app.domain.auth.controller.google_controller import GoogleController
+from app.domain.auth.service.google_oauth_service import GoogleOAuthService
+from app.domain.auth.service.oauth_state_store import OAuthStateStore
+from app.domain.user.user_controller import UserController
+from app.domain.user.user_import_service import UserImportService
+from app.domain.user.user_repository import SignupBatchWriter, UserRepository
+from app.domain.user.user_service import UserService
+
+logger = logging.getLogger("account_service")
+
+
+@asynccontextmanager
+async def services(app: FastAPI):
+    # 중간에 실패하면 그때까지 시작한 것만 역순으로 정리 (지연 시작이 다시 시도할 수 있게)
+    async with AsyncExitStack() as stack:
+        # DB 엔진/풀은 프로세스당 하나만 생성해서 모든 요청이 공유
+        engine = create_engine()
+        stack.push_async_callback(engine.dispose)
+        await init_models(engine)
+
+        repository = UserRepository(engine)
+        hasher = PasswordHasher()
+        stack.callback(hasher.close)
+        writer = SignupBatchWriter(repository)
+        await writer.start()
+        stack.push_async_callback(writer.stop)
+        session_store = SessionStore()
+        await session_store.start()
+        stack.push_async_callback(session_store.stop)
+        login_throttle = LoginThrottle()
+        await login_throttle.start()
+        stack.push_async_callback(login_throttle.stop)
+        google_oauth = GoogleOAuthService(OAuthStateStore())
+        await google_oauth.start()
+        stack.push_async_callback(google_oauth.stop)
+
+        app.state.user_controller = UserController(UserService(repository, writer, hasher))
+        app.state.session_store = session_store
+        app.state.login_throttle = login_throttle
+        app.state.user_import_service = UserImportService(repository, hasher)
+        app.state.google_controller = GoogleController(google_oauth, session_store, repository)
+        logger.info("✅ Account Service 초기화 완료")
+        yield
@@ -0,0 +1,88 @@
+"""
+비동기 데이터베이스 엔진 설정
+- 운영: postgresql+asyncpg (커넥션 풀 + prepared statement 캐시)
+- 로컬/테스트: sqlite+aiosqlite
+"""
+import logging
+import os
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import StaticPool
+
+logger = logging.getLogger(__name__)
+
+Base = declarative_base()
+
+DEFAULT_DATABASE_URL = "sqlite+aiosqlite:///./account.db"
+
+
+def get_database_url() -> str:
+    """환경변수 DATABASE_URL 을 async 드라이버 URL 로 정규화"""
+    url = os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL)
+    # Railway/Supabase 는 드라이버 없는 postgres:// 형태를 주는 경우가 있음
+    if url.startswith("postgres://"):
+        url = "postgresql+asyncpg://" + url[len("postgres://"):]
+    elif url.startswith("postgresql://"):
+        url = "postgresql+asyncpg://" + url[len("postgresql://"):]
+    return url
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """SQLite 동시성 설정 (WAL + busy timeout)"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+def create_engine(url: Optional[str] = None) -> AsyncEngine:
+    """AsyncEngine 생성 (lifespan 에서 한 번만 호출)"""
+    url = url or get_database_url()
+    echo = os.getenv("DB_ECHO", "false").lower() == "true"
+
+    if url.startswith("sqlite"):
+        if ":memory:" in url:
+            # 인메모리 DB 는 커넥션마다 별도 DB 가 되므로 하나의 커넥션을 공유
+            engine = create_async_engine(
+                url, echo=echo, poolclass=StaticPool, connect_args={"check_same_thread": False}
+            )
+        else:
+            engine = create_async_engine(url, echo=echo, connect_args={"timeout": 30})
+            event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+        logger.info(f"🗄️ SQLite 엔진 생성: {url}")
+        return engine
+
+    engine = create_async_engine(
+        url,
+        echo=echo,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        # 클라우드 DB 의 유휴 연결 정리보다 먼저 재생성
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        pool_pre_ping=True,
+        # asyncpg prepared statement 캐시 (로그인 조회 등 반복 쿼리 재사용)
+        connect_args={
+            "prepared_statement_cache_size": int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256")),
+        },
+    )
+    logger.info(f"🗄️ PostgreSQL 엔진 생성: pool_size={engine.pool.size()}")
+    return engine
+
+
+def create_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    """AsyncSession 팩토리 생성"""
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+async def init_models(engine: AsyncEngine) -> None:
+    """테이블/인덱스 생성 (DB_AUTO_CREATE=false 이면 생략)"""
+    if os.getenv("DB_AUTO_CREATE", "true").lower() != "true":
+        return
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    logger.info("✅ 테이블 생성/확인 완료")
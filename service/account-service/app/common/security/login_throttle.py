@@ -0,0 +1,264 @@
+"""
+로그인 실패 제한 (brute-force / credential stuffing 방어)
+- user_id, IP 별 실패 횟수를 count-min sketch 로 근사 → 공격자 키가 아무리 많아도 메모리 고정
+- 현재/직전 윈도우 두 개의 sketch 로 슬라이딩 윈도우 근사 (직전 윈도우는 경과 비율만큼 감쇠)
+- 검사는 O(depth) 이고 KDF(비밀번호 해시) 이전에 수행
+- REDIS_URL 이 있으면 레플리카 간 카운터를 공유 (검사 경로에서는 네트워크 호출 없음)
+"""
+import asyncio
+import hashlib
+import ipaddress
+import logging
+import os
+import time
+from array import array
+from typing import Dict, Optional, Tuple, Union
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # 선택 의존성
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "login_throttle:"
+
+
+class CountMinSketch:
+    """고정 크기 count-min sketch (depth x width 개의 32bit 카운터)"""
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.table = array("I", bytes(4 * width * depth))
+
+    def cells(self, key: str) -> Tuple[int, ...]:
+        """key 가 매핑되는 행별 카운터 위치"""
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=4 * self.depth).digest()
+        return tuple(
+            row * self.width + int.from_bytes(digest[4 * row: 4 * row + 4], "little") % self.width
+            for row in range(self.depth)
+        )
+
+    def add(self, cells: Tuple[int, ...], count: int = 1) -> None:
+        """conservative update: 최솟값 카운터만 올려 과대 추정을 줄임"""
+        target = min(self.table[cell] for cell in cells) + count
+        for cell in cells:
+            if self.table[cell] < target:
+                self.table[cell] = target
+
+    def estimate(self, cells: Tuple[int, ...]) -> int:
+        return min(self.table[cell] for cell in cells)
+
+    def clear(self) -> None:
+        self.table = array("I", bytes(4 * self.width * self.depth))
+
+
+class LoginThrottle:
+    def __init__(
+        self,
+        window_seconds: Optional[float] = None,
+        max_failures_per_user: Optional[int] = None,
+        max_failures_per_ip: Optional[int] = None,
+        width: Optional[int] = None,
+        depth: Optional[int] = None,
+        redis_url: Optional[str] = None,
+        sync_interval: float = 1.0,
+    ):
+        self.window = window_seconds or float(os.getenv("LOGIN_THROTTLE_WINDOW_SECONDS", "300"))
+        self.max_failures_per_user = max_failures_per_user or int(os.getenv("LOGIN_MAX_FAILURES_PER_USER", "10"))
+        self.max_failures_per_ip = max_failures_per_ip or int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", "100"))
+        width = width or int(os.getenv("LOGIN_THROTTLE_SKETCH_WIDTH", "2048"))
+        depth = depth or int(os.getenv("LOGIN_THROTTLE_SKETCH_DEPTH", "4"))
+        self.redis_url = redis_url if redis_url is not None else os.getenv("REDIS_URL")
+        self.sync_interval = sync_interval
+
+        self._window_index = self._current_window()
+        self._current = CountMinSketch(width, depth)
+        self._previous = CountMinSketch(width, depth)
+        # Redis 에서 가져온 공유 카운터 (다른 레플리카 실패 포함)
+        self._shared_current = CountMinSketch(width, depth)
+        self._shared_previous = CountMinSketch(width, depth)
+        # 아직 Redis 에 반영하지 않은 증가분 (window -> cell -> count)
+        self._pending: Dict[int, Dict[int, int]] = {}
+        self._redis = None
+        self._sync_task: Optional[asyncio.Task] = None
+        self.blocked = 0
+
+    def _current_window(self) -> int:
+        return int(time.time() // self.window)
+
+    def _rotate(self) -> float:
+        """윈도우 경계를 넘었으면 sketch 교체, 현재 윈도우 경과 비율 반환"""
+        now = time.time()
+        index = int(now // self.window)
+        if index != self._window_index:
+            if index == self._window_index + 1:
+                self._previous, self._current = self._current, self._previous
+                self._shared_previous, self._shared_current = self._shared_current, self._shared_previous
+            else:
+                self._previous.clear()
+                self._shared_previous.clear()
+            self._current.clear()
+            self._shared_current.clear()
+            self._window_index = index
+        return (now % self.window) / self.window
+
+    def _estimate(self, cells: Tuple[int, ...], elapsed_ratio: float) -> float:
+        current = max(self._current.estimate(cells), self._shared_current.estimate(cells))
+        previous = max(self._previous.estimate(cells), self._shared_previous.estimate(cells))
+        return current + previous * (1.0 - elapsed_ratio)
+
+    def check(self, user_id: str, client_ip: Optional[str]) -> Optional[float]:
+        """차단 대상이면 재시도까지 남은 초, 아니면 None"""
+        elapsed_ratio = self._rotate()
+        limited = self._estimate(self._current.cells("u:" + user_id), elapsed_ratio) >= self.max_failures_per_user
+        if not limited and client_ip:
+            limited = self._estimate(self._current.cells("ip:" + client_ip), elapsed_ratio) >= self.max_failures_per_ip
+        if not limited:
+            return None
+        self.blocked += 1
+        return self.window * (1.0 - elapsed_ratio)
+
+    def record_failure(self, user_id: str, client_ip: Optional[str]) -> None:
+        """로그인 실패 기록"""
+        self._rotate()
+        keys = ["u:" + user_id] + (["ip:" + client_ip] if client_ip else [])
+        for key in keys:
+            cells = self._current.cells(key)
+            self._current.add(cells)
+            if self._redis is not None:
+                pending = self._pending.setdefault(self._window_index, {})
+                for cell in cells:
+                    pending[cell] = pending.get(cell, 0) + 1
+
+    async def start(self):
+        """Redis 공유 모드 시작 (REDIS_URL 이 없으면 프로세스 내에서만 동작)"""
+        if not self.redis_url or aioredis is None:
+            logger.info("✅ 로그인 실패 제한: 로컬 카운터 사용")
+            return
+        try:
+            self._redis = aioredis.from_url(self.redis_url, decode_responses=True)
+            await self._redis.ping()
+            self._sync_task = asyncio.create_task(self._sync_loop())
+            logger.info("✅ 로그인 실패 제한: Redis 공유 카운터 사용")
+        except Exception as e:
+            logger.warning(f"⚠️ Redis 연결 실패, 로그인 실패 제한은 로컬 카운터로 동작: {e}")
+            self._redis = None
+
+    async def stop(self):
+        if self._sync_task:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def _sync_loop(self):
+        """증가분 push + 현재/직전 윈도우 공유 카운터 pull"""
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self._sync()
+            except Exception as e:
+                logger.error(f"❌ 로그인 실패 카운터 동기화 오류: {e}")
+
+    async def _sync(self):
+        pending, self._pending = self._pending, {}
+        self._rotate()
+        index = self._window_index
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for window, cells in pending.items():
+                    key = f"{REDIS_KEY_PREFIX}{window}"
+                    for cell, count in cells.items():
+                        pipe.hincrby(key, cell, count)
+                    pipe.expire(key, int(self.window * 2) + 60)
+                pipe.hgetall(f"{REDIS_KEY_PREFIX}{index}")
+                pipe.hgetall(f"{REDIS_KEY_PREFIX}{index - 1}")
+                results = await pipe.execute()
+        except Exception:
+            # 보내지 못한 증가분은 다음 주기에 다시 (그 사이 쌓인 증가분과 합침, 집계가 끝난 윈도우는 버림)
+            self._requeue(pending, index - 1)
+            raise
+
+        # pull 하는 동안 윈도우가 바뀌었으면 다음 주기에 다시 가져옴
+        if index != self._window_index:
+            return
+        for sketch, values in ((self._shared_current, results[-2]), (self._shared_previous, results[-1])):
+            sketch.clear()
+            for cell, count in values.items():
+                sketch.table[int(cell)] = int(count)
+
+    def _requeue(self, pending: Dict[int, Dict[int, int]], oldest_window: int) -> None:
+        for window, cells in pending.items():
+            if window < oldest_window:
+                continue
+            merged = self._pending.setdefault(window, {})
+            for cell, count in cells.items():
+                merged[cell] = merged.get(cell, 0) + count
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "backend": "redis" if self._redis is not None else "local",
+            "window_seconds": self.window,
+            "max_failures_per_user": self.max_failures_per_user,
+            "max_failures_per_ip": self.max_failures_per_ip,
+            "sketch_bytes": 4 * len(self._current.table) * 4,
+            "blocked": self.blocked,
+        }
+
+
+def _parse_networks(value: str) -> Tuple[Union[ipaddress.IPv4Network, ipaddress.IPv6Network], ...]:
+    networks = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            networks.append(ipaddress.ip_network(item, strict=False))
+        except ValueError:
+            logger.warning(f"⚠️ TRUSTED_PROXIES 항목 무시: {item}")
+    return tuple(networks)
+
+
+# X-Forwarded-For 를 붙일 수 있는 프록시(게이트웨이, 플랫폼 로드밸런서) 대역, 기본은 사설/루프백/CGNAT 대역
+TRUSTED_PROXIES = _parse_networks(os.getenv(
+    "TRUSTED_PROXIES",
+    "127.0.0.0/8,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16,100.64.0.0/10,::1/128,fc00::/7",
+))
+
+
+def _is_trusted(address: str, networks) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def get_client_ip(request, trusted_proxies=None) -> Optional[str]:
+    """
+    클라이언트 IP 추출
+    X-Forwarded-For 는 클라이언트가 앞부분을 마음대로 채울 수 있으므로,
+    직접 연결한 상대가 신뢰하는 프록시일 때만 읽고 오른쪽(가장 최근 홉)부터 신뢰 프록시를 건너뛴
+    첫 주소를 사용 (게이트웨이는 자신이 본 상대 주소를 맨 뒤에 붙여서 전달)
+    """
+    networks = TRUSTED_PROXIES if trusted_proxies is None else trusted_proxies
+    peer = request.client.host if request.client else None
+    if peer is None or not _is_trusted(peer, networks):
+        return peer
+    forwarded = request.headers.get("x-forwarded-for")
+    if not forwarded:
+        return peer
+    client = peer
+    for address in reversed([address.strip() for address in forwarded.split(",")]):
+        if not address:
+            continue
+        client = address
+        if not _is_trusted(address, networks):
+            break
+    return client
@@ -0,0 +1,87 @@
+"""
+비밀번호 해시 (scrypt)
+- KDF 연산은 이벤트 루프를 막지 않도록 스레드 풀에서 실행
+- hashlib.scrypt 는 연산 중 GIL 을 놓으므로 스레드로도 병렬 처리됨
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+_ALGORITHM = "scrypt"
+
+
+class PasswordHasher:
+    def __init__(
+        self,
+        n: int = 2 ** 14,
+        r: int = 8,
+        p: int = 1,
+        max_workers: Optional[int] = None,
+    ):
+        self.n = n
+        self.r = r
+        self.p = p
+        self.max_workers = max_workers or int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pwhash")
+        # 존재하지 않는 사용자 로그인도 동일한 비용이 들도록 사용하는 더미 해시
+        self._dummy_hash = self._hash_sync(secrets.token_urlsafe(16))
+
+    def _derive(self, password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        return hashlib.scrypt(
+            password.encode("utf-8"), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r * p, dklen=32
+        )
+
+    def _hash_sync(self, password: str) -> str:
+        salt = secrets.token_bytes(16)
+        digest = self._derive(password, salt, self.n, self.r, self.p)
+        return "$".join([
+            _ALGORITHM,
+            str(self.n),
+            str(self.r),
+            str(self.p),
+            base64.b64encode(salt).decode("ascii"),
+            base64.b64encode(digest).decode("ascii"),
+        ])
+
+    def _verify_sync(self, password: str, encoded: str) -> bool:
+        try:
+            algorithm, n, r, p, salt, digest = encoded.split("$")
+        except ValueError:
+            return False
+        if algorithm != _ALGORITHM:
+            return False
+        expected = base64.b64decode(digest)
+        actual = self._derive(password, base64.b64decode(salt), int(n), int(r), int(p))
+        return hmac.compare_digest(expected, actual)
+
+    async def hash(self, password: str) -> str:
+        """비밀번호 해시 생성"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._hash_sync, password)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """여러 비밀번호를 풀 전체에 분산해서 병렬 해시"""
+        loop = asyncio.get_running_loop()
+        return list(await asyncio.gather(
+            *(loop.run_in_executor(self._executor, self._hash_sync, password) for password in passwords)
+        ))
+
+    async def verify(self, password: str, encoded: Optional[str]) -> bool:
+        """비밀번호 검증 (encoded 가 없으면 더미 해시로 동일 비용 소모 후 False)"""
+        loop = asyncio.get_running_loop()
+        if encoded is None:
+            await loop.run_in_executor(self._executor, self._verify_sync, password, self._dummy_hash)
+            return False
+        return await loop.run_in_executor(self._executor, self._verify_sync, password, encoded)
+
+    def close(self):
+        """리소스 정리"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,3 @@
+from .session_store import SESSION_COOKIE_NAME, SessionStore, extract_session_token, token_id
+
+__all__ = ["SESSION_COOKIE_NAME", "SessionStore", "extract_session_token", "token_id"]
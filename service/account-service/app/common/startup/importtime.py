@@ -0,0 +1,94 @@
+"""
+import 비용 리포트 (python -X importtime 결과 집계)
+
+    python -m app.common.startup.importtime [app.main app.bootstrap ...] [--top 25] [--json]
+
+- 새 인터프리터에서 대상 모듈을 차례로 import 하며 -X importtime 출력을 받아
+  모듈별 누적(cumulative) / 자체(self) 시간과 최상위 패키지별 자체 시간 합계를 보여줌
+- 이미 떠 있는 프로세스의 import 상태와 무관하게 콜드 스타트 기준으로 측정
+  (/health/startup/imports 도 같은 함수를 사용, 지연 import 되는 모듈까지 포함)
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+
+def parse(output: str) -> List[Dict[str, Any]]:
+    """-X importtime 출력 → [{"module", "self_us", "cumulative_us", "depth"}] (import 순서)"""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 머리글 행
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        rows.append({
+            "module": stripped,
+            "self_us": int(parts[0]),
+            "cumulative_us": int(parts[1]),
+            # 들여쓰기 두 칸 = import 깊이 한 단계
+            "depth": (len(name) - len(stripped) - 1) // 2,
+        })
+    return rows
+
+
+def profile(modules: Sequence[str] = ("app.main",), top: int = 25, cwd: Optional[str] = None) -> Dict[str, Any]:
+    """새 프로세스에서 modules 를 차례로 import 하며 시간 측정, 상위 top 개씩 집계"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        cwd=cwd, env=env, capture_output=True, text=True, timeout=120,
+    )
+    rows = parse(result.stderr)
+    if result.returncode != 0:
+        raise RuntimeError(f"{', '.join(modules)} import 실패: {result.stderr.strip().splitlines()[-1:]}")
+    packages: Dict[str, int] = defaultdict(int)
+    for row in rows:
+        packages[row["module"].split(".")[0]] += row["self_us"]
+    return {
+        "modules_requested": list(modules),
+        "total_ms": round(sum(packages.values()) / 1000, 1),
+        "modules": len(rows),
+        "packages": [
+            {"package": name, "self_ms": round(us / 1000, 1)}
+            for name, us in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        ],
+        "slowest_cumulative": [
+            {"module": row["module"], "cumulative_ms": round(row["cumulative_us"] / 1000, 1), "self_ms": round(row["self_us"] / 1000, 1)}
+            for row in sorted(rows, key=lambda row: -row["cumulative_us"])[:top]
+        ],
+        "slowest_self": [
+            {"module": row["module"], "self_ms": round(row["self_us"] / 1000, 1)}
+            for row in sorted(rows, key=lambda row: -row["self_us"])[:top]
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모듈 import 비용 리포트 (-X importtime 집계)")
+    parser.add_argument("modules", nargs="*", default=["app.main"])
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--json", action="store_true", help="JSON 으로 출력")
+    args = parser.parse_args()
+
+    report = profile(args.modules, args.top)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+    print(f"{' + '.join(report['modules_requested'])}: {report['total_ms']:.0f}ms ({report['modules']} modules)")
+    print(f"\n{'package':<40} {'self ms':>9}")
+    for row in report["packages"]:
+        print(f"{row['package']:<40} {row['self_ms']:>9.1f}")
+    print(f"\n{'module':<60} {'cumul ms':>9} {'self ms':>9}")
+    for row in report["slowest_cumulative"]:
+        print(f"{row['module']:<60} {row['cumulative_ms']:>9.1f} {row['self_ms']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+요청마다 루트(server) 스팬을 여는 순수 ASGI 미들웨어와 설치 함수
+- traceparent 를 받으면 그 trace 를 이어가고, 없으면 새 trace (head 샘플링, edge 면 받은 sampled 도 다시 결정)
+- 스팬 이름은 처리한 라우트 경로 ("POST /login"), 맞는 라우트가 없으면(404 등) "POST unmatched"
+  (요청 경로를 그대로 쓰면 스팬 이름이 지표 라벨이 되므로 아무 경로나 보내 라벨 수를 무한히 늘릴 수 있음)
+- 응답 상태 5xx 나 처리 중 예외는 오류로 표시
+- 응답 헤더 X-Trace-ID 로 trace id 를 돌려줌 (GET /traces/{trace_id} 로 조회)
+- 헬스체크 같은 경로(exclude 로 시작하는 경로)는 추적하지 않음
+"""
+import os
+from typing import Iterable, Optional
+
+from fastapi import FastAPI
+
+from .span_exporter import SpanExporter
+from .tracer import TRACE_ID_HEADER, Tracer
+
+DEFAULT_EXCLUDE = ("/health", "/ping", "/docs", "/openapi.json")
+
+
+class TracingMiddleware:
+    def __init__(self, app, tracer: Tracer, exclude: Iterable[str] = DEFAULT_EXCLUDE):
+        self.app = app
+        self.tracer = tracer
+        self.exclude = tuple(exclude)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude):
+            return await self.app(scope, receive, send)
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        method = scope["method"]
+        span, tokens = self.tracer.begin(traceparent, f"{method} unmatched", "server")
+        status = 500
+        trace_header = (TRACE_ID_HEADER.encode("latin-1"), span.trace_id.encode("latin-1"))
+
+        async def send_with_trace(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), trace_header]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace)
+        except BaseException as e:
+            span.error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            route = scope.get("route")
+            if route is not None and getattr(route, "path", None):
+                span.name = f"{method} {route.path}"
+            span.set("http.status_code", status)
+            if status >= 500:
+                span.status = "error"
+            self.tracer.finish(span, tokens)
+
+
+def install_tracing(
+    app: FastAPI, tracer: Tracer, service: str, exclude: Iterable[str] = DEFAULT_EXCLUDE, edge: bool = False
+) -> Optional[SpanExporter]:
+    """
+    TracingMiddleware 를 붙이고 스팬 전송을 켬
+    edge: 외부 요청을 바로 받는 프로세스(게이트웨이), 클라이언트 traceparent 의 sampled 를 무시하고 head 샘플링을 다시 결정
+    TRACE_EXPORT_URL, 없으면 MONITORING_SERVICE_URL + /traces/push, 둘 다 없거나 TRACE_ENABLED=false 면 미들웨어만 (내보내지 않음)
+    """
+    tracer.service = service
+    tracer.edge = edge
+    app.add_middleware(TracingMiddleware, tracer=tracer, exclude=exclude)
+    if os.getenv("TRACE_ENABLED", "true").lower() == "false":
+        return None
+    url = os.getenv("TRACE_EXPORT_URL")
+    if not url:
+        base = os.getenv("MONITORING_SERVICE_URL")
+        if not base:
+            return None
+        url = base.rstrip("/") + "/traces/push"
+    exporter = SpanExporter(url).start()
+    tracer.export = exporter
+    return exporter
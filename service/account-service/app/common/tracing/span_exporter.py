@@ -0,0 +1,101 @@
+"""
+스팬 전송 (monitoring-service 로 배치 전송)
+- Tracer 가 샘플링한 요청의 스팬 목록을 넘기면 메모리 큐에 넣기만 함 (요청 경로에서 네트워크/압축 없음)
+  큐가 TRACE_EXPORT_QUEUE 개로 차면 가장 오래된 스팬부터 버림
+- 전송 스레드가 TRACE_EXPORT_SECONDS 마다, 또는 TRACE_EXPORT_BATCH 개가 쌓이면
+  NDJSON 으로 묶어 zstd(없으면 gzip) 로 압축해 POST {MONITORING_SERVICE_URL}/traces/push
+- 실패하면 그 배치는 버리고 다음 주기까지 기다림 (추적은 로그보다 덜 중요, 재시도로 큐를 막지 않음)
+"""
+import atexit
+import gzip
+import json
+import os
+import threading
+import urllib.request
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # 선택 의존성 (없으면 gzip)
+    zstandard = None
+
+
+class SpanExporter:
+    def __init__(
+        self,
+        url: str,
+        batch_size: Optional[int] = None,
+        interval: Optional[float] = None,
+        queue_size: Optional[int] = None,
+    ):
+        self.url = url
+        self.batch_size = batch_size or int(os.getenv("TRACE_EXPORT_BATCH", "1000"))
+        self.interval = interval or float(os.getenv("TRACE_EXPORT_SECONDS", "2"))
+        self.queue: Deque[Dict[str, Any]] = deque(maxlen=queue_size or int(os.getenv("TRACE_EXPORT_QUEUE", "20000")))
+        self.encoding = "zstd" if zstandard is not None else "gzip"
+        self._compressor = zstandard.ZstdCompressor(level=3) if zstandard is not None else None
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.counts = {"queued": 0, "sent": 0, "dropped": 0, "batches": 0, "failures": 0, "bytes": 0}
+
+    def start(self) -> "SpanExporter":
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        return self
+
+    def __call__(self, spans: List[Dict[str, Any]]):
+        overflow = len(self.queue) + len(spans) - self.queue.maxlen
+        if overflow > 0:
+            self.counts["dropped"] += overflow
+        self.queue.extend(spans)
+        self.counts["queued"] += len(spans)
+        if len(self.queue) >= self.batch_size:
+            self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        while self.queue:
+            batch = []
+            while self.queue and len(batch) < self.batch_size:
+                batch.append(self.queue.popleft())
+            if not self._send(batch):
+                return
+
+    def _send(self, batch: List[Dict[str, Any]]) -> bool:
+        try:
+            body = "\n".join(json.dumps(span, ensure_ascii=False) for span in batch).encode("utf-8")
+            body = self._compressor.compress(body) if self._compressor is not None else gzip.compress(body, compresslevel=5)
+            request = urllib.request.Request(
+                self.url,
+                data=body,
+                method="POST",
+                headers={"Content-Type": "application/x-ndjson", "Content-Encoding": self.encoding},
+            )
+            with urllib.request.urlopen(request, timeout=5) as response:
+                response.read()
+        except Exception:
+            self.counts["failures"] += 1
+            self.counts["dropped"] += len(batch)
+            return False
+        self.counts["sent"] += len(batch)
+        self.counts["batches"] += 1
+        self.counts["bytes"] += len(body)
+        return True
+
+    def close(self):
+        if self._thread is not None and not self._stopped.is_set():
+            self._stopped.set()
+            self._wake.set()
+            self._thread.join(3)
+            self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"url": self.url, "encoding": self.encoding, "pending": len(self.queue), **self.counts}
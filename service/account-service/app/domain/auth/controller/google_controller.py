@@ -0,0 +1,59 @@
+from fastapi import HTTPException
+from fastapi.responses import RedirectResponse
+import logging
+import os
+
+from app.common.session import SESSION_COOKIE_NAME, SessionStore
+from app.domain.user.user_repository import UserRepository
+from ..service.google_oauth_service import GoogleOAuthService, OAuthError
+
+logger = logging.getLogger(__name__)
+
+class GoogleController:
+    def __init__(self, service: GoogleOAuthService, session_store: SessionStore, repository: UserRepository):
+        self.service = service
+        self.session_store = session_store
+        self.repository = repository
+
+    async def login(self, return_uri: str) -> RedirectResponse:
+        """Google 로그인 페이지로 리다이렉트"""
+        try:
+            url = await self.service.authorization_url(return_uri)
+        except OAuthError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return RedirectResponse(url, status_code=302)
+
+    async def callback(self, code: str, state: str) -> RedirectResponse:
+        """코드 교환 → 세션 발급 → 로그인 시작 시 받은 주소로 리다이렉트"""
+        try:
+            result = await self.service.complete(code, state)
+        except OAuthError as e:
+            logger.warning(f"❌ Google 로그인 실패: {e}")
+            raise HTTPException(status_code=400, detail=str(e))
+
+        claims = result["claims"]
+        # Google 계정은 항상 sub 로 식별 (일반 가입 user_id 는 이메일 소유 확인 없이 만들 수 있으므로
+        # 이메일이 같다고 기존 계정으로 로그인시키지 않음)
+        user_id = f"google:{claims['sub']}"
+        row = await self.repository.find_by_user_id(user_id)
+
+        token = await self.session_store.create({
+            "user_id": user_id,
+            "company_id": row.company_id if row else None,
+            "provider": "google",
+            "email": claims.get("email") if claims.get("email_verified") else None,
+            "name": claims.get("name"),
+        })
+        logger.info(f"✅ Google 로그인 성공: {user_id}")
+
+        response = RedirectResponse(result["return_uri"], status_code=302)
+        response.set_cookie(
+            key=SESSION_COOKIE_NAME,
+            value=token,
+            max_age=self.session_store.ttl,
+            httponly=True,
+            secure=os.getenv("RAILWAY_ENVIRONMENT", "false").lower() == "true",
+            samesite="lax",
+            path="/",
+        )
+        return response
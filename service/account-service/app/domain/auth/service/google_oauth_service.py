@@ -0,0 +1,178 @@
+"""
+Google OAuth (OIDC authorization code + PKCE) 서비스
+- 토큰 교환은 프로세스당 하나의 httpx.AsyncClient (커넥션 풀, keep-alive) 로 수행
+- ID 토큰은 캐시된 JWKS 로 로컬 검증 → 로그인마다 userinfo 엔드포인트를 호출하지 않음
+- GOOGLE_DISCOVERY_URL 을 로컬 가짜 IdP 로 바꾸면 외부 네트워크 없이 전체 흐름 테스트 가능
+"""
+import base64
+import hashlib
+import logging
+import os
+import secrets
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode, urlsplit
+
+import httpx
+import jwt
+
+from .oauth_state_store import OAuthStateStore
+from .oidc_provider import OIDCProvider
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_DISCOVERY_URL = "https://accounts.google.com/.well-known/openid-configuration"
+# Google 은 iss 를 두 가지 형태로 발급
+GOOGLE_ISSUERS = ("https://accounts.google.com", "accounts.google.com")
+
+
+class OAuthError(Exception):
+    """OAuth 흐름 실패 (사용자에게는 400 으로 응답)"""
+
+
+def _pkce_pair() -> tuple:
+    verifier = secrets.token_urlsafe(48)
+    challenge = base64.urlsafe_b64encode(hashlib.sha256(verifier.encode("ascii")).digest()).rstrip(b"=").decode("ascii")
+    return verifier, challenge
+
+
+class GoogleOAuthService:
+    def __init__(
+        self,
+        state_store: OAuthStateStore,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None,
+        redirect_uri: Optional[str] = None,
+        discovery_url: Optional[str] = None,
+        token_url: Optional[str] = None,
+        allowed_return_origins: Optional[List[str]] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.state_store = state_store
+        self.client_id = client_id or os.getenv("GOOGLE_CLIENT_ID", "")
+        self.client_secret = client_secret or os.getenv("GOOGLE_CLIENT_SECRET", "")
+        self.redirect_uri = redirect_uri or os.getenv("GOOGLE_REDIRECT_URI", "http://localhost:8080/api/v1/auth/google/callback")
+        discovery_url = discovery_url or os.getenv("GOOGLE_DISCOVERY_URL", GOOGLE_DISCOVERY_URL)
+        # 비어 있으면 discovery 문서의 token_endpoint 사용
+        self.token_url = token_url or os.getenv("GOOGLE_TOKEN_URL") or None
+        origins = allowed_return_origins or os.getenv("OAUTH_ALLOWED_RETURN_ORIGINS", "http://localhost:3000").split(",")
+        self.allowed_return_origins = {origin.strip().rstrip("/") for origin in origins if origin.strip()}
+
+        self.client = client or httpx.AsyncClient(
+            timeout=httpx.Timeout(float(os.getenv("OAUTH_HTTP_TIMEOUT_SECONDS", "10"))),
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("OAUTH_HTTP_MAX_CONNECTIONS", "20")),
+                max_keepalive_connections=int(os.getenv("OAUTH_HTTP_MAX_KEEPALIVE", "10")),
+            ),
+        )
+        self.provider = OIDCProvider(
+            self.client,
+            discovery_url,
+            default_ttl=float(os.getenv("OIDC_CACHE_DEFAULT_TTL_SECONDS", "3600")),
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.client_id and self.client_secret)
+
+    async def start(self):
+        await self.state_store.start()
+        if self.configured:
+            await self.provider.warm_up()
+        else:
+            logger.warning("⚠️ GOOGLE_CLIENT_ID/SECRET 미설정: Google 로그인 비활성화")
+
+    async def stop(self):
+        await self.state_store.stop()
+        await self.client.aclose()
+
+    def is_allowed_return_uri(self, uri: str) -> bool:
+        """로그인 후 돌아갈 주소는 허용된 origin 만 (open redirect 방지)"""
+        parts = urlsplit(uri)
+        return f"{parts.scheme}://{parts.netloc}" in self.allowed_return_origins
+
+    async def authorization_url(self, return_uri: str) -> str:
+        """Google 로그인 페이지 URL 생성 (state/nonce/PKCE 발급)"""
+        if not self.configured:
+            raise OAuthError("Google 로그인이 설정되지 않았습니다")
+        if not self.is_allowed_return_uri(return_uri):
+            raise OAuthError("허용되지 않은 redirect_uri 입니다")
+
+        metadata = await self.provider.metadata()
+        nonce = secrets.token_urlsafe(16)
+        verifier, challenge = _pkce_pair()
+        state = await self.state_store.issue({"return_uri": return_uri, "nonce": nonce, "verifier": verifier})
+        query = urlencode({
+            "client_id": self.client_id,
+            "redirect_uri": self.redirect_uri,
+            "response_type": "code",
+            "scope": "openid email profile",
+            "state": state,
+            "nonce": nonce,
+            "code_challenge": challenge,
+            "code_challenge_method": "S256",
+            "prompt": "select_account",
+        })
+        return f"{metadata['authorization_endpoint']}?{query}"
+
+    async def complete(self, code: str, state: str) -> Dict[str, Any]:
+        """콜백 처리: state 확인 → 코드 교환 → ID 토큰 검증 → {claims, return_uri}"""
+        saved = await self.state_store.consume(state)
+        if saved is None:
+            raise OAuthError("state 가 만료되었거나 유효하지 않습니다")
+
+        metadata = await self.provider.metadata()
+        try:
+            response = await self.client.post(
+                self.token_url or metadata["token_endpoint"],
+                data={
+                    "grant_type": "authorization_code",
+                    "code": code,
+                    "redirect_uri": self.redirect_uri,
+                    "client_id": self.client_id,
+                    "client_secret": self.client_secret,
+                    "code_verifier": saved["verifier"],
+                },
+                headers={"Accept": "application/json"},
+            )
+        except httpx.HTTPError as e:
+            logger.error(f"❌ Google 토큰 교환 요청 실패: {e}")
+            raise OAuthError("Google 토큰 교환에 실패했습니다") from e
+        if response.status_code != 200:
+            logger.warning(f"❌ Google 토큰 교환 거부: {response.status_code} {response.text[:200]}")
+            raise OAuthError("Google 토큰 교환에 실패했습니다")
+
+        try:
+            id_token = response.json().get("id_token")
+        except (ValueError, AttributeError) as e:
+            logger.warning(f"❌ Google 토큰 응답 형식 오류: {response.text[:200]}")
+            raise OAuthError("Google 토큰 교환에 실패했습니다") from e
+        if not id_token:
+            raise OAuthError("ID 토큰이 없습니다")
+        claims = await self.verify_id_token(id_token, saved["nonce"], metadata)
+        return {"claims": claims, "return_uri": saved["return_uri"]}
+
+    async def verify_id_token(self, id_token: str, nonce: Optional[str], metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """ID 토큰 서명/iss/aud/exp/nonce 로컬 검증"""
+        try:
+            header = jwt.get_unverified_header(id_token)
+            key = await self.provider.signing_key(header.get("kid"))
+            # 알고리즘은 토큰 헤더가 아니라 키(JWK)에 맞춰 고정 (alg 혼동 공격 방지)
+            claims = jwt.decode(
+                id_token,
+                key=key.key,
+                algorithms=[key.algorithm_name],
+                audience=self.client_id,
+                leeway=60,
+                options={"require": ["iss", "aud", "exp", "iat", "sub"]},
+            )
+        except jwt.PyJWTError as e:
+            logger.warning(f"❌ ID 토큰 검증 실패: {e}")
+            raise OAuthError("ID 토큰 검증에 실패했습니다") from e
+
+        issuer = metadata.get("issuer")
+        valid_issuers = GOOGLE_ISSUERS if issuer in GOOGLE_ISSUERS else (issuer,)
+        if claims.get("iss") not in valid_issuers:
+            raise OAuthError("ID 토큰 발급자가 올바르지 않습니다")
+        if nonce is not None and claims.get("nonce") != nonce:
+            raise OAuthError("ID 토큰 nonce 가 일치하지 않습니다")
+        return claims
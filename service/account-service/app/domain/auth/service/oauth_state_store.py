@@ -0,0 +1,68 @@
+"""
+OAuth state 저장소
+- 로그인 시작 시 발급한 state 에 (redirect_uri, nonce, PKCE verifier) 를 묶어 TTL 동안 보관
+- 콜백에서 한 번만 꺼낼 수 있음 (재사용 방지)
+- REDIS_URL 이 있으면 Redis(GETDEL) 에 저장해서 콜백이 다른 레플리카로 가도 동작
+- 로컬 모드는 LRU + TTL 캐시라 로그인 시작만 반복하는 요청이 있어도 메모리는 maxsize 로 고정
+"""
+import json
+import logging
+import os
+import secrets
+from typing import Any, Dict, Optional
+
+from app.common.cache import LRUTTLCache
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # 선택 의존성
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+STATE_KEY_PREFIX = "oauth_state:"
+
+
+class OAuthStateStore:
+    def __init__(self, redis_url: Optional[str] = None, ttl: Optional[float] = None, maxsize: int = 10000):
+        self.redis_url = redis_url if redis_url is not None else os.getenv("REDIS_URL")
+        self.ttl = ttl or float(os.getenv("OAUTH_STATE_TTL_SECONDS", "600"))
+        self._local = LRUTTLCache(maxsize=maxsize, ttl=self.ttl)
+        self._redis = None
+
+    async def start(self):
+        if not self.redis_url or aioredis is None:
+            return
+        try:
+            self._redis = aioredis.from_url(self.redis_url, decode_responses=True)
+            await self._redis.ping()
+        except Exception as e:
+            logger.warning(f"⚠️ Redis 연결 실패, OAuth state 는 로컬에 저장: {e}")
+            self._redis = None
+
+    async def stop(self):
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def issue(self, data: Dict[str, Any]) -> str:
+        """새 state 발급"""
+        state = secrets.token_urlsafe(24)
+        if self._redis is not None:
+            await self._redis.set(STATE_KEY_PREFIX + state, json.dumps(data), ex=int(self.ttl))
+        else:
+            self._local.set(state, data)
+        return state
+
+    async def consume(self, state: str) -> Optional[Dict[str, Any]]:
+        """state 확인 후 삭제 (없거나 만료되었으면 None)"""
+        if self._redis is not None:
+            raw = await self._redis.getdel(STATE_KEY_PREFIX + state)
+            return json.loads(raw) if raw is not None else None
+        data = self._local.get(state)
+        if data is not None:
+            self._local.pop(state)
+        return data
+
+    def __len__(self) -> int:
+        return len(self._local)
@@ -0,0 +1,155 @@
+"""
+OIDC 제공자 메타데이터 캐시 (discovery 문서 + JWKS)
+- 응답의 Cache-Control max-age(- Age) 동안 재요청 없이 메모리에서 사용
+- 만료 후에는 기존 값을 그대로 쓰면서 백그라운드로 갱신 (로그인 경로가 IdP 응답을 기다리지 않음)
+- 모르는 kid 가 오면 (키 교체) JWKS 를 즉시 다시 받되, 동시 요청은 한 번의 요청으로 합치고
+  최소 간격을 두어 임의의 kid 로 IdP 를 두드리는 요청은 막음
+- JWK 는 받을 때 한 번만 파싱해서 공개키 객체로 보관
+"""
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+import jwt
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE = re.compile(r"(?:^|[,\s])(?:s-maxage|max-age)\s*=\s*\"?(\d+)")
+
+
+def cache_ttl(headers: httpx.Headers, default_ttl: float) -> float:
+    """Cache-Control / Age 헤더로 캐시 유효 시간(초) 계산"""
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0.0
+    match = _MAX_AGE.search(cache_control)
+    if not match:
+        return default_ttl
+    try:
+        age = float(headers.get("age", "0"))
+    except ValueError:
+        age = 0.0
+    return max(0.0, float(match.group(1)) - age)
+
+
+class CachedDocument:
+    """URL 하나의 JSON 응답 캐시 (stale-while-revalidate)"""
+
+    def __init__(self, client: httpx.AsyncClient, url: str, default_ttl: float):
+        self.client = client
+        self.url = url
+        self.default_ttl = default_ttl
+        self.value: Optional[Dict[str, Any]] = None
+        self.expires_at = 0.0
+        self.fetched_at = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+
+    async def get(self) -> Dict[str, Any]:
+        if self.value is None:
+            return await self.refresh()
+        if self.expires_at <= time.monotonic():
+            # 만료된 값을 먼저 돌려주고 갱신은 백그라운드에서
+            self._start_refresh()
+        return self.value
+
+    async def refresh(self) -> Dict[str, Any]:
+        """즉시 갱신 (진행 중인 요청이 있으면 그 결과를 공유)"""
+        return await asyncio.shield(self._start_refresh())
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._fetch())
+            self._inflight.add_done_callback(self._log_failure)
+        return self._inflight
+
+    def _log_failure(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"⚠️ OIDC 문서 갱신 실패 ({self.url}): {task.exception()}")
+
+    async def _fetch(self) -> Dict[str, Any]:
+        response = await self.client.get(self.url)
+        response.raise_for_status()
+        self.value = response.json()
+        self.fetched_at = time.monotonic()
+        self.expires_at = self.fetched_at + cache_ttl(response.headers, self.default_ttl)
+        self.on_update(self.value)
+        return self.value
+
+    def on_update(self, value: Dict[str, Any]) -> None:
+        pass
+
+
+class JWKSDocument(CachedDocument):
+    """JWKS 캐시 (kid -> 파싱된 공개키)"""
+
+    def __init__(self, client: httpx.AsyncClient, url: str, default_ttl: float):
+        super().__init__(client, url, default_ttl)
+        self.keys: Dict[str, jwt.PyJWK] = {}
+
+    def on_update(self, value: Dict[str, Any]) -> None:
+        keys = {}
+        for data in value.get("keys", []):
+            if data.get("use", "sig") != "sig" or "kid" not in data:
+                continue
+            try:
+                keys[data["kid"]] = jwt.PyJWK(data)
+            except jwt.PyJWKError as e:
+                logger.warning(f"⚠️ 지원하지 않는 JWK 무시 (kid={data.get('kid')}): {e}")
+        self.keys = keys
+
+
+class OIDCProvider:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        discovery_url: str,
+        default_ttl: float = 3600.0,
+        min_kid_refresh_interval: float = 60.0,
+    ):
+        self.client = client
+        self.default_ttl = default_ttl
+        self.min_kid_refresh_interval = min_kid_refresh_interval
+        self._discovery = CachedDocument(client, discovery_url, default_ttl)
+        self._jwks: Optional[JWKSDocument] = None
+
+    async def metadata(self) -> Dict[str, Any]:
+        """discovery 문서 (issuer, authorization_endpoint, token_endpoint, jwks_uri ...)"""
+        return await self._discovery.get()
+
+    async def _jwks_document(self) -> JWKSDocument:
+        jwks_uri = (await self.metadata())["jwks_uri"]
+        if self._jwks is None or self._jwks.url != jwks_uri:
+            self._jwks = JWKSDocument(self.client, jwks_uri, self.default_ttl)
+        return self._jwks
+
+    async def signing_key(self, kid: Optional[str]) -> jwt.PyJWK:
+        """kid 에 해당하는 서명 검증 키"""
+        jwks = await self._jwks_document()
+        if jwks.value is None:
+            await jwks.refresh()
+        else:
+            await jwks.get()
+
+        key = jwks.keys.get(kid) if kid else None
+        if key is None and time.monotonic() - jwks.fetched_at >= self.min_kid_refresh_interval:
+            # 키 교체 직후일 수 있으므로 한 번 다시 받아봄
+            logger.info(f"🔑 알 수 없는 kid={kid}, JWKS 갱신")
+            await jwks.refresh()
+            key = jwks.keys.get(kid) if kid else None
+        if key is None:
+            # kid 없는 토큰은 키가 하나뿐일 때만 허용
+            if kid is None and len(jwks.keys) == 1:
+                return next(iter(jwks.keys.values()))
+            raise jwt.InvalidTokenError(f"서명 키를 찾을 수 없습니다 (kid={kid})")
+        return key
+
+    async def warm_up(self) -> None:
+        """시작 시 미리 로드 (실패해도 첫 로그인 때 다시 시도)"""
+        try:
+            await (await self._jwks_document()).refresh()
+            logger.info(f"✅ OIDC 메타데이터 로드: {self._discovery.url}")
+        except Exception as e:
+            logger.warning(f"⚠️ OIDC 메타데이터 사전 로드 실패: {e}")
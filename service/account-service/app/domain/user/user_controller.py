@@ -1,6 +1,27 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional, Dict, Any
+from fastapi import HTTPException
+from typing import Optional, Dict, Any
+import logging
+
+from .user_service import UserService
+
+logger = logging.getLogger(__name__)
 
 class UserController:
-    def __init__(self):
-        pass
\ No newline at end of file
+    def __init__(self, service: UserService):
+        self.service = service
+
+    async def login(self, user_id: str, password: str) -> Dict[str, Any]:
+        """로그인 처리"""
+        user = await self.service.authenticate(user_id, password)
+        if user is None:
+            logger.warning(f"❌ 로그인 실패: 인증 정보 불일치 - user_id={user_id}")
+            raise HTTPException(status_code=401, detail="사용자 ID 또는 비밀번호가 올바르지 않습니다")
+        return user.model_dump(mode="json")
+
+    async def signup(self, user_id: str, password: str, company_id: Optional[str]) -> Dict[str, Any]:
+        """회원가입 처리"""
+        created = await self.service.register(user_id, password, company_id)
+        if not created:
+            logger.warning(f"❌ 회원가입 실패: 이미 존재하는 사용자 - user_id={user_id}")
+            raise HTTPException(status_code=409, detail="이미 존재하는 사용자 ID입니다")
+        return {"user_id": user_id, "company_id": company_id}
@@ -1,11 +1,25 @@
-from datetime import datetime
 from sqlalchemy import (
-    Column, String, DateTime, func, text
+    Column, Integer, String, DateTime, Index, func
 )
-from sqlalchemy.ext.declarative import declarative_base
 
-Base = declarative_base()
+from app.common.database import Base
 
 class UserEntity(Base):
-    def __init__(self):
-        pass
+    __tablename__ = "users"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String(64), nullable=False)
+    password_hash = Column(String(255), nullable=False)
+    company_id = Column(String(64), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # 로그인 조회 (user_id 단건) + 중복 가입 방지
+        Index("ux_users_user_id", "user_id", unique=True),
+        # 회사별 사용자 조회
+        Index("ix_users_company_id", "company_id"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<UserEntity user_id={self.user_id} company_id={self.company_id}>"
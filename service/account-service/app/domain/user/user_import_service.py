@@ -0,0 +1,210 @@
+"""
+대량 사용자 가입(import) 서비스
+- 요청 본문(NDJSON/CSV)을 스트리밍으로 읽어 배치 단위로 검증 → 해시 → INSERT
+- 이미 있는 user_id 는 건너뜀 (기존 사용자의 비밀번호/회사는 import 로 바꿀 수 없음)
+- company_scope 가 있으면 그 회사 사용자만 등록 (회사가 비어 있으면 채우고, 다르면 행 오류)
+- 메모리에는 처리 중인 배치와 해시 중인 다음 배치만 유지
+- 행별 결과와 마지막 요약(rows/sec)을 NDJSON 으로 스트리밍 반환
+"""
+import asyncio
+import codecs
+import csv
+import json
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from app.common.security.password_hasher import PasswordHasher
+from .user_model import UserImportRow
+from .user_repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+_ROWS_ADAPTER = TypeAdapter(List[UserImportRow])
+
+# (입력 줄 번호, 파싱된 행 또는 None, 파싱 오류 메시지)
+ParsedLine = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """바이트 청크 스트림을 UTF-8 줄 단위로 분리 (BOM 제거)"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def parse_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[ParsedLine]:
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, None, f"JSON 파싱 오류: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "JSON 객체가 아닙니다"
+            continue
+        yield line_no, row, None
+
+
+async def parse_csv(lines: AsyncIterator[str]) -> AsyncIterator[ParsedLine]:
+    """첫 줄을 헤더로 사용하는 CSV (필드 내부 줄바꿈은 지원하지 않음)"""
+    header: Optional[List[str]] = None
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) > len(header):
+            yield line_no, None, f"컬럼 수 초과: {len(values)} (헤더 {len(header)})"
+            continue
+        yield line_no, {name: value for name, value in zip(header, values) if value != ""}, None
+
+
+class UserImportService:
+    def __init__(self, repository: UserRepository, hasher: PasswordHasher, batch_size: Optional[int] = None):
+        self.repository = repository
+        self.hasher = hasher
+        self.batch_size = batch_size or int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+
+    async def run(self, chunks: AsyncIterator[bytes], fmt: str, company_scope: Optional[str] = None) -> AsyncIterator[str]:
+        """import 실행: 행별 결과 NDJSON 줄을 생성 (company_scope 가 없으면 회사 제한 없음 — 관리자 전용)"""
+        parser = parse_csv if fmt == "csv" else parse_ndjson
+        started = time.perf_counter()
+        counts = {"total": 0, "created": 0, "skipped": 0, "failed": 0}
+
+        # 배치 N 을 DB 에 쓰는 동안 배치 N+1 의 비밀번호 해시를 미리 진행
+        pending: Optional[asyncio.Task] = None
+        try:
+            async for batch in self._batches(parser(iter_lines(chunks))):
+                prepared = asyncio.create_task(self._prepare(batch, company_scope))
+                if pending is not None:
+                    for line in await self._write(await pending, counts):
+                        yield line
+                pending = prepared
+            if pending is not None:
+                for line in await self._write(await pending, counts):
+                    yield line
+                pending = None
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            **counts,
+            "elapsed_sec": round(elapsed, 3),
+            "rows_per_sec": round(counts["total"] / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+        logger.info(f"📦 사용자 import 완료: {summary}")
+        yield json.dumps({"summary": summary}, ensure_ascii=False) + "\n"
+
+    async def _batches(self, parsed: AsyncIterator[ParsedLine]) -> AsyncIterator[List[ParsedLine]]:
+        batch: List[ParsedLine] = []
+        async for item in parsed:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _validate(self, batch: List[ParsedLine]) -> Tuple[List[Tuple[int, UserImportRow]], Dict[int, str]]:
+        """배치 단위 검증 → (유효 행 목록, 줄 번호별 오류)"""
+        errors: Dict[int, str] = {line_no: error for line_no, row, error in batch if error}
+        candidates = [(line_no, row) for line_no, row, error in batch if not error]
+
+        try:
+            models = _ROWS_ADAPTER.validate_python([row for _, row in candidates])
+            return [(line_no, model) for (line_no, _), model in zip(candidates, models)], errors
+        except ValidationError as e:
+            failed: Dict[int, str] = {}
+            for err in e.errors(include_url=False):
+                index = err["loc"][0]
+                field = ".".join(str(part) for part in err["loc"][1:])
+                failed.setdefault(index, f"{field}: {err['msg']}")
+
+        # 실패한 행만 빼고 한 번 더 일괄 검증
+        for index, message in failed.items():
+            errors[candidates[index][0]] = message
+        remaining = [item for index, item in enumerate(candidates) if index not in failed]
+        models = _ROWS_ADAPTER.validate_python([row for _, row in remaining])
+        return [(line_no, model) for (line_no, _), model in zip(remaining, models)], errors
+
+    async def _prepare(self, batch: List[ParsedLine], company_scope: Optional[str]):
+        valid, errors = self._validate(batch)
+        if company_scope is not None:
+            scoped = []
+            for line_no, model in valid:
+                if model.company_id is None:
+                    model.company_id = company_scope
+                if model.company_id != company_scope:
+                    errors[line_no] = f"company_id: 요청자 회사({company_scope}) 사용자만 등록할 수 있습니다"
+                else:
+                    scoped.append((line_no, model))
+            valid = scoped
+
+        # 같은 배치 안에서 user_id 가 반복되면 마지막 행만 반영
+        last_line: Dict[str, int] = {model.user_id: line_no for line_no, model in valid}
+        skipped: Dict[int, Dict[str, Any]] = {}
+        deduped = []
+        for line_no, model in valid:
+            if last_line[model.user_id] != line_no:
+                skipped[line_no] = {
+                    "line": line_no,
+                    "user_id": model.user_id,
+                    "status": "skipped",
+                    "reason": f"line {last_line[model.user_id]} 의 같은 user_id 로 대체됨",
+                }
+            else:
+                deduped.append((line_no, model))
+
+        hashes = await self.hasher.hash_many([model.password for _, model in deduped])
+        rows = [
+            {"user_id": model.user_id, "password_hash": password_hash, "company_id": model.company_id}
+            for (_, model), password_hash in zip(deduped, hashes)
+        ]
+        return [line_no for line_no, _ in deduped], rows, errors, skipped, len(batch)
+
+    async def _write(self, prepared, counts: Dict[str, int]) -> List[str]:
+        line_numbers, rows, errors, skipped, total = prepared
+        results: Dict[int, Dict[str, Any]] = {
+            line_no: {"line": line_no, "status": "error", "error": message} for line_no, message in errors.items()
+        }
+        results.update(skipped)
+
+        try:
+            inserted = await self.repository.insert_many(rows)
+        except Exception as e:
+            logger.error(f"❌ 사용자 import 배치 기록 실패 ({len(rows)}건): {e}")
+            inserted = None
+        for line_no, row, ok in zip(line_numbers, rows, inserted or [False] * len(rows)):
+            if inserted is None:
+                results[line_no] = {"line": line_no, "user_id": row["user_id"], "status": "error", "error": "DB 기록 실패"}
+            elif ok:
+                results[line_no] = {"line": line_no, "user_id": row["user_id"], "status": "created"}
+            else:
+                results[line_no] = {"line": line_no, "user_id": row["user_id"], "status": "skipped", "reason": "이미 존재하는 사용자"}
+
+        counts["total"] += total
+        for result in results.values():
+            key = "failed" if result["status"] == "error" else result["status"]
+            counts[key] += 1
+        return [json.dumps(results[line_no], ensure_ascii=False) + "\n" for line_no in sorted(results)]
@@ -1,7 +1,45 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import AliasChoices, BaseModel, Field, field_validator
 from typing import Optional
-from datetime import date, datetime
+from datetime import datetime
+
+# 외부 로그인 계정은 "<provider>:<sub>" (예: google:1234) 로 저장되므로
+# 일반 가입/대량 가입 user_id 에는 구분자를 쓸 수 없게 막아 외부 계정 ID 를 선점하지 못하게 함
+PROVIDER_SEPARATOR = ":"
+
+
+def is_provider_user_id(user_id: Optional[str]) -> bool:
+    """외부 로그인(Google 등) 전용 user_id 형식인지"""
+    return bool(user_id) and PROVIDER_SEPARATOR in user_id
 
 class UserModel(BaseModel):
-    def __init__(self):
-        pass
\ No newline at end of file
+    """외부로 노출되는 사용자 정보 (비밀번호 해시 제외)"""
+    user_id: str
+    company_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+class UserImportRow(BaseModel):
+    """대량 가입(import) 입력 1행"""
+    user_id: str = Field(min_length=1, max_length=64)
+    password: str = Field(min_length=1, validation_alias=AliasChoices("password", "user_pw"))
+    company_id: Optional[str] = Field(default=None, max_length=64)
+
+    @field_validator("user_id", "company_id", mode="before")
+    @classmethod
+    def strip_text(cls, value):
+        if isinstance(value, str):
+            value = value.strip()
+            return value or None
+        return value
+
+    @field_validator("user_id")
+    @classmethod
+    def reject_provider_id(cls, value):
+        if is_provider_user_id(value):
+            raise ValueError(f"user_id 에 '{PROVIDER_SEPARATOR}' 를 사용할 수 없습니다")
+        return value
+
+    @field_validator("password", mode="before")
+    @classmethod
+    def coerce_password(cls, value):
+        # CSV/프론트엔드에서 숫자 비밀번호가 int 로 들어오는 경우 허용
+        return str(value) if isinstance(value, int) else value
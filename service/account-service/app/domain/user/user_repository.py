@@ -1,5 +1,142 @@
-from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .user_entity import UserEntity
+
+logger = logging.getLogger(__name__)
+
+# 모듈 수준에서 한 번만 구성하는 조회 구문
+# - 같은 Statement 객체를 재사용하므로 SQLAlchemy 컴파일 캐시가 항상 적중
+# - asyncpg 에서는 동일 SQL 문자열이라 prepared statement 캐시도 재사용됨
+_SELECT_BY_USER_ID = (
+    select(UserEntity.user_id, UserEntity.password_hash, UserEntity.company_id, UserEntity.created_at)
+    .where(UserEntity.user_id == bindparam("user_id"))
+)
+
 
 class UserRepository:
-    def __init__(self):
-        pass
\ No newline at end of file
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self._insert = pg_insert if engine.dialect.name == "postgresql" else sqlite_insert
+
+    async def find_by_user_id(self, user_id: str) -> Optional[Row]:
+        """user_id 로 사용자 단건 조회 (로그인 경로)"""
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_SELECT_BY_USER_ID, {"user_id": user_id})
+            return result.first()
+
+    async def insert_many(self, rows: List[Dict[str, Any]]) -> List[bool]:
+        """
+        여러 사용자를 한 트랜잭션에서 다중 행 INSERT
+        이미 존재하는 user_id 는 건너뛰고, 행별 성공 여부를 입력 순서대로 반환
+        """
+        if not rows:
+            return []
+
+        # 같은 배치 안의 중복은 먼저 들어온 요청만 반영
+        unique_rows: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            unique_rows.setdefault(row["user_id"], row)
+
+        stmt = (
+            self._insert(UserEntity)
+            .on_conflict_do_nothing(index_elements=["user_id"])
+            .returning(UserEntity.user_id)
+        )
+        async with self.engine.begin() as conn:
+            result = await conn.execute(stmt, list(unique_rows.values()))
+            inserted = {r.user_id for r in result}
+
+        claimed = set()
+        results = []
+        for row in rows:
+            user_id = row["user_id"]
+            ok = user_id in inserted and user_id not in claimed
+            if ok:
+                claimed.add(user_id)
+            results.append(ok)
+        return results
+
+
+class SignupBatchWriter:
+    """
+    회원가입 INSERT 그룹 커밋
+    동시에 들어온 요청을 max_wait_ms 동안 모아 한 번의 트랜잭션으로 기록
+    """
+
+    def __init__(
+        self,
+        repository: UserRepository,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+    ):
+        self.repository = repository
+        self.max_batch_size = max_batch_size or int(os.getenv("SIGNUP_BATCH_SIZE", "200"))
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else float(os.getenv("SIGNUP_BATCH_WAIT_MS", "5"))) / 1000
+        self._queue: "asyncio.Queue[Tuple[Dict[str, Any], asyncio.Future]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """배치 기록 태스크 시작"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"✅ 회원가입 배치 기록 시작: batch={self.max_batch_size}, wait={self.max_wait * 1000:.1f}ms")
+
+    async def stop(self):
+        """남은 요청을 기록하고 종료"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while not self._queue.empty():
+            await self._flush(self._drain([]))
+
+    async def submit(self, row: Dict[str, Any]) -> bool:
+        """가입 요청 1건을 배치에 넣고 결과(성공 여부)를 기다림"""
+        if self._task is None:
+            return (await self.repository.insert_many([row]))[0]
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, future))
+        return await future
+
+    def _drain(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                # 배치가 이미 꽉 찼으면 바로, 아니면 잠깐 기다렸다가 한꺼번에 커밋
+                if self._queue.qsize() + 1 < self.max_batch_size:
+                    await asyncio.sleep(self.max_wait)
+            finally:
+                # 종료 중 취소되더라도 이미 꺼낸 요청은 반드시 기록
+                await asyncio.shield(self._flush(self._drain(batch)))
+
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        try:
+            results = await self.repository.insert_many([row for row, _ in batch])
+        except Exception as e:
+            logger.error(f"❌ 회원가입 배치 기록 실패 ({len(batch)}건): {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), ok in zip(batch, results):
+            if not future.done():
+                future.set_result(ok)
+        logger.info(f"💾 회원가입 배치 커밋: {len(batch)}건 (성공 {sum(results)}건)")
@@ -0,0 +1,36 @@
+import logging
+from typing import Optional
+
+from app.common.security.password_hasher import PasswordHasher
+from .user_model import UserModel, is_provider_user_id
+from .user_repository import SignupBatchWriter, UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+class UserService:
+    def __init__(self, repository: UserRepository, writer: SignupBatchWriter, hasher: PasswordHasher):
+        self.repository = repository
+        self.writer = writer
+        self.hasher = hasher
+
+    async def authenticate(self, user_id: str, password: str) -> Optional[UserModel]:
+        """사용자 인증 (실패 시 None)"""
+        # 외부 로그인 전용 ID(google:<sub>)는 비밀번호 로그인 대상이 아님 (수정 전에 만들어진 행도 거부)
+        row = None if is_provider_user_id(user_id) else await self.repository.find_by_user_id(user_id)
+        # 사용자가 없어도 동일한 KDF 비용을 들여 존재 여부가 응답 시간으로 드러나지 않게 함
+        ok = await self.hasher.verify(password, row.password_hash if row else None)
+        if not ok:
+            return None
+        return UserModel(user_id=row.user_id, company_id=row.company_id, created_at=row.created_at)
+
+    async def register(self, user_id: str, password: str, company_id: Optional[str]) -> bool:
+        """회원가입 (이미 존재하는 user_id 면 False)"""
+        if await self.repository.find_by_user_id(user_id) is not None:
+            return False
+        password_hash = await self.hasher.hash(password)
+        return await self.writer.submit({
+            "user_id": user_id,
+            "password_hash": password_hash,
+            "company_id": company_id,
+        })
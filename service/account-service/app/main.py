@@ -1,22 +1,38 @@
 """
 Account 서비스 메인 애플리케이션 진입점
 """
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Query, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
+import asyncio
 import logging
 import os
-import time
+
+from app.common.logs import RequestContextMiddleware, bind_user, install_log_shipping
+from app.common.startup import LazyStartup
+from app.common.tracing import install_tracing, tracer
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("account_service")
+# monitoring-service 로 로그 배치 전송 (MONITORING_SERVICE_URL 이 있을 때, stdout 로그는 그대로)
+install_log_shipping("account-service")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # DB/세션/OAuth 등 무거운 초기화는 백그라운드에서 (헬스체크는 바로 응답, 나머지 요청은 준비될 때까지 대기)
+    startup.start()
+    yield
+    await startup.stop()
+    logger.info("🛑 Account Service 종료")
 
 app = FastAPI(
     title="Account Service",
     description="사용자 인증 및 계정 관리 서비스",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS 설정 - Gateway와 내부 통신만 허용
@@ -33,6 +49,18 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# 지연 시작: 라우터와 서비스 초기화(app.bootstrap)는 "startup complete" 이후 백그라운드에서
+startup = LazyStartup(
+    app,
+    services="app.bootstrap:services",
+    exempt=("/", "/health", "/healthz", "/ping", "/info", "/health/startup"),
+)
+
+# 요청마다 X-Request-ID (받거나 새로 만듦) → 이 요청 중 남긴 로그에 request_id 로 붙음
+app.add_middleware(RequestContextMiddleware)
+# 분산 추적: 게이트웨이의 traceparent 를 이어받아 요청마다 server 스팬, 스팬은 monitoring-service 로
+install_tracing(app, tracer, "account-service")
+
 # Pydantic 모델
 class LoginRequest(BaseModel):
     user_id: str
@@ -67,13 +95,17 @@ async def root():
     }
 
 # 헬스체크 엔드포인트
+# 서비스가 아직 준비 전이거나 초기화가 실패해 재시도 중이면 503 (컨테이너 헬스체크/로드밸런서가 준비된 뒤에만 트래픽을 보내게)
 @app.get("/health")
 async def health():
+    unready = startup.unready()
+    if unready is not None:
+        return JSONResponse(status_code=503, content={**unready, "service": "account"})
     return {"status": "ok", "service": "account"}
 
 @app.get("/healthz")
 async def healthz():
-    return {"status": "ok", "service": "account"}
+    return await health()
 
 # 핑 테스트
 @app.get("/ping")
@@ -84,6 +116,7 @@ async def ping():
 @app.post("/login")
 async def login(request: LoginRequest, http_request: Request):
     """MVC 구조: Account Service에서 로그인 처리"""
+    bind_user(request.user_id)
     logger.info(f"🔐 Account Service 로그인 요청 수신: user_id={request.user_id}, origin={http_request.headers.get('origin')}")
     
     try:
@@ -95,21 +128,59 @@ async def login(request: LoginRequest, http_request: Request):
             logger.warning(f"❌ 로그인 실패: 필수 입력값 누락 - user_id={request.user_id}, password_provided={bool(password)}")
             raise HTTPException(status_code=400, detail="사용자 ID와 비밀번호가 필요합니다")
         
-        # 2. 로그인 처리 (실제로는 데이터베이스 확인)
+        # 2. 실패 누적 검사 (비밀번호 해시 전에 차단해서 KDF 비용을 아낌)
+        from app.common.security.login_throttle import get_client_ip
+        login_throttle = http_request.app.state.login_throttle
+        client_ip = get_client_ip(http_request)
+        with tracer.span("login.throttle"):
+            retry_after = login_throttle.check(request.user_id, client_ip)
+        if retry_after is not None:
+            logger.warning(f"🚫 로그인 시도 제한: user_id={request.user_id}, ip={client_ip}")
+            raise HTTPException(
+                status_code=429,
+                detail="로그인 시도가 너무 많습니다. 잠시 후 다시 시도해주세요",
+                headers={"Retry-After": str(max(1, int(retry_after)))}
+            )
+        
+        # 3. 로그인 처리 (데이터베이스 확인)
         logger.info(f"🔍 사용자 인증 처리: {request.user_id}")
+        try:
+            with tracer.span("login.verify"):
+                user = await http_request.app.state.user_controller.login(request.user_id, password)
+        except HTTPException as e:
+            if e.status_code == 401:
+                login_throttle.record_failure(request.user_id, client_ip)
+            raise
         
-        # 3. 성공 응답
+        # 4. 세션 발급
+        from app.common.session import SESSION_COOKIE_NAME
+        session_store = http_request.app.state.session_store
+        with tracer.span("session.create"):
+            token = await session_store.create(user)
+        
+        # 5. 성공 응답
         logger.info(f"✅ 로그인 성공: {request.user_id}")
-        return JSONResponse(
+        response = JSONResponse(
             status_code=200,
             content={
                 "success": True,
                 "message": "로그인 성공 (Account Service)",
                 "user_id": request.user_id,
-                "token": f"account_token_{request.user_id}_{int(time.time())}",
+                "company_id": user["company_id"],
+                "token": token,
                 "service": "account-service"
             }
         )
+        response.set_cookie(
+            key=SESSION_COOKIE_NAME,
+            value=token,
+            max_age=session_store.ttl,
+            httponly=True,
+            secure=os.getenv("RAILWAY_ENVIRONMENT", "false").lower() == "true",
+            samesite="lax",
+            path="/",
+        )
+        return response
         
     except HTTPException:
         # HTTPException은 그대로 재발생
@@ -122,6 +193,7 @@ async def login(request: LoginRequest, http_request: Request):
 @app.post("/signup")
 async def signup(request_data: SignUpRequest, http_request: Request):
     """MVC 구조: Account Service에서 회원가입 처리"""
+    bind_user(request_data.user_id)
     logger.info(f"📝 Account Service 회원가입 요청 수신: user_id={request_data.user_id}, origin={http_request.headers.get('origin')}")
     
     try:
@@ -133,8 +205,14 @@ async def signup(request_data: SignUpRequest, http_request: Request):
             logger.warning(f"❌ 회원가입 실패: 필수 입력값 누락 - user_id={request_data.user_id}, password_provided={bool(password)}")
             raise HTTPException(status_code=400, detail="사용자 ID와 비밀번호가 필요합니다")
         
-        # 2. 회원가입 처리 (실제로는 데이터베이스 저장)
+        from app.domain.user.user_model import PROVIDER_SEPARATOR, is_provider_user_id
+        if is_provider_user_id(request_data.user_id):
+            logger.warning(f"❌ 회원가입 실패: 외부 로그인 전용 ID 형식 - user_id={request_data.user_id}")
+            raise HTTPException(status_code=400, detail=f"사용자 ID에 '{PROVIDER_SEPARATOR}' 를 사용할 수 없습니다")
+        
+        # 2. 회원가입 처리 (데이터베이스 저장)
         logger.info(f"🔍 사용자 등록 처리: {request_data.user_id}")
+        await http_request.app.state.user_controller.signup(request_data.user_id, password, request_data.company_id)
         
         # 3. 성공 응답
         logger.info(f"✅ 회원가입 성공: {request_data.user_id}")
@@ -159,36 +237,66 @@ async def signup(request_data: SignUpRequest, http_request: Request):
 # 사용자 프로필 엔드포인트 (인증 필요)
 @app.get("/profile")
 async def get_profile(http_request: Request):
-    auth_header = http_request.headers.get("authorization")
-    if not auth_header:
+    from app.common.session import extract_session_token
+    token = extract_session_token(http_request)
+    if not token:
         raise HTTPException(status_code=401, detail="Authorization header required")
     
-    logger.info(f"👤 PROFILE 조회 origin={http_request.headers.get('origin')}")
+    session = await http_request.app.state.session_store.get(token)
+    if session is None:
+        raise HTTPException(status_code=401, detail="세션이 만료되었거나 유효하지 않습니다")
+    bind_user(session["user_id"])
+    
+    logger.info(f"👤 PROFILE 조회 user_id={session['user_id']} origin={http_request.headers.get('origin')}")
     return JSONResponse(
         status_code=200,
         content={
             "success": True,
-            "user_id": "sample_user",
-            "email": "user@example.com",
-            "company_id": "sample_company"
+            "user_id": session["user_id"],
+            "company_id": session.get("company_id")
         }
     )
 
 # 로그아웃 엔드포인트 (인증 필요)
 @app.post("/logout")
 async def logout(http_request: Request):
-    auth_header = http_request.headers.get("authorization")
-    if not auth_header:
+    from app.common.session import SESSION_COOKIE_NAME, extract_session_token
+    token = extract_session_token(http_request)
+    if not token:
         raise HTTPException(status_code=401, detail="Authorization header required")
     
+    await http_request.app.state.session_store.delete(token)
     logger.info(f"🚪 LOGOUT origin={http_request.headers.get('origin')}")
-    return JSONResponse(
+    response = JSONResponse(
         status_code=200,
         content={
             "success": True,
             "message": "로그아웃 성공"
         }
     )
+    response.delete_cookie(key=SESSION_COOKIE_NAME, path="/")
+    return response
+
+# 시작 단계별 소요 시간
+@app.get("/health/startup")
+async def startup_health():
+    """지연 시작 진행 상황: 준비 여부, 단계별 ms"""
+    return startup.report()
+
+# 모듈별 import 비용 (새 프로세스에서 측정, 결과는 캐시)
+@app.get("/health/startup/imports")
+async def startup_imports(top: int = Query(default=25, ge=1, le=200)):
+    """python -X importtime 집계 (지연 import 모듈 포함): 모듈별 누적/자체 시간, 패키지별 합계"""
+    if getattr(app.state, "import_report", None) is None:
+        from app.common.startup.importtime import profile
+        app.state.import_report = await asyncio.to_thread(profile, ["app.main", *startup.deferred_modules()], 200)
+    report = app.state.import_report
+    return {
+        **report,
+        "packages": report["packages"][:top],
+        "slowest_cumulative": report["slowest_cumulative"][:top],
+        "slowest_self": report["slowest_self"][:top],
+    }
 
 # 서비스 정보
 @app.get("/info")
@@ -201,11 +309,18 @@ async def service_info():
             "/signup", 
             "/profile",
             "/logout",
+            "/users/import",
+            "/auth/google/login",
+            "/auth/google/callback",
             "/health",
             "/ping"
         ]
     }
 
+# 라우터 등록 (import 는 시작 직후 백그라운드에서, 없는 라우터는 경고만)
+startup.include_router("app.router.user_router:auth_router", "auth_router")
+startup.include_router("app.router.import_router:import_router", "import_router")
+
 # Railway 환경에서 실행
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "8006"))
@@ -0,0 +1,57 @@
+"""
+대량 사용자 import 라우터
+"""
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+import logging
+import os
+
+from app.common.session import extract_session_token
+
+logger = logging.getLogger(__name__)
+import_router = APIRouter(prefix="/users", tags=["import"])
+
+# 회사 제한 없이 import 할 수 있는 관리자 user_id (쉼표 구분), 그 외 사용자는 자기 회사 사용자만 등록 가능
+IMPORT_ADMIN_USERS = {user_id.strip() for user_id in os.getenv("IMPORT_ADMIN_USERS", "").split(",") if user_id.strip()}
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    요청 본문을 읽는 동안 응답을 함께 스트리밍하는 응답
+    StreamingResponse 의 연결 종료 감시는 receive() 를 호출해 본문 청크를 가로채므로 생략
+    (클라이언트가 끊기면 request.stream() 에서 ClientDisconnect 가 발생해 생성기가 종료됨)
+    """
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+@import_router.post("/import", summary="사용자 대량 등록 (NDJSON/CSV 스트리밍)")
+async def import_users(
+    request: Request,
+    format: str | None = Query(default=None, description="ndjson 또는 csv (미지정 시 Content-Type 으로 판단)")
+):
+    """
+    NDJSON(한 줄에 JSON 객체 1개) 또는 헤더가 있는 CSV 를 스트리밍으로 받아 새 사용자를 등록합니다.
+    이미 있는 사용자는 건너뛰며, 관리자가 아니면 요청자 회사의 사용자만 등록할 수 있습니다.
+    응답은 행별 결과 NDJSON 이며 마지막 줄에 처리 요약(rows/sec)이 포함됩니다.
+    """
+    token = extract_session_token(request)
+    session = await request.app.state.session_store.get(token) if token else None
+    if session is None:
+        raise HTTPException(status_code=401, detail="인증이 필요합니다")
+    is_admin = session["user_id"] in IMPORT_ADMIN_USERS
+    company_scope = None if is_admin else session.get("company_id")
+    if not is_admin and not company_scope:
+        logger.warning(f"🚫 사용자 import 권한 없음: 요청자={session['user_id']} (회사 없음)")
+        raise HTTPException(status_code=403, detail="관리자 또는 회사에 소속된 사용자만 import 할 수 있습니다")
+
+    content_type = request.headers.get("content-type", "")
+    fmt = (format or ("csv" if "csv" in content_type else "ndjson")).lower()
+    if fmt not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="지원하지 않는 형식입니다 (ndjson, csv)")
+
+    logger.info(f"📦 사용자 import 시작: format={fmt}, 요청자={session['user_id']}, 회사={company_scope or '전체(관리자)'}")
+    return DuplexStreamingResponse(
+        request.app.state.user_import_service.run(request.stream(), fmt, company_scope),
+        media_type="application/x-ndjson",
+    )
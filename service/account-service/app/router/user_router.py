@@ -1,14 +1,17 @@
 
-from fastapi import APIRouter, Cookie, HTTPException, Query
+import logging
+
+from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import JSONResponse
 
-# from app.domain.auth.controller.google_controller import GoogleController
+from app.common.session import SESSION_COOKIE_NAME, extract_session_token
 
+logger = logging.getLogger(__name__)
 auth_router = APIRouter(prefix="/auth", tags=["auth"])
-# google_controller = GoogleController()
 
 @auth_router.get("/google/login", summary="Google 로그인 시작")
 async def google_login(
+    request: Request,
     redirect_uri: str = Query(
         default="http://localhost:3000/dashboard",
         description="로그인 후 리다이렉트할 URI (기본값: /dashboard)"
@@ -17,24 +20,30 @@ async def google_login(
     """
     Google OAuth 로그인을 시작합니다.
     """
-    return {"message": "Google 로그인 기능 준비 중"}
+    return await request.app.state.google_controller.login(redirect_uri)
 
 @auth_router.get("/google/callback", summary="Google OAuth 콜백 처리")
 async def google_callback(
+    request: Request,
     code: str = Query(..., description="Google OAuth 인증 코드"),
     state: str = Query(..., description="로그인 시작 시 전달한 state 값")
 ):
     """
     Google OAuth 콜백을 처리합니다.
     """
-    return {"message": "Google 콜백 기능 준비 중"}
+    return await request.app.state.google_controller.callback(code, state)
 
 @auth_router.post("/logout", summary="로그아웃")
-async def logout(session_token: str | None = Cookie(None)):
+async def logout(request: Request):
     """
     사용자를 로그아웃하고 인증 쿠키를 삭제합니다.
     """
-    print(f"로그아웃 요청 - 받은 세션 토큰: {session_token}")
+    token = extract_session_token(request)
+    logger.info(f"🔓 로그아웃 요청 - 세션 토큰 존재: {bool(token)}")
+    
+    # 세션 삭제 (다른 레플리카에도 무효화 전파)
+    if token:
+        await request.app.state.session_store.delete(token)
     
     # 로그아웃 응답 생성
     response = JSONResponse({
@@ -44,21 +53,29 @@ async def logout(session_token: str | None = Cookie(None)):
     
     # 인증 쿠키 삭제
     response.delete_cookie(
-        key="session_token",
+        key=SESSION_COOKIE_NAME,
         path="/",
     )
     
-    print("✅ 로그아웃 완료 - 인증 쿠키 삭제됨")
+    logger.info("✅ 로그아웃 완료 - 인증 쿠키 삭제됨")
     return response
 
 @auth_router.get("/profile", summary="사용자 프로필 조회")
-async def get_profile(session_token: str | None = Cookie(None)):
+async def get_profile(request: Request):
     """
     세션 토큰으로 사용자 프로필을 조회합니다.
     """
-    print(f"프로필 요청 - 받은 세션 토큰: {session_token}")
+    token = extract_session_token(request)
     
-    if not session_token:
+    if not token:
         raise HTTPException(status_code=401, detail="인증 쿠키가 없습니다.")
     
-    return {"message": "프로필 조회 기능 준비 중"}
\ No newline at end of file
+    session = await request.app.state.session_store.get(token)
+    if session is None:
+        raise HTTPException(status_code=401, detail="세션이 만료되었거나 유효하지 않습니다.")
+    
+    return {
+        "user_id": session["user_id"],
+        "company_id": session.get("company_id"),
+        "login_at": session.get("created_at")
+    }
\ No newline at end of file
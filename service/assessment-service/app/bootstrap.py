@@ -0,0 +1,65 @@
+"""
+Assessment Service 서비스 초기화
+- 무거운 의존성(SQLAlchemy, numpy, redis)을 끌어오는 모듈은 여기서만 import 하고,
+  LazyStartup 이 uvicorn 시작 직후 백그라운드에서 이 모듈을 import 한 뒤 services() 에 진입
+"""
+import logging
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from fastapi import FastAPI
+
+from app.common.database import create_engine, init_models
+from app.common.queue import create_job_queue
+from app.common.session import SessionStore
+from app.domain.assessment.repository.assessment_repository import AssessmentRepository
+from app.domain.assessment.repository.assessment_sketch_repository import AssessmentSketchRepository
+from app.domain.assessment.service.assessment_job_service import AssessmentJobService
+from app.domain.assessment.service.assessment_service import AssessmentService
+from app.domain.assessment.service.percentile_service import PercentileService
+from app.domain.assessment.service.recommendation_engine import recommendation_engine
+from app.domain.assessment.service.scoring_engine import scoring_engine
+from app.domain.company.repository.company_repository import CompanyRepository
+from app.domain.company.service.company_directory_service import CompanyDirectoryService
+
+logger = logging.getLogger("assessment_service")
+
+
+@asynccontextmanager
+async def services(app: FastAPI):
+    # 중간에 실패하면 그때까지 시작한 것만 역순으로 정리 (지연 시작이 다시 시도할 수 있게)
+    async with AsyncExitStack() as stack:
+        # account-service 와 같은 Redis 를 바라보는 세션 저장소 (읽기 전용으로 사용)
+        app.state.session_store = SessionStore()
+        await app.state.session_store.start()
+        stack.push_async_callback(app.state.session_store.stop)
+        # 지표 정의는 시작 시 한 번만 읽어 가중치 행렬로 컴파일
+        scoring_engine.load()
+        # 추천 규칙도 시작 시 컴파일하고, 규칙 파일이 바뀌면 다시 컴파일
+        await recommendation_engine.start()
+        stack.push_async_callback(recommendation_engine.stop)
+        # DB 엔진/풀은 프로세스당 하나만 생성해서 모든 요청이 공유
+        engine = create_engine()
+        stack.push_async_callback(engine.dispose)
+        await init_models(engine)
+        repository = AssessmentRepository(engine)
+        # 동종 업계 백분위 스케치: 저장본 로드 후 주기적으로 저장/다른 레플리카와 동기화
+        app.state.percentile_service = PercentileService(AssessmentSketchRepository(engine), scoring_engine)
+        await app.state.percentile_service.start(repository)
+        stack.push_async_callback(app.state.percentile_service.stop)
+        app.state.assessment_service = AssessmentService(
+            repository, scoring_engine, percentiles=app.state.percentile_service
+        )
+        # 결과 캐시 무효화를 다른 레플리카와 주고받는 구독
+        await app.state.assessment_service.start()
+        stack.push_async_callback(app.state.assessment_service.stop)
+        # 회사 디렉터리: DB 전체로 인메모리 검색 인덱스 구성 후 변경 알림/주기 조회로 갱신
+        app.state.company_directory_service = CompanyDirectoryService(CompanyRepository(engine), scoring_engine)
+        await app.state.company_directory_service.start()
+        stack.push_async_callback(app.state.company_directory_service.stop)
+        # 비동기 평가 작업: Redis(또는 로컬) 큐 + 프로세스 풀 워커
+        job_queue = await create_job_queue()
+        stack.push_async_callback(job_queue.stop)
+        app.state.assessment_job_service = AssessmentJobService(job_queue, app.state.assessment_service)
+        await app.state.assessment_job_service.start()
+        stack.push_async_callback(app.state.assessment_job_service.stop)
+        yield
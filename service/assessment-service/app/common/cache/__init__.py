@@ -0,0 +1,3 @@
+from .lru_ttl_cache import LRUTTLCache
+
+__all__ = ["LRUTTLCache"]
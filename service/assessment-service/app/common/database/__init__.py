@@ -0,0 +1,3 @@
+from .database import Base, create_engine, create_session_factory, get_database_url, init_models
+
+__all__ = ["Base", "create_engine", "create_session_factory", "get_database_url", "init_models"]
@@ -0,0 +1,18 @@
+from .context import (
+    REQUEST_ID_HEADER,
+    RequestContextMiddleware,
+    bind_user,
+    current_request_id,
+    current_user_id,
+)
+from .log_shipper import LogShipper, install_log_shipping
+
+__all__ = [
+    "REQUEST_ID_HEADER",
+    "RequestContextMiddleware",
+    "bind_user",
+    "current_request_id",
+    "current_user_id",
+    "LogShipper",
+    "install_log_shipping",
+]
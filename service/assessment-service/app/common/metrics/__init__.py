@@ -0,0 +1,3 @@
+from .system_sampler import SystemMetricsSampler, format_uptime, system_sampler
+
+__all__ = ["SystemMetricsSampler", "format_uptime", "system_sampler"]
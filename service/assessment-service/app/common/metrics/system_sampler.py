@@ -0,0 +1,189 @@
+"""
+시스템 지표 샘플러
+- 백그라운드 태스크가 METRICS_SAMPLE_SECONDS 마다 CPU, 메모리, 이벤트 루프 지연, 열린 fd, GC 통계를 수집해
+  고정 크기 링 버퍼(METRICS_HISTORY_SIZE 개)에 쌓음
+- 헬스체크는 마지막 샘플과 미리 만들어 둔 응답을 읽기만 함 (요청마다 psutil 호출/업타임 포맷 없음)
+- 이벤트 루프 지연: 0.5초 간격으로 sleep 이 예정보다 얼마나 늦게 깨어났는지 재고, 샘플 구간의 최대/평균을 기록
+- GC 일시 정지 시간: gc.callbacks 로 수집 시작~종료 시간을 누적
+"""
+import asyncio
+import gc
+import logging
+import os
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# 이벤트 루프 지연 측정 간격 (샘플 간격보다 촘촘하게)
+LAG_PROBE_SECONDS = 0.5
+
+
+def format_uptime(seconds):
+    """업타임을 사람이 읽기 쉬운 형태로 변환"""
+    if seconds < 60:
+        return f"{int(seconds)}초"
+    elif seconds < 3600:
+        return f"{int(seconds // 60)}분 {int(seconds % 60)}초"
+    elif seconds < 86400:
+        hours = int(seconds // 3600)
+        minutes = int((seconds % 3600) // 60)
+        return f"{hours}시간 {minutes}분"
+    else:
+        days = int(seconds // 86400)
+        hours = int((seconds % 86400) // 3600)
+        return f"{days}일 {hours}시간"
+
+
+class SystemMetricsSampler:
+    def __init__(self, interval: Optional[float] = None, history_size: Optional[int] = None):
+        self.interval = interval or float(os.getenv("METRICS_SAMPLE_SECONDS", "5"))
+        self.history: Deque[Dict[str, Any]] = deque(
+            maxlen=history_size or int(os.getenv("METRICS_HISTORY_SIZE", "720"))
+        )
+        self.process = psutil.Process()
+        # 시작 시 한 번만 읽는 정적 정보
+        self.cpu_count = psutil.cpu_count()
+        self.memory_total = psutil.virtual_memory().total
+        self.started_at: Optional[float] = None
+        self.health: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lags: List[float] = []
+        self._gc_started: Optional[float] = None
+        self._gc_pause = 0.0
+        self._gc_pause_count = 0
+
+    # ---- 수명 주기 --------------------------------------------------------
+
+    def start(self, started_at: Optional[float] = None):
+        """첫 샘플을 바로 수집한 뒤 주기 수집 시작 (헬스체크가 항상 읽을 샘플이 있도록)"""
+        self.started_at = started_at or time.time()
+        if self._on_gc not in gc.callbacks:
+            gc.callbacks.append(self._on_gc)
+        # cpu_percent 는 직전 호출 이후의 사용률이므로 기준점을 먼저 잡음
+        self.process.cpu_percent(None)
+        psutil.cpu_percent(None)
+        self.sample()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_sample = loop.time() + self.interval
+        while True:
+            expected = loop.time() + LAG_PROBE_SECONDS
+            await asyncio.sleep(LAG_PROBE_SECONDS)
+            now = loop.time()
+            self._lags.append(max(0.0, now - expected))
+            if now >= next_sample:
+                next_sample += self.interval
+                try:
+                    self.sample()
+                except Exception as e:
+                    logger.warning(f"⚠️ 시스템 지표 수집 실패: {e}")
+
+    def _on_gc(self, phase: str, info: Dict[str, Any]):
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        elif self._gc_started is not None:
+            self._gc_pause += time.perf_counter() - self._gc_started
+            self._gc_pause_count += 1
+            self._gc_started = None
+
+    # ---- 수집 -------------------------------------------------------------
+
+    def _open_fds(self) -> Optional[int]:
+        try:
+            return self.process.num_fds()
+        except (AttributeError, psutil.Error):  # Windows 에는 num_fds 가 없음
+            return None
+
+    def sample(self) -> Dict[str, Any]:
+        now = time.time()
+        memory = psutil.virtual_memory()
+        with self.process.oneshot():
+            rss = self.process.memory_info().rss
+            process_cpu = self.process.cpu_percent(None)
+            threads = self.process.num_threads()
+        lags, self._lags = self._lags, []
+        gc_pause, gc_pause_count = self._gc_pause, self._gc_pause_count
+        self._gc_pause, self._gc_pause_count = 0.0, 0
+        uptime = now - self.started_at if self.started_at else 0
+        sample = {
+            "timestamp": now,
+            "uptime_seconds": round(uptime, 2),
+            "cpu_percent": psutil.cpu_percent(None),
+            "process_cpu_percent": process_cpu,
+            "memory_percent": memory.percent,
+            "memory_available_mb": round(memory.available / 1024 / 1024, 2),
+            "process_rss_mb": round(rss / 1024 / 1024, 2),
+            "threads": threads,
+            "open_fds": self._open_fds(),
+            "loop_lag_ms_max": round(max(lags) * 1000, 2) if lags else None,
+            "loop_lag_ms_avg": round(sum(lags) / len(lags) * 1000, 2) if lags else None,
+            "gc_counts": list(gc.get_count()),
+            "gc_collections": [stats["collections"] for stats in gc.get_stats()],
+            "gc_pause_ms": round(gc_pause * 1000, 2),
+            "gc_pause_count": gc_pause_count,
+        }
+        self.history.append(sample)
+        # /health 응답은 샘플마다 한 번만 만듦
+        self.health = {
+            "status": "healthy",
+            "timestamp": datetime.fromtimestamp(now).isoformat(),
+            "uptime_seconds": sample["uptime_seconds"],
+            "uptime_formatted": format_uptime(uptime),
+            "system": {
+                "memory_percent": sample["memory_percent"],
+                "memory_available_mb": sample["memory_available_mb"],
+                "cpu_percent": sample["cpu_percent"],
+                "process_rss_mb": sample["process_rss_mb"],
+                "open_fds": sample["open_fds"],
+                "loop_lag_ms": sample["loop_lag_ms_max"],
+            },
+        }
+        return sample
+
+    # ---- 조회 -------------------------------------------------------------
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        return self.history[-1] if self.history else None
+
+    def window(self, seconds: Optional[float] = None) -> List[Dict[str, Any]]:
+        """최근 seconds 초 동안의 샘플 (없으면 버퍼 전체, 오래된 것부터)"""
+        if seconds is None:
+            return list(self.history)
+        since = time.time() - seconds
+        out = []
+        for sample in reversed(self.history):
+            if sample["timestamp"] < since:
+                break
+            out.append(sample)
+        out.reverse()
+        return out
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "cpu_count": self.cpu_count,
+            "memory_total_gb": round(self.memory_total / 1024 / 1024 / 1024, 2),
+            "interval_seconds": self.interval,
+            "history_size": self.history.maxlen,
+        }
+
+
+# 전역 시스템 지표 샘플러 인스턴스
+system_sampler = SystemMetricsSampler()
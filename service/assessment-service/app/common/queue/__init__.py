@@ -0,0 +1,3 @@
+from .job_queue import LocalJobQueue, RedisJobQueue, create_job_queue
+
+__all__ = ["LocalJobQueue", "RedisJobQueue", "create_job_queue"]
@@ -0,0 +1,317 @@
+"""
+작업 큐 (작업 레코드 + 대기열 + 멱등 키 + 그룹별 동시 실행 슬롯)
+- RedisJobQueue: REDIS_URL 의 Redis 를 사용하는 내구성 큐 (여러 레플리카가 같은 큐를 소비)
+    ready 리스트 → BLMOVE 로 공용 processing 리스트에 옮기고 leases ZSET 에 임대 만료 시각을 기록한 뒤 처리,
+    처리 중에는 임대를 연장(extend)하고 끝나면 ack 로 제거
+    임대가 만료된 작업(처리하던 레플리카가 죽음)은 어느 레플리카의 reaper 든 ready 로 되돌림
+    재시도 대기는 실행 시각을 점수로 하는 delayed ZSET
+- 작업 등록(create_job)은 멱등 키 선점 + 작업 레코드 저장 + 대기열 추가를 한 번에 (중간에 죽어도 키만 남지 않음)
+- LocalJobQueue: 같은 인터페이스의 프로세스 내 구현 (로컬 개발용, 재시작하면 작업이 사라짐)
+REDIS_URL 이 없거나 redis 패키지가 없으면 LocalJobQueue 사용
+"""
+import asyncio
+import heapq
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.common.cache import LRUTTLCache
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # 선택 의존성
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+# 시각이 된 지연 작업을 ready 로 옮김 (여러 레플리카가 동시에 실행해도 한 번만 이동)
+_PROMOTE_DUE = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, 100)
+for _, id in ipairs(due) do
+    redis.call('ZREM', KEYS[1], id)
+    redis.call('LPUSH', KEYS[2], id)
+end
+return #due
+"""
+
+# 그룹(회사) 실행 슬롯 획득: 상한을 넘으면 되돌리고 0
+_ACQUIRE_SLOT = """
+local n = redis.call('INCR', KEYS[1])
+if n > tonumber(ARGV[1]) then
+    redis.call('DECR', KEYS[1])
+    return 0
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+# 멱등 키 선점 + 작업 저장 + 대기열 추가 (키가 이미 있으면 아무것도 하지 않고 기존 job_id)
+# ARGV[4] 가 1 이면 기존 키를 덮어씀 (키가 가리키던 작업 레코드가 만료된 경우)
+_CREATE_JOB = """
+if KEYS[3] ~= KEYS[1] then
+    if ARGV[4] ~= '1' then
+        local existing = redis.call('GET', KEYS[3])
+        if existing then return existing end
+    end
+    redis.call('SET', KEYS[3], ARGV[1], 'EX', ARGV[3])
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+redis.call('LPUSH', KEYS[2], ARGV[1])
+return false
+"""
+
+# processing 의 작업 중 임대가 만료된 것을 ready 로 되돌림
+# 임대 기록이 없는 작업(BLMOVE 직후 임대를 기록하기 전에 죽음)은 처음 본 시각부터 임대 시간을 줌
+_REAP_EXPIRED = """
+local now = tonumber(ARGV[1])
+local recovered = 0
+for _, id in ipairs(redis.call('LRANGE', KEYS[1], 0, -1)) do
+    local lease = redis.call('ZSCORE', KEYS[2], id)
+    if not lease then
+        redis.call('ZADD', KEYS[2], now + tonumber(ARGV[2]), id)
+    elseif tonumber(lease) <= now then
+        redis.call('LREM', KEYS[1], 1, id)
+        redis.call('ZREM', KEYS[2], id)
+        redis.call('LPUSH', KEYS[3], id)
+        recovered = recovered + 1
+    end
+end
+return recovered
+"""
+
+_RELEASE_SLOT = """
+local n = redis.call('DECR', KEYS[1])
+if n <= 0 then redis.call('DEL', KEYS[1]) end
+return n
+"""
+
+
+class LocalJobQueue:
+    def __init__(self, maxsize: Optional[int] = None):
+        self._jobs = LRUTTLCache(maxsize=maxsize or int(os.getenv("JOB_LOCAL_MAXSIZE", "100000")))
+        self._idempotency = LRUTTLCache(maxsize=maxsize or int(os.getenv("JOB_LOCAL_MAXSIZE", "100000")))
+        self._ready: Deque[str] = deque()
+        self._delayed: List[Tuple[float, str]] = []
+        self._slots: Dict[str, int] = {}
+        self._wakeup = asyncio.Event()
+
+    @property
+    def is_distributed(self) -> bool:
+        return False
+
+    async def start(self):
+        logger.info("✅ 로컬 작업 큐 사용 (재시작 시 대기 중인 작업은 사라짐)")
+
+    async def stop(self):
+        pass
+
+    async def save_job(self, job: Dict[str, Any], ttl: float) -> None:
+        self._jobs.set(job["job_id"], dict(job), ttl)
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    async def create_job(
+        self, job: Dict[str, Any], ttl: float, idempotency_key: Optional[str] = None, replace: bool = False
+    ) -> Optional[str]:
+        """멱등 키 선점 + 저장 + 대기열 추가, 키가 이미 있으면 아무것도 하지 않고 기존 job_id"""
+        if idempotency_key:
+            existing = self._idempotency.get(idempotency_key)
+            if existing is not None and not replace:
+                return existing
+            self._idempotency.set(idempotency_key, job["job_id"], ttl)
+        await self.save_job(job, ttl)
+        await self.enqueue(job["job_id"])
+        return None
+
+    async def enqueue(self, job_id: str, delay: float = 0.0) -> None:
+        if delay > 0:
+            heapq.heappush(self._delayed, (time.time() + delay, job_id))
+        else:
+            self._ready.append(job_id)
+        self._wakeup.set()
+
+    async def reserve(self, timeout: float = 1.0) -> Optional[str]:
+        deadline = time.monotonic() + timeout
+        while True:
+            now = time.time()
+            while self._delayed and self._delayed[0][0] <= now:
+                self._ready.append(heapq.heappop(self._delayed)[1])
+            if self._ready:
+                return self._ready.popleft()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if self._delayed:
+                remaining = min(remaining, max(self._delayed[0][0] - now, 0.0))
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    async def ack(self, job_id: str) -> None:
+        pass
+
+    async def extend(self, job_id: str) -> None:
+        pass
+
+    async def reap(self) -> int:
+        return 0
+
+    async def acquire_slot(self, group: str, limit: int, ttl: float) -> bool:
+        if self._slots.get(group, 0) >= limit:
+            return False
+        self._slots[group] = self._slots.get(group, 0) + 1
+        return True
+
+    async def release_slot(self, group: str) -> None:
+        remaining = self._slots.get(group, 0) - 1
+        if remaining > 0:
+            self._slots[group] = remaining
+        else:
+            self._slots.pop(group, None)
+
+    async def depth(self) -> Dict[str, int]:
+        return {"ready": len(self._ready), "delayed": len(self._delayed)}
+
+
+class RedisJobQueue:
+    def __init__(self, redis_url: str, prefix: str = "assessment_jobs", lease_seconds: Optional[float] = None):
+        self.redis_url = redis_url
+        self.prefix = prefix
+        # 처리 중 작업의 임대 시간 (처리하는 동안 lease / 3 마다 연장, 연장이 끊기면 만료 후 다른 레플리카가 회수)
+        self.lease_seconds = lease_seconds or float(os.getenv("JOB_LEASE_SECONDS", "30"))
+        self._redis = None
+        self._ready_key = f"{prefix}:ready"
+        self._delayed_key = f"{prefix}:delayed"
+        self._processing_key = f"{prefix}:processing"
+        self._leases_key = f"{prefix}:leases"
+        self._reaper_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_distributed(self) -> bool:
+        return True
+
+    async def start(self):
+        """Redis 연결 후 임대가 만료된 작업 회수(reaper) 시작"""
+        self._redis = aioredis.from_url(self.redis_url, decode_responses=True)
+        await self._redis.ping()
+        self._promote = self._redis.register_script(_PROMOTE_DUE)
+        self._create = self._redis.register_script(_CREATE_JOB)
+        self._reap = self._redis.register_script(_REAP_EXPIRED)
+        self._acquire = self._redis.register_script(_ACQUIRE_SLOT)
+        self._release = self._redis.register_script(_RELEASE_SLOT)
+        self._reaper_task = asyncio.create_task(self._reaper_loop())
+        logger.info(f"✅ Redis 작업 큐 연결: {self.redis_url} (임대 {self.lease_seconds:.0f}초)")
+
+    async def stop(self):
+        if self._reaper_task:
+            self._reaper_task.cancel()
+            try:
+                await self._reaper_task
+            except asyncio.CancelledError:
+                pass
+            self._reaper_task = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def _reaper_loop(self):
+        while True:
+            try:
+                recovered = await self.reap()
+                if recovered:
+                    logger.warning(f"⚠️ 임대가 만료된 작업 {recovered}건을 다시 대기열에 넣음")
+            except Exception as e:
+                logger.error(f"❌ 만료 작업 회수 실패: {e}")
+            await asyncio.sleep(self.lease_seconds / 2)
+
+    async def reap(self) -> int:
+        """임대가 만료된 처리 중 작업을 ready 로 되돌리고 건수 반환"""
+        return int(await self._reap(
+            keys=[self._processing_key, self._leases_key, self._ready_key],
+            args=[time.time(), self.lease_seconds],
+        ))
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}:job:{job_id}"
+
+    async def save_job(self, job: Dict[str, Any], ttl: float) -> None:
+        await self._redis.set(self._job_key(job["job_id"]), json.dumps(job, ensure_ascii=False), ex=max(1, int(ttl)))
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self._redis.get(self._job_key(job_id))
+        return json.loads(raw) if raw else None
+
+    async def create_job(
+        self, job: Dict[str, Any], ttl: float, idempotency_key: Optional[str] = None, replace: bool = False
+    ) -> Optional[str]:
+        """멱등 키 선점 + 저장 + 대기열 추가 (스크립트 하나로), 키가 이미 있으면 아무것도 하지 않고 기존 job_id"""
+        job_key = self._job_key(job["job_id"])
+        # 멱등 키가 없으면 세 번째 키 자리에 작업 키를 넣어 스크립트가 키 선점을 건너뜀
+        idem_key = f"{self.prefix}:idem:{idempotency_key}" if idempotency_key else job_key
+        existing = await self._create(
+            keys=[job_key, self._ready_key, idem_key],
+            args=[job["job_id"], json.dumps(job, ensure_ascii=False), max(1, int(ttl)), "1" if replace else "0"],
+        )
+        return existing or None
+
+    async def enqueue(self, job_id: str, delay: float = 0.0) -> None:
+        if delay > 0:
+            await self._redis.zadd(self._delayed_key, {job_id: time.time() + delay})
+        else:
+            await self._redis.lpush(self._ready_key, job_id)
+
+    async def reserve(self, timeout: float = 1.0) -> Optional[str]:
+        await self._promote(keys=[self._delayed_key, self._ready_key], args=[time.time()])
+        job_id = await self._redis.blmove(self._ready_key, self._processing_key, timeout, "RIGHT", "LEFT")
+        if job_id is not None:
+            await self._redis.zadd(self._leases_key, {job_id: time.time() + self.lease_seconds})
+        return job_id
+
+    async def extend(self, job_id: str) -> None:
+        """처리 중 임대 연장 (이미 회수된 작업이면 아무것도 하지 않음)"""
+        await self._redis.zadd(self._leases_key, {job_id: time.time() + self.lease_seconds}, xx=True)
+
+    async def ack(self, job_id: str) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self._processing_key, 1, job_id)
+            pipe.zrem(self._leases_key, job_id)
+            await pipe.execute()
+
+    async def acquire_slot(self, group: str, limit: int, ttl: float) -> bool:
+        # ttl: 레플리카가 슬롯을 반납하지 못하고 죽어도 이 시간이 지나면 풀림
+        return bool(await self._acquire(keys=[f"{self.prefix}:running:{group}"], args=[limit, max(1, int(ttl))]))
+
+    async def release_slot(self, group: str) -> None:
+        await self._release(keys=[f"{self.prefix}:running:{group}"])
+
+    async def depth(self) -> Dict[str, int]:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.llen(self._ready_key)
+            pipe.zcard(self._delayed_key)
+            pipe.llen(self._processing_key)
+            ready, delayed, processing = await pipe.execute()
+        return {"ready": ready, "delayed": delayed, "processing": processing}
+
+
+async def create_job_queue(redis_url: Optional[str] = None):
+    """REDIS_URL 이 있으면 Redis 큐, 연결할 수 없으면 로컬 큐"""
+    redis_url = redis_url if redis_url is not None else os.getenv("REDIS_URL")
+    if redis_url and aioredis is not None:
+        queue = RedisJobQueue(redis_url)
+        try:
+            await queue.start()
+            return queue
+        except Exception as e:
+            logger.warning(f"⚠️ Redis 작업 큐 연결 실패, 로컬 작업 큐로 동작: {e}")
+    elif redis_url:
+        logger.warning("⚠️ redis 패키지가 없어 로컬 작업 큐로 동작")
+    queue = LocalJobQueue()
+    await queue.start()
+    return queue
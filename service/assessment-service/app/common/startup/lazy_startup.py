@@ -0,0 +1,258 @@
+"""
+지연 시작 (lazy startup)
+- uvicorn 이 "startup complete" 를 찍기 전에는 FastAPI 와 헬스체크만 준비하고,
+  무거운 모듈(SQLAlchemy, numpy, redis, 라우터와 pydantic 스키마) import 와 서비스 초기화는
+  시작 직후 백그라운드에서 진행
+    1. 초기화 모듈 import       (스레드에서, 이벤트 루프는 헬스체크 응답 가능)
+    2. 라우터 import + 등록      (import 는 스레드에서, include_router 는 루프에서)
+    3. 서비스 초기화             (초기화 모듈의 async context manager 진입, 종료 시 빠져나옴)
+    4. 준비 완료 → 대기 중이던 요청 진행
+    5. OpenAPI(JSON) 스키마 미리 생성 (첫 /docs 요청이 느리지 않도록)
+- 준비 전 요청: 헬스체크 등 exempt 경로는 바로 응답, 나머지는 준비될 때까지 기다림
+  (STARTUP_WAIT_SECONDS 를 넘기거나 초기화가 실패하면 503 + Retry-After)
+- 헬스체크는 unready() 로 준비 전(starting)과 초기화 실패 중(unhealthy)에 503 을 내서
+  배포 헬스체크/로드밸런서가 실제 요청을 처리할 수 있을 때만 트래픽을 보내게 함
+- 초기화가 실패하면 들어갔던 서비스를 정리하고 STARTUP_RETRY_SECONDS 부터 두 배씩
+  (최대 STARTUP_RETRY_MAX_SECONDS) 기다렸다 다시 시도
+"""
+import asyncio
+import importlib
+import logging
+import os
+import time
+from contextlib import AsyncExitStack
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import FastAPI
+
+try:
+    import psutil
+except ImportError:  # 선택 의존성 (프로세스 시작 시각 → 준비까지 시간)
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+def _load(target: str) -> Any:
+    """"package.module:attr" 형태의 대상을 import"""
+    module_name, _, attr = target.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, attr) if attr else module
+
+
+def _process_started_at() -> Optional[float]:
+    if psutil is None:
+        return None
+    try:
+        return psutil.Process().create_time()
+    except psutil.Error:
+        return None
+
+
+class LazyStartup:
+    def __init__(
+        self,
+        app: FastAPI,
+        services: Optional[str] = None,
+        exempt: Iterable[str] = ("/", "/health"),
+        wait_timeout: Optional[float] = None,
+    ):
+        """
+        services: 서비스 초기화 async context manager ("app.bootstrap:services"), app 을 인자로 받음
+        exempt:   준비 전에도 바로 처리할 경로 (정확히 일치)
+        """
+        self.app = app
+        self.services = services
+        self.exempt = frozenset(exempt)
+        self.wait_timeout = wait_timeout or float(os.getenv("STARTUP_WAIT_SECONDS", "30"))
+        self.retry_initial = float(os.getenv("STARTUP_RETRY_SECONDS", "1"))
+        self.retry_max = float(os.getenv("STARTUP_RETRY_MAX_SECONDS", "60"))
+        self.routers: List[Tuple[str, str, Dict[str, Any]]] = []
+        self.phases: Dict[str, float] = {}
+        self.mounted: List[str] = []
+        self.error: Optional[str] = None
+        self.attempts = 0
+        # 실패 후 다음 시도 시각 (time.time())
+        self.retry_at: Optional[float] = None
+        self.ready_at: Optional[float] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stack: Optional[AsyncExitStack] = None
+        self._started: Optional[float] = None
+        app.add_middleware(StartupGateMiddleware, startup=self)
+
+    def include_router(self, target: str, name: str, **kwargs):
+        """라우터를 지연 등록 ("app.router.main_router:router"), kwargs 는 include_router 로 그대로 전달"""
+        self.routers.append((target, name, kwargs))
+
+    def deferred_modules(self) -> List[str]:
+        """백그라운드에서 import 하는 모듈 (import 비용 리포트용)"""
+        targets = ([self.services] if self.services else []) + [target for target, _, _ in self.routers]
+        return [target.partition(":")[0] for target in targets]
+
+    @property
+    def ready(self) -> bool:
+        return self._ready is not None and self._ready.is_set() and self.error is None
+
+    # ---- 수명 주기 --------------------------------------------------------
+
+    def start(self):
+        """lifespan 시작 시 호출, 바로 반환 (초기화는 백그라운드)"""
+        self._started = time.perf_counter()
+        self._ready = asyncio.Event()
+        self._task = asyncio.create_task(self._boot())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        if self._stack is not None:
+            stack, self._stack = self._stack, None
+            await stack.aclose()
+
+    async def _phase(self, name: str, fn: Callable, *args):
+        started = time.perf_counter()
+        result = fn(*args)
+        if asyncio.iscoroutine(result):
+            result = await result
+        self.phases[name] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    async def _boot(self):
+        delay = self.retry_initial
+        while not await self._attempt():
+            self.retry_at = time.time() + delay
+            logger.warning(f"⚠️ {delay:g}초 뒤 서비스 초기화 재시도 ({self.attempts}번째 실패)")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.retry_max)
+            # 다시 시도하는 동안 들어온 요청은 이번 시도 결과를 기다림
+            self._ready.clear()
+        self.retry_at = None
+        self.ready_at = time.time()
+        self.phases["total"] = round((time.perf_counter() - self._started) * 1000, 1)
+        self._ready.set()
+        logger.info(f"✅ 서비스 준비 완료 ({self.phases['total']:.0f}ms, 단계별 {self.phases})")
+        try:
+            await self._phase("prewarm", asyncio.to_thread, self._prewarm)
+        except Exception as e:
+            logger.warning(f"⚠️ 스키마 미리 생성 실패 (첫 요청 때 생성): {e}")
+
+    async def _attempt(self) -> bool:
+        """초기화 한 번, 실패하면 들어갔던 서비스를 빠져나오고 False (이미 등록한 라우터는 그대로)"""
+        self.attempts += 1
+        try:
+            factory = None
+            if self.services:
+                factory = await self._phase("import_services", asyncio.to_thread, _load, self.services)
+            await self._phase("routers", self._mount_routers)
+            if factory is not None:
+                self._stack = AsyncExitStack()
+                await self._phase("services", self._stack.enter_async_context, factory(self.app))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            logger.error(f"❌ 서비스 초기화 실패: {self.error}")
+            if self._stack is not None:
+                stack, self._stack = self._stack, None
+                try:
+                    await stack.aclose()
+                except Exception as close_error:
+                    logger.warning(f"⚠️ 초기화 실패 후 정리 중 오류: {close_error}")
+            self._ready.set()
+            return False
+        self.error = None
+        return True
+
+    async def _mount_routers(self):
+        for target, name, kwargs in self.routers:
+            if name in self.mounted:
+                continue
+            try:
+                router = await asyncio.to_thread(_load, target)
+            except ImportError as e:
+                logger.warning(f"{name} not found: {e}")
+                continue
+            self.app.include_router(router, **kwargs)
+            self.mounted.append(name)
+            logger.info(f"✅ {name} 등록됨")
+
+    def _prewarm(self):
+        """
+        pydantic 2 는 모델/TypeAdapter 를 만들 때 검증기를 컴파일하므로 라우터 import(2단계)에서 이미 끝남
+        남은 비용은 JSON 스키마: 첫 /docs 요청 때 전체 라우트를 훑는 대신 미리 생성 (app.openapi() 결과는 캐시됨)
+        """
+        self.app.openapi()
+
+    # ---- 요청 대기 --------------------------------------------------------
+
+    async def wait(self) -> bool:
+        """준비되면 True, 시간 초과/실패면 False"""
+        if self.ready:
+            return True
+        if self._ready is None:
+            return False
+        try:
+            await asyncio.wait_for(self._ready.wait(), self.wait_timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.error is None
+
+    def retry_after(self) -> int:
+        """503 응답의 Retry-After (초)"""
+        if self.retry_at is None:
+            return 1
+        return max(1, int(self.retry_at - time.time() + 0.999))
+
+    def unready(self) -> Optional[Dict[str, Any]]:
+        """아직 요청을 처리할 수 없으면(초기화 중 / 실패해 재시도 중) 헬스체크 503 에 실을 내용, 준비됐으면 None"""
+        if self.ready:
+            return None
+        if self.error is None:
+            pending = [name for _, name, _ in self.routers if name not in self.mounted]
+            return {"status": "starting", "attempts": self.attempts, "pending_routers": pending}
+        return {"status": "unhealthy", "error": self.error, "attempts": self.attempts, "retry_in_seconds": self.retry_after()}
+
+    def report(self) -> Dict[str, Any]:
+        process_started = _process_started_at()
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "attempts": self.attempts,
+            "phases_ms": self.phases,
+            # 인터프리터 시작부터 준비 완료까지 (import 포함 콜드 스타트 전체)
+            "process_to_ready_ms": (
+                round((self.ready_at - process_started) * 1000, 1)
+                if self.ready_at is not None and process_started is not None else None
+            ),
+            "routers": self.mounted,
+            "pending_routers": [name for _, name, _ in self.routers if name not in self.mounted] if not self.ready else [],
+        }
+
+
+class StartupGateMiddleware:
+    """준비 전에는 exempt 경로만 통과시키고 나머지는 준비될 때까지 대기 (순수 ASGI 미들웨어)"""
+
+    def __init__(self, app, startup: LazyStartup):
+        self.app = app
+        self.startup = startup
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket") and not self.startup.ready and scope["path"] not in self.startup.exempt:
+            if not await self.startup.wait():
+                if scope["type"] == "websocket":
+                    await send({"type": "websocket.close", "code": 1013})
+                    return
+                retry_after = str(self.startup.retry_after()).encode()
+                await send({
+                    "type": "http.response.start",
+                    "status": 503,
+                    "headers": [(b"content-type", b"application/json"), (b"retry-after", retry_after)],
+                })
+                await send({"type": "http.response.body", "body": b'{"detail":"Service starting"}'})
+                return
+        await self.app(scope, receive, send)
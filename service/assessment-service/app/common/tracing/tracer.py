@@ -0,0 +1,279 @@
+"""
+분산 추적 (W3C traceparent)
+- 요청 하나(이 프로세스 안)의 스팬은 contextvar 로 이어짐: tracer.span("이름") 은 지금 스팬의 자식
+- 샘플링
+    head: traceparent 가 없으면 TRACE_SAMPLE_RATIO 확률로 결정, 있으면 flags 의 sampled 를 따름
+          edge(게이트웨이)는 외부 클라이언트가 보낸 sampled 를 믿지 않고 trace id 만 이어받아 다시 결정
+          (모든 요청을 sampled 로 보내 스팬 전송/저장을 부풀리는 것을 막음)
+    tail: head 에서 빠진 요청도 TRACE_TAIL=true 면 스팬을 메모리에만 모아 두었다가, 루트 스팬이
+          TRACE_SLOW_MS 이상 걸렸거나 오류면 내보냄 (서비스마다 따로 판단, trace id 는 같음)
+- TRACE_TAIL=false 이고 head 에서 빠지면 span() 은 공용 NOOP_SPAN 을 돌려줌 (contextvar 조회 한 번)
+- 시각: 시작은 time.time(), 길이는 perf_counter 차이 (벽시계가 바뀌어도 길이는 정확)
+"""
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+TRACEPARENT = "traceparent"
+TRACE_ID_HEADER = "x-trace-id"
+# 스팬 하나에 붙는 속성 값 길이 상한
+MAX_ATTR_CHARS = 256
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start", "_t0", "duration_ms", "status", "attrs")
+
+    recording = True
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], name: str, kind: str, attrs: Dict[str, Any]):
+        self.trace_id = trace_id
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.status = "ok"
+        self.attrs = attrs
+
+    def set(self, key: str, value: Any):
+        self.attrs[key] = value
+
+    def error(self, message: str):
+        self.status = "error"
+        self.attrs["error"] = str(message)[:MAX_ATTR_CHARS]
+
+    def end(self):
+        if self.duration_ms is None:
+            self.duration_ms = (time.perf_counter() - self._t0) * 1000
+
+    def to_dict(self, service: str, tail: bool) -> Dict[str, Any]:
+        entry = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "name": self.name,
+            "service": service,
+            "kind": self.kind,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms or 0.0, 3),
+            "status": self.status,
+        }
+        if self.parent_id:
+            entry["parent_id"] = self.parent_id
+        if self.attrs:
+            entry["attrs"] = {k: v if isinstance(v, (int, float, bool)) else str(v)[:MAX_ATTR_CHARS] for k, v in self.attrs.items()}
+        if tail:
+            entry["tail"] = True
+        return entry
+
+
+class _NoopSpan:
+    recording = False
+    span_id = None
+    duration_ms = None
+
+    def set(self, key: str, value: Any):
+        pass
+
+    def error(self, message: str):
+        pass
+
+    def end(self):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _Trace:
+    """요청 하나의 추적 상태 (이 프로세스 안)"""
+    __slots__ = ("trace_id", "sampled", "spans")
+
+    def __init__(self, trace_id: str, sampled: bool, recording: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        # 기록하지 않으면 None (head 에서 빠지고 tail 도 꺼짐)
+        self.spans: Optional[List[Span]] = [] if recording else None
+
+
+_trace: ContextVar[Optional[_Trace]] = ContextVar("trace", default=None)
+_span: ContextVar[Optional[Span]] = ContextVar("span", default=None)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """'00-<trace 32>-<parent 16>-<flags 2>' → (trace_id, parent_id, sampled), 형식이 틀리면 None"""
+    if not value:
+        return None
+    parts = value.strip().lower().split("-")
+    if len(parts) < 4 or len(parts[0]) != 2 or parts[0] == "ff":
+        return None
+    _, trace_id, parent_id, flags = parts[:4]
+    if len(trace_id) != 32 or len(parent_id) != 16 or len(flags) != 2:
+        return None
+    try:
+        int(trace_id, 16), int(parent_id, 16)
+        sampled = bool(int(flags, 16) & 1)
+    except ValueError:
+        return None
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, sampled
+
+
+class Tracer:
+    def __init__(self, service: str = "unknown"):
+        self.service = service
+        self.sample_ratio = float(os.getenv("TRACE_SAMPLE_RATIO", "0.05"))
+        self.slow_ms = float(os.getenv("TRACE_SLOW_MS", "1000"))
+        self.tail = os.getenv("TRACE_TAIL", "true").lower() in ("1", "true", "yes")
+        # 외부에서 바로 요청을 받는 프로세스면 True (install_tracing(edge=True))
+        self.edge = False
+        self.export: Optional[Callable[[List[Dict[str, Any]]], None]] = None
+        self.counts = {"requests": 0, "head_sampled": 0, "tail_sampled": 0, "spans": 0}
+
+    # ---- 요청 단위 (미들웨어) ---------------------------------------------
+
+    def begin(self, traceparent: Optional[str], name: str, kind: str = "server", **attrs) -> Tuple[Span, Tuple[Token, Token]]:
+        """들어온 요청의 루트 스팬 시작, 반환한 토큰으로 finish() 에서 문맥을 되돌림"""
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+            if self.edge:
+                sampled = random.random() < self.sample_ratio
+        else:
+            trace_id, parent_id = "%032x" % random.getrandbits(128), None
+            sampled = random.random() < self.sample_ratio
+        trace = _Trace(trace_id, sampled, recording=sampled or self.tail)
+        span = Span(trace_id, parent_id, name, kind, attrs)
+        if trace.spans is not None:
+            trace.spans.append(span)
+        return span, (_trace.set(trace), _span.set(span))
+
+    def finish(self, span: Span, tokens: Tuple[Token, Token]):
+        """루트 스팬을 끝내고 샘플링 결정 (head 면 내보냄, 아니면 느리거나 오류일 때만)"""
+        span.end()
+        trace = _trace.get()
+        _trace.reset(tokens[0])
+        _span.reset(tokens[1])
+        self.counts["requests"] += 1
+        if trace is None or trace.spans is None:
+            return
+        if trace.sampled:
+            self.counts["head_sampled"] += 1
+            tail = False
+        elif span.status == "error" or span.duration_ms >= self.slow_ms:
+            self.counts["tail_sampled"] += 1
+            tail = True
+        else:
+            return
+        if self.export is not None:
+            spans = [s.to_dict(self.service, tail) for s in trace.spans if s.duration_ms is not None]
+            self.counts["spans"] += len(spans)
+            self.export(spans)
+
+    # ---- 스팬 ------------------------------------------------------------
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attrs) -> Iterator[Any]:
+        """지금 스팬의 자식 스팬 (기록하지 않는 요청이면 NOOP_SPAN), 예외가 나면 오류로 표시하고 다시 던짐"""
+        trace = _trace.get()
+        if trace is None or trace.spans is None:
+            yield NOOP_SPAN
+            return
+        parent = _span.get()
+        span = Span(trace.trace_id, parent.span_id if parent is not None else None, name, kind, attrs)
+        trace.spans.append(span)
+        token = _span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            span.end()
+            _span.reset(token)
+
+    def record(self, name: str, start: float, duration_ms: float, parent: Optional[Any] = None, kind: str = "internal", **attrs):
+        """이미 끝난 구간을 스팬으로 추가 (httpcore trace 이벤트처럼 시각을 따로 잰 경우)"""
+        trace = _trace.get()
+        if trace is None or trace.spans is None:
+            return
+        parent = parent if parent is not None else _span.get()
+        span = Span(trace.trace_id, parent.span_id if parent is not None else None, name, kind, attrs)
+        span.start = start
+        span.duration_ms = duration_ms
+        trace.spans.append(span)
+
+    def recording(self) -> bool:
+        trace = _trace.get()
+        return trace is not None and trace.spans is not None
+
+    # ---- 전파 ------------------------------------------------------------
+
+    def traceparent(self) -> Optional[str]:
+        """업스트림에 보낼 traceparent (부모 = 지금 스팬)"""
+        trace = _trace.get()
+        span = _span.get()
+        if trace is None or span is None:
+            return None
+        return f"00-{trace.trace_id}-{span.span_id}-{'01' if trace.sampled else '00'}"
+
+    def inject(self, headers: Dict[str, str]):
+        value = self.traceparent()
+        if value:
+            headers[TRACEPARENT] = value
+        else:
+            headers.pop(TRACEPARENT, None)
+
+    def current_trace_id(self) -> Optional[str]:
+        trace = _trace.get()
+        return trace.trace_id if trace is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "service": self.service,
+            "sample_ratio": self.sample_ratio,
+            "edge": self.edge,
+            "slow_ms": self.slow_ms,
+            "tail": self.tail,
+            **self.counts,
+        }
+
+
+def upstream_trace(tracer: Tracer, parent: Any) -> Optional[Callable]:
+    """
+    httpx 요청의 extensions={"trace": ...} 콜백: 연결(TCP+TLS)과 TTFB(요청 헤더 전송 → 응답 헤더 수신)를 parent 의 자식 스팬으로
+    기록하지 않는 요청이면 None (httpcore 이벤트를 받지 않음)
+    """
+    if not parent.recording:
+        return None
+    started: Dict[str, Tuple[float, float]] = {}
+
+    async def trace(event: str, info: Dict[str, Any]):
+        name, _, phase = event.rpartition(".")
+        if phase == "started":
+            started[name] = (time.time(), time.perf_counter())
+            return
+        if phase not in ("complete", "failed"):
+            return
+        if name in ("connection.connect_tcp", "connection.start_tls"):
+            key, span_name = name, "upstream.connect" if name.endswith("tcp") else "upstream.tls"
+        elif name.endswith("send_request_headers"):
+            # TTFB 는 요청 헤더를 보내기 시작한 때부터 잼
+            started["ttfb"] = started.get(name, (time.time(), time.perf_counter()))
+            return
+        elif name.endswith("receive_response_headers"):
+            key, span_name = "ttfb", "upstream.ttfb"
+        else:
+            return
+        if key not in started:
+            return
+        wall, t0 = started.pop(key)
+        attrs = {"failed": True} if phase == "failed" else {}
+        tracer.record(span_name, wall, (time.perf_counter() - t0) * 1000, parent=parent, **attrs)
+
+    return trace
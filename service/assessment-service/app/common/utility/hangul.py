@@ -0,0 +1,71 @@
+"""
+한글 자모 분해 (검색어 정규화용)
+- 완성형 음절(가~힣)을 호환 자모로 분해하고, 겹모음/겹받침은 다시 기본 자모로 풀어 씀
+  "삼성전자" → "ㅅㅏㅁㅅㅓㅇㅈㅓㄴㅈㅏ", "닭" → "ㄷㅏㄹㄱ"
+  입력 중인 검색어("삼성저", "삼성전ㅈ")도 분해하면 회사명 자모열의 접두어가 됨
+- 초성만 모은 문자열("ㅅㅅㅈㅈ")로 초성 검색 지원
+"""
+import re
+import unicodedata
+
+_SYLLABLE_BASE = 0xAC00
+_SYLLABLE_LAST = 0xD7A3
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = ("", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+             "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+
+# 겹모음/겹받침 → 기본 자모 (입력 도중 "ㅗ" 만 친 상태도 "ㅘ" 와 맞도록)
+_COMPOUND = {
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+
+_CHOSEONG_SET = frozenset(CHOSEONG)
+
+# 회사명에서 검색에 의미 없는 법인 표기
+_CORPORATE_MARKERS = re.compile(r"\(주\)|\(유\)|\(재\)|\(사\)|㈜|주식회사|유한회사")
+# 한글/영문/숫자 외 문자 (공백, 괄호, 점 등)는 구분자로 취급
+_SEPARATORS = re.compile(r"[^0-9a-zㄱ-ㆎ가-힣]+")
+# 전각 영문/숫자/기호 → 반각 (NFKC 는 호환 자모까지 조합형 자모로 바꿔 버리므로 직접 변환)
+_FULLWIDTH = {code: code - 0xFEE0 for code in range(0xFF01, 0xFF5F)}
+
+
+def _decompose_char(ch: str) -> str:
+    code = ord(ch)
+    if _SYLLABLE_BASE <= code <= _SYLLABLE_LAST:
+        code -= _SYLLABLE_BASE
+        jamo = CHOSEONG[code // 588] + JUNGSEONG[(code % 588) // 28] + JONGSEONG[code % 28]
+        return "".join(_COMPOUND.get(j, j) for j in jamo)
+    return _COMPOUND.get(ch, ch)
+
+
+def normalize(text: str) -> str:
+    """NFC + 전각 → 반각 + 소문자화 + 법인 표기 제거 (구분자는 공백 하나로)"""
+    text = unicodedata.normalize("NFC", text or "").translate(_FULLWIDTH).lower()
+    text = _CORPORATE_MARKERS.sub(" ", text)
+    return _SEPARATORS.sub(" ", text).strip()
+
+
+def decompose(text: str) -> str:
+    """정규화된 문자열 → 자모열 (한글이 아닌 문자는 그대로)"""
+    return "".join(_decompose_char(ch) for ch in text)
+
+
+def choseong(text: str) -> str:
+    """정규화된 문자열 → 초성열 (한글 음절만, 나머지 문자는 그대로)"""
+    out = []
+    for ch in text:
+        code = ord(ch)
+        if _SYLLABLE_BASE <= code <= _SYLLABLE_LAST:
+            out.append(CHOSEONG[(code - _SYLLABLE_BASE) // 588])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def is_choseong_query(text: str) -> bool:
+    """초성(자음)만으로 된 검색어인지"""
+    return bool(text) and all(ch in _CHOSEONG_SET for ch in text)
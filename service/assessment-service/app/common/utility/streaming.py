@@ -0,0 +1,124 @@
+"""
+스트리밍 요청/응답 유틸리티
+"""
+import codecs
+import json
+from typing import Any, AsyncIterator, Tuple
+
+from fastapi.responses import StreamingResponse
+
+# 하나의 항목이 이 크기를 넘도록 끝나지 않으면 잘못된 입력으로 보고 중단 (버퍼 무한 증가 방지)
+MAX_ITEM_BYTES = 1024 * 1024
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    요청 본문을 읽는 동안 응답을 함께 스트리밍하는 응답
+    StreamingResponse 의 연결 종료 감시는 receive() 를 호출해 본문 청크를 가로채므로 생략
+    (클라이언트가 끊기면 request.stream() 에서 ClientDisconnect 가 발생해 생성기가 종료됨)
+    """
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def iter_text(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """바이트 청크 → UTF-8 문자열 청크 (멀티바이트 문자가 청크 경계에 걸려도 안전, BOM 제거)"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    async for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+async def iter_lines(texts: AsyncIterator[str]) -> AsyncIterator[str]:
+    buffer = ""
+    async for text in texts:
+        buffer += text
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+        if len(buffer) > MAX_ITEM_BYTES:
+            raise ValueError(f"한 줄이 {MAX_ITEM_BYTES} bytes 를 넘습니다")
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+# (항목 순번, 파싱된 값, 파싱 오류 메시지)
+ParsedItem = Tuple[int, Any, str]
+
+
+async def parse_ndjson(texts: AsyncIterator[str]) -> AsyncIterator[ParsedItem]:
+    index = 0
+    async for line in iter_lines(texts):
+        if not line.strip():
+            continue
+        try:
+            yield index, json.loads(line), None
+        except json.JSONDecodeError as e:
+            yield index, None, f"JSON 파싱 오류: {e.msg}"
+        index += 1
+
+
+async def parse_json_array(texts: AsyncIterator[str]) -> AsyncIterator[ParsedItem]:
+    """
+    최상위 JSON 배열을 원소 단위로 점진 파싱
+    완성된 원소만 raw_decode 로 꺼내고, 나머지는 다음 청크가 올 때까지 버퍼에 둠
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, index = "", 0, 0
+    started = finished = False
+    async for text in texts:
+        buffer = buffer[pos:] + text
+        pos = 0
+        while not finished:
+            while pos < len(buffer) and (buffer[pos].isspace() or (started and buffer[pos] == ",")):
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("JSON 배열이 아닙니다")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                finished = True
+                break
+            try:
+                value, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if len(buffer) - pos > MAX_ITEM_BYTES:
+                    raise ValueError(f"배열 원소 {index} 를 파싱할 수 없습니다")
+                break  # 원소가 아직 다 도착하지 않음
+            yield index, value, None
+            index += 1
+    if not finished:
+        raise ValueError(f"JSON 배열이 닫히지 않았습니다 (원소 {index} 부근)")
+
+
+async def parse_items(chunks: AsyncIterator[bytes], fmt: str = "auto") -> AsyncIterator[ParsedItem]:
+    """NDJSON 또는 JSON 배열 본문을 항목 단위로 파싱 (auto 는 첫 글자가 '[' 이면 배열)"""
+    texts = iter_text(chunks)
+    if fmt == "auto":
+        first = ""
+        async for text in texts:
+            first = text
+            if text.strip():
+                break
+        fmt = "json" if first.lstrip().startswith("[") else "ndjson"
+        texts = _prepend(first, texts)
+    parser = parse_json_array if fmt == "json" else parse_ndjson
+    async for item in parser(texts):
+        yield item
+
+
+async def _prepend(first: str, rest: AsyncIterator[str]) -> AsyncIterator[str]:
+    if first:
+        yield first
+    async for text in rest:
+        yield text
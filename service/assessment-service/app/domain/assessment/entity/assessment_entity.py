@@ -0,0 +1,34 @@
+from sqlalchemy import (
+    JSON, Column, DateTime, Float, Index, String, func
+)
+
+from app.common.database import Base
+
+class AssessmentEntity(Base):
+    __tablename__ = "assessments"
+
+    id = Column(String(40), primary_key=True)
+    user_id = Column(String(64), nullable=True)
+    company_id = Column(String(64), nullable=True)
+    company_type = Column(String(16), nullable=False)
+    assessment_type = Column(String(64), nullable=True)
+    status = Column(String(16), nullable=False, default="completed")
+    score = Column(Float, nullable=True)
+    # {"sub_scores": ..., "indicators": ..., "recommendations": ...}
+    result = Column(JSON, nullable=False)
+    assessment_data = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # 회사별 최신순 목록 (keyset 페이지네이션: created_at, id)
+        Index("ix_assessments_company_created", "company_id", "created_at", "id"),
+        # 사용자별 / 회사 유형별 최신순 조회
+        Index("ix_assessments_user_created", "user_id", "created_at"),
+        Index("ix_assessments_type_created", "company_type", "created_at"),
+        # 기간 조회
+        Index("ix_assessments_created_at", "created_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<AssessmentEntity id={self.id} company_id={self.company_id} score={self.score}>"
@@ -0,0 +1,17 @@
+from sqlalchemy import JSON, Column, DateTime, String, func
+
+from app.common.database import Base
+
+class AssessmentScoreStateEntity(Base):
+    """평가별 증분 재계산용 중간 결과 (반올림 전 지표/하위 점수/총점)"""
+    __tablename__ = "assessment_score_states"
+
+    assessment_id = Column(String(40), primary_key=True)
+    # 지표 정의 버전 (정의가 바뀌면 이 중간 결과는 쓰지 않고 전체 재계산)
+    model_version = Column(String(16), nullable=False)
+    # {"indicators": [...], "sub_scores": [...], "total": ...}
+    state = Column(JSON, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self) -> str:
+        return f"<AssessmentScoreStateEntity assessment_id={self.assessment_id} version={self.model_version}>"
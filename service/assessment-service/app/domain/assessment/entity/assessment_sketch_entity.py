@@ -0,0 +1,18 @@
+from sqlalchemy import JSON, Column, DateTime, Float, String, func
+
+from app.common.database import Base
+
+class AssessmentSketchEntity(Base):
+    """레플리카별 분위수 스케치 (모든 레플리카의 행을 합치면 전체 분포)"""
+    __tablename__ = "assessment_sketches"
+
+    replica_id = Column(String(64), primary_key=True)
+    # "{company_type}|{industry}|{metric}"
+    sketch_key = Column(String(200), primary_key=True)
+    count = Column(Float, nullable=False, default=0)
+    # TDigest.to_dict()
+    payload = Column(JSON, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self) -> str:
+        return f"<AssessmentSketchEntity replica={self.replica_id} key={self.sketch_key} count={self.count}>"
@@ -0,0 +1,162 @@
+"""
+t-digest 분위수 스케치 (merging digest)
+- 값 분포를 최대 약 compression 개의 centroid(평균, 가중치)로 요약 → 메모리/직렬화 크기가 데이터 수와 무관
+- 양 끝(상/하위 분위)은 작은 centroid 로 촘촘하게, 가운데는 크게 묶는 k1 스케일 함수 사용
+- 같은 compression 의 스케치끼리 merge 할 수 있으므로 레플리카별 스케치를 합치면 전체 분포가 됨
+- add 는 버퍼에 쌓았다가 한꺼번에 압축, percentile/quantile 은 압축된 centroid 에서 이진 탐색 (O(log k))
+"""
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class TDigest:
+    def __init__(self, compression: float = 100.0):
+        self.compression = float(compression)
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: List[float] = []
+        self._buffer_limit = int(self.compression * 5)
+        # percentile 조회용 보간 표 (압축할 때마다 다시 만듦)
+        self._xs: Optional[np.ndarray] = None
+        self._ys: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return int(self.count)
+
+    # ---- 갱신 -----------------------------------------------------------
+
+    def add(self, value: float) -> None:
+        if value is None or math.isnan(value):
+            return
+        self._buffer.append(float(value))
+        self.count += 1
+        if value < self.min:
+            self.min = float(value)
+        if value > self.max:
+            self.max = float(value)
+        self._xs = None
+        if len(self._buffer) >= self._buffer_limit:
+            self._compress()
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """other 의 분포를 합침 (self 를 변경하고 반환)"""
+        if other.count == 0:
+            return self
+        other._compress()
+        self._compress(other.means, other.weights)
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _compress(self, extra_means: Optional[np.ndarray] = None, extra_weights: Optional[np.ndarray] = None) -> None:
+        if not self._buffer and extra_means is None:
+            return
+        parts_m = [self.means, np.asarray(self._buffer, dtype=np.float64)]
+        parts_w = [self.weights, np.ones(len(self._buffer))]
+        if extra_means is not None:
+            parts_m.append(extra_means)
+            parts_w.append(extra_weights)
+        means = np.concatenate(parts_m)
+        weights = np.concatenate(parts_w)
+        order = np.argsort(means, kind="mergesort")
+        means, weights = means[order].tolist(), weights[order].tolist()
+        self._buffer = []
+
+        total = sum(weights)
+        delta = self.compression
+        out_m: List[float] = []
+        out_w: List[float] = []
+        cur_m, cur_w = means[0], weights[0]
+        done = 0.0
+        limit = self._q_limit(0.0, total, delta)
+        for m, w in zip(means[1:], weights[1:]):
+            if done + cur_w + w <= limit:
+                # 같은 centroid 로 합침 (가중 평균)
+                cur_w += w
+                cur_m += (m - cur_m) * w / cur_w
+            else:
+                out_m.append(cur_m)
+                out_w.append(cur_w)
+                done += cur_w
+                limit = self._q_limit(done, total, delta)
+                cur_m, cur_w = m, w
+        out_m.append(cur_m)
+        out_w.append(cur_w)
+        self.means = np.array(out_m)
+        self.weights = np.array(out_w)
+        self._xs = None
+
+    @staticmethod
+    def _q_limit(done: float, total: float, delta: float) -> float:
+        """k1 스케일: 현재 centroid 가 가질 수 있는 누적 가중치 상한"""
+        q = done / total
+        k = delta / (2 * math.pi) * math.asin(2 * q - 1) + 1
+        if k >= delta / 4:
+            return total
+        return (math.sin(2 * math.pi * k / delta) + 1) / 2 * total
+
+    # ---- 조회 -----------------------------------------------------------
+
+    def _table(self):
+        """(값, 누적 가중치) 보간 표: 각 centroid 는 평균 위치에 가중치의 절반이 누적된 것으로 봄"""
+        if self._xs is None:
+            self._compress()
+            if self.count == 0:
+                return None, None
+            # 평균이 같은 centroid 는 하나로 (보간 표의 x 는 증가해야 함)
+            xs, starts = np.unique(self.means, return_index=True)
+            weights = np.add.reduceat(self.weights, starts)
+            mids = np.cumsum(weights) - weights / 2
+            if self.min < xs[0]:
+                xs, mids = np.concatenate([[self.min], xs]), np.concatenate([[0.0], mids])
+            if self.max > xs[-1]:
+                xs, mids = np.concatenate([xs, [self.max]]), np.concatenate([mids, [self.count]])
+            self._xs, self._ys = xs, mids
+        return self._xs, self._ys
+
+    def cdf(self, value: float) -> float:
+        """value 보다 작은 값의 비율 (같은 값은 절반만 포함), 0~1"""
+        xs, ys = self._table()
+        if xs is None:
+            return math.nan
+        if value < self.min:
+            return 0.0
+        if value > self.max:
+            return 1.0
+        return float(np.interp(value, xs, ys)) / self.count
+
+    def quantile(self, q: float) -> float:
+        """분위수 q (0~1) 에 해당하는 값"""
+        xs, ys = self._table()
+        if xs is None:
+            return math.nan
+        return float(np.interp(q * self.count, ys, xs))
+
+    # ---- 직렬화 ---------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        self._compress()
+        return {
+            "compression": self.compression,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "means": np.round(self.means, 6).tolist(),
+            "weights": self.weights.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TDigest":
+        digest = cls(data.get("compression", 100.0))
+        digest.means = np.asarray(data.get("means", []), dtype=np.float64)
+        digest.weights = np.asarray(data.get("weights", []), dtype=np.float64)
+        digest.count = float(data.get("count", digest.weights.sum()))
+        if digest.count:
+            digest.min, digest.max = float(data["min"]), float(data["max"])
+        return digest
@@ -0,0 +1,180 @@
+"""
+추천 규칙 컴파일 결과 (bitset 기반 판정 구조)
+- 규칙 = 조건들의 AND, 조건 = (필드, 연산자, 값)
+    숫자 필드: score, sub_score.<id>, indicator.<id>  연산자 < <= > >=
+    범주 필드: company_type, industry                 연산자 in (목록) / == (단일 값)
+- 컴파일 시 필드×연산자마다 임계값을 정렬하고, "이 임계값 조건이 거짓이면 탈락하는 규칙" bitset 의
+  누적 OR(prefix/suffix) 표를 만들어 둠
+- 판정: 값 하나당 이진 탐색 1번으로 탈락 규칙 bitset 을 얻고, 필드별로 OR → 살아남은 규칙이 발동
+  → 규칙 수와 무관하게 (필드 수 × log 임계값 수) 이고, N 건은 searchsorted 로 한꺼번에 처리
+- 규칙은 priority 내림차순으로 번호를 매기므로 bitset 의 낮은 비트부터 읽으면 곧 우선순위 순서
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+NUMERIC_OPS = ("<", "<=", ">", ">=")
+CATEGORICAL_FIELDS = ("company_type", "industry")
+
+
+class RuleCompileError(ValueError):
+    """규칙 정의 오류"""
+
+
+def parse_condition(rule_id: str, condition: Dict[str, Any]) -> Tuple[str, str, Any]:
+    try:
+        field, op, value = condition["field"], condition.get("op", "in"), condition["value"]
+    except (KeyError, TypeError):
+        raise RuleCompileError(f"{rule_id}: 조건에는 field/op/value 가 필요합니다 ({condition})")
+    if field in CATEGORICAL_FIELDS:
+        if op == "==":
+            value = [value]
+        elif op != "in":
+            raise RuleCompileError(f"{rule_id}: {field} 에는 in / == 만 사용할 수 있습니다")
+        return field, "in", frozenset(str(v).upper() for v in value)
+    if not (field == "score" or field.startswith("sub_score.") or field.startswith("indicator.")):
+        raise RuleCompileError(f"{rule_id}: 알 수 없는 필드 {field}")
+    if op not in NUMERIC_OPS:
+        raise RuleCompileError(f"{rule_id}: 숫자 필드 {field} 에 사용할 수 없는 연산자 {op}")
+    try:
+        return field, op, float(value)
+    except (TypeError, ValueError):
+        raise RuleCompileError(f"{rule_id}: {field} {op} 의 값이 숫자가 아닙니다 ({value!r})")
+
+
+class _ThresholdIndex:
+    """필드 하나 × 연산자 하나의 임계값 → 탈락 bitset 표"""
+
+    def __init__(self, op: str, masks_by_threshold: Dict[float, np.ndarray], words: int):
+        self.op = op
+        self.thresholds = np.array(sorted(masks_by_threshold))
+        masks = np.stack([masks_by_threshold[t] for t in self.thresholds])
+        zero = np.zeros((1, words), dtype=np.uint64)
+        if op in ("<", "<="):
+            # v < t (v <= t) 는 t 가 작은 쪽부터 거짓 → 앞쪽 누적 OR
+            self.table = np.concatenate([zero, np.bitwise_or.accumulate(masks, axis=0)])
+            self.side = "right" if op == "<" else "left"
+        else:
+            # v > t (v >= t) 는 t 가 큰 쪽부터 거짓 → 뒤쪽 누적 OR
+            self.table = np.concatenate([np.bitwise_or.accumulate(masks[::-1], axis=0)[::-1], zero])
+            self.side = "left" if op == ">" else "right"
+
+    def failing(self, values: np.ndarray) -> np.ndarray:
+        """(N,) 값 → (N, W) 탈락 규칙 bitset"""
+        return self.table[np.searchsorted(self.thresholds, values, side=self.side)]
+
+
+class CompiledRuleSet:
+    def __init__(self, rules: Sequence[Dict[str, Any]], max_recommendations: int = 5):
+        self.max_recommendations = max_recommendations
+        # priority 내림차순, 같은 priority 는 정의 순서
+        ordered = sorted(enumerate(rules), key=lambda item: (-float(item[1].get("priority", 0)), item[0]))
+        self.rule_ids: List[str] = []
+        self.texts: List[str] = []
+        for _, rule in ordered:
+            if "id" not in rule or "recommendation" not in rule:
+                raise RuleCompileError(f"규칙에는 id 와 recommendation 이 필요합니다 ({rule})")
+            self.rule_ids.append(str(rule["id"]))
+            self.texts.append(str(rule["recommendation"]))
+        if len(set(self.rule_ids)) != len(self.rule_ids):
+            raise RuleCompileError("규칙 id 가 중복되었습니다")
+
+        self.num_rules = len(ordered)
+        self.words = max(1, (self.num_rules + 63) // 64)
+        self.all_mask = self._mask(range(self.num_rules))
+
+        numeric: Dict[str, Dict[str, Dict[float, np.ndarray]]] = {}
+        categorical: Dict[str, Dict[int, frozenset]] = {}
+        for r, (_, rule) in enumerate(ordered):
+            for condition in rule.get("when", []):
+                field, op, value = parse_condition(self.rule_ids[r], condition)
+                if op == "in":
+                    # 같은 필드 조건이 여러 개면 교집합
+                    previous = categorical.setdefault(field, {}).get(r)
+                    categorical[field][r] = value if previous is None else previous & value
+                else:
+                    by_threshold = numeric.setdefault(field, {}).setdefault(op, {})
+                    mask = by_threshold.setdefault(value, np.zeros(self.words, dtype=np.uint64))
+                    self._set_bit(mask, r)
+
+        self.numeric_fields: List[str] = sorted(numeric)
+        self.indexes: Dict[str, List[_ThresholdIndex]] = {
+            field: [_ThresholdIndex(op, by_threshold, self.words) for op, by_threshold in ops.items()]
+            for field, ops in numeric.items()
+        }
+        # 값이 없는(NaN) 필드는 그 필드를 참조하는 규칙 전부 탈락
+        self.referencing: Dict[str, np.ndarray] = {}
+        for field, ops in numeric.items():
+            mask = np.zeros(self.words, dtype=np.uint64)
+            for by_threshold in ops.values():
+                for threshold_mask in by_threshold.values():
+                    mask |= threshold_mask
+            self.referencing[field] = mask
+
+        # 범주 필드: 값 → 그 값을 허용하는 규칙, 그리고 해당 필드에 제약이 있는 규칙
+        self.categorical: Dict[str, Tuple[np.ndarray, Dict[str, np.ndarray]]] = {}
+        for field, allowed_by_rule in categorical.items():
+            constrained = self._mask(allowed_by_rule)
+            satisfied: Dict[str, np.ndarray] = {}
+            for r, allowed in allowed_by_rule.items():
+                for value in allowed:
+                    self._set_bit(satisfied.setdefault(value, np.zeros(self.words, dtype=np.uint64)), r)
+            self.categorical[field] = (constrained, satisfied)
+
+    def _mask(self, rule_indices) -> np.ndarray:
+        mask = np.zeros(self.words, dtype=np.uint64)
+        for r in rule_indices:
+            self._set_bit(mask, r)
+        return mask
+
+    @staticmethod
+    def _set_bit(mask: np.ndarray, r: int) -> None:
+        mask[r // 64] |= np.uint64(1) << np.uint64(r % 64)
+
+    # ---- 판정 -----------------------------------------------------------
+
+    def fired(self, numeric: Dict[str, np.ndarray], categorical: Dict[str, Sequence[Optional[str]]], n: int) -> np.ndarray:
+        """
+        numeric: 필드 → (N,) 값 (없으면 NaN), categorical: 필드 → 길이 N 목록
+        반환: (N, num_rules) bool, 규칙 순서는 우선순위 순
+        """
+        failing = np.zeros((n, self.words), dtype=np.uint64)
+        for field, indexes in self.indexes.items():
+            values = numeric.get(field)
+            if values is None:
+                failing |= self.referencing[field]
+                continue
+            missing = np.isnan(values)
+            for index in indexes:
+                failing |= index.failing(values)
+            if missing.any():
+                failing[missing] |= self.referencing[field]
+
+        for field, (constrained, satisfied) in self.categorical.items():
+            values = categorical.get(field) or [None] * n
+            # 고유 값별로 한 번만 bitset 을 계산해서 행에 배분
+            codes: Dict[Optional[str], int] = {}
+            row_codes = np.fromiter(
+                (codes.setdefault(None if v is None else str(v).upper(), len(codes)) for v in values),
+                dtype=np.intp,
+                count=n,
+            )
+            table = np.stack([constrained & ~satisfied.get(value, np.uint64(0)) for value in codes]) if codes else None
+            if table is not None:
+                failing |= table[row_codes]
+
+        fired_words = self.all_mask & ~failing
+        bits = np.unpackbits(fired_words.view(np.uint8), axis=1, bitorder="little")
+        return bits[:, : self.num_rules].astype(bool)
+
+    def recommendations(self, fired: np.ndarray) -> List[List[str]]:
+        """발동한 규칙 → 행별 추천 문구 (우선순위 순, 같은 문구는 한 번만)"""
+        limit = self.max_recommendations
+        rows, cols = np.nonzero(fired)
+        bounds = np.searchsorted(rows, np.arange(fired.shape[0] + 1))
+        texts = self.texts
+        out: List[List[str]] = []
+        for i in range(fired.shape[0]):
+            picked = dict.fromkeys(texts[c] for c in cols[bounds[i]:bounds[i + 1]])
+            out.append(list(picked)[:limit])
+        return out
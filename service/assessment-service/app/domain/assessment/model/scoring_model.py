@@ -0,0 +1,286 @@
+"""
+평가 점수 모델 (company_type 별 1개)
+- 지표 정의(JSON)를 시작 시 한 번 NumPy 가중치 행렬로 컴파일
+    X (N, Q)  질문 응답을 0~1 로 정규화한 값      M (N, Q)  응답 여부 마스크
+    Wqi (Q, I) 질문 → 지표 가중치                  Wis (I, S) 지표 → 하위 점수 가중치
+    ws (S,)    하위 점수 → 총점 가중치
+- 지표/하위/총점 = 가중 평균 = (값 @ W) / (마스크 @ W) → 응답하지 않은 질문/지표는 자동으로 가중치에서 제외
+- 1건이든 10만 건이든 같은 행렬 연산 세 번으로 계산 (필드 단위 Python 루프 없음)
+- 같은 가중치에서 질문 → 지표 → 하위 점수 → 총점 의존 그래프를 만들어, 일부 응답만 바뀐 평가는
+  영향받는 노드만 다시 계산 (rescore)
+"""
+import hashlib
+import json
+import math
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+RECOMMENDATION_THRESHOLD = 60.0
+MAX_RECOMMENDATIONS = 3
+
+
+class ScoreBatch(NamedTuple):
+    """N 건의 점수 (응답이 없어 계산할 수 없는 칸은 NaN)"""
+    indicators: np.ndarray  # (N, I)
+    sub_scores: np.ndarray  # (N, S)
+    total: np.ndarray       # (N,)
+
+
+def _weighted_mean(values: np.ndarray, mask: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """마스크된 가중 평균, 유효 가중치가 0 이면 NaN"""
+    numerator = (values * mask) @ weights
+    denominator = mask @ weights
+    out = np.full(numerator.shape, np.nan)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out
+
+
+def _round(value: float) -> Optional[float]:
+    return None if math.isnan(value) else round(float(value), 2)
+
+
+class ScoringModel:
+    def __init__(self, definition: Dict[str, Any]):
+        self.company_type: str = definition["company_type"]
+        self.name: str = definition.get("name", self.company_type)
+
+        questions: Dict[str, Dict[str, Any]] = definition["questions"]
+        self.question_keys: List[str] = list(questions)
+        self.question_index: Dict[str, int] = {key: i for i, key in enumerate(self.question_keys)}
+        self.lower = np.array([float(q.get("min", 0)) for q in questions.values()])
+        span = np.array([float(q.get("max", 100)) for q in questions.values()]) - self.lower
+        self.span = np.where(span > 0, span, 1.0)
+        self.invert = np.array([bool(q.get("invert", False)) for q in questions.values()])
+
+        indicators = definition["indicators"]
+        self.indicator_ids: List[str] = [ind["id"] for ind in indicators]
+        self.indicator_names: List[str] = [ind.get("name", ind["id"]) for ind in indicators]
+        self.indicator_recommendation_texts: List[Optional[str]] = [ind.get("recommendation") for ind in indicators]
+
+        sub_scores: Dict[str, float] = definition["sub_scores"]
+        self.sub_score_ids: List[str] = list(sub_scores)
+        sub_index = {sid: i for i, sid in enumerate(self.sub_score_ids)}
+
+        self.w_question_indicator = np.zeros((len(self.question_keys), len(indicators)))
+        self.w_indicator_sub = np.zeros((len(indicators), len(self.sub_score_ids)))
+        for j, ind in enumerate(indicators):
+            for key, weight in ind["inputs"].items():
+                if key not in self.question_index:
+                    raise ValueError(f"{self.company_type}: 지표 {ind['id']} 의 입력 {key} 가 questions 에 없습니다")
+                self.w_question_indicator[self.question_index[key], j] = float(weight)
+            if ind["sub_score"] not in sub_index:
+                raise ValueError(f"{self.company_type}: 지표 {ind['id']} 의 sub_score {ind['sub_score']} 가 없습니다")
+            self.w_indicator_sub[j, sub_index[ind["sub_score"]]] = float(ind.get("weight", 1.0))
+        self.w_sub_total = np.array([float(w) for w in sub_scores.values()])
+        self.indicator_position: Dict[str, int] = {iid: j for j, iid in enumerate(self.indicator_ids)}
+        self.sub_score_position: Dict[str, int] = sub_index
+
+        # 의존 그래프 (가중치 0 인 간선은 제외)
+        #   질문 → 영향받는 지표, 지표 → 입력 질문/가중치, 지표 → 하위 점수
+        self.question_dependents: List[List[int]] = [
+            np.flatnonzero(row).tolist() for row in self.w_question_indicator
+        ]
+        self.indicator_inputs: List[Tuple[List[int], List[float]]] = []
+        for column in self.w_question_indicator.T:
+            inputs = np.flatnonzero(column)
+            self.indicator_inputs.append((inputs.tolist(), column[inputs].tolist()))
+        self.indicator_sub: List[int] = [int(row.argmax()) for row in self.w_indicator_sub]
+        # 정의가 바뀌면 저장된 중간 결과를 쓰지 않도록 정의 내용 해시를 버전으로 사용
+        self.version: str = hashlib.sha256(
+            json.dumps(definition, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:16]
+
+    @property
+    def num_questions(self) -> int:
+        return len(self.question_keys)
+
+    # ---- 입력 변환 -------------------------------------------------------
+
+    def _flatten(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """섹션별로 묶여 온 응답({"quality": {"defect_rate_ppm": 120}})은 한 단계 펼침"""
+        if not any(isinstance(value, dict) for value in data.values()):
+            return data
+        flat: Dict[str, Any] = {}
+        for key, value in data.items():
+            if isinstance(value, dict):
+                flat.update(value)
+            else:
+                flat[key] = value
+        return flat
+
+    def industry(self, data: Dict[str, Any]) -> Optional[str]:
+        """assessment_data 의 업종 (추천 규칙/동종 업계 백분위 기준)"""
+        industry = self._flatten(data).get("industry")
+        return str(industry) if industry else None
+
+    def vectorize(self, rows: Iterable[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, Dict[int, str]]:
+        """
+        assessment_data 목록 → (X, M, 행별 오류)
+        N x Q 응답표를 한 번에 float 배열로 변환하고, 실패했을 때만 칸 단위로 다시 확인해 오류 행을 찾음
+        """
+        keys = self.question_keys
+        table = [[row.get(key) for key in keys] for row in map(self._flatten, rows)]
+        errors: Dict[int, str] = {}
+        try:
+            # None 은 NaN 으로 변환됨
+            raw = np.asarray(table, dtype=np.float64).reshape(len(table), len(keys))
+        except (TypeError, ValueError):
+            raw = np.full((len(table), len(keys)), np.nan)
+            for i, values in enumerate(table):
+                for q, value in enumerate(values):
+                    try:
+                        raw[i, q] = np.nan if value is None else float(value)
+                    except (TypeError, ValueError):
+                        errors.setdefault(i, f"{keys[q]}: 숫자가 아닌 값 {value!r}")
+
+        mask = ~np.isnan(raw)
+        x = (np.nan_to_num(raw) - self.lower) / self.span
+        x = np.clip(np.where(self.invert, 1.0 - x, x), 0.0, 1.0)
+        return x, mask.astype(np.float64), errors
+
+    # ---- 점수 계산 -------------------------------------------------------
+
+    def score_matrix(self, x: np.ndarray, mask: np.ndarray) -> ScoreBatch:
+        indicators = _weighted_mean(x, mask, self.w_question_indicator) * 100.0
+        indicator_mask = ~np.isnan(indicators)
+        sub_scores = _weighted_mean(np.nan_to_num(indicators), indicator_mask, self.w_indicator_sub)
+        sub_mask = ~np.isnan(sub_scores)
+        total = _weighted_mean(np.nan_to_num(sub_scores), sub_mask, self.w_sub_total)
+        return ScoreBatch(indicators, sub_scores, total)
+
+    def score_many(self, rows: List[Dict[str, Any]]) -> Tuple[ScoreBatch, Dict[int, str]]:
+        x, mask, errors = self.vectorize(rows)
+        return self.score_matrix(x, mask), errors
+
+    def recommendation_indices(self, indicators: np.ndarray) -> List[List[int]]:
+        """기준 점수 미만인 지표를 낮은 순으로 최대 MAX_RECOMMENDATIONS 개 (N 건 일괄)"""
+        filled = np.where(np.isnan(indicators), np.inf, indicators)
+        order = np.argsort(filled, axis=1)[:, :MAX_RECOMMENDATIONS]
+        below = np.take_along_axis(filled, order, axis=1) < RECOMMENDATION_THRESHOLD
+        return [row[keep].tolist() for row, keep in zip(order, below)]
+
+    def indicator_recommendations(self, indicators: np.ndarray) -> List[List[str]]:
+        """추천 규칙이 없을 때의 기본 추천: 낮은 지표의 recommendation 문구"""
+        texts = self.indicator_recommendation_texts
+        return [[texts[j] for j in recs if texts[j]] for recs in self.recommendation_indices(indicators)]
+
+    def results(self, batch: ScoreBatch, recommendations: Optional[List[List[str]]] = None) -> List[Dict[str, Any]]:
+        """N 건 전체를 응답용 dict 목록으로 변환 (반올림/NaN 처리를 배열 단위로)"""
+        def to_rows(values: np.ndarray) -> List[List[Optional[float]]]:
+            rounded = np.round(values, 2).astype(object)
+            rounded[np.isnan(values)] = None
+            return rounded.tolist()
+
+        totals = to_rows(batch.total)
+        sub_rows = to_rows(batch.sub_scores)
+        indicator_rows = to_rows(batch.indicators)
+        if recommendations is None:
+            recommendations = self.indicator_recommendations(batch.indicators)
+        return [
+            {
+                "score": total,
+                "sub_scores": dict(zip(self.sub_score_ids, subs)),
+                "indicators": dict(zip(self.indicator_ids, inds)),
+                "recommendations": recs,
+            }
+            for total, subs, inds, recs in zip(totals, sub_rows, indicator_rows, recommendations)
+        ]
+
+    def result(self, batch: ScoreBatch, i: int, recommendations: Optional[List[str]] = None) -> Dict[str, Any]:
+        """i 번째 점수를 응답용 dict 로 변환"""
+        if recommendations is None:
+            recommendations = self.indicator_recommendations(batch.indicators[i:i + 1])[0]
+        return {
+            "score": _round(batch.total[i]),
+            "sub_scores": {sid: _round(v) for sid, v in zip(self.sub_score_ids, batch.sub_scores[i])},
+            "indicators": {iid: _round(v) for iid, v in zip(self.indicator_ids, batch.indicators[i])},
+            "recommendations": recommendations,
+        }
+
+    # ---- 증분 재계산 -----------------------------------------------------
+
+    def apply_patch(self, data: Dict[str, Any], patch: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        저장된 응답에 변경분을 합침 → (질문 단위로 펼친 새 응답, 값이 바뀐 키)
+        값이 None 이면 해당 응답을 지움
+        """
+        merged = dict(self._flatten(data))
+        changed: List[str] = []
+        for key, value in self._flatten(patch).items():
+            if value is None:
+                if key in merged:
+                    del merged[key]
+                    changed.append(key)
+            elif merged.get(key) != value:
+                merged[key] = value
+                changed.append(key)
+        return merged, changed
+
+    def state(self, batch: ScoreBatch, i: int) -> Dict[str, Any]:
+        """i 번째 평가의 중간 결과 (반올림 전 지표/하위 점수/총점) → 저장용 dict"""
+        def to_list(values: np.ndarray) -> List[Optional[float]]:
+            return [None if math.isnan(v) else float(v) for v in values]
+
+        return {
+            "indicators": to_list(batch.indicators[i]),
+            "sub_scores": to_list(batch.sub_scores[i]),
+            "total": None if math.isnan(batch.total[i]) else float(batch.total[i]),
+        }
+
+    def batch_from_state(self, state: Dict[str, Any]) -> ScoreBatch:
+        def to_array(values) -> np.ndarray:
+            return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+        return ScoreBatch(
+            to_array(state["indicators"])[None, :],
+            to_array(state["sub_scores"])[None, :],
+            to_array([state["total"]]),
+        )
+
+    def rescore(self, state: Dict[str, Any], data: Dict[str, Any], changed: List[str]) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+        """
+        바뀐 질문에서 시작해 영향받는 지표 → 하위 점수 → 총점만 상태에 반영
+        값은 전체 채점(score_many)과 같은 vectorize + score_matrix 로 구함: 열만 자르거나 입력만 골라 곱하면
+        BLAS 가 모양에 따라 합산 순서를 바꿔 마지막 비트가 달라지고, 반올림 경계(62.475 등)에서 결과가 어긋나 상태에 남음
+        질문 수 × 지표 수 행렬 곱 한 번이라 비용은 작고, 바뀐 노드 판정/보고와 추천 재사용은 그대로
+        data 는 apply_patch 가 돌려준 펼친 응답, 반환: (새 중간 결과, 다시 계산되어 값이 바뀐 노드)
+        """
+        batch = self.batch_from_state(state)
+        indicators, sub_scores, total = batch.indicators[0], batch.sub_scores[0], float(batch.total[0])
+
+        dirty_indicators = sorted({
+            j for key in changed if key in self.question_index for j in self.question_dependents[self.question_index[key]]
+        })
+        changed_indicators: List[int] = []
+        changed_subs: List[int] = []
+        if dirty_indicators:
+            x, mask, errors = self.vectorize([data])
+            if errors:
+                raise ValueError(errors[0])
+            full = self.score_matrix(x, mask)
+        for j in dirty_indicators:
+            value = float(full.indicators[0, j])
+            if not _same(value, indicators[j]):
+                indicators[j] = value
+                changed_indicators.append(j)
+
+        for s in sorted({self.indicator_sub[j] for j in changed_indicators}):
+            value = float(full.sub_scores[0, s])
+            if not _same(value, sub_scores[s]):
+                sub_scores[s] = value
+                changed_subs.append(s)
+
+        if changed_subs:
+            total = float(full.total[0])
+
+        new_state = self.state(ScoreBatch(indicators[None, :], sub_scores[None, :], np.array([total])), 0)
+        return new_state, {
+            "questions": [key for key in changed if key in self.question_index],
+            "indicators": [self.indicator_ids[j] for j in changed_indicators],
+            "sub_scores": [self.sub_score_ids[s] for s in changed_subs],
+        }
+
+
+def _same(a: float, b: float) -> bool:
+    return (math.isnan(a) and math.isnan(b)) or a == b
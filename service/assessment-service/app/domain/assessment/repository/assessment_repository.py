@@ -0,0 +1,133 @@
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, insert, literal, select, tuple_, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..entity.assessment_entity import AssessmentEntity
+from ..entity.assessment_score_state_entity import AssessmentScoreStateEntity
+
+logger = logging.getLogger(__name__)
+
+# 모듈 수준에서 한 번만 구성하는 구문 (컴파일/prepared statement 캐시 재사용)
+_SELECT_BY_ID = select(AssessmentEntity).where(AssessmentEntity.id == bindparam("assessment_id"))
+_INSERT = insert(AssessmentEntity)
+_SELECT_STATE = select(AssessmentScoreStateEntity.model_version, AssessmentScoreStateEntity.state).where(
+    AssessmentScoreStateEntity.assessment_id == bindparam("assessment_id")
+)
+_INSERT_STATE = insert(AssessmentScoreStateEntity)
+_DELETE_STATE = delete(AssessmentScoreStateEntity).where(
+    AssessmentScoreStateEntity.assessment_id == bindparam("assessment_id")
+)
+
+_LIST_COLUMNS = (
+    AssessmentEntity.id,
+    AssessmentEntity.user_id,
+    AssessmentEntity.company_id,
+    AssessmentEntity.company_type,
+    AssessmentEntity.assessment_type,
+    AssessmentEntity.status,
+    AssessmentEntity.score,
+    AssessmentEntity.created_at,
+)
+
+
+def _state_row(assessment_id: str, state: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "assessment_id": assessment_id,
+        "model_version": state["version"],
+        "state": {key: value for key, value in state.items() if key != "version"},
+    }
+
+
+class AssessmentRepository:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    async def insert(self, row: Dict[str, Any], state: Optional[Dict[str, Any]] = None) -> None:
+        """평가 저장 (중간 결과가 있으면 같은 트랜잭션에서 함께 저장)"""
+        async with self.engine.begin() as conn:
+            await conn.execute(_INSERT, row)
+            if state is not None:
+                await conn.execute(_INSERT_STATE, _state_row(row["id"], state))
+
+    async def find_state(self, assessment_id: str) -> Optional[Dict[str, Any]]:
+        async with self.engine.connect() as conn:
+            row = (await conn.execute(_SELECT_STATE, {"assessment_id": assessment_id})).first()
+        return {"version": row.model_version, **row.state} if row is not None else None
+
+    async def update_scored(
+        self,
+        assessment_id: str,
+        expected_updated_at: datetime,
+        values: Dict[str, Any],
+        state: Dict[str, Any],
+    ) -> bool:
+        """
+        재계산 결과 저장 (낙관적 동시성: 읽은 뒤 다른 요청이 먼저 수정했으면 False)
+        """
+        async with self.engine.begin() as conn:
+            result = await conn.execute(
+                update(AssessmentEntity)
+                .where(AssessmentEntity.id == assessment_id, AssessmentEntity.updated_at == expected_updated_at)
+                .values(**values)
+            )
+            if result.rowcount != 1:
+                return False
+            await conn.execute(_DELETE_STATE, {"assessment_id": assessment_id})
+            await conn.execute(_INSERT_STATE, _state_row(assessment_id, state))
+            return True
+
+    async def find_by_id(self, assessment_id: str) -> Optional[Row]:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_SELECT_BY_ID, {"assessment_id": assessment_id})
+            return result.first()
+
+    async def list_by_company(
+        self,
+        company_id: str,
+        limit: int,
+        after: Optional[Tuple[datetime, str]] = None,
+    ) -> List[Row]:
+        """
+        회사별 평가 목록 (최신순, keyset 페이지네이션)
+        after = 이전 페이지 마지막 행의 (created_at, id) → OFFSET 없이 인덱스 범위 탐색만 수행
+        """
+        stmt = (
+            select(*_LIST_COLUMNS)
+            .where(AssessmentEntity.company_id == company_id)
+            .order_by(AssessmentEntity.created_at.desc(), AssessmentEntity.id.desc())
+            .limit(limit)
+        )
+        if after is not None:
+            created_at, assessment_id = after
+            stmt = stmt.where(
+                tuple_(AssessmentEntity.created_at, AssessmentEntity.id)
+                < tuple_(literal(created_at, AssessmentEntity.created_at.type), literal(assessment_id))
+            )
+        async with self.engine.connect() as conn:
+            result = await conn.execute(stmt)
+            return list(result)
+
+    async def iter_scored(self, batch_size: int = 1000) -> AsyncIterator[List[Row]]:
+        """전체 평가를 id 순 keyset 으로 batch_size 건씩 (분위수 스케치 재구성용)"""
+        columns = (
+            AssessmentEntity.id,
+            AssessmentEntity.company_type,
+            AssessmentEntity.score,
+            AssessmentEntity.result,
+            AssessmentEntity.assessment_data,
+        )
+        last_id: Optional[str] = None
+        while True:
+            stmt = select(*columns).order_by(AssessmentEntity.id).limit(batch_size)
+            if last_id is not None:
+                stmt = stmt.where(AssessmentEntity.id > last_id)
+            async with self.engine.connect() as conn:
+                rows = list(await conn.execute(stmt))
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1].id
@@ -0,0 +1,55 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..entity.assessment_sketch_entity import AssessmentSketchEntity
+
+logger = logging.getLogger(__name__)
+
+
+def _rows(replica_id: str, sketches: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    now = datetime.now(timezone.utc)
+    return [
+        {"replica_id": replica_id, "sketch_key": key, "count": payload["count"], "payload": payload, "updated_at": now}
+        for key, payload in sketches.items()
+    ]
+
+
+class AssessmentSketchRepository:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    async def count(self) -> int:
+        async with self.engine.connect() as conn:
+            return (await conn.execute(select(func.count()).select_from(AssessmentSketchEntity))).scalar_one()
+
+    async def save(self, replica_id: str, sketches: Dict[str, Dict[str, Any]]) -> None:
+        """레플리카 한 곳의 스케치를 교체 저장 (각 레플리카는 자기 행만 쓰므로 충돌 없음)"""
+        if not sketches:
+            return
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                delete(AssessmentSketchEntity).where(
+                    AssessmentSketchEntity.replica_id == replica_id,
+                    AssessmentSketchEntity.sketch_key.in_(list(sketches)),
+                )
+            )
+            await conn.execute(insert(AssessmentSketchEntity), _rows(replica_id, sketches))
+
+    async def insert_new(self, replica_id: str, sketches: Dict[str, Dict[str, Any]]) -> None:
+        """새 레플리카 행만 추가 (이미 있으면 IntegrityError)"""
+        async with self.engine.begin() as conn:
+            await conn.execute(insert(AssessmentSketchEntity), _rows(replica_id, sketches))
+
+    async def load_all(self) -> List[Row]:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(select(
+                AssessmentSketchEntity.replica_id,
+                AssessmentSketchEntity.sketch_key,
+                AssessmentSketchEntity.payload,
+            ))
+            return list(result)
@@ -0,0 +1,299 @@
+"""
+비동기 평가 작업 서비스
+- POST 는 작업을 큐에 넣고 job_id 만 바로 반환, 처리는 백그라운드 워커가 담당
+- 점수/추천 계산(CPU)은 프로세스 풀에서 실행해 이벤트 루프와 uvicorn 워커를 막지 않음, 저장(I/O)은 이벤트 루프에서
+- 진행 상태(queued → running → succeeded/failed, progress 0~100)는 작업 레코드에 기록되어 폴링으로 조회
+- 실패 시 지수 백오프로 최대 JOB_MAX_ATTEMPTS 회 재시도, 평가 id 는 작업 생성 시 정해 두므로 재시도해도 한 번만 저장
+- 같은 Idempotency-Key 로 다시 요청하면 새 작업을 만들지 않고 기존 작업을 반환 (키 선점과 작업 저장은 큐에서 한 번에)
+- 제한 시간(JOB_TIMEOUT_SECONDS)은 워커 프로세스 안에서 SIGALRM 으로 계산을 중단, 그래도 끝나지 않으면
+  JOB_KILL_GRACE_SECONDS 뒤 프로세스 풀을 새로 만들고 이전 워커를 종료 (시간 초과 작업이 워커를 계속 차지하지 않게)
+- 회사별 동시 실행 수 상한(JOB_MAX_CONCURRENT_PER_COMPANY), 넘으면 잠시 뒤로 미룸
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from .assessment_service import AssessmentService, new_assessment_id
+from .recommendation_engine import recommendation_engine
+from .scoring_engine import InvalidAssessmentDataError, UnknownCompanyTypeError, scoring_engine
+
+logger = logging.getLogger(__name__)
+
+# 응답에 노출하지 않는 작업 레코드 필드
+_PRIVATE_FIELDS = ("payload", "idempotency_key")
+
+
+def _on_timeout(signum, frame):
+    raise TimeoutError("작업 제한 시간 초과")
+
+
+def _init_worker():
+    """프로세스 풀 워커 초기화: 지표 정의와 추천 규칙을 한 번 컴파일"""
+    if hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _on_timeout)
+    scoring_engine.load()
+    recommendation_engine.load()
+
+
+def _score_in_worker(
+    company_type: str, assessment_data: Dict[str, Any], timeout: float
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    # 제한 시간이 지나면 워커 스스로 계산을 멈추고 TimeoutError (SIGALRM 이 없는 플랫폼은 부모의 강제 종료에 맡김)
+    alarm = hasattr(signal, "setitimer")
+    if alarm:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        # 부모 프로세스와 같은 규칙을 쓰도록 규칙 파일이 바뀌었으면 다시 컴파일
+        recommendation_engine.reload_if_changed()
+        return scoring_engine.evaluate(company_type, assessment_data)
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class AssessmentJobService:
+    def __init__(
+        self,
+        queue,
+        assessment_service: AssessmentService,
+        process_workers: Optional[int] = None,
+        consumers: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        retry_backoff: Optional[float] = None,
+        job_timeout: Optional[float] = None,
+        kill_grace: Optional[float] = None,
+        result_ttl: Optional[float] = None,
+        pending_ttl: Optional[float] = None,
+        company_concurrency: Optional[int] = None,
+    ):
+        self.queue = queue
+        self.assessment_service = assessment_service
+        self.process_workers = process_workers or int(os.getenv("JOB_PROCESS_WORKERS", str(os.cpu_count() or 1)))
+        # 저장(I/O)이 계산과 겹치도록 소비자는 프로세스 수보다 많게
+        self.consumers = consumers or int(os.getenv("JOB_CONSUMERS", str(self.process_workers * 2)))
+        self.max_attempts = max_attempts or int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+        self.retry_backoff = retry_backoff or float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "2"))
+        self.job_timeout = job_timeout or float(os.getenv("JOB_TIMEOUT_SECONDS", "120"))
+        self.kill_grace = kill_grace or float(os.getenv("JOB_KILL_GRACE_SECONDS", "5"))
+        self.result_ttl = result_ttl or float(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+        self.pending_ttl = pending_ttl or float(os.getenv("JOB_PENDING_TTL_SECONDS", "86400"))
+        self.company_concurrency = company_concurrency or int(os.getenv("JOB_MAX_CONCURRENT_PER_COMPANY", "2"))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+        self.counts = {"submitted": 0, "succeeded": 0, "failed": 0, "retried": 0, "deferred": 0, "pool_recycled": 0}
+
+    # ---- 수명 주기 --------------------------------------------------------
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # fork 는 이벤트 루프/DB 연결까지 복제하므로 기본은 spawn
+        context = multiprocessing.get_context(os.getenv("JOB_PROCESS_START_METHOD", "spawn"))
+        return ProcessPoolExecutor(max_workers=self.process_workers, mp_context=context, initializer=_init_worker)
+
+    def _recycle_executor(self, failed: ProcessPoolExecutor) -> bool:
+        """
+        failed 풀을 새 풀로 바꾸고 그 워커 프로세스를 종료 (끝나지 않는 워커, BrokenProcessPool)
+        같은 풀에서 실패한 소비자가 여럿이어도 한 번만 바꿈 → 이미 바뀌었으면 False
+        """
+        if self._executor is not failed:
+            return False
+        old, self._executor = failed, self._new_executor()
+        self.counts["pool_recycled"] += 1
+        # 이전 풀에서 돌던 다른 작업은 BrokenProcessPool 로 끝나 재시도됨
+        processes = list((getattr(old, "_processes", None) or {}).values())
+        old.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        return True
+
+    async def start(self):
+        self._executor = self._new_executor()
+        self._tasks = [asyncio.create_task(self._consume()) for _ in range(self.consumers)]
+        logger.info(
+            f"✅ 평가 작업 워커 시작: 프로세스 {self.process_workers}, 소비자 {self.consumers}, "
+            f"회사별 동시 실행 {self.company_concurrency}"
+        )
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # ---- 제출/조회 --------------------------------------------------------
+
+    async def submit(
+        self,
+        company_type: str,
+        assessment_data: Dict[str, Any],
+        user_id: Optional[str] = None,
+        company_id: Optional[str] = None,
+        assessment_type: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """작업 생성 → (작업, 새로 만들었는지), company_type 이 잘못되면 UnknownCompanyTypeError"""
+        company_type = self.assessment_service.engine.model(company_type).company_type
+        job_id = f"job_{uuid.uuid4().hex}"
+        scoped_key = f"{user_id or '-'}:{idempotency_key}" if idempotency_key else None
+        now = _now()
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "stage": "queued",
+            "progress": 0,
+            "attempts": 0,
+            "company_type": company_type,
+            "user_id": user_id,
+            "company_id": company_id,
+            "assessment_id": new_assessment_id(),
+            "idempotency_key": idempotency_key,
+            "payload": {"assessment_data": assessment_data, "assessment_type": assessment_type},
+            "created_at": now,
+            "updated_at": now,
+        }
+        existing_id = await self.queue.create_job(job, self.pending_ttl, scoped_key)
+        if existing_id is not None:
+            existing = await self.queue.get_job(existing_id)
+            if existing is not None:
+                return self.public_view(existing), False
+            # 키가 가리키던 작업 레코드가 만료됨 → 키를 이 작업으로 바꿔서 등록
+            await self.queue.create_job(job, self.pending_ttl, scoped_key, replace=True)
+        self.counts["submitted"] += 1
+        return self.public_view(job), True
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = await self.queue.get_job(job_id)
+        return self.public_view(job) if job is not None else None
+
+    @staticmethod
+    def public_view(job: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in job.items() if key not in _PRIVATE_FIELDS}
+
+    async def _update(self, job: Dict[str, Any], ttl: Optional[float] = None, **fields) -> None:
+        job.update(fields, updated_at=_now())
+        await self.queue.save_job(job, ttl or self.pending_ttl)
+
+    # ---- 처리 -------------------------------------------------------------
+
+    async def _consume(self):
+        while True:
+            try:
+                job_id = await self.queue.reserve(timeout=1.0)
+                if job_id is not None:
+                    await self._process(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ 작업 큐 처리 오류: {e}")
+                await asyncio.sleep(1.0)
+
+    async def _process(self, job_id: str):
+        job = await self.queue.get_job(job_id)
+        if job is None or job["status"] in ("succeeded", "failed"):
+            # 만료되었거나 이미 끝난 작업 (중복 전달)
+            await self.queue.ack(job_id)
+            return
+
+        group = job.get("company_id") or job.get("user_id") or "anonymous"
+        if not await self.queue.acquire_slot(group, self.company_concurrency, self.job_timeout * 2):
+            # 같은 회사 작업이 이미 상한만큼 실행 중 → 잠시 뒤로 (다시 넣은 뒤 ack 해야 유실 없음)
+            await self.queue.enqueue(job_id, delay=0.5)
+            await self.queue.ack(job_id)
+            self.counts["deferred"] += 1
+            return
+
+        lease = asyncio.create_task(self._keep_lease(job_id))
+        try:
+            await self._run(job)
+        finally:
+            lease.cancel()
+            await self.queue.release_slot(group)
+            await self.queue.ack(job_id)
+
+    async def _keep_lease(self, job_id: str):
+        """처리하는 동안 큐 임대 연장 (이 레플리카가 죽으면 연장이 멈춰 다른 레플리카가 회수)"""
+        interval = getattr(self.queue, "lease_seconds", 30.0) / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.queue.extend(job_id)
+            except Exception as e:
+                logger.warning(f"⚠️ 작업 {job_id} 임대 연장 실패: {e}")
+
+    async def _run(self, job: Dict[str, Any]):
+        attempt = job["attempts"] + 1
+        await self._update(job, status="running", stage="scoring", progress=10, attempts=attempt, error=None)
+        payload = job["payload"]
+        # 실패 시 이 풀이 아직 현재 풀일 때만 새로 만듦 (다른 소비자가 이미 바꾼 풀을 덮어쓰지 않게)
+        executor = self._executor
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(
+                executor, _score_in_worker, job["company_type"], payload["assessment_data"], self.job_timeout
+            )
+            done, _ = await asyncio.wait({future}, timeout=self.job_timeout + self.kill_grace)
+            if not done:
+                if self._recycle_executor(executor):
+                    logger.error(f"❌ 평가 작업 {job['job_id']} 이 제한 시간 뒤에도 끝나지 않아 프로세스 풀을 다시 생성")
+                raise TimeoutError("작업 제한 시간 초과 (워커 강제 종료)")
+            result, state = future.result()
+            await self._update(job, stage="saving", progress=70)
+            saved = await self.assessment_service.create(
+                job["company_type"],
+                payload["assessment_data"],
+                user_id=job["user_id"],
+                company_id=job["company_id"],
+                assessment_type=payload["assessment_type"],
+                assessment_id=job["assessment_id"],
+                result=result,
+                state=state,
+            )
+        except (UnknownCompanyTypeError, InvalidAssessmentDataError) as e:
+            # 입력 오류는 재시도해도 같으므로 바로 실패 처리
+            await self._update(job, self.result_ttl, status="failed", stage="failed", progress=100, error=str(e))
+            self.counts["failed"] += 1
+            return
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool) and self._recycle_executor(executor):
+                logger.error("❌ 평가 프로세스 풀이 중단되어 다시 생성")
+            error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            if attempt < self.max_attempts:
+                delay = self.retry_backoff * 2 ** (attempt - 1)
+                await self._update(job, status="queued", stage="retrying", progress=0, error=error)
+                await self.queue.enqueue(job["job_id"], delay=delay)
+                self.counts["retried"] += 1
+                logger.warning(f"⚠️ 평가 작업 {job['job_id']} 실패 ({attempt}/{self.max_attempts}), {delay:.1f}초 후 재시도: {error}")
+            else:
+                await self._update(job, self.result_ttl, status="failed", stage="failed", progress=100, error=error)
+                self.counts["failed"] += 1
+                logger.error(f"❌ 평가 작업 {job['job_id']} 최종 실패: {error}")
+            return
+
+        await self._update(job, self.result_ttl, status="succeeded", stage="completed", progress=100, result=saved)
+        self.counts["succeeded"] += 1
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "distributed": self.queue.is_distributed,
+            "process_workers": self.process_workers,
+            "consumers": self.consumers,
+            **self.counts,
+            "queue": await self.queue.depth(),
+        }
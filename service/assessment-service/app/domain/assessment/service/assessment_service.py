@@ -0,0 +1,333 @@
+"""
+평가 생성/조회 서비스
+- 결과 조회는 LRU + TTL 캐시를 먼저 확인
+  평가를 쓰면(생성/수정) 이 레플리카 캐시를 비우고 assessment:changed 채널로 알려 다른 레플리카도 비움
+  구독이 끊겼다 다시 붙으면 그 사이 알림을 놓쳤을 수 있으므로 캐시 전체를 비움
+- 결과 응답에는 내용 해시 ETag 를 붙여 대시보드 재조회 시 304 로 응답할 수 있게 함
+- 저장한 점수는 동종 업계 백분위 스케치(PercentileService)에도 반영
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from app.common.cache import LRUTTLCache
+from ..repository.assessment_repository import AssessmentRepository
+from .percentile_service import PercentileService
+from .scoring_engine import ScoringEngine
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # 선택 의존성
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+CHANGE_CHANNEL = "assessment:changed"
+
+
+class AssessmentConflictError(Exception):
+    """동시 수정으로 재계산 결과를 저장하지 못함"""
+
+
+def new_assessment_id() -> str:
+    return f"assess_{uuid.uuid4().hex}"
+
+
+def compute_etag(payload: Dict[str, Any]) -> str:
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def encode_cursor(created_at: datetime, assessment_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), assessment_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """잘못된 커서면 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, assessment_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(assessment_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("잘못된 cursor 입니다") from e
+
+
+class AssessmentService:
+    def __init__(
+        self,
+        repository: AssessmentRepository,
+        engine: ScoringEngine,
+        cache_size: Optional[int] = None,
+        cache_ttl: Optional[float] = None,
+        percentiles: Optional[PercentileService] = None,
+        redis_url: Optional[str] = None,
+        replica_id: Optional[str] = None,
+    ):
+        self.repository = repository
+        self.engine = engine
+        self.percentiles = percentiles
+        self.redis_url = redis_url if redis_url is not None else os.getenv("REDIS_URL")
+        self.replica_id = replica_id or os.getenv("ASSESSMENT_REPLICA_ID") or socket.gethostname()
+        self._results = LRUTTLCache(
+            maxsize=cache_size or int(os.getenv("ASSESSMENT_RESULT_CACHE_SIZE", "10000")),
+            ttl=cache_ttl or float(os.getenv("ASSESSMENT_RESULT_CACHE_TTL_SECONDS", "600")),
+        )
+        # 캐시를 비울 때마다 증가: DB 를 읽는 사이 비워졌으면 읽은 (옛) 값을 캐시에 넣지 않음
+        self._evictions = 0
+        self._redis = None
+        self._subscribe_task: Optional[asyncio.Task] = None
+
+    # ---- 수명 주기 --------------------------------------------------------
+
+    async def start(self):
+        if not self.redis_url or aioredis is None:
+            return
+        try:
+            self._redis = aioredis.from_url(self.redis_url, decode_responses=True)
+            await self._redis.ping()
+            self._subscribe_task = asyncio.create_task(self._subscribe_loop())
+        except Exception as e:
+            logger.warning(f"⚠️ Redis 연결 실패, 결과 캐시 무효화는 이 레플리카 안에서만: {e}")
+            self._redis = None
+
+    async def stop(self):
+        if self._subscribe_task is not None:
+            self._subscribe_task.cancel()
+            try:
+                await self._subscribe_task
+            except asyncio.CancelledError:
+                pass
+            self._subscribe_task = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    # ---- 평가 ---------------------------------------------------------------
+
+    async def create(
+        self,
+        company_type: str,
+        assessment_data: Dict[str, Any],
+        user_id: Optional[str] = None,
+        company_id: Optional[str] = None,
+        assessment_type: Optional[str] = None,
+        assessment_id: Optional[str] = None,
+        result: Optional[Dict[str, Any]] = None,
+        state: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        점수 계산 → 저장 → {assessment_id, ..., score, sub_scores, indicators, recommendations}
+        작업 큐에서는 미리 계산한 result 와 미리 정한 assessment_id 를 넘김
+        (같은 id 로 재시도하면 다시 저장하지 않고 기존 평가를 반환)
+        """
+        model = self.engine.model(company_type)
+        if result is None:
+            result, state = self.engine.evaluate(company_type, assessment_data)
+        assessment_id = assessment_id or new_assessment_id()
+        created_at = datetime.now(timezone.utc)
+        try:
+            await self.repository.insert({
+                "id": assessment_id,
+                "user_id": user_id,
+                "company_id": company_id,
+                "company_type": model.company_type,
+                "assessment_type": assessment_type,
+                "status": "completed",
+                "score": result["score"],
+                "result": {key: result[key] for key in ("sub_scores", "indicators", "recommendations")},
+                "assessment_data": assessment_data,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }, state)
+        except IntegrityError:
+            existing = await self.repository.find_by_id(assessment_id)
+            if existing is None:
+                raise
+            logger.info(f"♻️ 이미 저장된 평가 재사용: {assessment_id}")
+            return {
+                "assessment_id": assessment_id,
+                "status": existing.status,
+                "created_at": existing.created_at.isoformat(),
+                "score": existing.score,
+                **existing.result,
+            }
+        await self._publish(assessment_id)
+        # 방금 쓴 결과는 곧바로 조회되는 경우가 많으므로 캐시에 미리 넣어 둠
+        self._cache_result(assessment_id, result)
+        if self.percentiles is not None:
+            self.percentiles.record(model.company_type, model.industry(assessment_data), result)
+        return {"assessment_id": assessment_id, "status": "completed", "created_at": created_at.isoformat(), **result}
+
+    async def update(self, assessment_id: str, patch: Dict[str, Any], max_attempts: int = 3) -> Optional[Dict[str, Any]]:
+        """
+        응답 일부 변경 → 바뀐 질문에 의존하는 지표/하위 점수/총점만 다시 계산해서 저장
+        동시에 같은 평가를 수정하면 최신 값을 다시 읽어 변경분을 다시 적용 (변경분 병합이므로 안전)
+        동종 업계 백분위 스케치에는 새 점수를 더하고 이전 점수는 보정 스케치로 상쇄
+        """
+        for _ in range(max_attempts):
+            entity = await self.repository.find_by_id(assessment_id)
+            if entity is None:
+                return None
+            state = await self.repository.find_state(assessment_id)
+            data, result, new_state, recomputed = self.engine.rescore(
+                entity.company_type, entity.assessment_data, patch, state, entity.result.get("recommendations")
+            )
+            updated_at = datetime.now(timezone.utc)
+            saved = await self.repository.update_scored(
+                assessment_id,
+                entity.updated_at,
+                {
+                    "score": result["score"],
+                    "result": {key: result[key] for key in ("sub_scores", "indicators", "recommendations")},
+                    "assessment_data": data,
+                    "updated_at": updated_at,
+                },
+                new_state,
+            )
+            if saved:
+                self.invalidate(assessment_id)
+                await self._publish(assessment_id)
+                self._cache_result(assessment_id, result)
+                if self.percentiles is not None:
+                    model = self.engine.model(entity.company_type)
+                    self.percentiles.replace(
+                        model.company_type,
+                        model.industry(entity.assessment_data),
+                        {"score": entity.score, **entity.result},
+                        model.industry(data),
+                        result,
+                    )
+                return {
+                    "assessment_id": assessment_id,
+                    "status": entity.status,
+                    "updated_at": updated_at.isoformat(),
+                    **result,
+                    "recomputed": recomputed,
+                }
+        raise AssessmentConflictError(f"평가 {assessment_id} 가 동시에 수정되고 있습니다. 잠시 후 다시 시도하세요")
+
+    async def get(self, assessment_id: str) -> Optional[Dict[str, Any]]:
+        entity = await self.repository.find_by_id(assessment_id)
+        if entity is None:
+            return None
+        return {
+            "assessment_id": entity.id,
+            "user_id": entity.user_id,
+            "company_id": entity.company_id,
+            "company_type": entity.company_type,
+            "assessment_type": entity.assessment_type,
+            "status": entity.status,
+            "score": entity.score,
+            "created_at": entity.created_at.isoformat(),
+        }
+
+    async def get_result(self, assessment_id: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """평가 결과와 ETag (캐시 우선)"""
+        cached = self._results.get(assessment_id)
+        if cached is not None:
+            return cached
+        evictions = self._evictions
+        entity = await self.repository.find_by_id(assessment_id)
+        if entity is None:
+            return None
+        return self._cache_result(assessment_id, {"score": entity.score, **entity.result}, store=self._evictions == evictions)
+
+    async def get_percentiles(self, assessment_id: str) -> Optional[Dict[str, Any]]:
+        """저장된 평가의 동종 업계 대비 백분위"""
+        if self.percentiles is None:
+            return None
+        entity = await self.repository.find_by_id(assessment_id)
+        if entity is None:
+            return None
+        model = self.engine.model(entity.company_type)
+        result = {"score": entity.score, **entity.result}
+        return {
+            "assessment_id": entity.id,
+            **self.percentiles.percentiles_for(model.company_type, model.industry(entity.assessment_data), result),
+        }
+
+    def invalidate(self, assessment_id: str) -> None:
+        """평가가 다시 쓰였을 때 호출 (이 레플리카 캐시만, 다른 레플리카는 _publish 로)"""
+        self._evictions += 1
+        self._results.pop(assessment_id)
+
+    async def _publish(self, assessment_id: str):
+        if self._redis is None:
+            return
+        try:
+            await self._redis.publish(CHANGE_CHANNEL, json.dumps({"id": assessment_id, "origin": self.replica_id}))
+        except Exception as e:
+            logger.error(f"❌ 평가 변경 알림 실패 (다른 레플리카는 캐시 TTL 뒤에 반영): {e}")
+
+    async def _subscribe_loop(self):
+        """다른 레플리카의 평가 변경 알림 수신 → 결과 캐시에서 제거"""
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(CHANGE_CHANNEL)
+                # 구독 전(또는 끊긴 동안) 놓친 알림이 있을 수 있으므로 전부 비우고 시작
+                self._evictions += 1
+                self._results.clear()
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    event = json.loads(message["data"])
+                    if event.get("origin") != self.replica_id:
+                        self.invalidate(event["id"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ 평가 변경 구독 오류, 재연결: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def _cache_result(self, assessment_id: str, result: Dict[str, Any], store: bool = True) -> Tuple[Dict[str, Any], str]:
+        payload = {
+            "assessment_id": assessment_id,
+            "score": result["score"],
+            "recommendations": result["recommendations"],
+            "detailed_analysis": result["sub_scores"],
+            "indicators": result["indicators"],
+        }
+        entry = (payload, compute_etag(payload))
+        if store:
+            self._results.set(assessment_id, entry)
+        return entry
+
+    async def list_by_company(self, company_id: str, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """회사별 평가 목록 (최신순), 다음 페이지가 있으면 next_cursor 포함"""
+        after = decode_cursor(cursor) if cursor else None
+        rows = await self.repository.list_by_company(company_id, limit + 1, after)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        items: List[Dict[str, Any]] = [
+            {
+                "assessment_id": row.id,
+                "user_id": row.user_id,
+                "company_type": row.company_type,
+                "assessment_type": row.assessment_type,
+                "status": row.status,
+                "score": row.score,
+                "created_at": row.created_at.isoformat(),
+            }
+            for row in rows
+        ]
+        return {
+            "company_id": company_id,
+            "items": items,
+            "next_cursor": encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None,
+        }
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self._results.stats()
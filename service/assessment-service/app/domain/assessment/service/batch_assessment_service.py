@@ -0,0 +1,104 @@
+"""
+배치 평가 서비스
+- NDJSON / JSON 배열 본문을 항목 단위로 점진 파싱 → chunk_size 건씩 행렬 연산으로 점수 계산
+- 결과는 chunk 가 끝날 때마다 NDJSON 으로 흘려보내므로 메모리는 chunk 하나 분량으로 고정
+- chunk 검증/점수 계산은 스레드에서 (NumPy 연산은 GIL 을 놓으므로 그동안 이벤트 루프는 다른 요청 처리)
+- 항목별 오류(파싱/검증/값)는 해당 줄에만 표시하고 나머지는 계속 처리
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+from app.common.utility.streaming import ParsedItem, parse_items
+from .scoring_engine import ScoringEngine, scoring_engine
+
+logger = logging.getLogger(__name__)
+
+
+def _validation_message(error: ValidationError) -> str:
+    first = error.errors(include_url=False)[0]
+    field = ".".join(str(part) for part in first["loc"])
+    return f"{field}: {first['msg']}" if field else first["msg"]
+
+
+class BatchAssessmentService:
+    def __init__(self, engine: ScoringEngine, chunk_size: Optional[int] = None):
+        self.engine = engine
+        self.chunk_size = chunk_size or int(os.getenv("ASSESSMENT_BATCH_CHUNK_SIZE", "1000"))
+
+    async def run(
+        self,
+        chunks: AsyncIterator[bytes],
+        company_type: str,
+        request_model: Type[BaseModel],
+        fmt: str = "auto",
+    ) -> AsyncIterator[str]:
+        """배치 평가 실행: 항목별 결과 NDJSON 줄(청크 단위로 묶음)을 생성"""
+        model = self.engine.model(company_type)
+        started = time.perf_counter()
+        counts = {"total": 0, "scored": 0, "failed": 0}
+
+        chunk: List[ParsedItem] = []
+        try:
+            async for item in parse_items(chunks, fmt):
+                chunk.append(item)
+                if len(chunk) >= self.chunk_size:
+                    yield await asyncio.to_thread(self._score_chunk, model, chunk, request_model, counts)
+                    chunk = []
+        except ValueError as e:
+            # 본문 형식 자체가 깨진 경우: 지금까지 결과는 유지하고 오류 줄로 종료
+            if chunk:
+                yield await asyncio.to_thread(self._score_chunk, model, chunk, request_model, counts)
+                chunk = []
+            yield json.dumps({"error": str(e)}, ensure_ascii=False) + "\n"
+        if chunk:
+            yield await asyncio.to_thread(self._score_chunk, model, chunk, request_model, counts)
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            **counts,
+            "company_type": model.company_type,
+            "elapsed_sec": round(elapsed, 3),
+            "items_per_sec": round(counts["total"] / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+        logger.info(f"📦 배치 평가 완료: {summary}")
+        yield json.dumps({"summary": summary}, ensure_ascii=False) + "\n"
+
+    def _score_chunk(self, model, chunk: List[ParsedItem], request_model: Type[BaseModel], counts: Dict[str, int]) -> str:
+        lines: Dict[int, Dict[str, Any]] = {}
+        valid_indices: List[int] = []
+        requests: List[BaseModel] = []
+        for index, value, error in chunk:
+            if error is None:
+                try:
+                    requests.append(request_model.model_validate(value))
+                    valid_indices.append(index)
+                    continue
+                except ValidationError as e:
+                    error = _validation_message(e)
+            lines[index] = {"index": index, "status": "error", "error": error}
+
+        rows = [request.data for request in requests]
+        batch, value_errors = model.score_many(rows)
+        results = self.engine.results(model, batch, rows)
+        for position, (index, request, result) in enumerate(zip(valid_indices, requests, results)):
+            echo = request.model_dump(exclude={"data"})
+            if position in value_errors:
+                lines[index] = {"index": index, **echo, "status": "error", "error": value_errors[position]}
+            else:
+                lines[index] = {"index": index, **echo, "status": "completed", **result}
+
+        counts["total"] += len(chunk)
+        failed = sum(1 for line in lines.values() if line["status"] == "error")
+        counts["failed"] += failed
+        counts["scored"] += len(chunk) - failed
+        return "".join(json.dumps(lines[index], ensure_ascii=False) + "\n" for index in sorted(lines))
+
+
+# 전역 배치 평가 서비스 인스턴스
+batch_assessment_service = BatchAssessmentService(scoring_engine)
@@ -0,0 +1,258 @@
+"""
+동종 업계 대비 백분위 서비스
+- (company_type, industry, 지표) 별 t-digest 스케치를 평가 저장 시마다 증분 갱신
+    지표: score, sub_score.<id>, indicator.<id>   industry: assessment_data.industry (대문자), 전체는 ALL
+- 각 레플리카는 자기 스케치만 DB 에 주기적으로 저장하고, 다른 레플리카의 스케치를 읽어 합친 뷰로 응답
+  → 레플리카가 늘어나도 모든 레플리카가 같은 분포(마지막 동기화 기준)로 백분위를 계산
+- 백분위 조회는 합쳐 둔 스케치에서 이진 탐색 한 번 (저장된 점수 정렬 없음)
+- 평가 수정 시 새 값은 그대로 더하고, 이전 값은 같은 키의 보정 스케치(<키>|retracted)에 더함
+  (t-digest 에서 값을 뺄 수 없으므로) → 백분위/표본 수는 (전체 - 보정) 으로 계산
+"""
+import asyncio
+import logging
+import os
+import socket
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from ..model.quantile_sketch import TDigest
+from ..repository.assessment_repository import AssessmentRepository
+from ..repository.assessment_sketch_repository import AssessmentSketchRepository
+from .scoring_engine import ScoringEngine
+
+logger = logging.getLogger(__name__)
+
+ALL_INDUSTRIES = "ALL"
+# 수정으로 무효가 된 이전 값을 모으는 보정 스케치 키 접미사
+RETRACTED_SUFFIX = "|retracted"
+# 스케치가 비어 있는 DB 에서 기존 평가로 재구성한 스케치를 저장하는 레플리카 이름
+BACKFILL_REPLICA = "backfill"
+
+
+def sketch_key(company_type: str, industry: Optional[str], metric: str) -> str:
+    return f"{company_type}|{normalize_industry(industry)}|{metric}"
+
+
+def normalize_industry(industry: Optional[str]) -> str:
+    return str(industry).strip().upper() if industry else ALL_INDUSTRIES
+
+
+def iter_metrics(result: Dict[str, Any]) -> Iterator[Tuple[str, float]]:
+    """평가 결과 → (지표 이름, 값) (값이 없는 지표는 제외)"""
+    if result.get("score") is not None:
+        yield "score", result["score"]
+    for prefix, group in (("sub_score", "sub_scores"), ("indicator", "indicators")):
+        for name, value in (result.get(group) or {}).items():
+            if value is not None:
+                yield f"{prefix}.{name}", value
+
+
+class PercentileService:
+    def __init__(
+        self,
+        sketch_repository: AssessmentSketchRepository,
+        engine: ScoringEngine,
+        replica_id: Optional[str] = None,
+        flush_interval: Optional[float] = None,
+        compression: Optional[float] = None,
+        min_peers: Optional[int] = None,
+    ):
+        self.sketch_repository = sketch_repository
+        self.engine = engine
+        self.replica_id = replica_id or os.getenv("ASSESSMENT_REPLICA_ID") or socket.gethostname()
+        self.flush_interval = flush_interval or float(os.getenv("PERCENTILE_SKETCH_FLUSH_SECONDS", "30"))
+        self.compression = compression or float(os.getenv("PERCENTILE_SKETCH_COMPRESSION", "100"))
+        self.min_peers = min_peers or int(os.getenv("PERCENTILE_MIN_PEERS", "10"))
+        # 이 레플리카가 기록한 값만 담은 스케치 (DB 에 저장되는 부분)
+        self._local: Dict[str, TDigest] = {}
+        self._dirty: set = set()
+        # 다른 레플리카 스케치를 합친 것 (동기화 때마다 교체)
+        self._remote: Dict[str, TDigest] = {}
+        # 응답에 쓰는 전체 뷰 = remote + local (기록 시 local 과 함께 갱신)
+        self._view: Dict[str, TDigest] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    # ---- 수명 주기 --------------------------------------------------------
+
+    async def start(self, assessment_repository: Optional[AssessmentRepository] = None):
+        """저장된 스케치 로드 (DB 에 하나도 없으면 기존 평가로 재구성) 후 주기 동기화 시작"""
+        try:
+            if assessment_repository is not None and await self.sketch_repository.count() == 0:
+                await self._backfill(assessment_repository)
+            await self.sync(load_own=True)
+        except Exception as e:
+            logger.error(f"❌ 분위수 스케치 로드 실패, 빈 스케치로 시작: {e}")
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"✅ 분위수 스케치 준비: 레플리카 {self.replica_id}, 스케치 {len(self._view)}개")
+
+    async def stop(self):
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"❌ 종료 중 분위수 스케치 저장 실패: {e}")
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning(f"⚠️ 분위수 스케치 동기화 실패 (다음 주기에 재시도): {e}")
+
+    async def _backfill(self, assessment_repository: AssessmentRepository):
+        digests: Dict[str, TDigest] = {}
+        total = 0
+        async for rows in assessment_repository.iter_scored():
+            for row in rows:
+                try:
+                    model = self.engine.model(row.company_type)
+                except ValueError:
+                    continue
+                industry = model.industry(row.assessment_data or {})
+                for key, value in self._keys(model.company_type, industry, {"score": row.score, **(row.result or {})}):
+                    digests.setdefault(key, TDigest(self.compression)).add(value)
+                total += 1
+        if not digests:
+            return
+        try:
+            await self.sketch_repository.insert_new(BACKFILL_REPLICA, {k: d.to_dict() for k, d in digests.items()})
+            logger.info(f"📊 기존 평가 {total}건으로 분위수 스케치 재구성")
+        except IntegrityError:
+            # 동시에 시작한 다른 레플리카가 먼저 재구성함
+            logger.info("📊 다른 레플리카가 분위수 스케치를 이미 재구성함")
+
+    # ---- 동기화 -----------------------------------------------------------
+
+    async def flush(self):
+        """변경된 이 레플리카 스케치를 저장"""
+        if not self._dirty:
+            return
+        keys, self._dirty = self._dirty, set()
+        try:
+            await self.sketch_repository.save(self.replica_id, {key: self._local[key].to_dict() for key in keys})
+        except Exception:
+            self._dirty |= keys
+            raise
+
+    async def sync(self, load_own: bool = False):
+        """저장 후 다른 레플리카 스케치를 다시 읽어 전체 뷰 재구성"""
+        await self.flush()
+        remote: Dict[str, TDigest] = {}
+        for row in await self.sketch_repository.load_all():
+            digest = TDigest.from_dict(row.payload)
+            if row.replica_id == self.replica_id:
+                # 재시작한 레플리카는 자기 스케치를 이어서 갱신
+                if load_own and row.sketch_key not in self._local:
+                    self._local[row.sketch_key] = digest
+                continue
+            if row.sketch_key in remote:
+                remote[row.sketch_key].merge(digest)
+            else:
+                remote[row.sketch_key] = digest
+        view: Dict[str, TDigest] = {}
+        for key in remote.keys() | self._local.keys():
+            merged = TDigest(self.compression)
+            for part in (remote.get(key), self._local.get(key)):
+                if part is not None:
+                    merged.merge(part)
+            view[key] = merged
+        self._remote, self._view = remote, view
+
+    # ---- 기록/조회 --------------------------------------------------------
+
+    def _keys(self, company_type: str, industry: Optional[str], result: Dict[str, Any]) -> Iterator[Tuple[str, float]]:
+        industries = {ALL_INDUSTRIES, normalize_industry(industry)}
+        for metric, value in iter_metrics(result):
+            for name in industries:
+                yield sketch_key(company_type, name, metric), float(value)
+
+    def _add(self, key: str, value: float) -> None:
+        self._local.setdefault(key, TDigest(self.compression)).add(value)
+        self._view.setdefault(key, TDigest(self.compression)).add(value)
+        self._dirty.add(key)
+
+    def record(self, company_type: str, industry: Optional[str], result: Dict[str, Any]) -> None:
+        """평가 저장 시 호출: 업계/전체 스케치에 점수 반영"""
+        for key, value in self._keys(company_type, industry, result):
+            self._add(key, value)
+
+    def replace(
+        self,
+        company_type: str,
+        old_industry: Optional[str],
+        old_result: Dict[str, Any],
+        industry: Optional[str],
+        result: Dict[str, Any],
+    ) -> None:
+        """평가 수정 시 호출: 새 값은 반영하고 이전 값은 보정 스케치로 상쇄"""
+        for key, value in self._keys(company_type, old_industry, old_result):
+            self._add(key + RETRACTED_SUFFIX, value)
+        self.record(company_type, industry, result)
+
+    def _peers(self, key: str) -> int:
+        digest, retracted = self._view.get(key), self._view.get(key + RETRACTED_SUFFIX)
+        return max(0, (len(digest) if digest is not None else 0) - (len(retracted) if retracted is not None else 0))
+
+    def _percentile(self, key: str, value: float) -> Tuple[int, Optional[float]]:
+        """(표본 수, 백분위) — 보정 스케치의 값만큼 빼고 계산, 표본이 없으면 백분위 None"""
+        peers = self._peers(key)
+        if not peers:
+            return 0, None
+        digest, retracted = self._view[key], self._view.get(key + RETRACTED_SUFFIX)
+        below = digest.cdf(value) * digest.count
+        if retracted is not None and retracted.count:
+            below -= retracted.cdf(value) * retracted.count
+        return peers, round(min(max(below / peers, 0.0), 1.0) * 100, 1)
+
+    def percentile(self, company_type: str, industry: Optional[str], metric: str, value: float) -> Dict[str, Any]:
+        """value 가 동종 기업 중 몇 백분위인지 (peer_count 가 0 이면 percentile 은 None)"""
+        company_type = self.engine.model(company_type).company_type
+        count, percentile = self._percentile(sketch_key(company_type, industry, metric), value)
+        return {
+            "company_type": company_type,
+            "industry": normalize_industry(industry),
+            "metric": metric,
+            "value": value,
+            "peer_count": count,
+            "percentile": percentile,
+        }
+
+    def percentiles_for(self, company_type: str, industry: Optional[str], result: Dict[str, Any]) -> Dict[str, Any]:
+        """평가 하나의 모든 지표 백분위 (업계 표본이 min_peers 미만이면 전체 기준)"""
+        industry = normalize_industry(industry)
+        peer_group = industry
+        if industry != ALL_INDUSTRIES and self._peers(sketch_key(company_type, industry, "score")) < self.min_peers:
+            peer_group = ALL_INDUSTRIES
+        out: Dict[str, Any] = {
+            "company_type": company_type,
+            "industry": industry,
+            "peer_group": peer_group,
+            "peer_count": self._peers(sketch_key(company_type, peer_group, "score")),
+            "score": None,
+            "sub_scores": {},
+            "indicators": {},
+        }
+        for metric, value in iter_metrics(result):
+            _, percentile = self._percentile(sketch_key(company_type, peer_group, metric), value)
+            prefix, _, name = metric.partition(".")
+            if prefix == "score":
+                out["score"] = percentile
+            else:
+                out[f"{prefix}s"][name] = percentile
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replica_id": self.replica_id,
+            "sketches": len(self._view),
+            "local_sketches": len(self._local),
+            "pending_flush": len(self._dirty),
+        }
@@ -0,0 +1,142 @@
+"""
+추천 규칙 엔진
+- 선언형 규칙 파일(YAML/JSON)을 시작 시 CompiledRuleSet 으로 컴파일
+- 점수 배치(ScoreBatch) 단위로 판정하므로 단건/배치 평가가 같은 경로를 사용
+- 파일 수정 시각을 주기적으로 확인해 바뀌면 다시 컴파일 (컴파일 실패 시 기존 규칙 유지)
+"""
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..model.recommendation_rules import CompiledRuleSet, RuleCompileError
+from ..model.scoring_model import ScoreBatch, ScoringModel
+
+try:
+    import yaml
+except ImportError:  # PyYAML 이 없으면 JSON 규칙 파일만 사용
+    yaml = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent.parent / "model" / "rules" / "recommendation_rules.yaml"
+
+
+class RecommendationEngine:
+    def __init__(self, rules_path: Optional[str] = None, reload_interval: Optional[float] = None):
+        self.rules_path = Path(rules_path or os.getenv("RECOMMENDATION_RULES_PATH") or DEFAULT_RULES_PATH)
+        self.reload_interval = (
+            reload_interval if reload_interval is not None
+            else float(os.getenv("RECOMMENDATION_RULES_RELOAD_SECONDS", "5"))
+        )
+        self.ruleset: Optional[CompiledRuleSet] = None
+        self._mtime: Optional[float] = None
+        self._reload_task: Optional[asyncio.Task] = None
+
+    def _read(self) -> Dict[str, Any]:
+        with open(self.rules_path, encoding="utf-8") as f:
+            if self.rules_path.suffix in (".yaml", ".yml"):
+                if yaml is None:
+                    raise RuleCompileError("YAML 규칙 파일을 읽으려면 PyYAML 이 필요합니다")
+                document = yaml.safe_load(f)
+            else:
+                document = json.load(f)
+        if isinstance(document, list):
+            document = {"rules": document}
+        if not isinstance(document, dict) or not isinstance(document.get("rules"), list):
+            raise RuleCompileError("규칙 파일에는 rules 목록이 필요합니다")
+        return document
+
+    def load(self) -> bool:
+        """규칙 파일을 읽어 컴파일, 실패하면 기존 규칙을 유지하고 False"""
+        try:
+            # 실패한 파일도 수정 시각은 기록해서, 다시 고쳐질 때까지 같은 오류를 반복하지 않음
+            self._mtime = self.rules_path.stat().st_mtime
+            document = self._read()
+            ruleset = CompiledRuleSet(document["rules"], int(document.get("max_recommendations", 5)))
+        except FileNotFoundError:
+            logger.warning(f"⚠️ 추천 규칙 파일 없음, 지표별 기본 추천 사용: {self.rules_path}")
+            return False
+        except (OSError, ValueError, TypeError) as e:
+            logger.error(f"❌ 추천 규칙 컴파일 실패 (기존 규칙 유지): {e}")
+            return False
+        except Exception as e:  # yaml.YAMLError 등
+            logger.error(f"❌ 추천 규칙 파일을 읽을 수 없음 (기존 규칙 유지): {e}")
+            return False
+        self.ruleset = ruleset
+        logger.info(
+            f"📏 추천 규칙 컴파일: {ruleset.num_rules}개 규칙, 숫자 필드 {len(ruleset.numeric_fields)}개 "
+            f"({self.rules_path.name})"
+        )
+        return True
+
+    def reload_if_changed(self) -> bool:
+        try:
+            mtime = self.rules_path.stat().st_mtime
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        return self.load()
+
+    async def start(self):
+        """규칙 로드 및 변경 감시 시작"""
+        self.load()
+        if self.reload_interval > 0:
+            self._reload_task = asyncio.create_task(self._reload_loop())
+
+    async def stop(self):
+        if self._reload_task:
+            self._reload_task.cancel()
+            try:
+                await self._reload_task
+            except asyncio.CancelledError:
+                pass
+            self._reload_task = None
+
+    async def _reload_loop(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            if self.reload_if_changed():
+                logger.info("🔄 추천 규칙 다시 로드됨")
+
+    # ---- 판정 -----------------------------------------------------------
+
+    def _numeric_values(self, ruleset: CompiledRuleSet, model: ScoringModel, batch: ScoreBatch) -> Dict[str, np.ndarray]:
+        """규칙이 참조하는 숫자 필드 → (N,) 값 (이 모델에 없는 필드는 빠짐 → 해당 규칙 탈락)"""
+        values: Dict[str, np.ndarray] = {}
+        for field in ruleset.numeric_fields:
+            kind, _, name = field.partition(".")
+            if kind == "score":
+                values[field] = batch.total
+            elif kind == "indicator" and name in model.indicator_position:
+                values[field] = batch.indicators[:, model.indicator_position[name]]
+            elif kind == "sub_score" and name in model.sub_score_position:
+                values[field] = batch.sub_scores[:, model.sub_score_position[name]]
+        return values
+
+    def recommend(
+        self,
+        model: ScoringModel,
+        batch: ScoreBatch,
+        industries: Optional[Sequence[Optional[str]]] = None,
+    ) -> Optional[List[List[str]]]:
+        """N 건의 추천 문구, 규칙이 로드되지 않았으면 None (호출 측에서 기본 추천 사용)"""
+        ruleset = self.ruleset
+        if ruleset is None:
+            return None
+        n = len(batch.total)
+        fired = ruleset.fired(
+            self._numeric_values(ruleset, model, batch),
+            {"company_type": [model.company_type] * n, "industry": industries},
+            n,
+        )
+        return ruleset.recommendations(fired)
+
+
+# 전역 추천 엔진 인스턴스
+recommendation_engine = RecommendationEngine()
@@ -0,0 +1,133 @@
+"""
+평가 점수 엔진
+- company_type 별 지표 정의(model/definitions/*.json)를 처음 한 번만 읽어 ScoringModel 로 컴파일
+- 단건(score)과 배치(score_many) 모두 같은 행렬 연산 경로 사용
+- 추천 문구는 컴파일된 추천 규칙(recommendation_engine)으로 판정, 규칙이 없으면 낮은 지표 기반 기본 추천
+"""
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..model.scoring_model import ScoreBatch, ScoringModel
+from .recommendation_engine import RecommendationEngine, recommendation_engine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEFINITIONS_DIR = Path(__file__).resolve().parent.parent / "model" / "definitions"
+
+
+class UnknownCompanyTypeError(ValueError):
+    """정의되지 않은 company_type"""
+
+
+class InvalidAssessmentDataError(ValueError):
+    """assessment_data 에 숫자로 변환할 수 없는 응답이 있음"""
+
+
+class ScoringEngine:
+    def __init__(self, definitions_dir: Optional[str] = None, recommender: Optional[RecommendationEngine] = None):
+        self.definitions_dir = Path(definitions_dir or os.getenv("ASSESSMENT_DEFINITIONS_DIR") or DEFAULT_DEFINITIONS_DIR)
+        self.recommender = recommender
+        self._models: Optional[Dict[str, ScoringModel]] = None
+        self._aliases: Dict[str, str] = {}
+
+    def load(self) -> Dict[str, ScoringModel]:
+        """정의 파일을 읽어 컴파일 (이미 로드했으면 그대로 반환)"""
+        if self._models is not None:
+            return self._models
+        models: Dict[str, ScoringModel] = {}
+        aliases: Dict[str, str] = {}
+        for path in sorted(self.definitions_dir.glob("*.json")):
+            with open(path, encoding="utf-8") as f:
+                definition = json.load(f)
+            model = ScoringModel(definition)
+            models[model.company_type] = model
+            for name in [model.company_type, *definition.get("aliases", [])]:
+                aliases[name.upper()] = model.company_type
+            logger.info(
+                f"📐 평가 모델 컴파일: {model.company_type} "
+                f"(질문 {model.num_questions}, 지표 {len(model.indicator_ids)}, 하위 점수 {len(model.sub_score_ids)})"
+            )
+        self._models, self._aliases = models, aliases
+        return models
+
+    def model(self, company_type: str) -> ScoringModel:
+        models = self.load()
+        name = self._aliases.get(company_type.strip().upper())
+        if name is None:
+            raise UnknownCompanyTypeError(
+                f"지원하지 않는 company_type: {company_type} (가능: {', '.join(sorted(models))})"
+            )
+        return models[name]
+
+    @property
+    def company_types(self) -> List[str]:
+        return sorted(self.load())
+
+    def score(self, company_type: str, assessment_data: Dict[str, Any]) -> Dict[str, Any]:
+        """단건 평가 → {score, sub_scores, indicators, recommendations}"""
+        return self.evaluate(company_type, assessment_data)[0]
+
+    def evaluate(self, company_type: str, assessment_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """단건 평가 → (응답용 결과, 증분 재계산용 중간 결과)"""
+        model = self.model(company_type)
+        batch, errors = model.score_many([assessment_data])
+        if errors:
+            raise InvalidAssessmentDataError(errors[0])
+        result = model.result(batch, 0, self.recommend(model, batch, [assessment_data])[0])
+        return result, {"version": model.version, **model.state(batch, 0)}
+
+    def rescore(
+        self,
+        company_type: str,
+        assessment_data: Dict[str, Any],
+        patch: Dict[str, Any],
+        state: Optional[Dict[str, Any]] = None,
+        recommendations: Optional[List[str]] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """
+        저장된 응답 + 변경분 → (새 응답, 결과, 중간 결과, 다시 계산된 노드)
+        저장된 중간 결과가 없거나 지표 정의가 바뀌었으면 전체를 다시 계산
+        점수와 업종이 그대로면 기존 추천(recommendations)을 재사용
+        """
+        model = self.model(company_type)
+        data, changed = model.apply_patch(assessment_data, patch)
+        if state is None or state.get("version") != model.version:
+            result, new_state = self.evaluate(company_type, data)
+            return data, result, new_state, {"full": True, "questions": changed}
+        try:
+            new_state, recomputed = model.rescore(state, data, changed)
+        except ValueError as e:
+            raise InvalidAssessmentDataError(str(e))
+        batch = model.batch_from_state(new_state)
+        unchanged = not recomputed["indicators"] and "industry" not in changed
+        if recommendations is None or not unchanged:
+            recommendations = self.recommend(model, batch, [data])[0]
+        result = model.result(batch, 0, recommendations)
+        return data, result, {"version": model.version, **new_state}, {"full": False, **recomputed}
+
+    def score_many(self, company_type: str, rows: List[Dict[str, Any]]) -> Tuple[ScoringModel, ScoreBatch, Dict[int, str]]:
+        """배치 평가 → (모델, 점수 배열, 행별 오류)"""
+        model = self.model(company_type)
+        batch, errors = model.score_many(rows)
+        return model, batch, errors
+
+    def recommend(self, model: ScoringModel, batch: ScoreBatch, rows: List[Dict[str, Any]]) -> List[List[str]]:
+        """N 건의 추천 문구 (industry 는 assessment_data 에서 읽음)"""
+        recommendations = None
+        if self.recommender is not None:
+            industries = [model.industry(row) for row in rows]
+            recommendations = self.recommender.recommend(model, batch, industries)
+        if recommendations is None:
+            recommendations = model.indicator_recommendations(batch.indicators)
+        return recommendations
+
+    def results(self, model: ScoringModel, batch: ScoreBatch, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """N 건 전체를 응답용 dict 목록으로 변환 (추천 포함)"""
+        return model.results(batch, self.recommend(model, batch, rows))
+
+
+# 전역 점수 엔진 인스턴스
+scoring_engine = ScoringEngine(recommender=recommendation_engine)
@@ -0,0 +1,27 @@
+from sqlalchemy import Boolean, Column, DateTime, Index, String, func
+
+from app.common.database import Base
+
+class CompanyEntity(Base):
+    """회사 디렉터리 (검색은 인메모리 인덱스에서, 이 테이블은 원본)"""
+    __tablename__ = "companies"
+
+    id = Column(String(64), primary_key=True)
+    name = Column(String(200), nullable=False)
+    # LME / SME
+    company_type = Column(String(16), nullable=False)
+    # 업태 (manufacturing, technology, service ...)
+    type = Column(String(64), nullable=True)
+    industry = Column(String(64), nullable=True)
+    # 삭제는 비활성화로 기록해야 다른 레플리카가 변경분 조회로 알 수 있음
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # 인덱스 갱신용 변경분 조회
+        Index("ix_companies_updated_at", "updated_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<CompanyEntity id={self.id} name={self.name} company_type={self.company_type}>"
@@ -0,0 +1,382 @@
+"""
+회사 디렉터리 인메모리 인덱스
+- 이름: 한글 자모 분해 후 n-gram 역색인
+    검색어 자모 3개 이상 → 자모 trigram 교집합 후 부분 문자열 확인 ("삼성전" 은 "(주)삼성전자" 와 매칭)
+    자모 1~2개      → 단어 시작 접두어 색인 ("ㅅ", "사")
+    초성만         → 초성 bigram 색인 ("ㅅㅅㅈㅈ" → "삼성전자")
+- company_type / type / industry: 값별 bitmap (문서 수 길이의 bool 배열), 여러 값은 OR, 필드끼리는 AND
+- 정렬: (정규화된 이름, id) 순으로 문서 번호를 매겨 두므로 postings/bitmap 순서가 곧 결과 순서
+  → keyset 커서 = 마지막 (이름, id), 다음 페이지는 이진 탐색으로 시작 위치만 찾음
+- 변경분은 작은 delta 에 모으고 (기존 문서는 alive bitmap 에서 지움), 일정 크기가 넘으면 세그먼트 재구성
+"""
+import bisect
+import heapq
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.common.utility import hangul
+
+# 이름 n-gram 길이 (자모 기준 / 초성 기준)
+GRAM = 3
+CHOSEONG_GRAM = 2
+# 검색 시 한 번에 확인하는 후보/문서 구간 (모자라면 4배씩 늘림)
+CHUNK = 256
+
+FILTER_FIELDS = ("company_type", "type", "industry")
+
+SortKey = Tuple[str, str]
+Filters = Dict[str, FrozenSet[str]]
+
+
+def normalize_value(field: str, value: Optional[str]) -> Optional[str]:
+    """필터 값 정규화: type 은 소문자, company_type / industry 는 대문자"""
+    if value is None or not str(value).strip():
+        return None
+    value = str(value).strip()
+    return value.lower() if field == "type" else value.upper()
+
+
+class CompanyDoc:
+    """색인 단위 (검색용 정규화 문자열을 미리 계산해 둠)"""
+    __slots__ = ("id", "name", "company_type", "type", "industry", "key", "jamo", "cho")
+
+    def __init__(self, id: str, name: str, company_type: str, type: Optional[str] = None, industry: Optional[str] = None):
+        self.id = id
+        self.name = name
+        self.company_type = normalize_value("company_type", company_type)
+        self.type = normalize_value("type", type)
+        self.industry = normalize_value("industry", industry)
+        normalized = hangul.normalize(name)
+        self.key: SortKey = (normalized, id)
+        compact = normalized.replace(" ", "")
+        self.jamo = hangul.decompose(compact)
+        self.cho = hangul.choseong(compact)
+
+    def same(self, other: "CompanyDoc") -> bool:
+        return (self.name, self.company_type, self.type, self.industry) == (
+            other.name, other.company_type, other.type, other.industry
+        )
+
+    def token_jamo(self) -> List[str]:
+        return [hangul.decompose(token) for token in self.key[0].split()]
+
+    def grams(self) -> set:
+        """이 문서가 들어가는 색인 키 (t: 자모 trigram, p: 단어 접두어, c: 초성 bigram)"""
+        grams = {"t" + self.jamo[i:i + GRAM] for i in range(len(self.jamo) - GRAM + 1)}
+        for token in self.token_jamo():
+            grams.update("p" + token[:k] for k in range(1, min(GRAM, len(token) + 1)))
+        grams.update("c" + self.cho[i:i + CHOSEONG_GRAM] for i in range(len(self.cho) - CHOSEONG_GRAM + 1))
+        return grams
+
+    def matches_filters(self, filters: Filters) -> bool:
+        return all(getattr(self, field) in values for field, values in filters.items())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "company_type": self.company_type,
+            "type": self.type,
+            "industry": self.industry,
+        }
+
+
+class NameQuery:
+    """검색어 → 색인 키 목록 + 최종 확인 함수"""
+
+    def __init__(self, text: str):
+        compact = hangul.normalize(text).replace(" ", "")
+        if len(compact) >= CHOSEONG_GRAM and hangul.is_choseong_query(compact):
+            self.mode, self.pattern = "choseong", compact
+            self.grams = ["c" + compact[i:i + CHOSEONG_GRAM] for i in range(len(compact) - CHOSEONG_GRAM + 1)]
+            self.exact = len(compact) == CHOSEONG_GRAM
+            return
+        self.pattern = hangul.decompose(compact)
+        if len(self.pattern) < GRAM:
+            self.mode = "prefix"
+            self.grams = ["p" + self.pattern]
+            self.exact = True
+        else:
+            self.mode = "substring"
+            self.grams = sorted({"t" + self.pattern[i:i + GRAM] for i in range(len(self.pattern) - GRAM + 1)})
+            # trigram 하나짜리 검색어는 색인 자체가 정확한 결과
+            self.exact = len(self.pattern) == GRAM
+
+    @property
+    def empty(self) -> bool:
+        return not self.pattern
+
+    def matches(self, doc: CompanyDoc) -> bool:
+        if self.mode == "choseong":
+            return self.pattern in doc.cho
+        if self.mode == "prefix":
+            return any(token.startswith(self.pattern) for token in doc.token_jamo())
+        return self.pattern in doc.jamo
+
+
+class CompanySegment:
+    """정렬된 문서 + 이름 postings + 필드별 bitmap (생성 후 alive 외에는 바뀌지 않음)"""
+
+    def __init__(self, docs: Iterable[CompanyDoc]):
+        self.docs: List[CompanyDoc] = sorted(docs, key=lambda doc: doc.key)
+        self.keys: List[SortKey] = [doc.key for doc in self.docs]
+        self.positions: Dict[str, int] = {doc.id: i for i, doc in enumerate(self.docs)}
+        n = len(self.docs)
+
+        postings: Dict[str, List[int]] = {}
+        for i, doc in enumerate(self.docs):
+            for gram in doc.grams():
+                postings.setdefault(gram, []).append(i)
+        # 문서 번호 순으로 추가했으므로 이미 정렬되어 있음
+        self.postings: Dict[str, np.ndarray] = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+        self.bitmaps: Dict[str, Dict[str, np.ndarray]] = {}
+        for field in FILTER_FIELDS:
+            by_value: Dict[str, List[int]] = {}
+            for i, doc in enumerate(self.docs):
+                value = getattr(doc, field)
+                if value is not None:
+                    by_value.setdefault(value, []).append(i)
+            bitmaps = {}
+            for value, ids in by_value.items():
+                bitmap = np.zeros(n, dtype=bool)
+                bitmap[ids] = True
+                bitmaps[value] = bitmap
+            self.bitmaps[field] = bitmaps
+
+        # 수정/삭제된 문서는 여기서만 지움 (새 값은 delta 에)
+        self.alive = np.ones(n, dtype=bool)
+        self.live_count = n
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def get(self, company_id: str) -> Optional[CompanyDoc]:
+        position = self.positions.get(company_id)
+        if position is None or not self.alive[position]:
+            return None
+        return self.docs[position]
+
+    def kill(self, company_id: str) -> None:
+        position = self.positions.get(company_id)
+        if position is not None and self.alive[position]:
+            self.alive[position] = False
+            self.live_count -= 1
+
+    def _field_mask(self, field: str, values: FrozenSet[str], lo: int, hi: int) -> np.ndarray:
+        bitmaps = self.bitmaps[field]
+        mask = np.zeros(hi - lo, dtype=bool)
+        for value in values:
+            bitmap = bitmaps.get(value)
+            if bitmap is not None:
+                mask |= bitmap[lo:hi]
+        return mask
+
+    def _postings(self, grams: List[str]) -> List[np.ndarray]:
+        """색인 키별 postings (짧은 것부터), 없는 키가 있으면 빈 목록"""
+        lists = []
+        for gram in grams:
+            ids = self.postings.get(gram)
+            if ids is None:
+                return []
+            lists.append(ids)
+        return sorted(lists, key=len)
+
+    @staticmethod
+    def _intersect(candidates: np.ndarray, others: List[np.ndarray]) -> np.ndarray:
+        """candidates 중 다른 postings 에도 모두 있는 것 (이진 탐색)"""
+        for other in others:
+            if not len(candidates):
+                break
+            found = np.searchsorted(other, candidates)
+            np.minimum(found, len(other) - 1, out=found)
+            candidates = candidates[other[found] == candidates]
+        return candidates
+
+    def _keep(self, positions: np.ndarray, filters: Filters) -> np.ndarray:
+        """positions 중 살아 있고 필터를 만족하는 것"""
+        keep = self.alive[positions]
+        for field, values in filters.items():
+            field_keep = np.zeros(len(positions), dtype=bool)
+            for value in values:
+                bitmap = self.bitmaps[field].get(value)
+                if bitmap is not None:
+                    field_keep |= bitmap[positions]
+            keep &= field_keep
+        return positions[keep]
+
+    def search(self, query: Optional[NameQuery], filters: Filters, after: Optional[SortKey], limit: int) -> List[CompanyDoc]:
+        """after 다음부터 조건에 맞는 문서를 최대 limit 개 (이름, id 순)"""
+        start = bisect.bisect_right(self.keys, after) if after is not None else 0
+        n = len(self.docs)
+        if start >= n or limit <= 0:
+            return []
+
+        out: List[CompanyDoc] = []
+        chunk = max(CHUNK, limit * 4)
+        if query is None:
+            # 이름 조건 없음: 앞에서부터 구간별로 bitmap AND (한 페이지 분량이 차면 중단)
+            lo = start
+            while lo < n and len(out) < limit:
+                hi = min(n, lo + chunk)
+                mask = self.alive[lo:hi].copy()
+                for field, values in filters.items():
+                    mask &= self._field_mask(field, values, lo, hi)
+                out.extend(self.docs[i] for i in (np.flatnonzero(mask)[: limit - len(out)] + lo).tolist())
+                lo, chunk = hi, chunk * 4
+            return out
+
+        lists = self._postings(query.grams)
+        if not lists:
+            return out
+        candidates, others = lists[0], lists[1:]
+        offset = int(np.searchsorted(candidates, start))
+        # 가장 짧은 postings 를 구간별로 교집합/필터/원문 확인 (흔한 검색어라도 한 페이지 분량만 처리)
+        while offset < len(candidates) and len(out) < limit:
+            positions = self._keep(self._intersect(candidates[offset:offset + chunk], others), filters)
+            offset, chunk = offset + chunk, chunk * 4
+            for i in positions.tolist():
+                doc = self.docs[i]
+                # n-gram 교집합은 후보일 뿐이므로 원문 확인 (검색어가 n-gram 하나면 생략)
+                if query.exact or query.matches(doc):
+                    out.append(doc)
+                    if len(out) >= limit:
+                        break
+        return out
+
+    def count(self, filters: Filters) -> int:
+        """이름 조건 없이 필터만 있을 때의 전체 건수"""
+        mask = self.alive.copy()
+        for field, values in filters.items():
+            mask &= self._field_mask(field, values, 0, len(self.docs))
+        return int(np.count_nonzero(mask))
+
+
+class CompanyIndex:
+    """
+    세그먼트(대부분의 문서) + delta(최근 변경분, id → 문서 또는 삭제 표시 None)
+    delta 도 색인 키/필드 값별 id 집합을 변경 때마다 갱신하므로 검색 시 delta 전체를 훑지 않음
+    """
+
+    def __init__(self, docs: Iterable[CompanyDoc] = ()):
+        self.segment = CompanySegment(docs)
+        self.delta: Dict[str, Optional[CompanyDoc]] = {}
+        self._delta_postings: Dict[str, set] = {}
+        self._delta_live: set = set()
+        # 재구성 중(snapshot ~ replace_segment)에 바뀐 id, 재구성 중이 아니면 None
+        self._changed: Optional[set] = None
+
+    def __len__(self) -> int:
+        return self.segment.live_count + len(self._delta_live)
+
+    def get(self, company_id: str) -> Optional[CompanyDoc]:
+        if company_id in self.delta:
+            return self.delta[company_id]
+        return self.segment.get(company_id)
+
+    @staticmethod
+    def _delta_keys(doc: CompanyDoc) -> Iterable[str]:
+        yield from doc.grams()
+        for field in FILTER_FIELDS:
+            yield f"f{field}={getattr(doc, field)}"
+
+    def _set_delta(self, company_id: str, doc: Optional[CompanyDoc]) -> None:
+        previous = self.delta.get(company_id)
+        if previous is not None:
+            for key in self._delta_keys(previous):
+                ids = self._delta_postings[key]
+                ids.discard(company_id)
+                if not ids:
+                    del self._delta_postings[key]
+        self.delta[company_id] = doc
+        if self._changed is not None:
+            self._changed.add(company_id)
+        if doc is None:
+            self._delta_live.discard(company_id)
+            return
+        self._delta_live.add(company_id)
+        for key in self._delta_keys(doc):
+            self._delta_postings.setdefault(key, set()).add(company_id)
+
+    def upsert(self, doc: CompanyDoc) -> bool:
+        """바뀐 내용이 있을 때만 반영하고 True"""
+        current = self.get(doc.id)
+        if current is not None and current.same(doc):
+            return False
+        self.segment.kill(doc.id)
+        self._set_delta(doc.id, doc)
+        return True
+
+    def delete(self, company_id: str) -> bool:
+        if self.get(company_id) is None:
+            return False
+        self.segment.kill(company_id)
+        self._set_delta(company_id, None)
+        return True
+
+    # ---- 재구성 ---------------------------------------------------------
+
+    def snapshot(self) -> List[CompanyDoc]:
+        """재구성 입력 (현재 살아 있는 문서 전체), 이때부터 replace_segment 까지의 변경을 기록"""
+        segment = self.segment
+        docs = [doc for doc, alive in zip(segment.docs, segment.alive.tolist()) if alive]
+        docs.extend(doc for doc in self.delta.values() if doc is not None)
+        self._changed = set()
+        return docs
+
+    def replace_segment(self, segment: CompanySegment) -> None:
+        """
+        snapshot 으로 만든 세그먼트로 교체
+        snapshot 이후 바뀐 문서는 새 세그먼트에서 지우고 delta 로 다시 반영한 뒤 교체
+        """
+        changed, self._changed = self._changed or set(), None
+        remaining = {company_id: self.delta[company_id] for company_id in changed}
+        for company_id in remaining:
+            segment.kill(company_id)
+        self.segment, self.delta = segment, {}
+        self._delta_postings, self._delta_live = {}, set()
+        for company_id, doc in remaining.items():
+            self._set_delta(company_id, doc)
+
+    def abort_rebuild(self) -> None:
+        """재구성 실패/취소: 기록만 멈춤 (delta 는 그대로 남음)"""
+        self._changed = None
+
+    # ---- 검색 -----------------------------------------------------------
+
+    def _delta_candidates(self, query: Optional[NameQuery], filters: Filters) -> set:
+        """delta 중 색인 키/필터를 모두 만족하는 id (이름은 후보 수준)"""
+        groups = [self._delta_postings.get(gram, set()) for gram in (query.grams if query is not None else ())]
+        for field, values in filters.items():
+            groups.append(set().union(*(self._delta_postings.get(f"f{field}={value}", set()) for value in values)))
+        if not groups:
+            return self._delta_live
+        groups.sort(key=len)
+        return groups[0].intersection(*groups[1:])
+
+    def search(
+        self,
+        query: Optional[NameQuery],
+        filters: Filters,
+        after: Optional[SortKey] = None,
+        limit: int = 20,
+    ) -> Tuple[List[CompanyDoc], bool]:
+        """(결과, 다음 페이지 여부)"""
+        if query is not None and query.empty:
+            query = None
+        found = self.segment.search(query, filters, after, limit + 1)
+        if self._delta_live:
+            recent = sorted(
+                (
+                    doc for doc in (self.delta[company_id] for company_id in self._delta_candidates(query, filters))
+                    if (after is None or doc.key > after) and (query is None or query.exact or query.matches(doc))
+                ),
+                key=lambda doc: doc.key,
+            )
+            if recent:
+                found = list(heapq.merge(found, recent[: limit + 1], key=lambda doc: doc.key))
+        return found[:limit], len(found) > limit
+
+    def count(self, filters: Filters) -> int:
+        return self.segment.count(filters) + len(self._delta_candidates(None, filters))
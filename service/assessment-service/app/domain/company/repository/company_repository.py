@@ -0,0 +1,97 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import and_, bindparam, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..entity.company_entity import CompanyEntity
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = (
+    CompanyEntity.id,
+    CompanyEntity.name,
+    CompanyEntity.company_type,
+    CompanyEntity.type,
+    CompanyEntity.industry,
+    CompanyEntity.is_active,
+    CompanyEntity.updated_at,
+)
+
+_SELECT_BY_ID = select(*_COLUMNS).where(CompanyEntity.id == bindparam("company_id"))
+
+
+class CompanyRepository:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self._insert = pg_insert if engine.dialect.name == "postgresql" else sqlite_insert
+
+    async def iter_active(self, batch_size: int = 5000) -> AsyncIterator[List[Row]]:
+        """활성 회사 전체를 id 순 keyset 으로 batch_size 건씩 (인덱스 구성용)"""
+        last_id: Optional[str] = None
+        while True:
+            stmt = select(*_COLUMNS).where(CompanyEntity.is_active.is_(True)).order_by(CompanyEntity.id).limit(batch_size)
+            if last_id is not None:
+                stmt = stmt.where(CompanyEntity.id > last_id)
+            async with self.engine.connect() as conn:
+                rows = list(await conn.execute(stmt))
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1].id
+
+    async def changed_since(self, since: datetime, after_id: Optional[str] = None, limit: int = 5000) -> List[Row]:
+        """
+        since 이후 변경/비활성화된 회사 ((updated_at, id) 순)
+        after_id 를 주면 (updated_at, id) > (since, after_id) keyset 으로 이어서 읽음 (같은 시각 행이 limit 을 넘어도 빠짐없이)
+        """
+        if after_id is None:
+            condition = CompanyEntity.updated_at >= since
+        else:
+            condition = or_(
+                CompanyEntity.updated_at > since,
+                and_(CompanyEntity.updated_at == since, CompanyEntity.id > after_id),
+            )
+        stmt = (
+            select(*_COLUMNS)
+            .where(condition)
+            .order_by(CompanyEntity.updated_at, CompanyEntity.id)
+            .limit(limit)
+        )
+        async with self.engine.connect() as conn:
+            return list(await conn.execute(stmt))
+
+    async def find_by_id(self, company_id: str) -> Optional[Row]:
+        async with self.engine.connect() as conn:
+            return (await conn.execute(_SELECT_BY_ID, {"company_id": company_id})).first()
+
+    async def upsert(self, values: Dict[str, Any]) -> Row:
+        """
+        id 기준 저장 (없으면 추가, 비활성화된 회사는 다시 활성화)
+        INSERT ... ON CONFLICT (id) DO UPDATE 한 문장으로 → 같은 새 id 를 동시에 저장해도 IntegrityError 없이 나중 값이 남음
+        """
+        now = datetime.now(timezone.utc)
+        fields = {key: values.get(key) for key in ("name", "company_type", "type", "industry")}
+        stmt = self._insert(CompanyEntity).values(
+            id=values["id"], **fields, is_active=True, created_at=now, updated_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CompanyEntity.id],
+            set_={**fields, "is_active": True, "updated_at": now},
+        )
+        async with self.engine.begin() as conn:
+            await conn.execute(stmt)
+            return (await conn.execute(_SELECT_BY_ID, {"company_id": values["id"]})).first()
+
+    async def deactivate(self, company_id: str) -> bool:
+        async with self.engine.begin() as conn:
+            result = await conn.execute(
+                update(CompanyEntity)
+                .where(CompanyEntity.id == company_id, CompanyEntity.is_active.is_(True))
+                .values(is_active=False, updated_at=datetime.now(timezone.utc))
+            )
+            return result.rowcount == 1
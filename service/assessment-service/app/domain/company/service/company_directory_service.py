@@ -0,0 +1,304 @@
+"""
+회사 디렉터리 서비스
+- 시작 시 DB 의 활성 회사 전체로 인메모리 인덱스(CompanyIndex)를 구성, 검색은 DB 를 거치지 않음
+- 변경 반영
+    이 레플리카의 수정: 저장 직후 인덱스에 바로 반영하고 company:changed 채널로 알림
+    다른 레플리카의 수정: 알림을 받으면 DB 에서 그 회사를 다시 읽어 반영
+    DB 를 직접 수정한 경우/알림 유실 대비: updated_at 기준 변경분을 주기적으로 조회 (COMPANY_INDEX_POLL_SECONDS)
+- 변경분(delta)이 COMPANY_INDEX_DELTA_LIMIT 건을 넘으면 백그라운드 스레드에서 세그먼트 재구성
+"""
+import asyncio
+import base64
+import json
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from app.domain.assessment.service.scoring_engine import ScoringEngine
+from ..model.company_index import CompanyDoc, CompanyIndex, CompanySegment, Filters, NameQuery, SortKey, normalize_value
+from ..repository.company_repository import CompanyRepository
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # 선택 의존성
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+CHANGE_CHANNEL = "company:changed"
+# 레플리카 간 시계 차이/같은 시각 커밋을 놓치지 않도록 변경분 조회는 이만큼 겹쳐서
+POLL_OVERLAP = timedelta(seconds=5)
+# 변경분 조회 한 번에 읽는 행 수 (넘으면 (updated_at, id) keyset 으로 이어서)
+POLL_BATCH_SIZE = 5000
+
+
+def encode_cursor(key: SortKey) -> str:
+    raw = json.dumps(list(key), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> SortKey:
+    """잘못된 커서면 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        name, company_id = json.loads(raw)
+        return str(name), str(company_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("잘못된 cursor 입니다") from e
+
+
+def _doc(row) -> CompanyDoc:
+    return CompanyDoc(row.id, row.name, row.company_type, row.type, row.industry)
+
+
+class CompanyDirectoryService:
+    def __init__(
+        self,
+        repository: CompanyRepository,
+        engine: ScoringEngine,
+        redis_url: Optional[str] = None,
+        poll_interval: Optional[float] = None,
+        delta_limit: Optional[int] = None,
+        replica_id: Optional[str] = None,
+    ):
+        self.repository = repository
+        self.engine = engine
+        self.redis_url = redis_url if redis_url is not None else os.getenv("REDIS_URL")
+        self.poll_interval = poll_interval or float(os.getenv("COMPANY_INDEX_POLL_SECONDS", "30"))
+        self.delta_limit = delta_limit or int(os.getenv("COMPANY_INDEX_DELTA_LIMIT", "1000"))
+        self.replica_id = replica_id or os.getenv("ASSESSMENT_REPLICA_ID") or socket.gethostname()
+        self.index = CompanyIndex()
+        self._watermark: Optional[datetime] = None
+        self._redis = None
+        self._tasks: list = []
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self.counts = {"applied": 0, "rebuilds": 0}
+
+    # ---- 수명 주기 --------------------------------------------------------
+
+    async def start(self):
+        try:
+            await self.load()
+        except Exception as e:
+            logger.error(f"❌ 회사 인덱스 구성 실패, 빈 인덱스로 시작 (변경분 조회로 채움): {e}")
+            self._watermark = datetime(1970, 1, 1, tzinfo=timezone.utc)
+        if self.redis_url and aioredis is not None:
+            try:
+                self._redis = aioredis.from_url(self.redis_url, decode_responses=True)
+                await self._redis.ping()
+                self._tasks.append(asyncio.create_task(self._subscribe_loop()))
+            except Exception as e:
+                logger.warning(f"⚠️ Redis 연결 실패, 회사 변경은 주기 조회로만 반영: {e}")
+                self._redis = None
+        if self.poll_interval > 0:
+            self._tasks.append(asyncio.create_task(self._poll_loop()))
+
+    async def stop(self):
+        for task in [*self._tasks, self._rebuild_task]:
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._tasks, self._rebuild_task = [], None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def load(self):
+        """DB 전체로 인덱스 재구성 (읽는 동안의 변경은 다음 변경분 조회가 반영)"""
+        started = time.perf_counter()
+        watermark = datetime.now(timezone.utc) - POLL_OVERLAP
+        docs = []
+        async for rows in self.repository.iter_active():
+            docs.extend(_doc(row) for row in rows)
+        # 수십만 건 n-gram 색인은 CPU 작업이므로 이벤트 루프 밖에서
+        self.index = await asyncio.to_thread(CompanyIndex, docs)
+        self._watermark = watermark
+        logger.info(
+            f"🏢 회사 인덱스 구성: {len(docs)}개, 색인 키 {len(self.index.segment.postings)}개 "
+            f"({(time.perf_counter() - started) * 1000:.0f}ms)"
+        )
+
+    # ---- 변경 반영 --------------------------------------------------------
+
+    def _apply(self, company_id: str, row) -> bool:
+        if row is None or not row.is_active:
+            changed = self.index.delete(company_id)
+        else:
+            changed = self.index.upsert(_doc(row))
+        if changed:
+            self.counts["applied"] += 1
+            self._maybe_rebuild()
+        return changed
+
+    def _maybe_rebuild(self):
+        if len(self.index.delta) >= self.delta_limit and (self._rebuild_task is None or self._rebuild_task.done()):
+            self._rebuild_task = asyncio.create_task(self._rebuild())
+
+    async def _rebuild(self):
+        started = time.perf_counter()
+        index = self.index
+        docs = index.snapshot()
+        try:
+            segment = await asyncio.to_thread(CompanySegment, docs)
+        except BaseException as e:
+            index.abort_rebuild()
+            if isinstance(e, Exception):
+                logger.error(f"❌ 회사 인덱스 재구성 실패 (delta 유지): {e}")
+                return
+            raise
+        # 재구성 중 들어온 변경은 replace_segment 가 새 세그먼트에 다시 반영한 뒤 교체 (사이에 await 없음)
+        index.replace_segment(segment)
+        self.counts["rebuilds"] += 1
+        logger.info(f"🔄 회사 인덱스 재구성: {len(segment)}개 ({(time.perf_counter() - started) * 1000:.0f}ms)")
+
+    async def _poll_loop(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.warning(f"⚠️ 회사 변경분 조회 실패 (다음 주기에 재시도): {e}")
+
+    async def poll(self) -> int:
+        """마지막 조회 이후 변경된 회사 반영, 실제로 바뀐 건수 반환"""
+        changed = 0
+        since, after_id = self._watermark - POLL_OVERLAP, None
+        while True:
+            rows = await self.repository.changed_since(since, after_id, limit=POLL_BATCH_SIZE)
+            for row in rows:
+                changed += self._apply(row.id, row)
+            if not rows:
+                break
+            latest = rows[-1].updated_at
+            if latest.tzinfo is None:
+                # SQLite 는 시간대 정보 없이 돌려줌 (저장 값은 UTC)
+                latest = latest.replace(tzinfo=timezone.utc)
+            self._watermark = max(self._watermark, latest)
+            if len(rows) < POLL_BATCH_SIZE:
+                break
+            # 마지막 행 다음부터 (같은 updated_at 인 행이 POLL_BATCH_SIZE 를 넘어도 id 로 이어 읽음)
+            since, after_id = rows[-1].updated_at, rows[-1].id
+        return changed
+
+    async def _subscribe_loop(self):
+        """다른 레플리카의 회사 변경 알림 수신 → DB 에서 다시 읽어 반영"""
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(CHANGE_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    event = json.loads(message["data"])
+                    if event.get("origin") == self.replica_id:
+                        continue
+                    self._apply(event["id"], await self.repository.find_by_id(event["id"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 끊긴 동안 놓친 변경은 주기 조회가 반영
+                logger.error(f"❌ 회사 변경 구독 오류, 재연결: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def _publish(self, company_id: str):
+        if self._redis is None:
+            return
+        try:
+            await self._redis.publish(CHANGE_CHANNEL, json.dumps({"id": company_id, "origin": self.replica_id}))
+        except Exception as e:
+            logger.error(f"❌ 회사 변경 알림 실패 (주기 조회로 반영됨): {e}")
+
+    # ---- 쓰기 -------------------------------------------------------------
+
+    async def upsert(
+        self,
+        company_id: str,
+        name: str,
+        company_type: str,
+        type: Optional[str] = None,
+        industry: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """회사 등록/수정, company_type 이 잘못되면 UnknownCompanyTypeError"""
+        company_type = self.engine.model(company_type).company_type
+        row = await self.repository.upsert({
+            "id": company_id,
+            "name": name,
+            "company_type": company_type,
+            "type": normalize_value("type", type),
+            "industry": normalize_value("industry", industry),
+        })
+        self._apply(company_id, row)
+        await self._publish(company_id)
+        return _doc(row).to_dict()
+
+    async def delete(self, company_id: str) -> bool:
+        if not await self.repository.deactivate(company_id):
+            return False
+        self._apply(company_id, None)
+        await self._publish(company_id)
+        return True
+
+    # ---- 조회 -------------------------------------------------------------
+
+    def get(self, company_id: str) -> Optional[Dict[str, Any]]:
+        doc = self.index.get(company_id)
+        return doc.to_dict() if doc is not None else None
+
+    def filters(
+        self,
+        company_type: Optional[str] = None,
+        types: Optional[Iterable[str]] = None,
+        industries: Optional[Iterable[str]] = None,
+    ) -> Filters:
+        filters: Filters = {}
+        if company_type:
+            filters["company_type"] = frozenset([self.engine.model(company_type).company_type])
+        for field, values in (("type", types), ("industry", industries)):
+            normalized = frozenset(v for v in (normalize_value(field, value) for value in values or ()) if v)
+            if normalized:
+                filters[field] = normalized
+        return filters
+
+    def search(
+        self,
+        q: Optional[str] = None,
+        company_type: Optional[str] = None,
+        types: Optional[Iterable[str]] = None,
+        industries: Optional[Iterable[str]] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        이름(접두어/부분/초성) + 필터 검색, (정규화된 이름, id) 순
+        잘못된 cursor 면 ValueError, company_type 이 잘못되면 UnknownCompanyTypeError
+        """
+        after = decode_cursor(cursor) if cursor else None
+        filters = self.filters(company_type, types, industries)
+        query = NameQuery(q) if q and q.strip() else None
+        docs, has_more = self.index.search(query, filters, after, limit)
+        out: Dict[str, Any] = {
+            "companies": [doc.to_dict() for doc in docs],
+            "next_cursor": encode_cursor(docs[-1].key) if has_more else None,
+        }
+        if query is None:
+            # 이름 조건이 없으면 bitmap 으로 전체 건수를 바로 셀 수 있음
+            out["total"] = self.index.count(filters)
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "companies": len(self.index),
+            "segment": len(self.index.segment),
+            "delta": len(self.index.delta),
+            "grams": len(self.index.segment.postings),
+            "distributed": self._redis is not None,
+            **self.counts,
+        }
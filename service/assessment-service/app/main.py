@@ -1,15 +1,22 @@
 """
 Assessment Service 메인 파일
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+import asyncio
 import os
 import logging
 import sys
-import psutil
 import time
 from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Optional
+
+from app.common.logs import RequestContextMiddleware, install_log_shipping
+from app.common.metrics import system_sampler
+from app.common.startup import LazyStartup
+from app.common.tracing import install_tracing, tracer
 
 # 로깅 설정
 logging.basicConfig(
@@ -18,6 +25,8 @@ logging.basicConfig(
     handlers=[logging.StreamHandler(sys.stdout)]
 )
 logger = logging.getLogger("assessment_service")
+# monitoring-service 로 로그 배치 전송 (MONITORING_SERVICE_URL 이 있을 때, stdout 로그는 그대로)
+install_log_shipping("assessment-service")
 
 # 서비스 시작 시간 기록
 start_time = None
@@ -27,9 +36,16 @@ async def lifespan(app: FastAPI):
     global start_time
     start_time = time.time()
     logger.info("🚀 Assessment Service 시작")
-    logger.info(f"📊 시스템 정보: CPU 코어 {psutil.cpu_count()}, 메모리 {round(psutil.virtual_memory().total / 1024 / 1024 / 1024, 2)}GB")
-    logger.info("✅ 헬스체크 엔드포인트 준비됨: /health, /health/simple, /health/minimal")
+    # 시스템 지표는 백그라운드에서 주기적으로 수집하고 헬스체크는 마지막 샘플만 읽음
+    system_sampler.start(start_time)
+    info = system_sampler.info()
+    logger.info(f"📊 시스템 정보: CPU 코어 {info['cpu_count']}, 메모리 {info['memory_total_gb']}GB")
+    logger.info("✅ 헬스체크 엔드포인트 준비됨: /health, /health/simple, /health/minimal, /health/history")
+    # DB/큐/인덱스 등 무거운 초기화는 백그라운드에서 (헬스체크는 바로 응답, 나머지 요청은 준비될 때까지 대기)
+    startup.start()
     yield
+    await startup.stop()
+    await system_sampler.stop()
     logger.info("🛑 Assessment Service 종료")
 
 app = FastAPI(
@@ -49,6 +65,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 지연 시작: 라우터와 서비스 초기화(app.bootstrap)는 "startup complete" 이후 백그라운드에서
+startup = LazyStartup(
+    app,
+    services="app.bootstrap:services",
+    exempt=("/", "/health", "/health/simple", "/health/minimal", "/health/history", "/health/startup"),
+)
+
+# 요청마다 X-Request-ID (받거나 새로 만듦) → 이 요청 중 남긴 로그에 request_id 로 붙음
+app.add_middleware(RequestContextMiddleware)
+# 분산 추적: 게이트웨이의 traceparent 를 이어받아 요청마다 server 스팬, 스팬은 monitoring-service 로
+install_tracing(app, tracer, "assessment-service")
+
 # 기본 루트 경로
 @app.get("/")
 async def root():
@@ -63,58 +91,73 @@ async def root():
 # 개선된 헬스 체크
 @app.get("/health")
 async def health_check():
-    """간단하고 빠른 헬스 체크 엔드포인트"""
-    try:
-        # 기본 시스템 정보만 빠르게 확인
-        uptime = time.time() - start_time if start_time else 0
-        memory_info = psutil.virtual_memory()
-        
-        # 서비스 상태 확인 (간단한 버전)
-        health_status = {
-            "status": "healthy",
-            "service": "assessment",
-            "version": "0.1.0",
-            "timestamp": datetime.now().isoformat(),
-            "uptime_seconds": round(uptime, 2),
-            "uptime_formatted": format_uptime(uptime),
-            "system": {
-                "memory_percent": memory_info.percent,
-                "memory_available_mb": round(memory_info.available / 1024 / 1024, 2)
-            }
-        }
-        
-        return health_status
-        
-    except Exception as e:
-        logger.error(f"Health check failed: {e}")
+    """간단하고 빠른 헬스 체크 엔드포인트 (백그라운드 샘플러의 마지막 샘플, 준비 전이거나 초기화 실패 중이면 503)"""
+    unready = startup.unready()
+    if unready is not None:
+        return JSONResponse(status_code=503, content={**unready, "service": "assessment"})
+    health = system_sampler.health
+    if health is None:
         raise HTTPException(status_code=503, detail="Service unhealthy")
+    return {"service": "assessment", "version": "0.1.0", **health}
 
 # 간단한 헬스 체크 (기존 호환성 유지)
 @app.get("/health/simple")
 async def simple_health_check():
     """간단한 헬스 체크 (기존 호환성용)"""
+    unready = startup.unready()
+    if unready is not None:
+        return JSONResponse(status_code=503, content={**unready, "service": "assessment"})
     return {"status": "healthy", "service": "assessment"}
 
 # 최소한의 헬스 체크 (Docker용)
 @app.get("/health/minimal")
 async def minimal_health_check():
     """최소한의 헬스 체크 (Docker 헬스체크용)"""
+    unready = startup.unready()
+    if unready is not None:
+        return JSONResponse(status_code=503, content={"status": unready["status"]})
     return {"status": "ok"}
 
-def format_uptime(seconds):
-    """업타임을 사람이 읽기 쉬운 형태로 변환"""
-    if seconds < 60:
-        return f"{int(seconds)}초"
-    elif seconds < 3600:
-        return f"{int(seconds // 60)}분 {int(seconds % 60)}초"
-    elif seconds < 86400:
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        return f"{hours}시간 {minutes}분"
-    else:
-        days = int(seconds // 86400)
-        hours = int((seconds % 86400) // 3600)
-        return f"{days}일 {hours}시간"
+# 최근 시스템 지표 (추세 분석용)
+@app.get("/health/history")
+async def health_history(
+    seconds: Optional[float] = Query(default=None, gt=0, description="최근 몇 초 (없으면 버퍼 전체)")
+):
+    """샘플러 링 버퍼의 최근 구간 (오래된 것부터)"""
+    return {**system_sampler.info(), "samples": system_sampler.window(seconds)}
+
+# 시작 단계별 소요 시간
+@app.get("/health/startup")
+async def startup_health_check():
+    """지연 시작 진행 상황: 준비 여부, 단계별 ms, 프로세스 시작부터 준비까지 ms"""
+    return startup.report()
+
+# 모듈별 import 비용 (새 프로세스에서 측정, 결과는 캐시)
+@app.get("/health/startup/imports")
+async def startup_imports(top: int = Query(default=25, ge=1, le=200)):
+    """python -X importtime 집계 (지연 import 모듈 포함): 모듈별 누적/자체 시간, 패키지별 합계"""
+    if getattr(app.state, "import_report", None) is None:
+        from app.common.startup.importtime import profile
+        app.state.import_report = await asyncio.to_thread(profile, ["app.main", *startup.deferred_modules()], 200)
+    report = app.state.import_report
+    return {
+        **report,
+        "packages": report["packages"][:top],
+        "slowest_cumulative": report["slowest_cumulative"][:top],
+        "slowest_self": report["slowest_self"][:top],
+    }
+
+# 평가 작업 큐 상태
+@app.get("/health/jobs")
+async def job_health_check():
+    """작업 큐 길이와 처리 건수"""
+    return await app.state.assessment_job_service.stats()
+
+# 회사 디렉터리 인덱스 상태
+@app.get("/health/companies")
+async def company_index_health_check():
+    """인덱스 문서 수, 미반영 변경분(delta), 재구성 횟수"""
+    return app.state.company_directory_service.stats()
 
 # 향후 확장을 위한 플레이스홀더 함수들
 async def check_database_connection():
@@ -133,41 +176,12 @@ async def check_external_services():
         "timestamp": datetime.now().isoformat()
     }
 
-# 라우터 등록 (안전하게)
-try:
-    from app.router.main_router import router as main_router
-    app.include_router(main_router, prefix="/api/v1")
-    logger.info("✅ main_router 등록됨")
-except ImportError as e:
-    logger.warning(f"main_router not found: {e}")
-
-try:
-    from app.router.auth_router import router as auth_router
-    app.include_router(auth_router, prefix="/api/v1/auth")
-    logger.info("✅ auth_router 등록됨")
-except ImportError as e:
-    logger.warning(f"auth_router not found: {e}")
-
-try:
-    from app.router.le_router import router as le_router
-    app.include_router(le_router, prefix="/api/v1/le")
-    logger.info("✅ le_router 등록됨")
-except ImportError as e:
-    logger.warning(f"le_router not found: {e}")
-
-try:
-    from app.router.sme_router import router as sme_router
-    app.include_router(sme_router, prefix="/api/v1/sme")
-    logger.info("✅ sme_router 등록됨")
-except ImportError as e:
-    logger.warning(f"sme_router not found: {e}")
-
-try:
-    from app.router.user_router import router as user_router
-    app.include_router(user_router, prefix="/api/v1/user")
-    logger.info("✅ user_router 등록됨")
-except ImportError as e:
-    logger.warning(f"user_router not found: {e}")
+# 라우터 등록 (import 는 시작 직후 백그라운드에서, 없는 라우터는 경고만)
+startup.include_router("app.router.main_router:router", "main_router", prefix="/api/v1")
+startup.include_router("app.router.auth_router:router", "auth_router", prefix="/api/v1/auth")
+startup.include_router("app.router.le_router:router", "le_router", prefix="/api/v1/le")
+startup.include_router("app.router.sme_router:router", "sme_router", prefix="/api/v1/sme")
+startup.include_router("app.router.user_router:router", "user_router", prefix="/api/v1/user")
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,10 +1,12 @@
 """
 Assessment Service Auth Router
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 import logging
 
+from app.common.session import extract_session_token
+
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
@@ -38,6 +40,19 @@ async def login(request: AuthRequest):
         raise HTTPException(status_code=401, detail="Authentication failed")
 
 @router.get("/verify")
-async def verify_token():
-    """토큰 검증"""
-    return {"status": "valid", "message": "Token is valid"}
+async def verify_token(request: Request):
+    """토큰 검증 (Authorization: Bearer 또는 session_token 쿠키)"""
+    token = extract_session_token(request)
+    if not token:
+        raise HTTPException(status_code=401, detail="Token required")
+    
+    session = await request.app.state.session_store.get(token)
+    if session is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    
+    return {
+        "status": "valid",
+        "message": "Token is valid",
+        "user_id": session["user_id"],
+        "company_id": session.get("company_id")
+    }
@@ -1,11 +1,15 @@
 """
 Assessment Service LE (Large Enterprise) Router
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional
 import logging
 
+from app.common.utility.streaming import DuplexStreamingResponse
+from app.domain.assessment.service.batch_assessment_service import batch_assessment_service
+from app.domain.assessment.service.scoring_engine import InvalidAssessmentDataError
+
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
@@ -15,39 +19,70 @@ class LERequest(BaseModel):
     data: dict
 
 class LEResponse(BaseModel):
+    assessment_id: Optional[str] = None
     company_id: str
     assessment_type: str
-    score: float
+    score: Optional[float]
+    sub_scores: Dict[str, Optional[float]] = {}
+    indicators: Dict[str, Optional[float]] = {}
     recommendations: List[str]
 
 @router.post("/assessment", response_model=LEResponse)
-async def create_le_assessment(request: LERequest):
+async def create_le_assessment(request: LERequest, http_request: Request):
     """대기업 평가 생성"""
     try:
         response = LEResponse(
             company_id=request.company_id,
             assessment_type=request.assessment_type,
-            score=92.5,
-            recommendations=[
-                "대규모 생산 시설 최적화",
-                "글로벌 공급망 관리 시스템 도입",
-                "고도화된 품질 관리 프로세스"
-            ]
+            **await http_request.app.state.assessment_service.create(
+                "LME",
+                request.data,
+                company_id=request.company_id,
+                assessment_type=request.assessment_type,
+            )
         )
         
         logger.info(f"LE assessment created: {request.company_id}")
         return response
         
+    except InvalidAssessmentDataError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error(f"LE assessment creation failed: {str(e)}")
         raise HTTPException(status_code=500, detail="Assessment creation failed")
 
+@router.post("/assessment/batch")
+async def create_le_assessment_batch(
+    request: Request,
+    format: str = Query(default="auto", description="ndjson, json(배열) 또는 auto(본문 첫 글자로 판단)")
+):
+    """
+    대기업 배치 평가
+    LERequest 를 한 줄에 하나씩(NDJSON) 또는 JSON 배열로 스트리밍해서 보내면
+    항목별 결과를 NDJSON 으로 스트리밍 반환합니다. 마지막 줄은 처리 요약입니다.
+    """
+    fmt = format.lower()
+    if fmt not in ("auto", "ndjson", "json"):
+        raise HTTPException(status_code=400, detail="지원하지 않는 형식입니다 (auto, ndjson, json)")
+    logger.info(f"📦 LME 배치 평가 시작: format={fmt}")
+    return DuplexStreamingResponse(
+        batch_assessment_service.run(request.stream(), "LME", LERequest, fmt),
+        media_type="application/x-ndjson",
+    )
+
 @router.get("/companies")
-async def get_le_companies():
-    """대기업 목록 조회"""
-    return {
-        "companies": [
-            {"id": "le_001", "name": "대기업 A", "type": "manufacturing"},
-            {"id": "le_002", "name": "대기업 B", "type": "technology"}
-        ]
-    }
+async def get_le_companies(
+    http_request: Request,
+    q: Optional[str] = Query(default=None, description="회사명 검색어 (접두어/부분 일치, 초성 검색 가능)"),
+    type: Optional[List[str]] = Query(default=None, description="업태 (여러 번 지정하면 OR)"),
+    industry: Optional[List[str]] = Query(default=None, description="업종 (여러 번 지정하면 OR)"),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, description="이전 응답의 next_cursor")
+):
+    """대기업 목록 조회 (이름순, cursor 기반 페이지네이션)"""
+    try:
+        return http_request.app.state.company_directory_service.search(
+            q, company_type="LME", types=type, industries=industry, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,11 +1,18 @@
 """
 Assessment Service 메인 라우터
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Dict, Optional, List
 import logging
 
+from app.domain.assessment.service.assessment_service import AssessmentConflictError, AssessmentService
+from app.domain.assessment.service.scoring_engine import (
+    InvalidAssessmentDataError,
+    UnknownCompanyTypeError,
+)
+
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
@@ -13,12 +20,25 @@ class AssessmentRequest(BaseModel):
     user_id: str
     company_type: str
     assessment_data: dict
+    company_id: Optional[str] = None
+
+class AssessmentUpdateRequest(BaseModel):
+    # 바뀐 응답만 (섹션별로 묶어도 됨), 값이 null 이면 응답 삭제
+    assessment_data: dict
+
+class CompanyRequest(BaseModel):
+    name: str
+    company_type: str
+    type: Optional[str] = None
+    industry: Optional[str] = None
 
 class AssessmentResponse(BaseModel):
     assessment_id: str
     user_id: str
     company_type: str
-    score: float
+    score: Optional[float]
+    sub_scores: Dict[str, Optional[float]] = {}
+    indicators: Dict[str, Optional[float]] = {}
     recommendations: List[str]
     status: str
 
@@ -30,72 +50,190 @@ async def get_assessment_info():
         "version": "0.1.0",
         "endpoints": [
             "/assessment/create",
+            "/assessment/jobs",
+            "/assessment/jobs/{job_id}",
             "/assessment/{assessment_id}",
-            "/assessment/{assessment_id}/result"
+            "/assessment/{assessment_id}/result",
+            "/assessment/{assessment_id}/percentile",
+            "/companies",
+            "/companies/{company_id}",
+            "/companies/{company_id}/assessments",
+            "/benchmarks/percentile"
         ]
     }
 
 @router.post("/assessment/create", response_model=AssessmentResponse)
-async def create_assessment(request: AssessmentRequest):
+async def create_assessment(request: AssessmentRequest, http_request: Request):
     """새로운 평가 생성"""
     try:
-        # 실제 구현에서는 데이터베이스에 저장
-        assessment_id = f"assess_{request.user_id}_{request.company_type}"
-        
-        # 임시 응답 (실제로는 평가 로직 구현)
+        assessment_service: AssessmentService = http_request.app.state.assessment_service
+        result = await assessment_service.create(
+            request.company_type,
+            request.assessment_data,
+            user_id=request.user_id,
+            company_id=request.company_id,
+        )
         response = AssessmentResponse(
-            assessment_id=assessment_id,
             user_id=request.user_id,
             company_type=request.company_type,
-            score=85.5,
-            recommendations=[
-                "생산성 향상을 위한 자동화 도입 검토",
-                "공급망 최적화 방안 수립",
-                "품질 관리 시스템 강화"
-            ],
-            status="completed"
+            **result
         )
         
-        logger.info(f"Assessment created: {assessment_id}")
+        logger.info(f"Assessment created: {result['assessment_id']} score={result['score']}")
         return response
         
+    except UnknownCompanyTypeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except InvalidAssessmentDataError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error(f"Assessment creation failed: {str(e)}")
         raise HTTPException(status_code=500, detail="Assessment creation failed")
 
+@router.post("/assessment/jobs", status_code=202)
+async def submit_assessment_job(
+    request: AssessmentRequest,
+    http_request: Request,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key")
+):
+    """평가 작업 등록 (바로 job_id 반환, 같은 Idempotency-Key 재요청은 기존 작업 반환)"""
+    try:
+        job, created = await http_request.app.state.assessment_job_service.submit(
+            request.company_type,
+            request.assessment_data,
+            user_id=request.user_id,
+            company_id=request.company_id,
+            idempotency_key=idempotency_key,
+        )
+    except UnknownCompanyTypeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    status_url = f"{http_request.url.path}/{job['job_id']}"
+    return JSONResponse(
+        {**job, "status_url": status_url},
+        status_code=202 if created else 200,
+        headers={"Location": status_url},
+    )
+
+@router.get("/assessment/jobs/{job_id}")
+async def get_assessment_job(job_id: str, http_request: Request):
+    """평가 작업 상태/진행률 조회 (완료되면 result 포함, 결과는 JOB_RESULT_TTL_SECONDS 동안 보관)"""
+    job = await http_request.app.state.assessment_job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    # 진행 중이면 다음 폴링 간격 안내
+    headers = {} if job["status"] in ("succeeded", "failed") else {"Retry-After": "1"}
+    return JSONResponse(job, headers=headers)
+
+@router.get("/companies")
+async def search_companies(
+    http_request: Request,
+    q: Optional[str] = Query(default=None, description="회사명 검색어 (접두어/부분 일치, 초성 검색 가능)"),
+    company_type: Optional[str] = Query(default=None, description="LME / SME (없으면 전체)"),
+    type: Optional[List[str]] = Query(default=None, description="업태 (여러 번 지정하면 OR)"),
+    industry: Optional[List[str]] = Query(default=None, description="업종 (여러 번 지정하면 OR)"),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, description="이전 응답의 next_cursor")
+):
+    """회사 디렉터리 검색 (이름순, cursor 기반 페이지네이션)"""
+    try:
+        return http_request.app.state.company_directory_service.search(
+            q, company_type=company_type, types=type, industries=industry, limit=limit, cursor=cursor
+        )
+    except UnknownCompanyTypeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/companies/{company_id}")
+async def get_company(company_id: str, http_request: Request):
+    """회사 조회"""
+    company = http_request.app.state.company_directory_service.get(company_id)
+    if company is None:
+        raise HTTPException(status_code=404, detail="Company not found")
+    return company
+
+@router.put("/companies/{company_id}")
+async def upsert_company(company_id: str, request: CompanyRequest, http_request: Request):
+    """회사 등록/수정 (검색 인덱스에 바로 반영되고 다른 레플리카에 전파)"""
+    try:
+        return await http_request.app.state.company_directory_service.upsert(
+            company_id, request.name, request.company_type, request.type, request.industry
+        )
+    except UnknownCompanyTypeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.delete("/companies/{company_id}", status_code=204)
+async def delete_company(company_id: str, http_request: Request):
+    """회사 삭제 (비활성화)"""
+    if not await http_request.app.state.company_directory_service.delete(company_id):
+        raise HTTPException(status_code=404, detail="Company not found")
+    return Response(status_code=204)
+
+@router.get("/companies/{company_id}/assessments")
+async def list_company_assessments(
+    company_id: str,
+    http_request: Request,
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, description="이전 응답의 next_cursor")
+):
+    """회사별 평가 목록 (최신순, cursor 기반 페이지네이션)"""
+    try:
+        return await http_request.app.state.assessment_service.list_by_company(company_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/benchmarks/percentile")
+async def get_benchmark_percentile(
+    http_request: Request,
+    company_type: str = Query(..., description="LME / SME (별칭 LE, SMALL 등 허용)"),
+    value: float = Query(..., description="비교할 점수"),
+    metric: str = Query(default="score", description="score, sub_score.<id>, indicator.<id>"),
+    industry: Optional[str] = Query(default=None, description="업종 (없으면 전체)")
+):
+    """점수가 동종 기업 중 몇 백분위인지"""
+    try:
+        return http_request.app.state.percentile_service.percentile(company_type, industry, metric, value)
+    except UnknownCompanyTypeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/assessment/{assessment_id}")
-async def get_assessment(assessment_id: str):
+async def get_assessment(assessment_id: str, http_request: Request):
     """평가 정보 조회"""
+    assessment = await http_request.app.state.assessment_service.get(assessment_id)
+    if assessment is None:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    return assessment
+
+@router.patch("/assessment/{assessment_id}")
+async def update_assessment(assessment_id: str, request: AssessmentUpdateRequest, http_request: Request):
+    """응답 일부 수정 → 바뀐 질문에 의존하는 지표/하위 점수/총점만 다시 계산 (recomputed 에 재계산된 노드)"""
     try:
-        # 실제 구현에서는 데이터베이스에서 조회
-        return {
-            "assessment_id": assessment_id,
-            "status": "completed",
-            "created_at": "2024-01-01T00:00:00Z"
-        }
-    except Exception as e:
-        logger.error(f"Assessment retrieval failed: {str(e)}")
+        updated = await http_request.app.state.assessment_service.update(assessment_id, request.assessment_data)
+    except InvalidAssessmentDataError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except AssessmentConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if updated is None:
         raise HTTPException(status_code=404, detail="Assessment not found")
+    return updated
 
 @router.get("/assessment/{assessment_id}/result")
-async def get_assessment_result(assessment_id: str):
-    """평가 결과 조회"""
-    try:
-        # 실제 구현에서는 데이터베이스에서 조회
-        return {
-            "assessment_id": assessment_id,
-            "score": 85.5,
-            "recommendations": [
-                "생산성 향상을 위한 자동화 도입 검토",
-                "공급망 최적화 방안 수립",
-                "품질 관리 시스템 강화"
-            ],
-            "detailed_analysis": {
-                "efficiency": 85,
-                "quality": 90,
-                "sustainability": 80
-            }
-        }
-    except Exception as e:
-        logger.error(f"Assessment result retrieval failed: {str(e)}")
+async def get_assessment_result(assessment_id: str, http_request: Request):
+    """평가 결과 조회 (If-None-Match 가 같으면 304)"""
+    found = await http_request.app.state.assessment_service.get_result(assessment_id)
+    if found is None:
         raise HTTPException(status_code=404, detail="Assessment result not found")
+    payload, etag = found
+    # 브라우저가 매번 재검증하도록 no-cache (변경이 없으면 본문 없이 304)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in (tag.strip() for tag in http_request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(payload, headers=headers)
+
+@router.get("/assessment/{assessment_id}/percentile")
+async def get_assessment_percentile(assessment_id: str, http_request: Request):
+    """평가의 총점/하위 점수/지표별 동종 업계 대비 백분위"""
+    found = await http_request.app.state.assessment_service.get_percentiles(assessment_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    return found
@@ -0,0 +1,116 @@
+"""
+회사 디렉터리 인덱스 마이크로벤치마크
+
+    python -m benchmarks.company_index_benchmark [--sizes 10000,100000] [--limit 20]
+
+회사 수별로 다음을 측정
+- build:  CompanyIndex 구성 시간 (시작/재구성 시 1회)
+- 검색 종류별 p50 / p99 지연 (μs): 접두어, 입력 중인 검색어, 부분 일치, 초성, 필터만, 이름 + 필터,
+  다음 페이지(keyset), delta 가 쌓인 상태
+- 선형 탐색(모든 회사 이름을 확인)과 결과가 같은지 확인
+"""
+import argparse
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+from app.domain.company.model.company_index import CompanyDoc, CompanyIndex, Filters, NameQuery
+
+_SYLLABLES = "가나다라마바사아자차카타파하강남동서한국대성신일진우영화현광명정보삼태"
+_SUFFIXES = ["전자", "정밀", "산업", "테크", "바이오", "물산", "화학", "식품", "기계", "건설", "소재", "에너지", "로지스"]
+TYPES = ["manufacturing", "technology", "service", "logistics", "construction"]
+INDUSTRIES = ["AUTOMOTIVE", "ELECTRONICS", "CHEMICAL", "STEEL", "FOOD", "TEXTILE"]
+
+
+def make_docs(count: int, seed: int = 11) -> List[CompanyDoc]:
+    """음절 2~3개 + 업종 접미어 (+ 법인 표기) 형태의 가상 회사"""
+    rng = random.Random(seed)
+    docs = []
+    for i in range(count):
+        name = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 3))) + rng.choice(_SUFFIXES)
+        if rng.random() < 0.3:
+            name = "(주)" + name
+        elif rng.random() < 0.1:
+            name += " " + rng.choice(["코리아", "글로벌", "홀딩스"])
+        docs.append(CompanyDoc(
+            f"c{i:07d}", name, rng.choice(["LME", "SME", "SME", "SME"]), rng.choice(TYPES), rng.choice(INDUSTRIES)
+        ))
+    return docs
+
+
+def linear_search(docs: List[CompanyDoc], query: Optional[NameQuery], filters: Filters, limit: int) -> List[str]:
+    """비교용: 모든 회사를 확인한 뒤 정렬"""
+    found = [
+        doc for doc in docs
+        if doc.matches_filters(filters) and (query is None or query.matches(doc))
+    ]
+    found.sort(key=lambda doc: doc.key)
+    return [doc.id for doc in found[:limit]]
+
+
+def latency(fn: Callable[[], object], repeat: int = 300) -> Dict[str, float]:
+    fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return {"p50": samples[len(samples) // 2], "p99": samples[int(len(samples) * 0.99) - 1]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="회사 디렉터리 인덱스 벤치마크")
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    sme = {"company_type": frozenset(["SME"])}
+    cases = [
+        ("prefix 1 jamo", "ㅎ", {}),
+        ("prefix syllable", "한", {}),
+        ("typing", "한국저", {}),
+        ("substring", "전자", {}),
+        ("long substring", "한국전자", {}),
+        ("choseong", "ㅎㄱㅈㅈ", {}),
+        ("filter only", None, {**sme, "type": frozenset(["manufacturing"])}),
+        ("filter (rare)", None, {**sme, "industry": frozenset(["STEEL"]), "type": frozenset(["logistics"])}),
+        ("name + filter", "정밀", {**sme, "industry": frozenset(["AUTOMOTIVE", "STEEL"])}),
+    ]
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        docs = make_docs(size)
+        started = time.perf_counter()
+        index = CompanyIndex(docs)
+        build_ms = (time.perf_counter() - started) * 1000
+        print(f"\ncompanies={size} build={build_ms:,.0f}ms grams={len(index.segment.postings):,}")
+        print(f"{'case':>18} {'p50 μs':>10} {'p99 μs':>10} {'hits':>6}")
+
+        for label, text, filters in cases:
+            query = NameQuery(text) if text else None
+            found, _ = index.search(query, filters, None, args.limit)
+            assert [doc.id for doc in found] == linear_search(docs, query, filters, args.limit), label
+            stats = latency(lambda: index.search(query, filters, None, args.limit))
+            print(f"{label:>18} {stats['p50']:>10.1f} {stats['p99']:>10.1f} {len(found):>6}")
+
+        # 중간 페이지: 앞 페이지 마지막 키 다음부터
+        query = NameQuery("전자")
+        first, _ = index.search(query, {}, None, 2000)
+        after = first[-1].key
+        stats = latency(lambda: index.search(query, {}, after, args.limit))
+        print(f"{'page 100 (keyset)':>18} {stats['p50']:>10.1f} {stats['p99']:>10.1f}")
+
+        # 재구성 전 delta 가 가득 찬 상태 (COMPANY_INDEX_DELTA_LIMIT 기본값)
+        rng = random.Random(3)
+        for doc in rng.sample(docs, min(1000, size)):
+            index.upsert(CompanyDoc(doc.id, doc.name + " 신규", doc.company_type, doc.type, doc.industry))
+        query = NameQuery("전자")
+        current = [index.get(doc.id) for doc in docs]
+        found, _ = index.search(query, sme, None, args.limit)
+        assert [doc.id for doc in found] == linear_search(current, query, sme, args.limit), "delta"
+        stats = latency(lambda: index.search(query, sme, None, args.limit))
+        print(f"{'delta=1000':>18} {stats['p50']:>10.1f} {stats['p99']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
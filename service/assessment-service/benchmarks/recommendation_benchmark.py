@@ -0,0 +1,135 @@
+"""
+추천 규칙 엔진 마이크로벤치마크
+
+    python -m benchmarks.recommendation_benchmark [--company-type LME] [--rules 15,100,1000] [--sizes 1,1000,100000]
+
+규칙 수 × 회사 수별로 다음을 측정
+- compile:  규칙 목록 → CompiledRuleSet (시작/핫 리로드 시 1회)
+- compiled: 임계값 인덱스 + bitset 판정 + 추천 문구 선택 (assessments/sec, rules×assessments/sec)
+- naive:    규칙마다 조건을 if 로 확인하는 선형 체인 (비교용, 결과가 같은지도 확인)
+"""
+import argparse
+import random
+import time
+from typing import Any, Dict, List
+
+from app.domain.assessment.model.recommendation_rules import CompiledRuleSet, parse_condition
+from app.domain.assessment.model.scoring_model import ScoringModel
+from app.domain.assessment.service.recommendation_engine import RecommendationEngine
+from app.domain.assessment.service.scoring_engine import ScoringEngine
+from benchmarks.scoring_benchmark import make_rows, measure
+
+INDUSTRIES = ["AUTOMOTIVE", "ELECTRONICS", "CHEMICAL", "STEEL", "FOOD", "TEXTILE", None]
+
+
+def make_rules(model: ScoringModel, count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """지표/하위 점수/총점 임계값과 company_type/industry 조건을 섞은 가상 규칙"""
+    rng = random.Random(seed)
+    fields = (
+        ["score"]
+        + [f"sub_score.{sid}" for sid in model.sub_score_ids]
+        + [f"indicator.{iid}" for iid in model.indicator_ids]
+    )
+    rules = []
+    for r in range(count):
+        when = [
+            {"field": field, "op": rng.choice(["<", "<=", ">", ">="]), "value": rng.randrange(20, 90, 5)}
+            for field in rng.sample(fields, rng.randint(1, 3))
+        ]
+        if rng.random() < 0.3:
+            when.append({"field": "company_type", "op": "==", "value": rng.choice(["LME", "SME"])})
+        if rng.random() < 0.3:
+            when.append({"field": "industry", "op": "in", "value": rng.sample(INDUSTRIES[:-1], 2)})
+        rules.append({"id": f"rule-{r}", "priority": rng.randint(0, 100), "when": when, "recommendation": f"추천 {r % 50}"})
+    return rules
+
+
+def prepare_naive(rules: List[Dict[str, Any]]) -> List[Any]:
+    """비교용 선형 체인: 조건 파싱과 우선순위 정렬은 미리 해 둠 (요청마다 하는 일은 if 평가뿐)"""
+    ordered = sorted(enumerate(rules), key=lambda item: (-float(item[1].get("priority", 0)), item[0]))
+    return [([parse_condition(rule["id"], c) for c in rule["when"]], rule["recommendation"]) for _, rule in ordered]
+
+
+def naive_recommend(chain: List[Any], values: Dict[str, Any], limit: int) -> List[str]:
+    """규칙을 우선순위 순으로 하나씩 if 로 평가"""
+    fired = []
+    for conditions, text in chain:
+        ok = True
+        for field, op, expected in conditions:
+            value = values.get(field)
+            if op == "in":
+                ok = value is not None and str(value).upper() in expected
+            elif value is None or value != value:
+                ok = False
+            elif op == "<":
+                ok = value < expected
+            elif op == "<=":
+                ok = value <= expected
+            elif op == ">":
+                ok = value > expected
+            else:
+                ok = value >= expected
+            if not ok:
+                break
+        if ok:
+            fired.append(text)
+    return list(dict.fromkeys(fired))[:limit]
+
+
+def row_values(model: ScoringModel, batch, i: int, industry) -> Dict[str, Any]:
+    """i 번째 평가를 선형 체인 입력(필드 → 값)으로 변환"""
+    values: Dict[str, Any] = {"score": float(batch.total[i]), "company_type": model.company_type, "industry": industry}
+    values.update({f"sub_score.{sid}": float(batch.sub_scores[i, s]) for s, sid in enumerate(model.sub_score_ids)})
+    values.update({f"indicator.{iid}": float(batch.indicators[i, j]) for j, iid in enumerate(model.indicator_ids)})
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추천 규칙 엔진 벤치마크")
+    parser.add_argument("--company-type", default="LME")
+    parser.add_argument("--rules", default="15,100,1000")
+    parser.add_argument("--sizes", default="1,1000,100000")
+    args = parser.parse_args()
+
+    model = ScoringEngine().model(args.company_type)
+    print(f"company_type={model.company_type} indicators={len(model.indicator_ids)}")
+    print(
+        f"{'rules':>6} {'companies':>10} {'compile ms':>11} {'compiled/s':>13} "
+        f"{'rules×asmt/s':>15} {'naive/s':>11} {'speedup':>8}"
+    )
+
+    for rule_count in (int(r) for r in args.rules.split(",")):
+        rules = make_rules(model, rule_count)
+        started = time.perf_counter()
+        ruleset = CompiledRuleSet(rules)
+        compile_ms = (time.perf_counter() - started) * 1000
+        engine = RecommendationEngine(reload_interval=0)
+        engine.ruleset = ruleset
+        chain = prepare_naive(rules)
+
+        for size in (int(s) for s in args.sizes.split(",")):
+            rows = make_rows(model, size)
+            batch, _ = model.score_many(rows)
+            rng = random.Random(size)
+            industries = [rng.choice(INDUSTRIES) for _ in range(size)]
+
+            compiled_rate = measure(lambda: engine.recommend(model, batch, industries), size)
+
+            sample = min(size, max(1, 200_000 // rule_count))
+            sample_values = [row_values(model, batch, i, industries[i]) for i in range(sample)]
+            naive_rate = measure(
+                lambda: [naive_recommend(chain, values, ruleset.max_recommendations) for values in sample_values],
+                sample,
+            )
+            compiled = engine.recommend(model, batch, industries)
+            expected = [naive_recommend(chain, values, ruleset.max_recommendations) for values in sample_values]
+            assert compiled[:sample] == expected, "컴파일 결과가 선형 평가와 다릅니다"
+
+            print(
+                f"{rule_count:>6} {size:>10} {compile_ms:>11.1f} {compiled_rate:>13,.0f} "
+                f"{compiled_rate * rule_count:>15,.0f} {naive_rate:>11,.0f} {compiled_rate / naive_rate:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+평가 점수 엔진 마이크로벤치마크
+
+    python -m benchmarks.scoring_benchmark [--company-type LME] [--sizes 1,1000,100000]
+
+회사 수별로 다음을 측정해 assessments/sec 로 출력
+- vectorize: assessment_data dict → 정규화 행렬 변환
+- score:     행렬 연산 (지표 → 하위 점수 → 총점)
+- end-to-end: vectorize + score + 추천 지표 선택
+- 비교용 per-field Python 루프 구현 (기존 방식으로 점수를 계산했을 때)
+"""
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from app.domain.assessment.model.scoring_model import ScoringModel
+from app.domain.assessment.service.scoring_engine import ScoringEngine
+
+
+def make_rows(model: ScoringModel, count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """질문의 80% 정도만 응답한 가상 회사 데이터"""
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        row = {}
+        for q, key in enumerate(model.question_keys):
+            if rng.random() < 0.8:
+                lower = float(model.lower[q])
+                row[key] = round(lower + rng.random() * float(model.span[q]), 2)
+        rows.append(row)
+    return rows
+
+
+def python_loop_score(model: ScoringModel, row: Dict[str, Any]) -> float:
+    """비교용: 필드마다 Python 으로 가중 평균을 계산하는 구현"""
+    sub_totals: Dict[int, List[float]] = {}
+    for j in range(len(model.indicator_ids)):
+        value_sum = weight_sum = 0.0
+        for q, key in enumerate(model.question_keys):
+            weight = model.w_question_indicator[q, j]
+            if weight == 0 or row.get(key) is None:
+                continue
+            x = (float(row[key]) - model.lower[q]) / model.span[q]
+            x = 1.0 - x if model.invert[q] else x
+            value_sum += min(max(x, 0.0), 1.0) * weight
+            weight_sum += weight
+        if weight_sum:
+            s = int(model.w_indicator_sub[j].argmax())
+            sub_totals.setdefault(s, [0.0, 0.0])
+            sub_totals[s][0] += value_sum / weight_sum * 100 * model.w_indicator_sub[j, s]
+            sub_totals[s][1] += model.w_indicator_sub[j, s]
+    total = weight = 0.0
+    for s, (value_sum, weight_sum) in sub_totals.items():
+        total += value_sum / weight_sum * model.w_sub_total[s]
+        weight += model.w_sub_total[s]
+    return total / weight if weight else float("nan")
+
+
+def measure(fn: Callable[[], Any], count: int, min_seconds: float = 0.5) -> float:
+    """count 건 처리 함수를 min_seconds 이상 반복 실행해 건/초 계산"""
+    fn()
+    runs, started = 0, time.perf_counter()
+    while True:
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return runs * count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="평가 점수 엔진 벤치마크")
+    parser.add_argument("--company-type", default="LME")
+    parser.add_argument("--sizes", default="1,1000,100000")
+    args = parser.parse_args()
+
+    model = ScoringEngine().model(args.company_type)
+    print(f"company_type={model.company_type} questions={model.num_questions} indicators={len(model.indicator_ids)}")
+    print(f"{'companies':>10} {'vectorize/s':>14} {'score/s':>14} {'end-to-end/s':>14} {'python loop/s':>14}")
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        rows = make_rows(model, size)
+        x, mask, _ = model.vectorize(rows)
+
+        def end_to_end():
+            batch, _ = model.score_many(rows)
+            model.recommendation_indices(batch.indicators)
+
+        vectorize_rate = measure(lambda: model.vectorize(rows), size)
+        score_rate = measure(lambda: model.score_matrix(x, mask), size)
+        e2e_rate = measure(end_to_end, size)
+        loop_rows = rows[: min(size, 10000)]
+        loop_rate = measure(lambda: [python_loop_score(model, row) for row in loop_rows], len(loop_rows))
+        print(f"{size:>10} {vectorize_rate:>14,.0f} {score_rate:>14,.0f} {e2e_rate:>14,.0f} {loop_rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Chatbot Service 서비스 초기화
+- 검색 인덱스(numpy, 임베딩 모델)와 응답 생성 백엔드처럼 무거운 모듈은 여기서만 import 하고,
+  LazyStartup 이 uvicorn 시작 직후 백그라운드에서 이 모듈을 import 한 뒤 services() 에 진입
+"""
+import logging
+import os
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from fastapi import FastAPI
+
+from app.common.session import SessionStore
+from app.domain.chat.service.answer_cache import AnswerCache
+from app.domain.chat.service.chat_backend import create_backend
+from app.domain.chat.service.chat_service import ChatService
+from app.domain.chat.service.conversation_store import ConversationStore
+from app.domain.retrieval.service.retrieval_service import RetrievalService
+
+logger = logging.getLogger("chatbot_service")
+
+
+@asynccontextmanager
+async def services(app: FastAPI):
+    # 중간에 실패하면 그때까지 시작한 것만 역순으로 정리 (지연 시작이 다시 시도할 수 있게)
+    async with AsyncExitStack() as stack:
+        # account-service 와 같은 Redis 를 바라보는 세션 저장소 (요청자의 회사/사용자 확인용, 읽기 전용으로 사용)
+        app.state.session_store = SessionStore()
+        await app.state.session_store.start()
+        stack.push_async_callback(app.state.session_store.stop)
+        # 응답 생성 백엔드는 CHAT_BACKEND 로 선택 (기본: 결정적인 로컬 스텁)
+        backend = create_backend()
+        await backend.start()
+        stack.push_async_callback(backend.stop)
+        # 근거 문서 검색 인덱스 (RETRIEVAL_INDEX_DIR 가 없으면 검색 없이 동작)
+        retrieval = RetrievalService()
+        await retrieval.start()
+        stack.push_async_callback(retrieval.stop)
+        app.state.retrieval_service = retrieval
+        # 반복 질문 답변 캐시 (ANSWER_CACHE_ENABLED=false 면 끔)
+        cache = AnswerCache() if os.getenv("ANSWER_CACHE_ENABLED", "true").lower() in ("1", "true", "yes") else None
+        # conversation_id 별 이전 대화 (REDIS_URL 이 있으면 Redis, 없으면 프로세스 메모리)
+        conversations = ConversationStore()
+        await conversations.start()
+        stack.push_async_callback(conversations.stop)
+        app.state.chat_service = ChatService(backend, retrieval=retrieval, cache=cache, conversations=conversations)
+        logger.info(
+            f"✅ 채팅 백엔드: {backend.name}, heartbeat {app.state.chat_service.heartbeat_interval}s, "
+            f"최대 {app.state.chat_service.stream_timeout}s"
+        )
+        yield
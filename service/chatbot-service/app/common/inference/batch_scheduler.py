@@ -0,0 +1,288 @@
+"""
+마이크로 배치 추론 스케줄러
+- 동시에 들어온 요청을 모아 모델을 한 번에 호출 (요청마다 따로 돌리면 CPU 행렬 연산 처리량 대부분이 버려짐)
+- 배치는 최대 크기(INFERENCE_MAX_BATCH_SIZE) 와 최대 대기(INFERENCE_MAX_WAIT_MS) 중 먼저 닿는 쪽에서 마감
+    max_wait 0   지연 우선: 워커가 비면 바로 실행 (워커가 바쁜 동안 쌓인 요청만 자연스럽게 묶임)
+    max_wait > 0 처리량 우선: 가장 오래 기다린 요청 기준으로 그만큼 더 모아서 실행
+- 길이(length)를 주면 padding 이 적게 생기도록 비슷한 길이끼리 묶음
+  가장 오래된 요청에서 시작해(굶는 요청 없음) 길이 순으로 이웃한 요청을 붙여 나가다가
+  padding 비율이 INFERENCE_MAX_PADDING 을 넘으면 멈춤 → 길이가 많이 다른 요청은 바로 다음 배치로
+- 모델은 전용 워커 스레드(기본) 또는 전용 워커 프로세스(INFERENCE_EXECUTOR=process)에서 한 번에 한 배치씩 실행
+  프로세스 모드에서는 모델 객체와 입력이 pickle 되어 전달되므로 모델은 가벼운 상태만 pickle 하도록 구현
+- 결과는 요청별 Future 로 돌려줌, 기다리던 코루틴이 취소되면 아직 실행 전인 요청은 배치에서 빠짐
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+BatchModel = Callable[[List[Any]], Sequence[Any]]
+
+
+class SchedulerBusy(RuntimeError):
+    """대기열이 가득 참 (INFERENCE_MAX_QUEUE)"""
+
+
+def _stats(values) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "p50": round(pick(0.5), 3),
+        "p95": round(pick(0.95), 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+class BatchMetrics:
+    def __init__(self, window: int):
+        self.batch_size: Deque[int] = deque(maxlen=window)
+        self.queue_wait_ms: Deque[float] = deque(maxlen=window)
+        self.run_ms: Deque[float] = deque(maxlen=window)
+        self.padding_ratio: Deque[float] = deque(maxlen=window)
+        # 처리량 계산용 (완료 시각, 건수), 최근 60초
+        self._completed: Deque[tuple] = deque()
+        self.counts = {"submitted": 0, "completed": 0, "cancelled": 0, "errors": 0, "rejected": 0, "batches": 0}
+
+    def batch_done(self, size: int, run_ms: float, padding: Optional[float]):
+        now = time.monotonic()
+        self.counts["batches"] += 1
+        self.counts["completed"] += size
+        self.batch_size.append(size)
+        self.run_ms.append(run_ms)
+        if padding is not None:
+            self.padding_ratio.append(padding)
+        self._completed.append((now, size))
+        while self._completed and self._completed[0][0] < now - 60:
+            self._completed.popleft()
+
+    def throughput(self) -> float:
+        """최근 60초 (또는 첫 완료 이후) 초당 처리 건수"""
+        if not self._completed:
+            return 0.0
+        span = max(time.monotonic() - self._completed[0][0], 1.0)
+        return round(sum(n for _, n in self._completed) / span, 1)
+
+
+@dataclass
+class _Pending:
+    item: Any
+    future: asyncio.Future
+    length: Optional[int]
+    enqueued: float = field(default_factory=time.perf_counter)
+
+
+class BatchScheduler:
+    def __init__(
+        self,
+        model: BatchModel,
+        name: str = "model",
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        max_queue: Optional[int] = None,
+        max_padding: Optional[float] = None,
+        executor: Optional[str] = None,
+        window: Optional[int] = None,
+    ):
+        self.model = model
+        self.name = name
+        self.max_batch_size = max_batch_size or int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "32"))
+        self.max_wait_ms = max_wait_ms if max_wait_ms is not None else float(os.getenv("INFERENCE_MAX_WAIT_MS", "0"))
+        self.max_queue = max_queue or int(os.getenv("INFERENCE_MAX_QUEUE", "1024"))
+        self.max_padding = max_padding if max_padding is not None else float(os.getenv("INFERENCE_MAX_PADDING", "0.5"))
+        self.executor_kind = executor or os.getenv("INFERENCE_EXECUTOR", "thread")
+        if self.executor_kind not in ("thread", "process"):
+            raise ValueError(f"알 수 없는 INFERENCE_EXECUTOR: {self.executor_kind} (thread / process)")
+        self.metrics = BatchMetrics(window or int(os.getenv("INFERENCE_METRICS_WINDOW", "1000")))
+        self._pending: List[_Pending] = []
+        self._wakeup = asyncio.Event()
+        self._executor: Optional[Executor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = 0
+
+    async def start(self):
+        if self._task is not None:
+            return
+        if self.executor_kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=1)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"infer-{self.name}")
+        self._task = asyncio.create_task(self._dispatch_loop())
+        logger.info(
+            f"✅ 추론 스케줄러 시작: {self.name} (batch ≤ {self.max_batch_size}, wait ≤ {self.max_wait_ms}ms, "
+            f"{self.executor_kind})"
+        )
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for pending in self._pending:
+            pending.future.cancel()
+        self._pending.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def submit(self, item: Any, length: Optional[int] = None) -> Any:
+        """item 을 배치에 넣고 결과를 기다림 (모델 오류는 그대로 전파, 대기열이 가득 차면 SchedulerBusy)"""
+        if self._task is None:
+            raise RuntimeError(f"추론 스케줄러가 시작되지 않았습니다: {self.name}")
+        if len(self._pending) >= self.max_queue:
+            self.metrics.counts["rejected"] += 1
+            raise SchedulerBusy(f"추론 대기열이 가득 찼습니다: {self.name} ({self.max_queue})")
+        pending = _Pending(item, asyncio.get_running_loop().create_future(), length)
+        self._pending.append(pending)
+        self.metrics.counts["submitted"] += 1
+        self._wakeup.set()
+        try:
+            return await pending.future
+        except asyncio.CancelledError:
+            if not pending.future.done():
+                pending.future.cancel()
+            raise
+
+    # ---- 배치 구성 ---------------------------------------------------------
+
+    def _drop_cancelled(self):
+        alive = [p for p in self._pending if not p.future.done()]
+        self.metrics.counts["cancelled"] += len(self._pending) - len(alive)
+        self._pending = alive
+
+    def _take(self) -> List[_Pending]:
+        """가장 오래된 요청 + (길이가 있으면) 그와 길이가 가까운 요청들"""
+        self._drop_cancelled()
+        if any(p.length is None for p in self._pending):
+            batch, self._pending = self._pending[:self.max_batch_size], self._pending[self.max_batch_size:]
+            return batch
+        # 기다리는 동안 전부 취소됐을 수 있음
+        if not self._pending:
+            return []
+        oldest = self._pending[0]
+        ordered = sorted(self._pending, key=lambda p: p.length)
+        lengths = [p.length for p in ordered]
+        lo = hi = next(i for i, p in enumerate(ordered) if p is oldest)
+        total = lengths[lo]
+        while hi - lo + 1 < self.max_batch_size:
+            # 양옆 중 padding 이 덜 늘어나는 쪽으로 한 칸씩 (길이 순 정렬이므로 최대 길이는 lengths[hi])
+            options = []
+            count = hi - lo + 2
+            if lo > 0:
+                options.append((1 - (total + lengths[lo - 1]) / (max(lengths[hi], 1) * count), lo - 1, hi))
+            if hi < len(ordered) - 1:
+                options.append((1 - (total + lengths[hi + 1]) / (max(lengths[hi + 1], 1) * count), lo, hi + 1))
+            if not options:
+                break
+            padding, new_lo, new_hi = min(options)
+            if padding > self.max_padding:
+                break
+            total += lengths[new_lo] if new_lo < lo else lengths[new_hi]
+            lo, hi = new_lo, new_hi
+        chosen = {id(p) for p in ordered[lo:hi + 1]}
+        batch = [p for p in self._pending if id(p) in chosen]
+        self._pending = [p for p in self._pending if id(p) not in chosen]
+        return batch
+
+    async def _dispatch_loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            batch: List[_Pending] = []
+            try:
+                self._drop_cancelled()
+                if not self._pending:
+                    continue
+                # 가장 오래 기다린 요청 기준으로 max_wait 까지 배치를 채움 (워커가 바빴던 동안 기다린 시간 포함)
+                deadline = self._pending[0].enqueued + self.max_wait_ms / 1000
+                while self._pending and len(self._pending) < self.max_batch_size:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    self._wakeup.clear()
+                batch = self._take()
+                if self._pending:
+                    self._wakeup.set()
+                if batch:
+                    await self._run(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 예외 하나로 디스패처가 멈추지 않도록 해당 요청만 실패 처리하고 계속
+                # (배치를 고르기 전이면 같은 상태로 다시 돌아도 같은 예외이므로 대기 중인 요청 전체)
+                failed = batch
+                if not failed:
+                    failed, self._pending = self._pending, []
+                failed = [p for p in failed if not p.future.done()]
+                self.metrics.counts["errors"] += len(failed)
+                logger.error(f"❌ 배치 디스패치 오류: {self.name}, {len(failed)}건 실패 처리, {type(e).__name__}: {e}")
+                for pending in failed:
+                    pending.future.set_exception(e)
+
+    async def _run(self, batch: List[_Pending]):
+        started = time.perf_counter()
+        for pending in batch:
+            self.metrics.queue_wait_ms.append((started - pending.enqueued) * 1000)
+        lengths = [p.length for p in batch if p.length is not None]
+        padding = None
+        if lengths and len(lengths) == len(batch) and max(lengths) > 0:
+            padding = 1 - sum(lengths) / (max(lengths) * len(lengths))
+        self._running = len(batch)
+        try:
+            outputs = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.model, [p.item for p in batch]
+            )
+            if len(outputs) != len(batch):
+                raise RuntimeError(f"모델 출력 수 불일치: 입력 {len(batch)}개, 출력 {len(outputs)}개")
+        except asyncio.CancelledError:
+            for pending in batch:
+                pending.future.cancel()
+            raise
+        except Exception as e:
+            self.metrics.counts["errors"] += len(batch)
+            logger.error(f"❌ 배치 추론 실패: {self.name}, {len(batch)}건, {type(e).__name__}: {e}")
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+        finally:
+            self._running = 0
+        self.metrics.batch_done(len(batch), (time.perf_counter() - started) * 1000, padding)
+        for pending, output in zip(batch, outputs):
+            if pending.future.done():
+                self.metrics.counts["cancelled"] += 1
+            else:
+                pending.future.set_result(output)
+
+    def stats(self) -> Dict[str, Any]:
+        metrics = self.metrics
+        return {
+            "name": self.name,
+            "executor": self.executor_kind,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "max_padding": self.max_padding,
+            "queued": len(self._pending),
+            "running": self._running,
+            **metrics.counts,
+            "throughput_per_sec": metrics.throughput(),
+            "batch_size": _stats(metrics.batch_size),
+            "queue_wait_ms": _stats(metrics.queue_wait_ms),
+            "run_ms": _stats(metrics.run_ms),
+            "padding_ratio": _stats(metrics.padding_ratio),
+        }
@@ -0,0 +1,66 @@
+"""
+요청 문맥 (request id / user id)
+- RequestContextMiddleware: X-Request-ID 헤더를 받거나(게이트웨이가 붙여 보냄) 없으면 새로 만들어
+  요청이 끝날 때까지 contextvar 에 두고 응답 헤더에도 붙임 → 이 요청 중 남긴 로그에 request_id 가 들어감
+- bind_user(user_id): 인증을 확인한 뒤 호출하면 이후 로그에 user_id 가 들어감
+- 순수 ASGI 미들웨어 (SSE 같은 스트리밍 응답도 버퍼링하지 않음)
+"""
+import re
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+REQUEST_ID_HEADER = "x-request-id"
+# 밖에서 온 값은 이 형식만 받음 (로그 색인 키로 쓰므로)
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+_user_id: ContextVar[Optional[str]] = ContextVar("user_id", default=None)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def current_user_id() -> Optional[str]:
+    return _user_id.get()
+
+
+def bind_user(user_id: Optional[str]):
+    _user_id.set(str(user_id) if user_id else None)
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex
+
+
+class RequestContextMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if _VALID_REQUEST_ID.match(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or new_request_id()
+        request_token = _request_id.set(request_id)
+        user_token = _user_id.set(None)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _request_id.reset(request_token)
+            _user_id.reset(user_token)
@@ -0,0 +1,256 @@
+"""
+세션 저장소 (2단 구조)
+- 1단: 프로세스 내 LRU + TTL 캐시 → 프로필 조회는 딕셔너리 조회로 끝남
+- 2단: Redis (REDIS_URL) → 쓰기는 모아서 파이프라인으로 기록 (write-behind)
+- 로그아웃은 Redis pub/sub 으로 전파되어 모든 레플리카의 1단 캐시에서 즉시 제거
+- 로그아웃한 토큰은 revoked:{jti} 로 남은 수명 동안 기록되고 token:revoked 채널로 게이트웨이에 전파
+REDIS_URL 이 없거나 redis 패키지가 없으면 1단 캐시만으로 동작 (로컬 개발용)
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import secrets
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.common.cache import LRUTTLCache
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # 선택 의존성
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+SESSION_COOKIE_NAME = "session_token"
+SESSION_KEY_PREFIX = "session:"
+INVALIDATION_CHANNEL = "session:invalidate"
+REVOKED_KEY_PREFIX = "revoked:"
+REVOCATION_CHANNEL = "token:revoked"
+
+
+def token_id(token: str) -> str:
+    """
+    토큰 식별자(jti)
+    JWT 에 jti 클레임이 있으면 그대로, 아니면 토큰 원문 대신 SHA-256 앞 32자리를 사용
+    """
+    parts = token.split(".")
+    if len(parts) == 3:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4)))
+            if isinstance(payload, dict) and payload.get("jti"):
+                return str(payload["jti"])
+        except (ValueError, UnicodeDecodeError):
+            pass
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:32]
+
+
+def extract_session_token(request) -> Optional[str]:
+    """Authorization: Bearer 헤더 또는 session_token 쿠키에서 세션 토큰 추출"""
+    auth_header = request.headers.get("authorization")
+    if auth_header:
+        scheme, _, value = auth_header.partition(" ")
+        if scheme.lower() == "bearer" and value.strip():
+            return value.strip()
+    return request.cookies.get(SESSION_COOKIE_NAME)
+
+
+class SessionStore:
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        ttl: Optional[int] = None,
+        local_maxsize: Optional[int] = None,
+        local_ttl: Optional[float] = None,
+        flush_interval_ms: Optional[float] = None,
+        flush_batch_size: int = 500,
+    ):
+        self.redis_url = redis_url if redis_url is not None else os.getenv("REDIS_URL")
+        self.ttl = ttl or int(os.getenv("SESSION_TTL_SECONDS", "86400"))
+        self.local_ttl = local_ttl or float(os.getenv("SESSION_LOCAL_TTL_SECONDS", "300"))
+        self.flush_interval = (flush_interval_ms or float(os.getenv("SESSION_FLUSH_INTERVAL_MS", "5"))) / 1000
+        self.flush_batch_size = flush_batch_size
+        self._local = LRUTTLCache(
+            maxsize=local_maxsize or int(os.getenv("SESSION_LOCAL_MAXSIZE", "10000")),
+            ttl=self.local_ttl,
+        )
+        self._redis = None
+        # 아직 Redis 에 기록되지 않은 세션 (token -> (직렬화된 값, 만료 시각))
+        self._pending: Dict[str, Tuple[str, float]] = {}
+        # 지금 파이프라인으로 기록 중인 토큰과, 그 사이 로그아웃되어 기록 뒤 다시 지워야 하는 토큰
+        self._inflight: Set[str] = set()
+        self._evicted_inflight: Set[str] = set()
+        self._flush_event = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._subscribe_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_distributed(self) -> bool:
+        return self._redis is not None
+
+    async def start(self):
+        """Redis 연결 및 백그라운드 태스크 시작"""
+        if self.redis_url and aioredis is not None:
+            try:
+                self._redis = aioredis.from_url(self.redis_url, decode_responses=True)
+                await self._redis.ping()
+                self._flush_task = asyncio.create_task(self._flush_loop())
+                self._subscribe_task = asyncio.create_task(self._subscribe_loop())
+                logger.info(f"✅ 세션 저장소 Redis 연결: {self.redis_url}")
+                return
+            except Exception as e:
+                logger.warning(f"⚠️ Redis 연결 실패, 로컬 세션 저장소로 동작: {e}")
+                self._redis = None
+        elif self.redis_url:
+            logger.warning("⚠️ redis 패키지가 없어 로컬 세션 저장소로 동작")
+
+        # 로컬 전용 모드에서는 1단 캐시가 원본이므로 세션 TTL 을 그대로 적용
+        self._local.ttl = self.ttl
+        logger.info("✅ 로컬 세션 저장소 사용")
+
+    async def stop(self):
+        """남은 쓰기를 기록하고 종료"""
+        for task in (self._subscribe_task, self._flush_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        if self._redis is not None:
+            try:
+                while self._pending:
+                    await self._flush_pending()
+            except Exception as e:
+                logger.error(f"❌ 종료 중 세션 기록 실패 ({len(self._pending)}건 유실): {e}")
+            await self._redis.aclose()
+            self._redis = None
+
+    async def create(self, data: Dict[str, Any]) -> str:
+        """새 세션 생성 후 토큰 반환"""
+        token = secrets.token_urlsafe(32)
+        session = {**data, "created_at": int(time.time())}
+        self._local.set(token, session)
+        if self._redis is not None:
+            self._pending[token] = (json.dumps(session), time.time() + self.ttl)
+            self._flush_event.set()
+        return token
+
+    async def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """세션 조회 (로컬 캐시 → Redis 순)"""
+        session = self._local.get(token)
+        if session is not None or self._redis is None:
+            return session
+
+        pending = self._pending.get(token)
+        if pending is not None:
+            raw = pending[0]
+        else:
+            try:
+                raw = await self._redis.get(SESSION_KEY_PREFIX + token)
+            except Exception as e:
+                logger.error(f"❌ 세션 조회 실패: {e}")
+                return None
+        if raw is None:
+            return None
+        session = json.loads(raw)
+        self._local.set(token, session)
+        return session
+
+    def _evict(self, token: str) -> None:
+        """로컬 캐시와 쓰기 대기열에서 제거 (대기열에 남으면 flush 가 로그아웃된 세션을 되살림)"""
+        self._local.pop(token)
+        self._pending.pop(token, None)
+        if token in self._inflight:
+            self._evicted_inflight.add(token)
+
+    async def delete(self, token: str) -> None:
+        """세션 삭제, 다른 레플리카에 무효화 전파 및 토큰 폐기 기록"""
+        self._evict(token)
+        if self._redis is None:
+            return
+        jti = token_id(token)
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.delete(SESSION_KEY_PREFIX + token)
+                pipe.publish(INVALIDATION_CHANNEL, token)
+                # 세션 최대 수명 동안만 폐기 목록에 유지 (이후에는 토큰 자체가 만료)
+                pipe.set(REVOKED_KEY_PREFIX + jti, 1, ex=self.ttl)
+                pipe.publish(REVOCATION_CHANNEL, f"{jti}:{self.ttl}")
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"❌ 세션 삭제 전파 실패: {e}")
+
+    async def _flush_loop(self):
+        """대기 중인 세션 쓰기를 flush_interval 단위로 모아서 기록"""
+        while True:
+            await self._flush_event.wait()
+            await asyncio.sleep(self.flush_interval)
+            self._flush_event.clear()
+            try:
+                await self._flush_pending()
+            except Exception as e:
+                logger.error(f"❌ 세션 기록 실패, 재시도 예정: {e}")
+                await asyncio.sleep(1)
+            if self._pending:
+                self._flush_event.set()
+
+    async def _flush_pending(self):
+        batch = []
+        for token in list(self._pending)[: self.flush_batch_size]:
+            batch.append((token, self._pending.pop(token)))
+        if not batch:
+            return
+
+        now = time.time()
+        self._inflight.update(token for token, _ in batch)
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for token, (raw, expires_at) in batch:
+                    ttl = int(expires_at - now)
+                    if ttl > 0:
+                        pipe.set(SESSION_KEY_PREFIX + token, raw, ex=ttl)
+                await pipe.execute()
+        except Exception:
+            # 기록 실패분은 (그 사이 로그아웃되지 않았다면) 다시 대기열로
+            for token, value in batch:
+                if token in self._local and token not in self._evicted_inflight:
+                    self._pending.setdefault(token, value)
+            raise
+        finally:
+            self._inflight.difference_update(token for token, _ in batch)
+            evicted = [token for token, _ in batch if token in self._evicted_inflight]
+            self._evicted_inflight.difference_update(evicted)
+        if evicted:
+            # 기록 중에 로그아웃된 세션은 로그아웃의 DEL 보다 늦게 SET 되었을 수 있으므로 다시 지움
+            await self._redis.delete(*(SESSION_KEY_PREFIX + token for token in evicted))
+
+    async def _subscribe_loop(self):
+        """다른 레플리카의 로그아웃 이벤트 수신 → 로컬 캐시와 쓰기 대기열에서 제거"""
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._evict(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ 세션 무효화 구독 오류, 재연결: {e}")
+                # 끊긴 동안 놓친 무효화가 있을 수 있으므로 로컬 캐시 비움
+                self._local.clear()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """세션 저장소 상태"""
+        return {
+            "backend": "redis" if self._redis is not None else "local",
+            "pending_writes": len(self._pending),
+            "local_cache": self._local.stats(),
+        }
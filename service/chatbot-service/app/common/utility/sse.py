@@ -0,0 +1,16 @@
+"""
+Server-Sent Events 프레임 직렬화
+- 한 이벤트 = "id: ...\nevent: ...\ndata: ...\n\n", data 는 한 줄 JSON (줄바꿈은 JSON 이스케이프로 처리됨)
+"""
+import json
+from typing import Any, Optional
+
+
+def format_event(event: str, data: Any, event_id: Optional[str] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
@@ -0,0 +1,26 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+MAX_MESSAGE_CHARS = 4000
+
+
+class ChatMessage(BaseModel):
+    role: Literal["system", "user", "assistant"]
+    content: str = Field(..., max_length=MAX_MESSAGE_CHARS)
+
+
+class ChatRequest(BaseModel):
+    message: str = Field(..., min_length=1, max_length=MAX_MESSAGE_CHARS)
+    history: List[ChatMessage] = Field(default_factory=list, max_length=50)
+    conversation_id: Optional[str] = Field(default=None, max_length=100)
+    # 근거 문서 검색/답변 캐시 범위 (공용 문서 + 이 회사 문서), 없으면 공용 문서만
+    # 라우터가 로그인 세션의 회사로 덮어씀 (클라이언트가 보낸 값은 쓰지 않음)
+    company_id: Optional[str] = Field(default=None, max_length=100)
+    # 저장된 대화(conversation_id)의 소유자, 라우터가 로그인 세션의 사용자로 덮어씀
+    user_id: Optional[str] = Field(default=None, max_length=200)
+    max_tokens: Optional[int] = Field(default=None, ge=1, le=4096)
+
+    def messages(self) -> List[dict]:
+        """백엔드로 보낼 대화 (이전 대화 + 이번 질문)"""
+        return [m.model_dump() for m in self.history] + [{"role": "user", "content": self.message}]
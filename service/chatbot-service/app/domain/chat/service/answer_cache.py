@@ -0,0 +1,369 @@
+"""
+답변 캐시 (같은 질문이 반복될 때 생성 없이 이전 답변을 그대로 스트리밍)
+- exact:    정규화한 질문(NFKC, 소문자, 문장부호/공백 정리) + 문맥 해시가 같으면 적중
+- semantic: 질문 임베딩의 코사인 유사도가 ANSWER_CACHE_SIMILARITY 이상이면 적중
+            후보는 random hyperplane LSH (LSH_TABLES 개 테이블 × LSH_BITS 비트) 버킷에서만 찾고 정확한 유사도로 재확인
+            숫자/영문 용어(연도, E/S/G, 지표 코드 등)가 하나라도 다르면 유사도와 상관없이 적중하지 않음
+            기본 임베딩일 때는 두 질문의 단어가 서로 상대 질문에 모두 들어 있어야 함
+            (어간이 같거나 bigram 절반 이상이 겹침 → 띄어쓰기/조사/문장부호 차이는 통과, 주제어가 하나라도 다르면 탈락)
+- 범위(scope): 회사 + 문맥 해시(이전 대화, 응답 백엔드, 검색 인덱스 build_id, 근거 문서 수, max_tokens)
+  exact 키와 LSH 버킷 키에 모두 들어가므로 다른 회사의 답변이나 다른 문맥의 답변은 후보에도 오르지 않음
+- 용량(ANSWER_CACHE_MAX_ENTRIES)을 넘으면 가장 오래 안 쓴 답변부터 제거(LRU), 저장 후 ANSWER_CACHE_TTL_SECONDS 가 지나면 만료
+- 기본 임베딩은 형태소 없는 토큰(어간 + bigram)의 feature hashing 이라 같은 단어로 된 질문의 표기 차이만 잡음,
+  의미가 같은 다른 표현까지 잡으려면 ANSWER_CACHE_EMBEDDER=package.module:callable (문자열 → 1차원 벡터) 로
+  문장 임베딩 모델을 연결하고 그 모델에 맞게 ANSWER_CACHE_SIMILARITY 를 정함 (단어 확인은 하지 않음)
+"""
+import asyncio
+import hashlib
+import importlib
+import json
+import logging
+import os
+import re
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import Any, Callable, Deque, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.domain.retrieval.model.retrieval_index import hashed_dims, term_hash
+from app.domain.retrieval.model.tokenizer import tokenize, word_tokens
+from .chat_metrics import percentiles
+
+logger = logging.getLogger(__name__)
+
+# 한 범위에 답변 100,000개일 때 재현율 0.98, 전체 비교보다 약 8배 빠름 (benchmarks/answer_cache_benchmark.py)
+LSH_TABLES = 24
+LSH_BITS = 12
+EMBEDDING_DIM = 512
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+Embedder = Callable[[str], Optional[np.ndarray]]
+
+
+def normalize_question(text: str) -> str:
+    """exact 키용: 대소문자/전각/문장부호/공백 차이를 없앰"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return _SPACES.sub(" ", _PUNCTUATION.sub(" ", text)).strip()
+
+
+def lexical_embedding(text: str, dim: int = EMBEDDING_DIM) -> Optional[np.ndarray]:
+    """검색 토크나이저 토큰의 feature hashing (1 + log tf), 단위 벡터"""
+    tokens = tokenize(text)
+    if not tokens:
+        return None
+    terms, counts = np.unique(tokens, return_counts=True)
+    dims, signs = hashed_dims(np.array([term_hash(t) for t in terms], np.uint64), dim)
+    vector = np.zeros(dim, np.float32)
+    np.add.at(vector, dims, signs * (1 + np.log(counts)).astype(np.float32))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else None
+
+
+def load_embedder(name: Optional[str] = None) -> Optional[Embedder]:
+    """ANSWER_CACHE_EMBEDDER="package.module:callable", 없으면 None (기본 lexical_embedding 사용)"""
+    name = name or os.getenv("ANSWER_CACHE_EMBEDDER", "")
+    if not name:
+        return None
+    module_name, _, attr = name.partition(":")
+    if not attr:
+        raise ValueError(f"ANSWER_CACHE_EMBEDDER 형식 오류: {name} (package.module:callable)")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def context_hash(**context: Any) -> str:
+    """답변에 영향을 주는 질문 외 문맥 → 짧은 해시"""
+    payload = json.dumps(context, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _covers(words: Tuple[Tuple[str, ...], ...], terms: FrozenSet[str]) -> bool:
+    """words 의 모든 단어가 terms 에 있음 (어간 일치 또는 bigram 절반 이상)"""
+    for tokens in words:
+        if tokens[0] in terms:
+            continue
+        bigrams = tokens[1:]
+        if not bigrams or sum(t in terms for t in bigrams) * 2 < len(bigrams):
+            return False
+    return True
+
+
+@dataclass
+class CacheQuery:
+    question: str
+    scope: Tuple[str, str]  # (회사, 문맥 해시)
+    normalized: str
+    words: Tuple[Tuple[str, ...], ...]
+    terms: FrozenSet[str]
+    anchors: FrozenSet[str]
+    vector: Optional[np.ndarray] = None
+    embedded: bool = False
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        return (*self.scope, self.normalized)
+
+
+@dataclass
+class CachedAnswer:
+    key: Tuple[str, str, str]
+    question: str
+    words: Tuple[Tuple[str, ...], ...]
+    terms: FrozenSet[str]
+    anchors: FrozenSet[str]
+    text: str
+    offsets: array  # 토큰별 끝 위치 (토큰마다 str 객체를 두지 않도록 이어 붙여 보관)
+    sources: List[Dict[str, Any]]
+    compute_ms: float
+    expires: float
+    slot: Optional[int] = None
+    codes: Tuple[int, ...] = ()
+    hits: int = 0
+
+    def tokens(self) -> Iterator[str]:
+        start = 0
+        for end in self.offsets:
+            yield self.text[start:end]
+            start = end
+
+
+@dataclass
+class CacheHit:
+    answer: CachedAnswer
+    tier: str  # exact / semantic
+    similarity: float = 1.0
+
+
+@dataclass
+class CacheMetrics:
+    counts: Dict[str, int] = field(default_factory=lambda: {
+        "lookups": 0, "exact_hits": 0, "semantic_hits": 0, "misses": 0,
+        "stored": 0, "evicted": 0, "expired": 0, "saved_tokens": 0,
+    })
+    saved_ms: float = 0.0
+    lookup_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+    semantic_similarity: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+
+
+class AnswerCache:
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+        similarity: Optional[float] = None,
+        embedder: Optional[Embedder] = None,
+        seed: int = 0,
+    ):
+        self.max_entries = max_entries or int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "10000"))
+        self.ttl = ttl or float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+        self.similarity = similarity or float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.8"))
+        custom = embedder or load_embedder()
+        self.embedder: Embedder = custom or lexical_embedding
+        self.embedder_name = getattr(custom, "__name__", type(custom).__name__) if custom else "lexical"
+        # 외부 모델은 이벤트 루프를 막지 않도록 스레드에서 실행
+        self._embed_in_thread = custom is not None
+        self._lexical = custom is None
+        self._seed = seed
+        self.metrics = CacheMetrics()
+        self._entries: "OrderedDict[Tuple[str, str, str], CachedAnswer]" = OrderedDict()
+        # 임베딩은 슬롯 번호로 한 행렬에 보관 (차원은 첫 임베딩에서 정함)
+        self._vectors: Optional[np.ndarray] = None
+        self._planes: Optional[np.ndarray] = None
+        self._slots: List[Optional[CachedAnswer]] = []
+        self._free: List[int] = []
+        self._buckets: Dict[Tuple[str, str, int, int], List[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def query(self, question: str, company_id: Optional[str], context: str) -> CacheQuery:
+        words = tuple(word_tokens(question))
+        terms = frozenset(t for tokens in words for t in tokens)
+        anchors = frozenset(tokens[0] for tokens in words if not "가" <= tokens[0][0] <= "힣")
+        return CacheQuery(question, (company_id or "", context), normalize_question(question), words, terms, anchors)
+
+    # ---- 조회 / 저장 -------------------------------------------------------
+
+    async def lookup(self, query: CacheQuery) -> Optional[CacheHit]:
+        started = time.perf_counter()
+        self.metrics.counts["lookups"] += 1
+        hit = self._exact(query)
+        if hit is None and self.similarity < 1:
+            await self._embed(query)
+            hit = self._semantic(query)
+        self.metrics.lookup_ms.append((time.perf_counter() - started) * 1000)
+        if hit is None:
+            self.metrics.counts["misses"] += 1
+            return None
+        answer = hit.answer
+        answer.hits += 1
+        self._entries.move_to_end(answer.key)
+        self.metrics.counts[f"{hit.tier}_hits"] += 1
+        self.metrics.counts["saved_tokens"] += len(answer.offsets)
+        self.metrics.saved_ms += answer.compute_ms
+        if hit.tier == "semantic":
+            self.metrics.semantic_similarity.append(hit.similarity)
+        return hit
+
+    async def store(self, query: CacheQuery, tokens: List[str], sources: List[Dict[str, Any]], compute_ms: float):
+        """완료된 답변 저장 (같은 키가 있으면 교체)"""
+        if not tokens or not query.normalized:
+            return
+        await self._embed(query)
+        old = self._entries.pop(query.key, None)
+        if old is not None:
+            self._release(old)
+        answer = CachedAnswer(
+            key=query.key,
+            question=query.question,
+            words=query.words,
+            terms=query.terms,
+            anchors=query.anchors,
+            text="".join(tokens),
+            offsets=array("I", accumulate(map(len, tokens))),
+            sources=sources,
+            compute_ms=round(compute_ms, 1),
+            expires=time.monotonic() + self.ttl,
+        )
+        while len(self._entries) >= self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._release(evicted)
+            self.metrics.counts["evicted"] += 1
+        self._entries[answer.key] = answer
+        if query.vector is not None:
+            self._index(answer, query)
+        self.metrics.counts["stored"] += 1
+
+    def clear(self, company_id: Optional[str] = None) -> int:
+        """company_id 의 답변(없으면 전체)을 지움, 지운 수"""
+        targets = [a for key, a in self._entries.items() if company_id is None or key[0] == company_id]
+        for answer in targets:
+            del self._entries[answer.key]
+            self._release(answer)
+        return len(targets)
+
+    # ---- exact / semantic ---------------------------------------------------
+
+    def _alive(self, answer: CachedAnswer) -> bool:
+        if answer.expires > time.monotonic():
+            return True
+        del self._entries[answer.key]
+        self._release(answer)
+        self.metrics.counts["expired"] += 1
+        return False
+
+    def _exact(self, query: CacheQuery) -> Optional[CacheHit]:
+        answer = self._entries.get(query.key)
+        if answer is None or not self._alive(answer):
+            return None
+        return CacheHit(answer, "exact")
+
+    async def _embed(self, query: CacheQuery):
+        if query.embedded:
+            return
+        query.embedded = True
+        if not query.normalized:
+            return
+        try:
+            if self._embed_in_thread:
+                vector = await asyncio.to_thread(self.embedder, query.question)
+            else:
+                vector = self.embedder(query.question)
+        except Exception as e:
+            logger.warning(f"⚠️ 답변 캐시 질문 임베딩 실패 (semantic 건너뜀): {type(e).__name__}: {e}")
+            return
+        if vector is None:
+            return
+        vector = np.asarray(vector, np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        if norm == 0 or (self._vectors is not None and len(vector) != self._vectors.shape[1]):
+            return
+        query.vector = vector / norm
+
+    def _codes(self, vector: np.ndarray) -> Tuple[int, ...]:
+        if self._planes is None:
+            rng = np.random.default_rng(self._seed)
+            self._planes = rng.standard_normal((LSH_TABLES * LSH_BITS, len(vector))).astype(np.float32)
+            self._vectors = np.zeros((min(self.max_entries, 1024), len(vector)), np.float32)
+        bits = (self._planes @ vector > 0).reshape(LSH_TABLES, LSH_BITS)
+        return tuple(int(code) for code in bits @ (1 << np.arange(LSH_BITS)))
+
+    def _semantic(self, query: CacheQuery) -> Optional[CacheHit]:
+        if query.vector is None or self._vectors is None:
+            return None
+        company, context = query.scope
+        candidates: Set[int] = set()
+        for table, code in enumerate(self._codes(query.vector)):
+            candidates.update(self._buckets.get((company, context, table, code), ()))
+        if not candidates:
+            return None
+        slots = np.fromiter(candidates, np.int64, len(candidates))
+        scores = self._vectors[slots] @ query.vector
+        for i in np.argsort(-scores):
+            if scores[i] < self.similarity:
+                break
+            answer = self._slots[slots[i]]
+            if self._matches(query, answer) and self._alive(answer):
+                return CacheHit(answer, "semantic", round(float(scores[i]), 4))
+        return None
+
+    def _matches(self, query: CacheQuery, answer: CachedAnswer) -> bool:
+        # 연도/지표 코드처럼 숫자·영문 용어가 다르면 다른 질문
+        if answer.key[:2] != query.scope or answer.anchors != query.anchors:
+            return False
+        return not self._lexical or (_covers(query.words, answer.terms) and _covers(answer.words, query.terms))
+
+    def _index(self, answer: CachedAnswer, query: CacheQuery):
+        answer.codes = self._codes(query.vector)
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._slots)
+            self._slots.append(None)
+            if slot >= len(self._vectors):
+                grown = np.zeros((min(self.max_entries, len(self._vectors) * 2), self._vectors.shape[1]), np.float32)
+                grown[:len(self._vectors)] = self._vectors
+                self._vectors = grown
+        self._vectors[slot] = query.vector
+        self._slots[slot] = answer
+        answer.slot = slot
+        company, context, _ = answer.key
+        for table, code in enumerate(answer.codes):
+            self._buckets[(company, context, table, code)].append(slot)
+
+    def _release(self, answer: CachedAnswer):
+        if answer.slot is None:
+            return
+        company, context, _ = answer.key
+        for table, code in enumerate(answer.codes):
+            bucket = self._buckets.get((company, context, table, code))
+            if bucket is not None and answer.slot in bucket:
+                bucket.remove(answer.slot)
+                if not bucket:
+                    del self._buckets[(company, context, table, code)]
+        self._slots[answer.slot] = None
+        self._free.append(answer.slot)
+        answer.slot = None
+
+    def stats(self) -> Dict[str, Any]:
+        counts = self.metrics.counts
+        hits = counts["exact_hits"] + counts["semantic_hits"]
+        return {
+            "enabled": True,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "similarity": self.similarity,
+            "embedder": self.embedder_name,
+            **counts,
+            "hit_rate": round(hits / counts["lookups"], 4) if counts["lookups"] else None,
+            "saved_compute_ms": round(self.metrics.saved_ms, 1),
+            "lookup_ms": percentiles(self.metrics.lookup_ms),
+            "semantic_similarity": percentiles(self.metrics.semantic_similarity),
+        }
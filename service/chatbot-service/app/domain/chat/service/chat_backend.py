@@ -0,0 +1,147 @@
+"""
+응답 생성 백엔드
+- stream() 은 토큰(텍스트 조각)을 하나씩 내보내는 async generator
+  소비자가 중간에 그만두면(클라이언트 연결 끊김) aclose() 로 정리되므로 업스트림 요청도 함께 끊김
+- CHAT_BACKEND 로 선택
+    stub   결정적인 로컬 스텁 (같은 입력이면 항상 같은 토큰, 외부 호출 없음, 기본값)
+    openai OpenAI 호환 /chat/completions 스트리밍 (CHAT_API_BASE, CHAT_API_KEY, CHAT_MODEL)
+    "package.module:Class" 형태로 직접 만든 백엔드도 지정 가능
+"""
+import asyncio
+import importlib
+import json
+import logging
+import os
+import re
+from typing import AsyncIterator, Dict, List, Optional, Type
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\S+\s*")
+
+
+class ChatBackend:
+    name = "base"
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def stream(self, messages: List[dict], max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+
+class StubChatBackend(ChatBackend):
+    """입력으로부터 정해진 답변을 만들어 단어 단위로 흘려보내는 테스트/로컬 개발용 백엔드"""
+
+    name = "stub"
+
+    def __init__(self, token_delay: Optional[float] = None, first_token_delay: Optional[float] = None):
+        self.token_delay = (
+            token_delay if token_delay is not None else float(os.getenv("CHAT_STUB_TOKEN_DELAY_MS", "20")) / 1000
+        )
+        self.first_token_delay = (
+            first_token_delay if first_token_delay is not None
+            else float(os.getenv("CHAT_STUB_FIRST_TOKEN_MS", "0")) / 1000
+        )
+
+    @staticmethod
+    def reply(messages: List[dict]) -> str:
+        question = messages[-1]["content"].strip()
+        turns = sum(1 for m in messages if m["role"] == "user")
+        return (
+            f"질문 \"{question}\" 을(를) 받았습니다. "
+            f"이 대화의 {turns}번째 질문이며, 이 응답은 로컬 스텁 백엔드가 생성했습니다."
+        )
+
+    async def stream(self, messages: List[dict], max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        tokens = _TOKEN_PATTERN.findall(self.reply(messages))
+        if max_tokens is not None:
+            tokens = tokens[:max_tokens]
+        if self.first_token_delay:
+            await asyncio.sleep(self.first_token_delay)
+        for i, token in enumerate(tokens):
+            if i and self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield token
+
+
+class OpenAIChatBackend(ChatBackend):
+    """OpenAI 호환 API 스트리밍 (data: {...} 줄 단위 SSE 응답을 토큰으로 변환)"""
+
+    name = "openai"
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.base_url = (base_url or os.getenv("CHAT_API_BASE", "https://api.openai.com/v1")).rstrip("/")
+        self.api_key = api_key or os.getenv("CHAT_API_KEY", "")
+        self.model = model or os.getenv("CHAT_MODEL", "gpt-4o-mini")
+        self.system_prompt = os.getenv("CHAT_SYSTEM_PROMPT")
+        self.client = client
+        self._owns_client = client is None
+
+    async def start(self):
+        if self.client is None:
+            # 연결 수립은 짧게, 토큰 사이 대기는 길게 (생성이 느린 모델도 끊기지 않도록)
+            self.client = httpx.AsyncClient(
+                timeout=httpx.Timeout(float(os.getenv("CHAT_API_TIMEOUT_SECONDS", "60")), connect=5.0),
+                limits=httpx.Limits(max_connections=int(os.getenv("CHAT_API_MAX_CONNECTIONS", "50"))),
+            )
+        if not self.api_key:
+            logger.warning("⚠️ CHAT_API_KEY 미설정: 인증 없이 호출합니다")
+
+    async def stop(self):
+        if self.client is not None and self._owns_client:
+            await self.client.aclose()
+            self.client = None
+
+    async def stream(self, messages: List[dict], max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        if self.system_prompt:
+            messages = [{"role": "system", "content": self.system_prompt}, *messages]
+        payload = {"model": self.model, "messages": messages, "stream": True}
+        if max_tokens is not None:
+            payload["max_tokens"] = max_tokens
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        # async with 를 빠져나가면(정상 종료/취소 모두) 응답 스트림을 닫아 업스트림 생성도 중단됨
+        async with self.client.stream(
+            "POST", f"{self.base_url}/chat/completions", json=payload, headers=headers
+        ) as response:
+            if response.status_code >= 400:
+                body = (await response.aread()).decode("utf-8", "replace")[:200]
+                raise RuntimeError(f"LLM API 오류 {response.status_code}: {body}")
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    return
+                choices = json.loads(data).get("choices") or []
+                content = (choices[0].get("delta") or {}).get("content") if choices else None
+                if content:
+                    yield content
+
+
+BACKENDS: Dict[str, Type[ChatBackend]] = {
+    StubChatBackend.name: StubChatBackend,
+    OpenAIChatBackend.name: OpenAIChatBackend,
+}
+
+
+def create_backend(name: Optional[str] = None) -> ChatBackend:
+    """CHAT_BACKEND 이름 또는 "package.module:Class" 로 백엔드 생성, 알 수 없는 이름이면 ValueError"""
+    name = name or os.getenv("CHAT_BACKEND", "stub")
+    if ":" in name:
+        module_name, _, attr = name.partition(":")
+        return getattr(importlib.import_module(module_name), attr)()
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 CHAT_BACKEND: {name} (사용 가능: {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
@@ -0,0 +1,59 @@
+"""
+채팅 스트림 지표
+- first_byte_ms:  요청 처리 시작 → start 이벤트 전송 (응답 헤더 + 첫 바이트)
+- first_token_ms: 요청 처리 시작 → 첫 token 이벤트 전송 (백엔드 첫 토큰 지연 포함)
+- tokens_per_sec: 첫 토큰 이후 생성 속도 ((토큰 수 - 1) / (마지막 토큰 - 첫 토큰))
+- 최근 CHAT_METRICS_WINDOW 개 스트림의 p50 / p95 와 누적 건수(완료/취소/오류/시간 초과)
+"""
+import os
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+
+def percentiles(values) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"p50": round(pick(0.5), 2), "p95": round(pick(0.95), 2), "max": round(ordered[-1], 2)}
+
+
+class ChatMetrics:
+    def __init__(self, window: Optional[int] = None):
+        window = window or int(os.getenv("CHAT_METRICS_WINDOW", "1000"))
+        self.first_byte_ms: Deque[float] = deque(maxlen=window)
+        self.first_token_ms: Deque[float] = deque(maxlen=window)
+        self.tokens_per_sec: Deque[float] = deque(maxlen=window)
+        self.active = 0
+        self.counts = {"started": 0, "completed": 0, "cancelled": 0, "errors": 0, "timeouts": 0, "tokens": 0}
+
+    def started(self):
+        self.active += 1
+        self.counts["started"] += 1
+
+    def finished(
+        self,
+        outcome: str,
+        tokens: int,
+        first_byte_ms: Optional[float],
+        first_token_ms: Optional[float],
+        tokens_per_sec: Optional[float],
+    ):
+        self.active -= 1
+        self.counts[outcome] += 1
+        self.counts["tokens"] += tokens
+        if first_byte_ms is not None:
+            self.first_byte_ms.append(first_byte_ms)
+        if first_token_ms is not None:
+            self.first_token_ms.append(first_token_ms)
+        if tokens_per_sec is not None:
+            self.tokens_per_sec.append(tokens_per_sec)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            **self.counts,
+            "first_byte_ms": percentiles(self.first_byte_ms),
+            "first_token_ms": percentiles(self.first_token_ms),
+            "tokens_per_sec": percentiles(self.tokens_per_sec),
+        }
@@ -0,0 +1,250 @@
+"""
+채팅 스트리밍 서비스
+- 백엔드의 토큰 async generator 를 SSE 이벤트로 변환
+    start     {"id", "backend"}                       응답 시작 직후 (첫 바이트를 바로 보냄)
+    sources   {"id", "sources": [{"index", "id", ...}]} 근거 문서를 찾았을 때 (검색 인덱스가 있을 때만)
+    token     {"index", "text"}                       토큰마다
+    heartbeat {"elapsed_ms"}                          CHAT_HEARTBEAT_SECONDS 동안 토큰이 없을 때 (프록시 유휴 타임아웃 방지)
+    done      {"id", "tokens", "first_token_ms", "tokens_per_sec", "elapsed_ms", "cached"}
+    error     {"id", "detail"}                        백엔드 오류 / CHAT_STREAM_TIMEOUT_SECONDS 초과
+- 근거 문서: 공용 문서 + 요청한 회사 문서에서 질문으로 검색해 system 메시지로 앞에 붙임 ([번호] 로 인용하도록)
+  검색이 실패해도 응답은 근거 없이 계속 생성
+- conversation_id 가 있고 요청에 이전 대화(history)가 없으면 대화 저장소(conversation_store)에서
+  토큰 예산 안의 최근 대화를 불러와 앞에 붙이고, 완료된 질문/답변은 대화 저장소에 추가
+  (대화는 요청한 사용자(user_id) 소유로 저장, user_id 가 없으면 저장소를 쓰지 않음)
+- 답변 캐시(answer_cache)에 같은/비슷한 질문의 완료된 답변이 있으면 검색과 생성 없이 그 답변을 같은 이벤트로 다시 보냄
+  (done 의 cached 가 "exact" / "semantic", 새로 생성했으면 null), 완료된 답변만 저장
+- 클라이언트 연결이 끊기면 StreamingResponse 가 이 generator 를 취소하고,
+  finally 에서 지표를 기록하고, 대기 중인 토큰 요청 취소와 백엔드 generator 정리(업스트림 생성 중단)는 별도 태스크로
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from app.common.utility.sse import format_event
+from app.domain.retrieval.service.retrieval_service import RetrievalService
+from ..model.chat_model import ChatRequest
+from .answer_cache import AnswerCache, CacheHit, CacheQuery, context_hash
+from .chat_backend import ChatBackend
+from .chat_metrics import ChatMetrics
+from .conversation_store import ConversationStore
+
+logger = logging.getLogger(__name__)
+
+
+class ChatService:
+    def __init__(
+        self,
+        backend: ChatBackend,
+        heartbeat_interval: Optional[float] = None,
+        stream_timeout: Optional[float] = None,
+        metrics: Optional[ChatMetrics] = None,
+        retrieval: Optional[RetrievalService] = None,
+        context_passages: Optional[int] = None,
+        context_chars: Optional[int] = None,
+        cache: Optional[AnswerCache] = None,
+        conversations: Optional[ConversationStore] = None,
+    ):
+        self.backend = backend
+        self.heartbeat_interval = heartbeat_interval or float(os.getenv("CHAT_HEARTBEAT_SECONDS", "15"))
+        self.stream_timeout = stream_timeout or float(os.getenv("CHAT_STREAM_TIMEOUT_SECONDS", "120"))
+        self.metrics = metrics or ChatMetrics()
+        self.retrieval = retrieval
+        self.context_passages = context_passages or int(os.getenv("RETRIEVAL_CHAT_PASSAGES", "4"))
+        self.context_chars = context_chars or int(os.getenv("RETRIEVAL_CONTEXT_CHARS", "800"))
+        self.cache = cache
+        self.conversations = conversations
+        self._closing: Set[asyncio.Task] = set()
+
+    async def stream(self, request: ChatRequest) -> AsyncIterator[str]:
+        stream_id = request.conversation_id or uuid.uuid4().hex
+        started = time.perf_counter()
+        deadline = started + self.stream_timeout
+        elapsed_ms = lambda: round((time.perf_counter() - started) * 1000, 1)
+        tokens = 0
+        first_byte_ms = first_token_ms = None
+        first_token_at = last_token_at = None
+        outcome = "cancelled"
+        cached = None
+        tokens_iter = None
+        pending: Optional[asyncio.Future] = None
+        self.metrics.started()
+        try:
+            yield format_event("start", {"id": stream_id, "backend": self.backend.name})
+            first_byte_ms = elapsed_ms()
+            history = await self._history(request)
+            cache_query = self._cache_query(request, history)
+            hit = await self._cache_lookup(cache_query)
+            if hit is not None:
+                cached = hit.tier
+                if hit.answer.sources:
+                    yield format_event("sources", {"id": stream_id, "sources": hit.answer.sources})
+                # 생성 속도가 아니므로 tokens_per_sec 는 기록하지 않음
+                for token in hit.answer.tokens():
+                    if first_token_ms is None:
+                        first_token_ms = elapsed_ms()
+                    yield format_event("token", {"index": tokens, "text": token})
+                    tokens += 1
+            else:
+                messages = [*history, {"role": "user", "content": request.message}]
+                sources = await self._retrieve(request)
+                source_events = [
+                    {"index": i + 1, **{key: value for key, value in source.items() if key != "text"}}
+                    for i, source in enumerate(sources)
+                ]
+                if sources:
+                    yield format_event("sources", {"id": stream_id, "sources": source_events})
+                    messages = [{"role": "system", "content": self._grounding(sources)}, *messages]
+                answer: List[str] = []
+                tokens_iter = self.backend.stream(messages, request.max_tokens).__aiter__()
+                while True:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        outcome = "timeouts"
+                        logger.warning(f"⏱️ 채팅 스트림 시간 초과: id={stream_id}, 토큰 {tokens}개")
+                        yield format_event("error", {"id": stream_id, "detail": "응답 생성 시간이 초과되었습니다"})
+                        return
+                    if pending is None:
+                        pending = asyncio.ensure_future(tokens_iter.__anext__())
+                    done, _ = await asyncio.wait({pending}, timeout=min(self.heartbeat_interval, remaining))
+                    if not done:
+                        # 토큰 요청은 그대로 두고 연결 유지용 이벤트만 보냄
+                        if time.perf_counter() < deadline:
+                            yield format_event("heartbeat", {"elapsed_ms": elapsed_ms()})
+                        continue
+                    future, pending = pending, None
+                    try:
+                        token = future.result()
+                    except StopAsyncIteration:
+                        break
+                    last_token_at = time.perf_counter()
+                    if first_token_at is None:
+                        first_token_at = last_token_at
+                        first_token_ms = elapsed_ms()
+                    yield format_event("token", {"index": tokens, "text": token})
+                    answer.append(token)
+                    tokens += 1
+                await self._cache_store(cache_query, answer, source_events, elapsed_ms())
+            await self._remember(request, hit.answer.text if hit is not None else "".join(answer))
+            outcome = "completed"
+            yield format_event("done", {
+                "id": stream_id,
+                "tokens": tokens,
+                "first_token_ms": first_token_ms,
+                "tokens_per_sec": self._tokens_per_sec(tokens, first_token_at, last_token_at),
+                "elapsed_ms": elapsed_ms(),
+                "cached": cached,
+            })
+        except Exception as e:
+            outcome = "errors"
+            logger.error(f"❌ 채팅 응답 생성 실패: id={stream_id}, {type(e).__name__}: {e}")
+            yield format_event("error", {"id": stream_id, "detail": "응답 생성 중 오류가 발생했습니다"})
+        finally:
+            tokens_per_sec = self._tokens_per_sec(tokens, first_token_at, last_token_at)
+            self.metrics.finished(outcome, tokens, first_byte_ms, first_token_ms, tokens_per_sec)
+            level = logging.INFO if outcome == "completed" else logging.WARNING
+            logger.log(
+                level,
+                f"💬 채팅 스트림 {outcome}: id={stream_id}, 토큰 {tokens}개, 첫 토큰 {first_token_ms}ms, "
+                f"{tokens_per_sec} tokens/s, {elapsed_ms()}ms" + (f", 캐시 {cached}" if cached else ""),
+            )
+            # 연결 끊김으로 취소된 경우 이 태스크 안의 await 는 다시 취소되므로 정리는 별도 태스크에서
+            task = asyncio.ensure_future(self._close(pending, tokens_iter))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def _history(self, request: ChatRequest) -> List[Dict[str, str]]:
+        """요청에 이전 대화가 있으면 그대로, 없으면 대화 저장소에서 토큰 예산 안의 최근 대화"""
+        if request.history or self.conversations is None or not request.conversation_id or not request.user_id:
+            return [m.model_dump() for m in request.history]
+        try:
+            return await self.conversations.window(request.user_id, request.conversation_id)
+        except Exception as e:
+            logger.warning(f"⚠️ 이전 대화 불러오기 실패 (이전 대화 없이 응답): {type(e).__name__}: {e}")
+            return []
+
+    async def _remember(self, request: ChatRequest, answer: str):
+        if self.conversations is None or not request.conversation_id or not request.user_id or not answer:
+            return
+        try:
+            await self.conversations.append(request.user_id, request.conversation_id, [
+                {"role": "user", "content": request.message},
+                {"role": "assistant", "content": answer},
+            ])
+        except Exception as e:
+            logger.warning(f"⚠️ 대화 저장 실패: id={request.conversation_id}, {type(e).__name__}: {e}")
+
+    def _cache_query(self, request: ChatRequest, history: List[Dict[str, str]]) -> Optional[CacheQuery]:
+        """질문 외에 답변을 바꾸는 문맥(이전 대화, 백엔드, 검색 인덱스, 근거 문서 수, max_tokens)을 범위에 넣음"""
+        if self.cache is None:
+            return None
+        context = context_hash(
+            history=history,
+            backend=self.backend.name,
+            index=self.retrieval.build_id if self.retrieval is not None else None,
+            passages=self.context_passages,
+            max_tokens=request.max_tokens,
+        )
+        return self.cache.query(request.message, request.company_id, context)
+
+    async def _cache_lookup(self, query: Optional[CacheQuery]) -> Optional[CacheHit]:
+        if query is None:
+            return None
+        try:
+            return await self.cache.lookup(query)
+        except Exception as e:
+            logger.warning(f"⚠️ 답변 캐시 조회 실패 (새로 생성): {type(e).__name__}: {e}")
+            return None
+
+    async def _cache_store(self, query: Optional[CacheQuery], answer: List[str], sources: List[Dict[str, Any]], compute_ms: float):
+        if query is None:
+            return
+        try:
+            await self.cache.store(query, answer, sources, compute_ms)
+        except Exception as e:
+            logger.warning(f"⚠️ 답변 캐시 저장 실패: {type(e).__name__}: {e}")
+
+    async def _retrieve(self, request: ChatRequest) -> List[Dict[str, Any]]:
+        if self.retrieval is None or not self.retrieval.enabled:
+            return []
+        try:
+            return await self.retrieval.search(request.message, request.company_id, k=self.context_passages)
+        except Exception as e:
+            logger.warning(f"⚠️ 근거 문서 검색 실패 (근거 없이 응답): {type(e).__name__}: {e}")
+            return []
+
+    def _grounding(self, sources: List[Dict[str, Any]]) -> str:
+        """검색 결과 → system 메시지 (passage 마다 RETRIEVAL_CONTEXT_CHARS 자까지)"""
+        lines = ["다음 참고 문서를 근거로 답변하고, 사용한 문서는 [번호] 로 표시하세요. 관련이 없으면 무시하세요."]
+        for i, source in enumerate(sources, 1):
+            text = source.get("text") or ""
+            if len(text) > self.context_chars:
+                text = text[:self.context_chars] + "…"
+            title = source.get("title")
+            lines.append(f"\n[{i}] {title}\n{text}" if title else f"\n[{i}]\n{text}")
+        return "\n".join(lines)
+
+    @staticmethod
+    async def _close(pending: Optional[asyncio.Future], tokens_iter):
+        """대기 중인 토큰 요청을 취소한 뒤 백엔드 generator 를 닫음 (업스트림 생성 중단)"""
+        if pending is not None:
+            pending.cancel()
+            try:
+                await pending
+            except (asyncio.CancelledError, StopAsyncIteration, Exception):
+                pass
+        aclose = getattr(tokens_iter, "aclose", None)
+        if aclose is not None:
+            try:
+                await aclose()
+            except Exception as e:
+                logger.warning(f"⚠️ 백엔드 스트림 정리 실패: {e}")
+
+    @staticmethod
+    def _tokens_per_sec(tokens: int, first_at: Optional[float], last_at: Optional[float]) -> Optional[float]:
+        if tokens < 2 or last_at is None or last_at <= first_at:
+            return None
+        return round((tokens - 1) / (last_at - first_at), 1)
@@ -0,0 +1,299 @@
+"""
+대화 저장소 (conversation_id 별 이전 대화를 서버에 보관해 다음 질문의 문맥으로 사용)
+- 세션마다 추가만 하는 로그, 메시지 하나 = msgpack [역할 번호, 토큰 수, 시각, 내용] (역할은 ROLES 의 번호로)
+- 토큰 수는 추가할 때 한 번만 셈 → 문맥 창 구성은 저장된 토큰 수만 뒤에서부터 더해 예산(CONVERSATION_CONTEXT_TOKENS)에
+  들어가는 최근 메시지를 고르고 그 메시지만 디코딩 (매 턴 전체 대화를 다시 세지 않음)
+- REDIS_URL 이 있으면 Redis 에 보관 (레플리카 간 공유)
+    chat:conv:{len(사용자)}:{사용자}:{len(id)}:{id}         메시지 레코드 list (RPUSH)
+    chat:conv:{len(사용자)}:{사용자}:{len(id)}:{id}:tokens  메시지별 토큰 수 uint32 를 이어 붙인 문자열 (APPEND)
+  사용자 ID 와 conversation_id 에 ':' 가 들어갈 수 있으므로 길이를 앞에 붙여 키가 한 가지로만 읽히게 함
+  (사용자 "a:b" + 대화 "c" 와 사용자 "a" + 대화 "b:c", 대화 "c:tokens" 와 대화 "c" 의 토큰 키가 겹치지 않음)
+  두 키는 한 트랜잭션으로 추가하고 함께 CONVERSATION_TTL_SECONDS 로 만료 시각을 갱신 (마지막 대화 기준)
+  잘라내기(LTRIM + 토큰 수 문자열 다시 쓰기)는 Lua 스크립트 하나로 (두 키가 어긋난 상태가 보이지 않게)
+  문맥 창은 토큰 수 끝부분(GETRANGE) → 필요한 메시지만 LRANGE, 왕복 2번
+- REDIS_URL 이 없거나 redis 패키지가 없으면 프로세스 메모리에 보관
+  (세션당 bytearray 로그 + 토큰 누적합 array, 최대 CONVERSATION_LOCAL_MAX_SESSIONS 개 LRU + TTL)
+- 세션이 CONVERSATION_MAX_MESSAGES 를 넘으면 오래된 메시지를 잘라 3/4 만 남김
+- 키에 소유자(로그인 사용자)가 들어가므로 같은 conversation_id 라도 사용자가 다르면 다른 대화
+  (다른 사용자의 대화는 id 를 알아도 읽거나 지울 수 없음)
+"""
+import importlib
+import logging
+import os
+import re
+import struct
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import msgpack
+
+from .chat_metrics import percentiles
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # 선택 의존성
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+ROLES = ("system", "user", "assistant")
+ROLE_IDS = {role: i for i, role in enumerate(ROLES)}
+KEY_PREFIX = "chat:conv:"
+# 메시지마다 역할/구분자로 붙는 토큰
+MESSAGE_OVERHEAD_TOKENS = 4
+# Redis 문맥 창 계산 때 읽는 최근 메시지 토큰 수 개수 (예산이 이보다 많은 메시지를 담는 경우는 드묾)
+WINDOW_SCAN = 512
+
+# KEYS: 메시지 list, 토큰 수 문자열 / ARGV: 남길 메시지 수, 토큰 수 하나의 바이트 수, TTL
+_TRIM = """
+local keep = tonumber(ARGV[1])
+redis.call('LTRIM', KEYS[1], -keep, -1)
+local counts = redis.call('GETRANGE', KEYS[2], -keep * tonumber(ARGV[2]), -1)
+redis.call('SET', KEYS[2], counts, 'EX', tonumber(ARGV[3]))
+return redis.call('LLEN', KEYS[1])
+"""
+
+_HANGUL = re.compile(r"[가-힣]")
+_COUNT = struct.Struct("<I")
+
+TokenCounter = Callable[[str], int]
+
+
+def estimate_tokens(text: str) -> int:
+    """한글은 글자당 1 토큰, 그 밖의 글자는 4자당 1 토큰으로 어림 + 메시지 오버헤드"""
+    hangul = len(_HANGUL.findall(text))
+    other = len(text) - hangul - text.count(" ")
+    return hangul + (other + 3) // 4 + MESSAGE_OVERHEAD_TOKENS
+
+
+def load_token_counter(name: Optional[str] = None) -> TokenCounter:
+    """CONVERSATION_TOKEN_COUNTER="package.module:callable" (문자열 → 토큰 수), 없으면 estimate_tokens"""
+    name = name or os.getenv("CONVERSATION_TOKEN_COUNTER", "")
+    if not name:
+        return estimate_tokens
+    module_name, _, attr = name.partition(":")
+    if not attr:
+        raise ValueError(f"CONVERSATION_TOKEN_COUNTER 형식 오류: {name} (package.module:callable)")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _decode(record: bytes) -> Dict[str, str]:
+    role, _, _, content = msgpack.unpackb(record, raw=False)
+    return {"role": ROLES[role], "content": content}
+
+
+class _LocalSession:
+    __slots__ = ("log", "ends", "prefix", "expires")
+
+    def __init__(self):
+        self.log = bytearray()
+        self.ends = array("I")        # 메시지별 레코드 끝 위치
+        self.prefix = array("Q", [0])  # 토큰 누적합 (prefix[i] = 앞 i 개 메시지 토큰 합)
+        self.expires = 0.0
+
+    def append(self, record: bytes, tokens: int):
+        self.log += record
+        self.ends.append(len(self.log))
+        self.prefix.append(self.prefix[-1] + tokens)
+
+    def window(self, budget: int) -> List[Dict[str, str]]:
+        # 최근 메시지부터 예산에 들어가는 만큼: prefix[n] - prefix[start] <= budget
+        start = bisect_left(self.prefix, self.prefix[-1] - budget)
+        if start == len(self.ends):
+            return []
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(self.log[self.ends[start - 1] if start > 0 else 0:])
+        return [{"role": ROLES[role], "content": content} for role, _, _, content in unpacker]
+
+    def trim(self, keep: int):
+        drop = len(self.ends) - keep
+        offset = self.ends[drop - 1]
+        base = self.prefix[drop]
+        self.log = self.log[offset:]
+        self.ends = array("I", (end - offset for end in self.ends[drop:]))
+        self.prefix = array("Q", (total - base for total in self.prefix[drop:]))
+
+    def __len__(self) -> int:
+        return len(self.ends)
+
+    def nbytes(self) -> int:
+        return len(self.log) + self.ends.itemsize * len(self.ends) + self.prefix.itemsize * len(self.prefix)
+
+
+class ConversationStore:
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        ttl: Optional[int] = None,
+        context_tokens: Optional[int] = None,
+        max_messages: Optional[int] = None,
+        local_max_sessions: Optional[int] = None,
+        token_counter: Optional[TokenCounter] = None,
+    ):
+        self.redis_url = redis_url if redis_url is not None else os.getenv("REDIS_URL")
+        self.ttl = ttl or int(os.getenv("CONVERSATION_TTL_SECONDS", "86400"))
+        self.context_tokens = context_tokens or int(os.getenv("CONVERSATION_CONTEXT_TOKENS", "3000"))
+        self.max_messages = max_messages or int(os.getenv("CONVERSATION_MAX_MESSAGES", "500"))
+        self.local_max_sessions = local_max_sessions or int(os.getenv("CONVERSATION_LOCAL_MAX_SESSIONS", "10000"))
+        self.count_tokens = token_counter or load_token_counter()
+        self._redis = None
+        self._trim = None
+        self._local: "OrderedDict[str, _LocalSession]" = OrderedDict()
+        self.window_ms: Deque[float] = deque(maxlen=1000)
+        self.window_messages: Deque[int] = deque(maxlen=1000)
+        self.counts = {"appended": 0, "windows": 0, "trimmed": 0, "evicted": 0, "expired": 0}
+
+    @property
+    def is_distributed(self) -> bool:
+        return self._redis is not None
+
+    async def start(self):
+        if self.redis_url and aioredis is not None:
+            try:
+                self._redis = aioredis.from_url(self.redis_url)
+                await self._redis.ping()
+                self._trim = self._redis.register_script(_TRIM)
+                logger.info(f"✅ 대화 저장소 Redis 연결: {self.redis_url}")
+                return
+            except Exception as e:
+                logger.warning(f"⚠️ Redis 연결 실패, 로컬 대화 저장소로 동작: {e}")
+                self._redis = None
+        elif self.redis_url:
+            logger.warning("⚠️ redis 패키지가 없어 로컬 대화 저장소로 동작")
+        logger.info("✅ 로컬 대화 저장소 사용")
+
+    async def stop(self):
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    @staticmethod
+    def key(owner: str, conversation_id: str) -> str:
+        return f"{KEY_PREFIX}{len(owner)}:{owner}:{len(conversation_id)}:{conversation_id}"
+
+    # ---- 추가 / 문맥 창 -----------------------------------------------------
+
+    async def append(self, owner: str, conversation_id: str, messages: List[Dict[str, str]]):
+        """메시지를 대화 끝에 추가 (토큰 수는 여기서 한 번만 셈)"""
+        now = int(time.time())
+        records, counts = [], []
+        for message in messages:
+            tokens = self.count_tokens(message["content"])
+            records.append(msgpack.packb([ROLE_IDS[message["role"]], tokens, now, message["content"]], use_bin_type=True))
+            counts.append(tokens)
+        key = self.key(owner, conversation_id)
+        if self._redis is not None:
+            await self._append_redis(key, records, counts)
+        else:
+            self._append_local(key, records, counts)
+        self.counts["appended"] += len(records)
+
+    async def window(
+        self, owner: str, conversation_id: str, budget: Optional[int] = None
+    ) -> List[Dict[str, str]]:
+        """토큰 예산 안에 들어가는 최근 메시지 (오래된 것부터), 대화가 없으면 빈 목록"""
+        started = time.perf_counter()
+        budget = budget or self.context_tokens
+        key = self.key(owner, conversation_id)
+        if self._redis is not None:
+            messages = await self._window_redis(key, budget)
+        else:
+            session = self._session(key)
+            messages = session.window(budget) if session is not None else []
+        self.counts["windows"] += 1
+        self.window_ms.append((time.perf_counter() - started) * 1000)
+        self.window_messages.append(len(messages))
+        return messages
+
+    async def messages(self, owner: str, conversation_id: str) -> List[Dict[str, str]]:
+        """owner 의 대화 전체 (화면 복원용)"""
+        key = self.key(owner, conversation_id)
+        if self._redis is not None:
+            return [_decode(record) for record in await self._redis.lrange(key, 0, -1)]
+        session = self._session(key)
+        return session.window(session.prefix[-1]) if session is not None else []
+
+    async def delete(self, owner: str, conversation_id: str) -> bool:
+        key = self.key(owner, conversation_id)
+        if self._redis is not None:
+            return bool(await self._redis.delete(key, f"{key}:tokens"))
+        return self._local.pop(key, None) is not None
+
+    # ---- 로컬 ---------------------------------------------------------------
+
+    def _session(self, key: str) -> Optional[_LocalSession]:
+        session = self._local.get(key)
+        if session is None:
+            return None
+        if session.expires <= time.monotonic():
+            del self._local[key]
+            self.counts["expired"] += 1
+            return None
+        return session
+
+    def _append_local(self, key: str, records: List[bytes], counts: List[int]):
+        session = self._session(key)
+        if session is None:
+            session = self._local[key] = _LocalSession()
+            while len(self._local) > self.local_max_sessions:
+                self._local.popitem(last=False)
+                self.counts["evicted"] += 1
+        for record, tokens in zip(records, counts):
+            session.append(record, tokens)
+        if len(session) > self.max_messages:
+            session.trim(self.max_messages * 3 // 4)
+            self.counts["trimmed"] += 1
+        session.expires = time.monotonic() + self.ttl
+        self._local.move_to_end(key)
+
+    # ---- Redis --------------------------------------------------------------
+
+    async def _append_redis(self, key: str, records: List[bytes], counts: List[int]):
+        tokens_key = f"{key}:tokens"
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, *records)
+            pipe.append(tokens_key, b"".join(_COUNT.pack(c) for c in counts))
+            pipe.expire(key, self.ttl)
+            pipe.expire(tokens_key, self.ttl)
+            length, _, _, _ = await pipe.execute()
+        if length > self.max_messages:
+            await self._trim_redis(key, self.max_messages * 3 // 4)
+
+    async def _trim_redis(self, key: str, keep: int):
+        """오래된 메시지를 잘라 최근 keep 개만 남김 (토큰 수 문자열도 같이, 원자적으로)"""
+        await self._trim(keys=[key, f"{key}:tokens"], args=[keep, _COUNT.size, self.ttl])
+        self.counts["trimmed"] += 1
+
+    async def _window_redis(self, key: str, budget: int) -> List[Dict[str, str]]:
+        raw = await self._redis.getrange(f"{key}:tokens", -WINDOW_SCAN * _COUNT.size, -1)
+        if not raw:
+            return []
+        counts = [count for (count,) in _COUNT.iter_unpack(raw[len(raw) % _COUNT.size:])]
+        total = keep = 0
+        for tokens in reversed(counts):
+            if total + tokens > budget:
+                break
+            total += tokens
+            keep += 1
+        if keep == 0:
+            return []
+        return [_decode(record) for record in await self._redis.lrange(key, -keep, -1)]
+
+    def stats(self) -> Dict[str, Any]:
+        local = {}
+        if self._redis is None:
+            sessions = len(self._local)
+            nbytes = sum(session.nbytes() for session in self._local.values())
+            local = {"sessions": sessions, "bytes": nbytes, "bytes_per_session": nbytes // sessions if sessions else 0}
+        return {
+            "backend": "redis" if self._redis is not None else "local",
+            "ttl_seconds": self.ttl,
+            "context_tokens": self.context_tokens,
+            **local,
+            **self.counts,
+            "window_ms": percentiles(self.window_ms),
+            "window_messages": percentiles(self.window_messages),
+        }
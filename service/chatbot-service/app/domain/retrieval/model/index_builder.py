@@ -0,0 +1,323 @@
+"""
+검색 인덱스 오프라인 빌더
+
+    python -m app.domain.retrieval.model.index_builder passages.jsonl ./index [--dim 256] [--ivf-lists N]
+
+- 입력: 한 줄에 passage 하나인 JSONL {"id", "text", "title"?, "company_id"?, "source"?, ...}
+  company_id 가 없으면 모든 회사에 공개되는 공용 문서 (기준서, 가이드 등)
+- 메모리 사용량이 passage 수에 비례해 커지지 않도록 chunk 단위 두 단계로 처리
+    1단계: 토큰화 → 청크별 (용어, 문서, tf) 배열을 임시 파일로, 문서 길이 / df 집계, 원문 기록
+    2단계: 용어를 해시 순으로 재번호 → posting 을 용어별 구간에 흩뿌려 기록 + dense 벡터 계산
+    마지막: 표본으로 spherical k-means → 전체 벡터를 군집 순서로 재배열 (IVF)
+- 임시 디렉터리에 만든 뒤 rename 으로 교체하므로 서비스가 읽는 도중 반쯤 쓰인 인덱스를 보지 않음
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import shutil
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from .retrieval_index import FORMAT_VERSION, MANIFEST, hashed_dims, term_hash
+from .tokenizer import tokenize
+
+logger = logging.getLogger(__name__)
+
+
+def bm25_idf(df: np.ndarray, passages: int) -> np.ndarray:
+    return np.log1p((passages - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+
+def bm25_saturation(tf: np.ndarray, doc_len: np.ndarray, avgdl: float, k1: float, b: float) -> np.ndarray:
+    """BM25 의 tf 포화 항 (idf 를 곱하기 전)"""
+    tf = tf.astype(np.float32)
+    return tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_len.astype(np.float32) / max(avgdl, 1e-9)))
+
+
+def read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class IndexBuilder:
+    def __init__(
+        self,
+        out_dir: str,
+        dim: int = 256,
+        ivf_lists: Optional[int] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+        chunk_size: int = 50_000,
+        kmeans_sample: int = 64_000,
+        kmeans_iterations: int = 10,
+        seed: int = 0,
+    ):
+        self.out_dir = os.path.abspath(out_dir)
+        self.dim = dim
+        self.ivf_lists = ivf_lists
+        self.k1 = k1
+        self.b = b
+        self.chunk_size = chunk_size
+        self.kmeans_sample = kmeans_sample
+        self.kmeans_iterations = kmeans_iterations
+        self.rng = np.random.default_rng(seed)
+        self.timings: Dict[str, float] = {}
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.work_dir, name)
+
+    def _memmap(self, name: str, dtype, shape) -> np.memmap:
+        return np.memmap(self._path(name), dtype=dtype, mode="w+", shape=shape)
+
+    def build(self, passages: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        started = self._phase_started = time.perf_counter()
+        self.work_dir = f"{self.out_dir}.building-{os.getpid()}"
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        os.makedirs(self.work_dir)
+        try:
+            chunks, vocab, df, doc_len, company = self._tokenize_pass(passages)
+            self._mark("tokenize")
+            manifest = self._write_index(chunks, vocab, df, doc_len, company)
+        except BaseException:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+            raise
+        manifest["build_seconds"] = round(time.perf_counter() - started, 1)
+        manifest["timings"] = self.timings
+        with open(self._path(MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        self._swap()
+        logger.info(
+            f"✅ 검색 인덱스 생성: {manifest['passages']}개 passage, 용어 {manifest['terms']}개, "
+            f"{manifest['build_seconds']}s → {self.out_dir}"
+        )
+        return manifest
+
+    def _mark(self, phase: str):
+        now = time.perf_counter()
+        self.timings[phase] = round(now - self._phase_started, 1)
+        self._phase_started = now
+
+    # ---- 1단계: 토큰화 -----------------------------------------------------
+
+    def _tokenize_pass(self, passages: Iterable[Dict[str, Any]]):
+        # 처음 보는 용어는 현재 크기 = 새 번호 (map 으로 C 수준에서 번호를 매김)
+        vocab: Dict[str, int] = defaultdict()
+        vocab.default_factory = vocab.__len__
+        df = np.zeros(1 << 16, np.int64)
+        doc_len: List[np.ndarray] = []
+        company: List[int] = []
+        companies: Dict[str, int] = {}
+        chunks: List[str] = []
+        offsets = [0]
+        with open(self._path("passages.bin"), "wb") as out:
+            batch: List[Dict[str, Any]] = []
+            for passage in passages:
+                batch.append(passage)
+                if len(batch) == self.chunk_size:
+                    df = self._tokenize_chunk(batch, len(offsets) - 1, vocab, df, doc_len, company, companies, chunks, out, offsets)
+                    batch = []
+            if batch:
+                df = self._tokenize_chunk(batch, len(offsets) - 1, vocab, df, doc_len, company, companies, chunks, out, offsets)
+        if len(offsets) == 1:
+            raise ValueError("passage 가 없습니다")
+        np.asarray(offsets, np.int64).tofile(self._path("passage_offsets.i64"))
+        with open(self._path("companies.json"), "w", encoding="utf-8") as f:
+            json.dump([None, *companies], f, ensure_ascii=False)
+        return chunks, vocab, df[:len(vocab)], np.concatenate(doc_len), np.asarray(company, np.int32)
+
+    def _tokenize_chunk(self, batch, first_doc, vocab, df, doc_len, company, companies, chunks, out, offsets):
+        term_ids: List[int] = []
+        lengths = np.empty(len(batch), np.int32)
+        for i, passage in enumerate(batch):
+            text = passage.get("text") or ""
+            title = passage.get("title")
+            tokens = tokenize(f"{title}\n{text}" if title else text)
+            lengths[i] = len(tokens)
+            term_ids.extend(map(vocab.__getitem__, tokens))
+
+            company_id = passage.get("company_id")
+            company.append(companies.setdefault(str(company_id), len(companies) + 1) if company_id else 0)
+            record = json.dumps(passage, ensure_ascii=False).encode("utf-8")
+            out.write(record)
+            offsets.append(offsets[-1] + len(record))
+
+        # (용어, 문서) 쌍으로 묶어 tf 계산, 결과는 용어 → 문서 순으로 정렬됨
+        terms = np.asarray(term_ids, np.int64)
+        docs = np.repeat(np.arange(len(batch), dtype=np.int64), lengths)
+        keys, tf = np.unique(terms * len(batch) + docs, return_counts=True)
+        terms, docs = keys // len(batch), keys % len(batch) + first_doc
+        if len(vocab) > len(df):
+            df = np.concatenate([df, np.zeros(max(len(vocab), len(df)), np.int64)])
+        df[:len(vocab)] += np.bincount(terms, minlength=len(vocab))
+
+        name = f"chunk-{len(chunks):05d}.npz"
+        np.savez(self._path(name), terms=terms.astype(np.int32), docs=docs.astype(np.int32), tf=np.minimum(tf, 65535).astype(np.uint16))
+        chunks.append(name)
+        doc_len.append(lengths)
+        logger.debug(f"📦 토큰화 {first_doc + len(batch)}개 (용어 {len(vocab)}개)")
+        return df
+
+    # ---- 2단계: posting / dense -------------------------------------------
+
+    def _write_index(self, chunks, vocab, df, doc_len, company) -> Dict[str, Any]:
+        passages, terms = len(doc_len), len(vocab)
+        avgdl = float(doc_len.mean())
+
+        # 용어 번호 = 해시 정렬 순서 (질의 시 searchsorted 로 찾음, 어휘 사전을 싣지 않아도 됨)
+        hashes = np.fromiter((term_hash(t) for t in vocab), np.uint64, terms)
+        del vocab
+        order = np.argsort(hashes, kind="stable")
+        hashes = hashes[order]
+        if terms > 1 and np.any(hashes[1:] == hashes[:-1]):
+            logger.warning("⚠️ 용어 해시 충돌: 일부 용어가 같은 posting 을 공유합니다")
+        renumber = np.empty(terms, np.int64)
+        renumber[order] = np.arange(terms)
+        df = df[order]
+        idf = bm25_idf(df, passages)
+        offsets = np.zeros(terms + 1, np.int64)
+        np.cumsum(df, out=offsets[1:])
+        hashes.tofile(self._path("term_hashes.u64"))
+        idf.tofile(self._path("idf.f32"))
+        offsets.tofile(self._path("term_offsets.i64"))
+        company.tofile(self._path("company.i32"))
+
+        postings_doc = self._memmap("postings_doc.i32", np.int32, (int(offsets[-1]),))
+        postings_weight = self._memmap("postings_weight.f32", np.float32, (int(offsets[-1]),))
+        vectors = self._memmap("vectors.tmp", np.float32, (passages, self.dim))
+        cursor = np.zeros(terms, np.int64)
+        term_dims, term_signs = hashed_dims(hashes, self.dim)
+        for name in chunks:
+            with np.load(self._path(name)) as chunk:
+                t, d, tf = renumber[chunk["terms"]], chunk["docs"], chunk["tf"]
+            os.remove(self._path(name))
+            # 용어 안에서 문서 오름차순 유지 (청크는 문서 번호 순으로 처리됨)
+            sort = np.argsort(t, kind="stable")
+            t, d, tf = t[sort], d[sort], tf[sort]
+            uniq, first, counts = np.unique(t, return_index=True, return_counts=True)
+            positions = offsets[t] + cursor[t] + (np.arange(len(t)) - np.repeat(first, counts))
+            cursor[uniq] += counts
+            postings_doc[positions] = d
+            postings_weight[positions] = idf[t] * bm25_saturation(tf, doc_len[d], avgdl, self.k1, self.b)
+
+            # dense: idf × (1 + log tf) 를 해시 차원에 부호와 함께 누적 후 L2 정규화
+            low, high = int(d.min()), int(d.max()) + 1
+            flat = (d - low).astype(np.int64) * self.dim + term_dims[t]
+            weights = term_signs[t] * idf[t] * (1 + np.log(tf.astype(np.float32)))
+            block = np.bincount(flat, weights=weights, minlength=(high - low) * self.dim).reshape(high - low, self.dim)
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            vectors[low:high] = block / np.where(norms > 0, norms, 1)
+        postings_doc.flush()
+        postings_weight.flush()
+        np.maximum.reduceat(postings_weight, offsets[:-1]).astype(np.float32).tofile(self._path("term_max.f32"))
+        del postings_doc, postings_weight
+        self._mark("postings")
+
+        ivf_lists = self.ivf_lists or max(1, int(math.sqrt(passages)))
+        self._write_ivf(vectors, min(ivf_lists, passages))
+        del vectors
+        os.remove(self._path("vectors.tmp"))
+        self._mark("ivf")
+
+        return {
+            "version": FORMAT_VERSION,
+            "passages": passages,
+            "terms": terms,
+            "postings": int(offsets[-1]),
+            "avgdl": round(avgdl, 3),
+            "k1": self.k1,
+            "b": self.b,
+            "dim": self.dim,
+            "embedder": "hashing",
+            "ivf_lists": min(ivf_lists, passages),
+            "companies": int(company.max()),
+            "built_at": datetime.now().isoformat(timespec="seconds"),
+            "build_id": uuid.uuid4().hex,
+        }
+
+    # ---- IVF (spherical k-means) ------------------------------------------
+
+    def _assign(self, vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        assign = np.empty(len(vectors), np.int32)
+        for start in range(0, len(vectors), self.chunk_size):
+            block = np.asarray(vectors[start:start + self.chunk_size], np.float32)
+            assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return assign
+
+    def _write_ivf(self, vectors: np.memmap, lists: int):
+        passages = len(vectors)
+        sample_ids = np.sort(self.rng.choice(passages, min(passages, max(self.kmeans_sample, lists)), replace=False))
+        sample = np.asarray(vectors[sample_ids], np.float32)
+        centroids = sample[self.rng.choice(len(sample), lists, replace=False)].copy()
+        for _ in range(self.kmeans_iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sizes = np.bincount(assign, minlength=lists)
+            empty = sizes == 0
+            starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+            sums = np.zeros_like(centroids)
+            sums[~empty] = np.add.reduceat(sample[np.argsort(assign, kind="stable")], starts[~empty], axis=0)
+            # 빈 군집은 임의 표본으로 다시 시작
+            sums[empty] = sample[self.rng.choice(len(sample), int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.where(norms > 0, norms, 1)
+
+        assign = self._assign(vectors, centroids)
+        order = np.argsort(assign, kind="stable").astype(np.int32)
+        ivf_offsets = np.zeros(lists + 1, np.int64)
+        np.cumsum(np.bincount(assign, minlength=lists), out=ivf_offsets[1:])
+        dense = self._memmap("dense.i8", np.int8, (passages, self.dim))
+        scale = self._memmap("dense_scale.f32", np.float32, (passages,))
+        for start in range(0, passages, self.chunk_size):
+            ids = order[start:start + self.chunk_size]
+            # 원본을 행 번호 순으로 읽어야 디스크 접근이 순차적
+            sort = np.argsort(ids)
+            block = np.empty((len(ids), self.dim), np.float32)
+            block[sort] = vectors[ids[sort]]
+            row_scale = np.abs(block).max(axis=1) / 127
+            row_scale[row_scale == 0] = 1
+            dense[start:start + len(ids)] = np.rint(block / row_scale[:, None]).astype(np.int8)
+            scale[start:start + len(ids)] = row_scale
+        dense.flush()
+        scale.flush()
+        del dense, scale
+        order.tofile(self._path("dense_ids.i32"))
+        ivf_offsets.tofile(self._path("ivf_offsets.i64"))
+        centroids.astype(np.float32).tofile(self._path("centroids.f32"))
+
+    # ---- 교체 --------------------------------------------------------------
+
+    def _swap(self):
+        """기존 인덱스가 있으면 옆으로 치운 뒤 새 디렉터리로 교체 (읽던 프로세스는 열린 파일을 계속 사용)"""
+        old = f"{self.out_dir}.old-{os.getpid()}"
+        if os.path.exists(self.out_dir):
+            os.rename(self.out_dir, old)
+        os.rename(self.work_dir, self.out_dir)
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BM25 + dense 메모리 맵 검색 인덱스 생성")
+    parser.add_argument("passages", help="passage JSONL 파일")
+    parser.add_argument("out_dir", help="인덱스 디렉터리 (RETRIEVAL_INDEX_DIR)")
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--ivf-lists", type=int, default=None, help="IVF 군집 수 (기본 sqrt(N))")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    manifest = IndexBuilder(args.out_dir, dim=args.dim, ivf_lists=args.ivf_lists, chunk_size=args.chunk_size).build(
+        read_jsonl(args.passages)
+    )
+    print(json.dumps(manifest, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
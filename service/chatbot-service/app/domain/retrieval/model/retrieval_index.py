@@ -0,0 +1,296 @@
+"""
+메모리 맵 검색 인덱스 (BM25 역색인 + dense 임베딩 행렬, 읽기 전용)
+- index_builder 가 만든 디렉터리의 배열 파일을 np.memmap 으로 열어 그대로 사용
+  → 프로세스가 여러 개여도 OS 페이지 캐시를 공유하므로 인덱스 메모리는 한 벌
+- BM25: 용어별 posting(문서 번호, 미리 계산한 idf × tf 가중치)을 모아 합산
+  흔한 용어는 MaxScore 로 가지치기해 긴 posting 을 다 읽지 않음 (결과는 전체 합산과 동일)
+- dense: 용어 해시를 부호와 차원으로 쓰는 feature hashing 임베딩 (idf 가중, L2 정규화)
+  벡터는 k-means 군집(IVF) 순서로 저장되어 있어 질의와 가까운 nprobe 개 군집만 훑음
+- hybrid: 두 결과를 Reciprocal Rank Fusion 으로 합침
+- 회사 범위: 공용 문서(회사 없음) + 요청한 회사의 문서만 후보가 됨 (다른 회사 평가 결과는 절대 섞이지 않음)
+
+파일 구성 (N = passage 수, V = 용어 수, D = 임베딩 차원, L = IVF 군집 수)
+    manifest.json          형식 버전, 통계, 빌드 파라미터
+    term_hashes.u64  [V]   용어 해시 (정렬됨, 위치 = 용어 번호)
+    idf.f32          [V]
+    term_offsets.i64 [V+1] 용어별 posting 구간
+    postings_doc.i32 [P]   문서 번호 (용어 안에서 오름차순)
+    postings_weight.f32 [P] BM25 가중치 (idf × tf 포화값, 질의 시 합산만 함)
+    term_max.f32     [V]   용어별 최대 가중치 (MaxScore 가지치기용 상한)
+    dense.i8         [N,D] 군집 순서로 정렬된 임베딩 (행별 int8 양자화, f16 보다 작고 f32 변환이 훨씬 빠름)
+    dense_scale.f32  [N]   행별 양자화 배율 (원래 값 ≈ int8 × 배율)
+    dense_ids.i32    [N]   dense 행 → 문서 번호
+    ivf_offsets.i64  [L+1] 군집별 dense 행 구간
+    centroids.f32    [L,D]
+    company.i32      [N]   회사 코드 (0 = 공용), companies.json 이 코드 → 회사 id
+    passages.bin / passage_offsets.i64 [N+1]  passage 원문 (JSON, UTF-8)
+"""
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .tokenizer import tokenize
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+# 하한 θ 를 구할 때 읽는 가장 드문 용어의 최대 posting 수 (이보다 흔하면 가지치기 없이 전체 합산)
+SEED_POSTINGS = 50_000
+MODES = ("bm25", "dense", "hybrid")
+
+
+def term_hash(term: str) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def hashed_dims(hashes: np.ndarray, dim: int) -> Tuple[np.ndarray, np.ndarray]:
+    """용어 해시 → (임베딩 차원, 부호 ±1)"""
+    hashes = hashes.astype(np.uint64, copy=False)
+    dims = (hashes % np.uint64(dim)).astype(np.int64)
+    signs = np.where((hashes >> np.uint64(40)) & np.uint64(1), 1.0, -1.0).astype(np.float32)
+    return dims, signs
+
+
+class RetrievalIndex:
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            self.manifest: Dict[str, Any] = json.load(f)
+        if self.manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 인덱스 형식: {self.manifest.get('version')}")
+        self.passages = self.manifest["passages"]
+        self.dim = self.manifest["dim"]
+        m = lambda name, dtype, shape=None: np.memmap(os.path.join(path, name), dtype=dtype, mode="r", shape=shape)
+        self.term_hashes = m("term_hashes.u64", np.uint64)
+        self.idf = m("idf.f32", np.float32)
+        self.term_offsets = m("term_offsets.i64", np.int64)
+        self.postings_doc = m("postings_doc.i32", np.int32)
+        self.postings_weight = m("postings_weight.f32", np.float32)
+        self.term_max = m("term_max.f32", np.float32)
+        self.dense = m("dense.i8", np.int8, (self.passages, self.dim))
+        self.dense_scale = m("dense_scale.f32", np.float32)
+        self.dense_ids = m("dense_ids.i32", np.int32)
+        self.ivf_offsets = m("ivf_offsets.i64", np.int64)
+        # 군집 중심은 작으므로 메모리로 (질의마다 전부 씀)
+        self.centroids = np.array(m("centroids.f32", np.float32).reshape(-1, self.dim))
+        self.company = m("company.i32", np.int32)
+        self.passage_offsets = m("passage_offsets.i64", np.int64)
+        self.passage_bytes = m("passages.bin", np.uint8)
+        with open(os.path.join(path, "companies.json"), encoding="utf-8") as f:
+            self.company_codes: Dict[str, int] = {company_id: code for code, company_id in enumerate(json.load(f)) if code}
+
+    def __len__(self) -> int:
+        return self.passages
+
+    # ---- 질의 준비 --------------------------------------------------------
+
+    def company_code(self, company_id: Optional[str]) -> int:
+        """0 = 공용 문서만, -1 = 인덱스에 없는 회사 (공용 문서만)"""
+        if not company_id:
+            return 0
+        return self.company_codes.get(company_id, -1)
+
+    def _terms(self, tokens: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """질의 토큰 → (용어 번호, 질의 내 빈도), 인덱스에 없는 용어는 제외"""
+        if not tokens:
+            return np.empty(0, np.int64), np.empty(0, np.float32)
+        counts: Dict[int, int] = {}
+        for token in tokens:
+            h = term_hash(token)
+            counts[h] = counts.get(h, 0) + 1
+        hashes = np.fromiter(counts.keys(), np.uint64, len(counts))
+        qtf = np.fromiter(counts.values(), np.float32, len(counts))
+        ids = np.searchsorted(self.term_hashes, hashes)
+        ids[ids >= len(self.term_hashes)] = 0
+        found = self.term_hashes[ids] == hashes
+        return ids[found], qtf[found]
+
+    def _allowed(self, docs: np.ndarray, code: int) -> np.ndarray:
+        companies = self.company[docs]
+        return (companies == 0) | (companies == code) if code > 0 else companies == 0
+
+    @staticmethod
+    def _top(docs: np.ndarray, scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        if len(docs) == 0:
+            return []
+        if len(docs) > k:
+            keep = np.argpartition(scores, -k)[-k:]
+            docs, scores = docs[keep], scores[keep]
+        order = np.lexsort((docs, -scores))
+        return [(int(docs[i]), float(scores[i])) for i in order]
+
+    # ---- 검색 -------------------------------------------------------------
+
+    def _term_scores(self, docs: np.ndarray, starts, ends, qtf) -> np.ndarray:
+        """정렬된 docs 각각의 주어진 용어 점수 합 (posting 을 다 읽지 않고 이진 탐색으로 찾음)"""
+        scores = np.zeros(len(docs), np.float64)
+        for start, end, weight in zip(starts, ends, qtf):
+            postings = self.postings_doc[start:end]
+            pos = np.searchsorted(postings, docs)
+            pos[pos == len(postings)] = 0
+            hit = postings[pos] == docs
+            scores[hit] += self.postings_weight[start + pos[hit]] * weight
+        return scores
+
+    def bm25(self, tokens: List[str], code: int, k: int) -> List[Tuple[int, float]]:
+        """
+        MaxScore 방식 (결과는 모든 posting 을 합산한 것과 같음)
+        1. 가장 드문 용어가 나오는 문서들의 실제 점수 중 k 번째 = 최종 k 번째 점수의 하한 θ
+        2. 최대 가중치 합이 θ 미만인 흔한 용어들은 후보를 만들지 않음 (그 용어만 나오는 문서는 상위 k 에 들 수 없음)
+        3. 나머지 용어의 posting 으로 후보를 만들고, 흔한 용어 점수는 남은 후보에만 이진 탐색으로 더함
+        """
+        term_ids, qtf = self._terms(tokens)
+        if len(term_ids) == 0:
+            return []
+        starts, ends = self.term_offsets[term_ids], self.term_offsets[term_ids + 1]
+        bounds = self.term_max[term_ids] * qtf
+
+        theta = 0.0
+        rarest = int(np.argmin(ends - starts))
+        if ends[rarest] - starts[rarest] <= SEED_POSTINGS:
+            seed = self.postings_doc[starts[rarest]:ends[rarest]]
+            seed = seed[self._allowed(seed, code)]
+            if len(seed) >= k:
+                theta = float(np.partition(self._term_scores(seed, starts, ends, qtf), -k)[-k])
+        order = np.argsort(bounds, kind="stable")
+        skip = order[np.cumsum(bounds[order]) < theta]
+        keep = order[len(skip):]
+
+        docs = np.concatenate([self.postings_doc[starts[i]:ends[i]] for i in keep])
+        weights = np.concatenate([self.postings_weight[starts[i]:ends[i]] * qtf[i] for i in keep])
+        if len(docs) > self.passages // 8:
+            partial = np.bincount(docs, weights=weights, minlength=self.passages)
+            candidates = np.flatnonzero(partial)
+            partial = partial[candidates]
+        else:
+            candidates, inverse = np.unique(docs, return_inverse=True)
+            partial = np.bincount(inverse, weights=weights)
+        if len(skip):
+            alive = partial + bounds[skip].sum() >= theta
+            candidates, partial = candidates[alive], partial[alive]
+        allowed = self._allowed(candidates, code)
+        candidates, partial = candidates[allowed], partial[allowed]
+        if len(skip):
+            partial = partial + self._term_scores(candidates, starts[skip], ends[skip], qtf[skip])
+        return self._top(candidates, partial, k)
+
+    def embed(self, tokens: List[str]) -> Optional[np.ndarray]:
+        term_ids, qtf = self._terms(tokens)
+        if len(term_ids) == 0:
+            return None
+        dims, signs = hashed_dims(self.term_hashes[term_ids], self.dim)
+        vector = np.zeros(self.dim, np.float32)
+        np.add.at(vector, dims, signs * self.idf[term_ids] * (1 + np.log(qtf)))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def dense_search(self, tokens: List[str], code: int, k: int, nprobe: int) -> List[Tuple[int, float]]:
+        return self.dense_search_batch([(tokens, code, k)], nprobe)[0]
+
+    def dense_search_batch(self, queries: List[Tuple[List[str], int, int]], nprobe: int) -> List[List[Tuple[int, float]]]:
+        """
+        (토큰, 회사 코드, k) 여러 개를 한 번에 검색
+        - 군집 중심과의 유사도는 질의 행렬 하나로 계산
+        - 같은 군집을 보는 질의들은 그 군집 벡터를 한 번만 변환해 행렬곱 한 번으로 점수 계산
+        """
+        vectors = [self.embed(tokens) for tokens, _, _ in queries]
+        live = [i for i, vector in enumerate(vectors) if vector is not None]
+        results: List[List[Tuple[int, float]]] = [[] for _ in queries]
+        if not live:
+            return results
+        matrix = np.stack([vectors[i] for i in live])
+        nprobe = min(nprobe, len(self.centroids))
+        centroid_scores = matrix @ self.centroids.T
+        probes = np.argpartition(-centroid_scores, nprobe - 1, axis=1)[:, :nprobe]
+        by_cluster: Dict[int, List[int]] = {}
+        for row, clusters in enumerate(probes.tolist()):
+            for cluster in clusters:
+                by_cluster.setdefault(cluster, []).append(row)
+
+        docs_parts: List[List[np.ndarray]] = [[] for _ in live]
+        score_parts: List[List[np.ndarray]] = [[] for _ in live]
+        for cluster, rows in by_cluster.items():
+            start, end = self.ivf_offsets[cluster], self.ivf_offsets[cluster + 1]
+            if start == end:
+                continue
+            docs = self.dense_ids[start:end]
+            companies = self.company[docs]
+            public = companies == 0
+            block = self.dense[start:end].astype(np.float32)
+            scores = (block @ matrix[rows].T) * self.dense_scale[start:end, None]
+            for column, row in enumerate(rows):
+                code = queries[live[row]][1]
+                allowed = public | (companies == code) if code > 0 else public
+                docs_parts[row].append(docs[allowed])
+                score_parts[row].append(scores[allowed, column])
+        for row, i in enumerate(live):
+            if docs_parts[row]:
+                results[i] = self._top(np.concatenate(docs_parts[row]), np.concatenate(score_parts[row]), queries[i][2])
+        return results
+
+    @staticmethod
+    def fuse(
+        mode: str,
+        bm25_hits: List[Tuple[int, float]],
+        dense_hits: List[Tuple[int, float]],
+        k: int,
+        rrf_k: int = 60,
+    ) -> List[Tuple[int, float, Dict[str, float]]]:
+        """검색 방식별 결과 → (문서, 점수, 방식별 점수), hybrid 는 Reciprocal Rank Fusion"""
+        if mode == "bm25":
+            return [(doc, score, {"bm25": score}) for doc, score in bm25_hits[:k]]
+        if mode == "dense":
+            return [(doc, score, {"dense": score}) for doc, score in dense_hits[:k]]
+        fused: Dict[int, Dict[str, float]] = {}
+        for name, hits in (("bm25", bm25_hits), ("dense", dense_hits)):
+            for rank, (doc, score) in enumerate(hits):
+                entry = fused.setdefault(doc, {"rrf": 0.0})
+                entry["rrf"] += 1.0 / (rrf_k + rank + 1)
+                entry[name] = score
+        return sorted(((doc, parts.pop("rrf"), parts) for doc, parts in fused.items()), key=lambda r: (-r[1], r[0]))[:k]
+
+    @staticmethod
+    def depth(mode: str, k: int) -> int:
+        """방식별로 가져올 후보 수 (hybrid 는 합치기 전에 더 깊게)"""
+        return max(k * 4, 20) if mode == "hybrid" else k
+
+    def search(
+        self,
+        query: str,
+        company_id: Optional[str] = None,
+        k: int = 5,
+        mode: str = "hybrid",
+        nprobe: int = 8,
+        rrf_k: int = 60,
+    ) -> List[Dict[str, Any]]:
+        """mode: bm25 / dense / hybrid, 결과는 점수 내림차순 passage (원문 포함)"""
+        if mode not in MODES:
+            raise ValueError(f"알 수 없는 검색 방식: {mode}")
+        tokens = tokenize(query)
+        code = self.company_code(company_id)
+        depth = self.depth(mode, k)
+        bm25_hits = self.bm25(tokens, code, depth) if mode != "dense" else []
+        dense_hits = self.dense_search(tokens, code, depth, nprobe) if mode != "bm25" else []
+        return self.materialize(self.fuse(mode, bm25_hits, dense_hits, k, rrf_k))
+
+    def materialize(self, ranked: List[Tuple[int, float, Dict[str, float]]]) -> List[Dict[str, Any]]:
+        return [
+            {**self.passage(doc), "score": round(score, 6), **{name: round(value, 6) for name, value in parts.items()}}
+            for doc, score, parts in ranked
+        ]
+
+    def passage(self, doc: int) -> Dict[str, Any]:
+        start, end = self.passage_offsets[doc], self.passage_offsets[doc + 1]
+        return json.loads(self.passage_bytes[start:end].tobytes())
+
+    def stats(self) -> Dict[str, Any]:
+        size = sum(
+            os.path.getsize(os.path.join(self.path, name)) for name in os.listdir(self.path)
+        )
+        return {
+            **{key: self.manifest[key] for key in ("passages", "terms", "postings", "dim", "ivf_lists", "built_at")},
+            "size_mb": round(size / 1024 / 1024, 1),
+        }
+
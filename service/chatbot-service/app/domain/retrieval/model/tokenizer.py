@@ -0,0 +1,50 @@
+"""
+검색용 토크나이저 (한국어 대응, 외부 형태소 분석기 없이)
+- NFKC 정규화 + 소문자, 한글 / 영문·숫자 연속 구간을 단어로
+- 한글 단어: 흔한 조사/어미를 떼어낸 어간 + 어간의 글자 bigram
+  ("탄소배출량을" → 탄소배출량, 탄소, 소배, 배출, 출량) 이라 띄어쓰기가 달라도("탄소 배출량") 일치
+- 같은 단어는 다시 분석하지 않도록 단어 단위 결과를 캐시 (문서 집합에서 단어 반복이 매우 많음)
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from itertools import chain
+from typing import List, Tuple
+
+_WORD = re.compile(r"[가-힣]+|[0-9a-z]+")
+
+# 긴 것부터 확인 (에서는 → 에서 → 에), 길이별 집합으로 단어 끝만 찾아봄
+_SUFFIXES = [
+    "에서는", "으로는", "에게서", "이라는", "이라고", "으로서", "으로써", "입니다", "합니다", "습니다", "됩니다",
+    "에서", "에게", "으로", "까지", "부터", "보다", "처럼", "이나", "이며", "이고", "라는", "하는", "되는",
+    "하고", "했다", "한다", "하여", "해야", "된다", "에는", "로는", "과는", "와는", "이다", "이란",
+    "은", "는", "이", "가", "을", "를", "의", "에", "와", "과", "도", "만", "로", "란",
+]
+_SUFFIXES_BY_LENGTH = [
+    (length, frozenset(s for s in _SUFFIXES if len(s) == length))
+    for length in sorted({len(s) for s in _SUFFIXES}, reverse=True)
+]
+
+
+@lru_cache(maxsize=200_000)
+def _word_tokens(word: str) -> Tuple[str, ...]:
+    if not "가" <= word[0] <= "힣":
+        return (word,)
+    stem = word
+    for length, suffixes in _SUFFIXES_BY_LENGTH:
+        # 한 글자 조사는 어간이 두 글자 이상 남을 때만 (아이 → 아 처럼 잘리지 않도록)
+        if len(word) - length >= (2 if length == 1 else 1) and word[-length:] in suffixes:
+            stem = word[:-length]
+            break
+    if len(stem) <= 2:
+        return (stem,)
+    return (stem, *(stem[i:i + 2] for i in range(len(stem) - 1)))
+
+
+def word_tokens(text: str) -> List[Tuple[str, ...]]:
+    """단어별 토큰 묶음 (한글은 어간 + bigram, 영문·숫자는 단어 그대로)"""
+    return list(map(_word_tokens, _WORD.findall(unicodedata.normalize("NFKC", text).lower())))
+
+
+def tokenize(text: str) -> List[str]:
+    return list(chain.from_iterable(map(_word_tokens, _WORD.findall(unicodedata.normalize("NFKC", text).lower()))))
@@ -0,0 +1,197 @@
+"""
+검색 서비스 (챗봇 답변 근거 문서)
+- RETRIEVAL_INDEX_DIR 의 메모리 맵 인덱스를 열어 검색 (index_builder 로 미리 생성)
+  인덱스가 없으면 검색 없이 동작 (채팅은 근거 문서 없이 그대로 응답)
+- 검색은 NumPy 연산이라 이벤트 루프를 막지 않도록 스레드에서 실행
+- dense 검색은 추론 스케줄러(BatchScheduler)로 동시 요청을 묶어 한 번에 계산 (RETRIEVAL_BATCHING, 기본 켜짐)
+  BM25 는 질의마다 읽는 posting 이 달라 묶어도 이득이 없으므로 스레드에서 따로 실행하고 dense 와 동시에 진행
+- 빌더가 디렉터리를 통째로 교체하므로 RETRIEVAL_RELOAD_SECONDS 마다 manifest 를 확인해 새 인덱스로 바꿈
+  (이전 인덱스를 쓰던 검색은 열린 파일로 끝까지 진행)
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.common.inference.batch_scheduler import BatchScheduler
+from app.domain.chat.service.chat_metrics import percentiles
+from ..model.retrieval_index import MANIFEST, MODES, RetrievalIndex
+from ..model.tokenizer import tokenize
+
+logger = logging.getLogger(__name__)
+
+# 프로세스 워커(INFERENCE_EXECUTOR=process)가 연 인덱스 (경로, build_id) → 인덱스
+_WORKER_INDEXES: Dict[Tuple[str, Optional[str]], RetrievalIndex] = {}
+
+
+class DenseSearchModel:
+    """
+    스케줄러에 넣는 dense 검색 모델: [(토큰, 회사 코드, k)] → [(build_id, 결과)]
+    pickle 할 때는 경로와 build_id 만 넘기고, 프로세스 워커는 같은 파일을 직접 memmap 으로 엶 (페이지 공유)
+    """
+
+    def __init__(self, index: RetrievalIndex, nprobe: int):
+        self.index = index
+        self.nprobe = nprobe
+
+    def __call__(self, queries: List[Tuple[List[str], int, int]]) -> List[Tuple[Optional[str], list]]:
+        build_id = self.index.manifest.get("build_id")
+        return [(build_id, hits) for hits in self.index.dense_search_batch(queries, self.nprobe)]
+
+    def __getstate__(self):
+        return {"path": self.index.path, "build_id": self.index.manifest.get("build_id"), "nprobe": self.nprobe}
+
+    def __setstate__(self, state):
+        key = (state["path"], state["build_id"])
+        if key not in _WORKER_INDEXES:
+            _WORKER_INDEXES.clear()
+            _WORKER_INDEXES[key] = RetrievalIndex(state["path"])
+        self.index = _WORKER_INDEXES[key]
+        self.nprobe = state["nprobe"]
+
+
+class RetrievalService:
+    def __init__(
+        self,
+        index_dir: Optional[str] = None,
+        mode: Optional[str] = None,
+        nprobe: Optional[int] = None,
+        reload_interval: Optional[float] = None,
+        batching: Optional[bool] = None,
+    ):
+        self.index_dir = index_dir or os.getenv("RETRIEVAL_INDEX_DIR", "")
+        self.mode = mode or os.getenv("RETRIEVAL_MODE", "hybrid")
+        self.nprobe = nprobe or int(os.getenv("RETRIEVAL_NPROBE", "16"))
+        self.reload_interval = reload_interval or float(os.getenv("RETRIEVAL_RELOAD_SECONDS", "60"))
+        if self.mode not in MODES:
+            raise ValueError(f"알 수 없는 RETRIEVAL_MODE: {self.mode} (사용 가능: {', '.join(MODES)})")
+        if batching is None:
+            batching = os.getenv("RETRIEVAL_BATCHING", "true").lower() in ("1", "true", "yes")
+        self.scheduler = BatchScheduler(None, name="dense_retrieval") if batching else None
+        self.index: Optional[RetrievalIndex] = None
+        self.latency_ms: Deque[float] = deque(maxlen=1000)
+        self.searches = 0
+        self._reload_task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.index is not None
+
+    @property
+    def build_id(self) -> Optional[str]:
+        """지금 인덱스의 빌드 id (인덱스가 바뀌면 달라짐), 인덱스가 없으면 None"""
+        return self.index.manifest.get("build_id") if self.index is not None else None
+
+    async def start(self):
+        if not self.index_dir:
+            logger.info("ℹ️ RETRIEVAL_INDEX_DIR 미설정: 근거 문서 검색 없이 동작합니다")
+            return
+        await self.reload()
+        if self.scheduler is not None:
+            await self.scheduler.start()
+        self._reload_task = asyncio.create_task(self._reload_loop())
+
+    async def stop(self):
+        if self._reload_task:
+            self._reload_task.cancel()
+            try:
+                await self._reload_task
+            except asyncio.CancelledError:
+                pass
+            self._reload_task = None
+        if self.scheduler is not None:
+            await self.scheduler.stop()
+
+    def _manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.index_dir, MANIFEST), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    async def reload(self) -> bool:
+        """디스크의 인덱스가 지금 것과 다르면 새로 엶, 바뀌었으면 True"""
+        manifest = self._manifest()
+        if manifest is None:
+            if self.index is None:
+                logger.warning(f"⚠️ 검색 인덱스 없음: {self.index_dir} (근거 문서 검색 없이 동작)")
+            return False
+        if self.index is not None and self.index.manifest.get("build_id") == manifest.get("build_id"):
+            return False
+        try:
+            index = await asyncio.to_thread(RetrievalIndex, self.index_dir)
+        except Exception as e:
+            logger.error(f"❌ 검색 인덱스 열기 실패: {self.index_dir}, {type(e).__name__}: {e}")
+            return False
+        self.index = index
+        if self.scheduler is not None:
+            self.scheduler.model = DenseSearchModel(index, self.nprobe)
+        logger.info(f"✅ 검색 인덱스 로드: passage {len(index)}개, 용어 {index.manifest['terms']}개 ({manifest.get('built_at')})")
+        return True
+
+    async def _reload_loop(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.warning(f"⚠️ 검색 인덱스 확인 실패: {e}")
+
+    async def search(
+        self,
+        query: str,
+        company_id: Optional[str] = None,
+        k: int = 5,
+        mode: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """공용 문서 + company_id 의 문서 중 상위 k 개, 인덱스가 없으면 빈 목록"""
+        index = self.index
+        if index is None:
+            return []
+        mode = mode or self.mode
+        started = time.perf_counter()
+        if self.scheduler is None:
+            results = await asyncio.to_thread(index.search, query, company_id, k, mode, self.nprobe)
+        else:
+            results = await self._search_batched(index, query, company_id, k, mode)
+        self.latency_ms.append((time.perf_counter() - started) * 1000)
+        self.searches += 1
+        return results
+
+    async def _search_batched(
+        self, index: RetrievalIndex, query: str, company_id: Optional[str], k: int, mode: str
+    ) -> List[Dict[str, Any]]:
+        tokens = tokenize(query)
+        code = index.company_code(company_id)
+        depth = index.depth(mode, k)
+        dense = (
+            asyncio.ensure_future(self.scheduler.submit((tokens, code, depth)))
+            if mode != "bm25" else None
+        )
+        try:
+            bm25_hits = await asyncio.to_thread(index.bm25, tokens, code, depth) if mode != "dense" else []
+            dense_hits = []
+            if dense is not None:
+                build_id, dense_hits = await dense
+                if build_id != index.manifest.get("build_id"):
+                    # 배치가 도는 사이 인덱스가 바뀜 → 문서 번호가 달라지므로 이 인덱스로 다시 계산
+                    dense_hits = await asyncio.to_thread(index.dense_search, tokens, code, depth, self.nprobe)
+        finally:
+            if dense is not None and not dense.done():
+                dense.cancel()
+        return index.materialize(index.fuse(mode, bm25_hits, dense_hits, k))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "index_dir": self.index_dir or None,
+            "mode": self.mode,
+            "nprobe": self.nprobe,
+            "batching": self.scheduler is not None,
+            "searches": self.searches,
+            "latency_ms": percentiles(self.latency_ms),
+            **({"index": self.index.stats()} if self.index is not None else {}),
+        }
@@ -0,0 +1,119 @@
+"""
+Chatbot Service 메인 파일
+"""
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+import logging
+import os
+import sys
+
+from app.common.logs import RequestContextMiddleware, install_log_shipping
+from app.common.startup import LazyStartup
+from app.common.tracing import install_tracing, tracer
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger("chatbot_service")
+# monitoring-service 로 로그 배치 전송 (MONITORING_SERVICE_URL 이 있을 때, stdout 로그는 그대로)
+install_log_shipping("chatbot-service")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("🚀 Chatbot Service 시작")
+    # 채팅 백엔드/검색 인덱스/대화 저장소 초기화는 백그라운드에서 (헬스체크는 바로 응답, 나머지 요청은 준비될 때까지 대기)
+    startup.start()
+    yield
+    await startup.stop()
+    logger.info("🛑 Chatbot Service 종료")
+
+app = FastAPI(
+    title="Chatbot Service",
+    description="Chatbot Service for EriPotter Project",
+    version="0.1.0",
+    lifespan=lifespan
+)
+
+# CORS 설정 (Gateway 경유 호출이 기본)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=False,
+    allow_methods=["GET", "POST"],
+    allow_headers=["*"],
+)
+
+# 지연 시작: 라우터와 서비스 초기화(app.bootstrap)는 "startup complete" 이후 백그라운드에서
+startup = LazyStartup(app, services="app.bootstrap:services", exempt=("/", "/health", "/health/startup"))
+
+# 요청마다 X-Request-ID (받거나 새로 만듦) → 이 요청 중 남긴 로그에 request_id 로 붙음
+app.add_middleware(RequestContextMiddleware)
+# 분산 추적: 게이트웨이의 traceparent 를 이어받아 요청마다 server 스팬, 스팬은 monitoring-service 로
+install_tracing(app, tracer, "chatbot-service")
+
+# 기본 루트 경로
+@app.get("/")
+async def root():
+    return {"message": "Chatbot Service", "version": "0.1.0", "status": "running", "service": "chatbot"}
+
+# 헬스 체크 (서비스가 아직 준비 전이거나 초기화가 실패해 재시도 중이면 503)
+@app.get("/health")
+async def health():
+    unready = startup.unready()
+    if unready is not None:
+        return JSONResponse(status_code=503, content={**unready, "service": "chatbot"})
+    return {"status": "healthy", "service": "chatbot"}
+
+# 시작 단계별 소요 시간
+@app.get("/health/startup")
+async def startup_health():
+    """지연 시작 진행 상황: 준비 여부, 시도 횟수, 단계별 ms"""
+    return startup.report()
+
+# 채팅 스트림 지표
+@app.get("/health/chat")
+async def chat_health():
+    """진행 중 스트림 수, 누적 건수, 첫 바이트/첫 토큰 지연과 tokens/sec 의 p50/p95"""
+    service = app.state.chat_service
+    return {"backend": service.backend.name, **service.metrics.snapshot()}
+
+# 검색 인덱스 상태
+@app.get("/health/retrieval")
+async def retrieval_health():
+    """인덱스 크기/빌드 시각, 검색 방식, 검색 지연 p50/p95"""
+    return app.state.retrieval_service.stats()
+
+# 대화 저장소 상태
+@app.get("/health/conversations")
+async def conversations_health():
+    """저장소 종류, (로컬이면) 세션 수와 세션당 바이트, 문맥 창 구성 시간과 메시지 수 p50/p95"""
+    return app.state.chat_service.conversations.stats()
+
+# 추론 배치 스케줄러 지표
+@app.get("/health/inference")
+async def inference_health():
+    """배치 크기, 대기열 대기 시간, 배치 실행 시간, 초당 처리 건수, padding 비율"""
+    scheduler = app.state.retrieval_service.scheduler
+    return {"schedulers": [scheduler.stats()] if scheduler is not None else []}
+
+# 답변 캐시 지표
+@app.get("/health/cache")
+async def cache_health():
+    """exact/semantic 적중률, 저장 답변 수, 제거/만료 건수, 절약한 생성 시간과 토큰 수"""
+    cache = app.state.chat_service.cache
+    return cache.stats() if cache is not None else {"enabled": False}
+
+# 라우터 등록 (지연 import, 없으면 경고만)
+startup.include_router("app.router.chat_router:router", "chat_router")
+startup.include_router("app.router.retrieval_router:router", "retrieval_router")
+
+if __name__ == "__main__":
+    import uvicorn
+    port = int(os.getenv("PORT", 8001))
+    logger.info(f"🚀 서버 시작: 포트 {port}")
+    uvicorn.run(app, host="0.0.0.0", port=port)
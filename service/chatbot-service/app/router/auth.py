@@ -0,0 +1,26 @@
+"""
+요청자 세션
+- 게이트웨이는 Authorization / session_token 쿠키를 그대로 넘기므로, account-service 와 같은 Redis 세션 저장소에서 세션을 읽음
+- 회사(tenant)와 사용자는 항상 세션에서 꺼냄 (쿼리/본문의 company_id 는 신뢰하지 않음)
+"""
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, Request
+
+from app.common.session import extract_session_token
+
+
+async def current_session(request: Request) -> Optional[Dict[str, Any]]:
+    """로그인 세션, 토큰이 없거나 만료됐으면 None"""
+    token = extract_session_token(request)
+    if not token:
+        return None
+    return await request.app.state.session_store.get(token)
+
+
+async def require_session(request: Request) -> Dict[str, Any]:
+    """로그인 세션, 없으면 401"""
+    session = await current_session(request)
+    if session is None:
+        raise HTTPException(status_code=401, detail="인증이 필요합니다")
+    return session
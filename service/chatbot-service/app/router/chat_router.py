@@ -0,0 +1,67 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.domain.chat.model.chat_model import MAX_MESSAGE_CHARS, ChatRequest
+from .auth import current_session, require_session
+
+router = APIRouter(tags=["chat"])
+
+# 프록시/브라우저가 이벤트를 모아 두지 않도록
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+async def _sse(request: Request, chat_request: ChatRequest) -> StreamingResponse:
+    # 검색 범위와 답변 캐시는 회사별이므로 회사는 로그인 세션에서 (비로그인은 공용 문서만)
+    # 서버에 저장하는 대화는 로그인한 사용자 소유 → 비로그인으로 conversation_id 를 쓰면 401
+    session = await current_session(request)
+    if session is None and chat_request.conversation_id:
+        raise HTTPException(status_code=401, detail="대화를 저장하려면 로그인이 필요합니다")
+    chat_request = chat_request.model_copy(update={
+        "company_id": session.get("company_id") if session else None,
+        "user_id": session["user_id"] if session else None,
+    })
+    service = request.app.state.chat_service
+    return StreamingResponse(service.stream(chat_request), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/chat")
+async def chat(chat_request: ChatRequest, request: Request):
+    """질문을 받아 응답을 토큰 단위 SSE 로 스트리밍 (start → sources → token... → done, 대기 중에는 heartbeat)"""
+    return await _sse(request, chat_request)
+
+
+@router.get("/chat")
+async def chat_event_source(
+    request: Request,
+    message: str = Query(..., min_length=1, max_length=MAX_MESSAGE_CHARS),
+    conversation_id: Optional[str] = Query(default=None, max_length=100),
+    max_tokens: Optional[int] = Query(default=None, ge=1, le=4096),
+):
+    """브라우저 EventSource 용 (GET 만 가능하므로 질문을 쿼리로 받음, 이전 대화는 conversation_id 로 서버에 저장된 대화 사용)"""
+    return await _sse(request, ChatRequest(message=message, conversation_id=conversation_id, max_tokens=max_tokens))
+
+
+@router.get("/chat/conversations/{conversation_id}")
+async def conversation_messages(
+    conversation_id: str,
+    request: Request,
+):
+    """서버에 저장된 내 대화 전체 (화면 복원용, 다른 사용자의 대화는 404)"""
+    session = await require_session(request)
+    messages = await request.app.state.chat_service.conversations.messages(session["user_id"], conversation_id)
+    if not messages:
+        raise HTTPException(status_code=404, detail="대화를 찾을 수 없습니다")
+    return {"conversation_id": conversation_id, "messages": messages}
+
+
+@router.delete("/chat/conversations/{conversation_id}")
+async def delete_conversation(
+    conversation_id: str,
+    request: Request,
+):
+    """저장된 내 대화 삭제 (다음 질문부터 이전 대화 없이 응답)"""
+    session = await require_session(request)
+    deleted = await request.app.state.chat_service.conversations.delete(session["user_id"], conversation_id)
+    return {"conversation_id": conversation_id, "deleted": deleted}
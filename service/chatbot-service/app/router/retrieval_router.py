@@ -0,0 +1,31 @@
+import time
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from .auth import current_session
+
+router = APIRouter(prefix="/retrieval", tags=["retrieval"])
+
+
+@router.get("/search")
+async def search(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=1000),
+    k: int = Query(default=5, ge=1, le=50),
+    mode: Optional[Literal["bm25", "dense", "hybrid"]] = Query(default=None),
+):
+    """근거 문서 검색 (공용 문서 + 로그인한 사용자 회사의 문서, 비로그인은 공용 문서만), mode 를 비우면 RETRIEVAL_MODE"""
+    service = request.app.state.retrieval_service
+    if not service.enabled:
+        raise HTTPException(status_code=503, detail="검색 인덱스가 없습니다 (RETRIEVAL_INDEX_DIR)")
+    session = await current_session(request)
+    company_id = session.get("company_id") if session else None
+    started = time.perf_counter()
+    results = await service.search(q, company_id, k, mode)
+    return {
+        "query": q,
+        "mode": mode or service.mode,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        "results": results,
+    }
@@ -0,0 +1,138 @@
+"""
+답변 캐시 벤치마크
+
+    python -m benchmarks.answer_cache_benchmark [--questions 2000] [--requests 50000] [--entries 10000,100000]
+
+- 적중률: 가상 질문 N개를 Zipf 분포로 반복해서 묻고(절반은 띄어쓰기/어미/문장부호를 바꾼 변형),
+  exact 만 쓸 때와 exact + semantic 을 쓸 때의 적중률, 절약한 생성 시간, 다른 질문의 답변을 돌려준 건수(오답) 비교
+- ANN: 한 범위에 답변 N개가 있을 때 LSH 후보 검색 vs 전체 비교의 조회 지연과 재현율
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from app.domain.chat.service.answer_cache import AnswerCache
+from benchmarks.retrieval_benchmark import make_queries
+
+_ENDINGS = ["", "?", " 알려줘", " 알려주세요", "은 어떻게 하나요?", "는 어떻게 하나요", "를 공시해야 하나요"]
+
+
+def distinct_questions(count: int, seed: int = 3) -> List[str]:
+    questions = list(dict.fromkeys(make_queries(count * 2, seed)))
+    return questions[:count]
+
+
+def variant(question: str, rng: random.Random) -> str:
+    """같은 뜻의 표면형 변화 하나"""
+    words = question.rstrip("?").split(" ")
+    kind = rng.randrange(4)
+    if kind == 0:
+        return question.rstrip("?") + rng.choice(["", "?", "??", "!", " ?"])
+    if kind == 1 and len(words) > 2:
+        i = rng.randrange(len(words) - 1)
+        return " ".join(words[:i] + [words[i] + words[i + 1]] + words[i + 2:])
+    if kind == 2:
+        long = [i for i, w in enumerate(words) if len(w) >= 4]
+        if long:
+            i = rng.choice(long)
+            cut = rng.randrange(2, len(words[i]) - 1)
+            return " ".join(words[:i] + [words[i][:cut], words[i][cut:]] + words[i + 1:])
+    base = question
+    for ending in sorted(_ENDINGS, key=len, reverse=True):
+        if ending and base.endswith(ending):
+            base = base[:-len(ending)]
+            break
+    return base + rng.choice(_ENDINGS)
+
+
+async def hit_rate(questions: List[str], requests: int, generation_ms: float, similarity: float, seed: int = 11) -> Dict:
+    rng = random.Random(seed)
+    ranks = np.arange(1, len(questions) + 1)
+    weights = 1 / ranks ** 1.1
+    picks = np.random.default_rng(seed).choice(len(questions), requests, p=weights / weights.sum())
+    cache = AnswerCache(max_entries=len(questions) // 2, ttl=3600, similarity=similarity)
+    wrong = 0
+    for pick in picks:
+        asked = questions[pick] if rng.random() < 0.5 else variant(questions[pick], rng)
+        query = cache.query(asked, "c0001", "ctx")
+        hit = await cache.lookup(query)
+        if hit is None:
+            await cache.store(query, [str(pick)], [], generation_ms)
+        elif hit.answer.text != str(pick):
+            wrong += 1
+    stats = cache.stats()
+    return {**stats, "wrong": wrong}
+
+
+async def ann_benchmark(entries: int, lookups: int = 2000, seed: int = 13) -> Dict[str, float]:
+    rng = random.Random(seed)
+    questions = distinct_questions(entries, seed)
+    cache = AnswerCache(max_entries=len(questions), ttl=3600)
+    for i, question in enumerate(questions):
+        await cache.store(cache.query(question, "c0001", "ctx"), [str(i)], [], 1.0)
+    vectors = cache._vectors[:len(cache._slots)]
+    lsh_ms, full_ms = [], []
+    found = lsh_found = 0
+    for _ in range(lookups):
+        query = cache.query(variant(rng.choice(questions), rng), "c0001", "ctx")
+        await cache._embed(query)
+        if query.vector is None:
+            continue
+        started = time.perf_counter()
+        hit = cache._semantic(query)
+        lsh_ms.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        scores = vectors @ query.vector
+        best = None
+        for slot in np.flatnonzero(scores >= cache.similarity)[np.argsort(-scores[scores >= cache.similarity])]:
+            answer = cache._slots[slot]
+            if answer is not None and cache._matches(query, answer):
+                best = answer
+                break
+        full_ms.append((time.perf_counter() - started) * 1000)
+        if best is not None:
+            found += 1
+            lsh_found += hit is not None
+    lsh_ms.sort()
+    full_ms.sort()
+    return {
+        "entries": len(questions),
+        "lsh_p50": lsh_ms[len(lsh_ms) // 2],
+        "full_p50": full_ms[len(full_ms) // 2],
+        "recall": lsh_found / found if found else float("nan"),
+        "matchable": found / len(lsh_ms),
+    }
+
+
+async def run(args):
+    questions = distinct_questions(args.questions)
+    print(f"\n적중률 (질문 {len(questions)}개, 요청 {args.requests:,}건, Zipf 1.1, 변형 50%, 용량 {len(questions) // 2}, "
+          f"생성 {args.generation_ms:.0f}ms 가정)")
+    print(f"{'계층':>16} {'hit rate':>9} {'exact':>7} {'semantic':>9} {'오답':>5} {'절약 (초)':>10}")
+    for label, similarity in (("exact", 1.0), ("exact+semantic", 0.8)):
+        stats = await hit_rate(questions, args.requests, args.generation_ms, similarity)
+        print(f"{label:>16} {stats['hit_rate']:>9.3f} {stats['exact_hits']:>7} {stats['semantic_hits']:>9} "
+              f"{stats['wrong']:>5} {stats['saved_compute_ms'] / 1000:>10.0f}")
+
+    print(f"\nANN (한 범위, 변형 질문 조회)")
+    print(f"{'entries':>8} {'LSH p50 ms':>11} {'전체 p50 ms':>12} {'recall':>7}")
+    for entries in [int(e) for e in args.entries.split(",")]:
+        stats = await ann_benchmark(entries)
+        print(f"{stats['entries']:>8} {stats['lsh_p50']:>11.3f} {stats['full_p50']:>12.3f} {stats['recall']:>7.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="답변 캐시 벤치마크")
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=50_000)
+    parser.add_argument("--generation-ms", type=float, default=2000)
+    parser.add_argument("--entries", default="10000,100000")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
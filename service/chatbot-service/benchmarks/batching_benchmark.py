@@ -0,0 +1,147 @@
+"""
+마이크로 배치 스케줄러 벤치마크
+
+    python -m benchmarks.batching_benchmark [--dir /tmp/retrieval-bench] [--passages 200000] [--clients 1,8,32,64]
+
+- dense 검색: 동시 클라이언트 수별로 요청마다 스레드에서 따로 실행 vs BatchScheduler (max_wait 0 / 2 / 5ms)
+  클라이언트는 응답을 받으면 바로 다음 요청을 보냄 (closed loop), QPS / p50 / p99 지연 / 평균 배치 크기
+- padding 이 있는 모델: 길이가 제각각인 입력을 최대 길이로 채워 계산하는 가상 인코더로
+  길이별 묶기 유무에 따른 처리량과 padding 비율(채워 넣은 토큰 / 계산한 토큰) 비교
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from app.common.inference.batch_scheduler import BatchScheduler
+from app.domain.retrieval.model.index_builder import IndexBuilder, read_jsonl
+from app.domain.retrieval.model.retrieval_index import RetrievalIndex
+from app.domain.retrieval.model.tokenizer import tokenize
+from app.domain.retrieval.service.retrieval_service import DenseSearchModel
+from benchmarks.retrieval_benchmark import make_passages, make_queries
+
+
+async def closed_loop(call: Callable[[int], Any], clients: int, seconds: float) -> Dict[str, float]:
+    samples: List[float] = []
+    deadline = time.perf_counter() + seconds
+
+    async def client(seed: int):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await call(rng.randrange(1 << 30))
+            samples.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    elapsed = time.perf_counter() - started
+    samples.sort()
+    return {
+        "qps": len(samples) / elapsed,
+        "p50": samples[len(samples) // 2],
+        "p99": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+async def dense_benchmark(index: RetrievalIndex, clients_list: List[int], seconds: float, nprobe: int):
+    queries = [(tokenize(q), index.company_code(f"c{i % 500:04d}"), 10) for i, q in enumerate(make_queries(500))]
+
+    print(f"\ndense 검색 (nprobe {nprobe}, 인덱스 {len(index):,}개)")
+    print(f"{'clients':>8} {'방식':>16} {'qps':>8} {'p50 ms':>8} {'p99 ms':>8} {'batch':>6}")
+    for clients in clients_list:
+        async def direct(i: int):
+            tokens, code, k = queries[i % len(queries)]
+            return await asyncio.to_thread(index.dense_search, tokens, code, k, nprobe)
+
+        stats = await closed_loop(direct, clients, seconds)
+        print(f"{clients:>8} {'per-request':>16} {stats['qps']:>8.0f} {stats['p50']:>8.2f} {stats['p99']:>8.2f} {'1':>6}")
+
+        for wait in (0, 2, 5):
+            scheduler = BatchScheduler(DenseSearchModel(index, nprobe), "dense", max_batch_size=32, max_wait_ms=wait)
+            await scheduler.start()
+            stats = await closed_loop(lambda i: scheduler.submit(queries[i % len(queries)]), clients, seconds)
+            batch = scheduler.stats()["batch_size"]["mean"]
+            await scheduler.stop()
+            label = f"batch wait={wait}ms"
+            print(f"{clients:>8} {label:>16} {stats['qps']:>8.0f} {stats['p50']:>8.2f} {stats['p99']:>8.2f} {batch:>6.1f}")
+
+
+class PaddedEncoder:
+    """토큰 id 를 배치 최대 길이로 채운 뒤 임베딩 → 선형층 → 평균 (padding 도 똑같이 계산됨)"""
+
+    def __init__(self, vocab: int = 30_000, dim: int = 256, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.embedding = rng.standard_normal((vocab, dim)).astype(np.float32)
+        self.weight = rng.standard_normal((dim, dim)).astype(np.float32) / np.sqrt(dim)
+        self.tokens = self.padded_tokens = 0
+
+    def __call__(self, batch: List[np.ndarray]) -> List[np.ndarray]:
+        longest = max(len(ids) for ids in batch)
+        self.tokens += sum(len(ids) for ids in batch)
+        self.padded_tokens += longest * len(batch)
+        padded = np.zeros((len(batch), longest), np.int64)
+        mask = np.zeros((len(batch), longest, 1), np.float32)
+        for row, ids in enumerate(batch):
+            padded[row, :len(ids)] = ids
+            mask[row, :len(ids)] = 1
+        hidden = np.tanh(self.embedding[padded] @ self.weight)
+        pooled = (hidden * mask).sum(axis=1) / mask.sum(axis=1)
+        return list(pooled)
+
+
+async def padding_benchmark(clients: int, seconds: float):
+    rng = np.random.default_rng(1)
+    # 짧은 질문이 대부분이고 긴 입력이 가끔 섞임
+    inputs = [rng.integers(1, 30_000, int(min(512, 8 + rng.pareto(1.2) * 24))) for _ in range(2000)]
+    print(f"\npadding 이 있는 모델 (clients {clients}, 입력 길이 p50 {int(np.median([len(x) for x in inputs]))} / "
+          f"max {max(len(x) for x in inputs)})")
+    print(f"{'묶는 방식':>12} {'qps':>8} {'p50 ms':>8} {'p99 ms':>8} {'batch':>6} {'padding':>8}")
+    for label, by_length in (("도착 순서", False), ("길이별", True)):
+        model = PaddedEncoder()
+        scheduler = BatchScheduler(model, "encoder", max_batch_size=32, max_wait_ms=0)
+        await scheduler.start()
+
+        async def call(i: int):
+            ids = inputs[i % len(inputs)]
+            return await scheduler.submit(ids, len(ids) if by_length else None)
+
+        stats = await closed_loop(call, clients, seconds)
+        metrics = scheduler.stats()
+        await scheduler.stop()
+        padding = 1 - model.tokens / model.padded_tokens
+        print(f"{label:>12} {stats['qps']:>8.0f} {stats['p50']:>8.2f} {stats['p99']:>8.2f} "
+              f"{metrics['batch_size']['mean']:>6.1f} {padding:>8.2f}")
+
+
+def ensure_index(path: str, passages: int) -> RetrievalIndex:
+    if not os.path.exists(os.path.join(path, "manifest.json")):
+        source = f"{path}.jsonl"
+        with open(source, "w", encoding="utf-8") as f:
+            for passage in make_passages(passages):
+                f.write(json.dumps(passage, ensure_ascii=False) + "\n")
+        IndexBuilder(path).build(read_jsonl(source))
+    return RetrievalIndex(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="마이크로 배치 스케줄러 벤치마크")
+    parser.add_argument("--dir", default="/tmp/retrieval-bench")
+    parser.add_argument("--passages", type=int, default=200_000, help="--dir 에 인덱스가 없을 때 만들 passage 수")
+    parser.add_argument("--clients", default="1,8,32,64")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--nprobe", type=int, default=16)
+    args = parser.parse_args()
+
+    index = ensure_index(args.dir, args.passages)
+    clients = [int(c) for c in args.clients.split(",")]
+    asyncio.run(dense_benchmark(index, clients, args.seconds, args.nprobe))
+    asyncio.run(padding_benchmark(max(clients), args.seconds))
+
+
+if __name__ == "__main__":
+    main()
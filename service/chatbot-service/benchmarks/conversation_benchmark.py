@@ -0,0 +1,118 @@
+"""
+대화 저장소 벤치마크
+
+    python -m benchmarks.conversation_benchmark [--sessions 10000] [--turns 5] [--history 10,100,1000]
+
+- 유휴 세션당 메모리: 세션마다 dict 목록을 그대로 들고 있을 때 vs 로컬 저장소(msgpack 로그 + 누적합) vs Redis 에 들어가는 값 크기
+- 턴당 문맥 창 구성 시간: 매 턴 전체 대화의 토큰을 다시 세고 앞에서부터 버리는 방식 vs 저장된 토큰 수로 고르는 방식
+"""
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+from typing import Dict, List
+
+import msgpack
+
+from app.domain.chat.service.conversation_store import ConversationStore, estimate_tokens
+
+_SYLLABLES = "가나다라마바사아자차카타파하거너더러머버서어저처커터퍼허고노도로모보소오조초코토포호구누두루무부수우주"
+
+
+def make_message(rng: random.Random, role: str) -> Dict[str, str]:
+    # 질문은 짧고 답변은 긺
+    words = rng.randint(5, 15) if role == "user" else rng.randint(60, 140)
+    text = " ".join("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 5))) for _ in range(words))
+    return {"role": role, "content": text}
+
+
+def make_turns(rng: random.Random, turns: int) -> List[Dict[str, str]]:
+    return [make_message(rng, role) for _ in range(turns) for role in ("user", "assistant")]
+
+
+def naive_window(history: List[Dict[str, str]], budget: int) -> List[Dict[str, str]]:
+    """매 턴 전체 대화 토큰을 다시 세고 예산을 넘는 동안 가장 오래된 메시지를 버림"""
+    window = list(history)
+    counts = [estimate_tokens(m["content"]) for m in window]
+    total = sum(counts)
+    while window and total > budget:
+        total -= counts.pop(0)
+        window.pop(0)
+    return window
+
+
+async def memory(sessions: int, turns: int):
+    rng = random.Random(1)
+    conversations = [make_turns(rng, turns) for _ in range(sessions)]
+    # msgpack 이 원본 str 에 UTF-8 사본을 캐시하므로 측정 전에 미리 만들어 둠 (요청 문자열은 응답 후 사라짐)
+    for turns_ in conversations:
+        for m in turns_:
+            msgpack.packb(m["content"])
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    naive = {
+        f"conv-{i}": [{"role": m["role"], "content": m["content"].encode().decode()} for m in turns_]
+        for i, turns_ in enumerate(conversations)
+    }
+    naive_bytes = tracemalloc.get_traced_memory()[0] - before
+    del naive
+
+    store = ConversationStore(redis_url="", local_max_sessions=sessions)
+    before = tracemalloc.get_traced_memory()[0]
+    for i, turns_ in enumerate(conversations):
+        for j in range(0, len(turns_), 2):
+            await store.append("u0001", f"conv-{i}", turns_[j:j + 2])
+    store_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    # Redis 에는 로그 레코드(list 항목) + 메시지당 uint32 토큰 수만 들어감 (키/자료구조 오버헤드 제외)
+    payload = sum(len(session.log) + 4 * len(session) for session in store._local.values())
+    text = sum(len(m["content"].encode("utf-8")) for turns_ in conversations for m in turns_)
+
+    print(f"\n유휴 세션당 메모리 (세션 {sessions:,}개, 세션당 {turns}턴, 본문 UTF-8 {text // sessions:,} B/세션)")
+    print(f"{'방식':>24} {'B/세션':>10}")
+    print(f"{'dict 목록':>24} {naive_bytes // sessions:>10,}")
+    print(f"{'로컬 저장소 (전체)':>24} {store_bytes // sessions:>10,}")
+    print(f"{'Redis 값 (로그 + 토큰 수)':>24} {payload // sessions:>10,}")
+
+
+async def assembly(history_lengths: List[int], budget: int, turns_per_run: int = 200):
+    rng = random.Random(2)
+    print(f"\n턴당 문맥 창 구성 (예산 {budget} 토큰)")
+    print(f"{'대화 길이':>10} {'다시 세기 ms':>14} {'저장소 ms':>10} {'창 메시지':>10}")
+    for length in history_lengths:
+        history = make_turns(rng, length // 2)
+        store = ConversationStore(redis_url="", context_tokens=budget)
+        for i in range(0, len(history), 2):
+            await store.append("u", "conv", history[i:i + 2])
+
+        started = time.perf_counter()
+        for _ in range(turns_per_run):
+            window = naive_window(history, budget)
+        naive_ms = (time.perf_counter() - started) * 1000 / turns_per_run
+
+        started = time.perf_counter()
+        for _ in range(turns_per_run):
+            stored = await store.window("u", "conv")
+        store_ms = (time.perf_counter() - started) * 1000 / turns_per_run
+        assert stored == window
+        print(f"{length:>10} {naive_ms:>14.3f} {store_ms:>10.3f} {len(stored):>10}")
+
+
+async def run(args):
+    await memory(args.sessions, args.turns)
+    await assembly([int(n) for n in args.history.split(",")], args.budget)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대화 저장소 벤치마크")
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--history", default="10,100,1000")
+    parser.add_argument("--budget", type=int, default=3000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+검색 인덱스 벤치마크 (가상 ESG passage)
+
+    python -m benchmarks.retrieval_benchmark [--passages 1000000] [--dir /tmp/retrieval-bench] [--workers 4] [--reuse]
+
+- build: 인덱스 생성 시간 / 처리량 / 파일 크기
+- 검색 방식(bm25 / dense / hybrid)별, 회사 범위 유무별 단일 스레드 QPS 와 p50 / p99 지연
+- dense IVF 의 nprobe 별 recall@10 (전체 벡터를 모두 비교한 결과 대비)
+- 여러 프로세스가 같은 인덱스를 열고 동시에 검색할 때 전체 QPS 와 프로세스별 메모리
+  RSS 는 공유 페이지를 프로세스마다 중복해서 세고, PSS 는 나눠서 셈 → 인덱스 페이지가 공유되면 PSS 합 ≈ RSS 하나
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+from app.domain.retrieval.model.index_builder import IndexBuilder, read_jsonl
+from app.domain.retrieval.model.retrieval_index import RetrievalIndex
+from app.domain.retrieval.model.tokenizer import tokenize
+
+_TOPICS = [
+    "온실가스", "탄소배출량", "스코프", "재생에너지", "에너지효율", "용수", "폐수", "폐기물", "재활용", "유해물질",
+    "대기오염", "생물다양성", "기후변화", "산업안전", "중대재해", "협력사", "공급망", "인권", "다양성", "임직원",
+    "교육훈련", "정보보호", "개인정보", "윤리경영", "반부패", "이사회", "감사위원회", "주주권리", "지배구조", "내부통제",
+    "지역사회", "사회공헌", "고객만족", "제품안전", "품질경영", "분쟁광물", "포장재", "순환경제", "탄소중립", "배출권",
+]
+_VERBS = ["관리", "측정", "보고", "감축", "개선", "점검", "공시", "평가", "수립", "운영", "검증", "모니터링", "교육", "확대"]
+_NOUNS = [
+    "목표", "지표", "정책", "체계", "계획", "현황", "실적", "절차", "기준", "성과", "리스크", "기회", "프로그램", "위원회",
+    "데이터", "범위", "주기", "책임자", "예산", "인증", "가이드라인", "시스템", "프로세스", "로드맵",
+]
+_JOSA = ["은", "는", "을", "를", "의", "에", "에서", "으로", "과", "와", "이", "가", ""]
+_STANDARDS = ["gri", "sasb", "tcfd", "issb", "k-esg", "iso14001", "iso45001", "cdp", "sbti", "re100"]
+_SYLLABLES = "가나다라마바사아자차카타파하거너더러머버서어저처커터퍼허고노도로모보소오조초코토포호구누두루무부수우주추쿠투푸후기니디리미비시지치키티피히강경공관광국금기남동명문민방배상생선성세소신안영용원유의인일재전정제조주중지진창천청충태통한해행현화환회"
+
+
+def make_vocabulary(size: int = 60_000, seed: int = 5) -> List[str]:
+    """음절 2~4개로 만든 가상 단어"""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.choice((2, 2, 3, 3, 4)))))
+    return sorted(words)
+
+
+def _phrase(rng: random.Random, topic: str, words: List[str], zipf: List[float]) -> str:
+    out = []
+    for _ in range(rng.randint(5, 10)):
+        pick = rng.random()
+        if pick < 0.15:
+            out.append((topic if rng.random() < 0.6 else rng.choice(_TOPICS)) + rng.choice(_JOSA))
+        elif pick < 0.55:
+            out.append(rng.choices(words, cum_weights=zipf)[0] + rng.choice(_JOSA))
+        elif pick < 0.7:
+            out.append(rng.choice(_NOUNS) + rng.choice(_JOSA))
+        elif pick < 0.85:
+            out.append(rng.choice(_VERBS) + rng.choice(["합니다", "해야 합니다", "하고", "하는", "했다"]))
+        elif pick < 0.92:
+            out.append(rng.choice(_STANDARDS))
+        else:
+            out.append(f"{rng.randint(2015, 2030)}년 {rng.randint(1, 100)}%")
+    return " ".join(out) + "."
+
+
+def make_themes(count: int = 400, size: int = 400, seed: int = 5) -> List[List[str]]:
+    """세부 주제별 어휘 (주제마다 자주 쓰는 단어가 다름, 일부 단어는 여러 주제에 걸침)"""
+    vocabulary = make_vocabulary()
+    rng = random.Random(seed)
+    return [rng.sample(vocabulary, size) for _ in range(count)]
+
+
+def make_passages(count: int, companies: int = 500, public_ratio: float = 0.2, seed: int = 7) -> Iterator[Dict]:
+    """passage 당 세부 주제 하나, 3~6 문장 (약 100 토큰), public_ratio 만큼은 공용 문서"""
+    rng = random.Random(seed)
+    themes = make_themes()
+    zipf = list(itertools.accumulate(1 / (rank + 3) for rank in range(len(themes[0]))))
+    for i in range(count):
+        theme = rng.randrange(len(themes))
+        topic = _TOPICS[theme % len(_TOPICS)]
+        passage = {
+            "id": f"p{i:07d}",
+            "title": f"{topic} {rng.choice(_NOUNS)}",
+            "text": " ".join(_phrase(rng, topic, themes[theme], zipf) for _ in range(rng.randint(3, 6))),
+        }
+        if rng.random() >= public_ratio:
+            passage["company_id"] = f"c{rng.randrange(companies):04d}"
+        yield passage
+
+
+def make_queries(count: int, seed: int = 3) -> List[str]:
+    """세부 주제의 주제어 + 일반 명사 + 주제 단어 1~2개 형태의 질문"""
+    rng = random.Random(seed)
+    themes = make_themes()
+    queries = []
+    for _ in range(count):
+        theme = rng.randrange(len(themes))
+        words = [_TOPICS[theme % len(_TOPICS)], rng.choice(_NOUNS)]
+        words += [themes[theme][min(int(rng.expovariate(1 / 20)), len(themes[theme]) - 1)] for _ in range(rng.randint(1, 2))]
+        if rng.random() < 0.5:
+            words.append(rng.choice(_VERBS))
+        queries.append(" ".join(words) + rng.choice(["", "은 어떻게 하나요?", " 알려줘", "를 공시해야 하나요"]))
+    return queries
+
+
+def latency(fn, queries: List[str]) -> Dict[str, float]:
+    fn(queries[0])
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        samples.append((time.perf_counter() - started) * 1000)
+    total = sum(samples) / 1000
+    samples.sort()
+    return {"qps": len(samples) / total, "p50": samples[len(samples) // 2], "p99": samples[int(len(samples) * 0.99) - 1]}
+
+
+def memory_kb() -> Dict[str, int]:
+    """/proc/self/smaps_rollup 의 Rss / Pss / Private (리눅스 전용)"""
+    values = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                    values[key] = int(rest.split()[0])
+    except OSError:
+        return {}
+    return {"rss": values["Rss"], "pss": values["Pss"], "private": values["Private_Clean"] + values["Private_Dirty"]}
+
+
+def _worker(path: str, queries: List[str], mode: str, seconds: float, barrier, results):
+    index = RetrievalIndex(path)
+    rng = random.Random(os.getpid())
+    barrier.wait()
+    done = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        index.search(rng.choice(queries), f"c{rng.randrange(500):04d}", k=10, mode=mode)
+        done += 1
+    results.put({"queries": done, **memory_kb()})
+
+
+def multi_process(path: str, queries: List[str], mode: str, workers: int, seconds: float) -> Dict[str, float]:
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=_worker, args=(path, queries, mode, seconds, barrier, results)) for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    rows = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return {
+        "qps": sum(row["queries"] for row in rows) / seconds,
+        "rss_mb": sum(row.get("rss", 0) for row in rows) / 1024,
+        "pss_mb": sum(row.get("pss", 0) for row in rows) / 1024,
+        "private_mb": sum(row.get("private", 0) for row in rows) / 1024,
+    }
+
+
+def dense_recall(index: RetrievalIndex, queries: List[str], nprobe: int, k: int = 10) -> float:
+    """IVF 후보만 본 결과가 전체 비교 결과의 상위 k 를 얼마나 포함하는지 (회사 범위 없이 공용 문서 기준)"""
+    hits = total = 0
+    for query in queries:
+        vector = index.embed(tokenize(query))
+        if vector is None:
+            continue
+        exact = []
+        for start in range(0, len(index), 200_000):
+            scores = (index.dense[start:start + 200_000].astype(np.float32) @ vector) * index.dense_scale[start:start + 200_000]
+            ids = index.dense_ids[start:start + 200_000]
+            allowed = index.company[ids] == 0
+            exact.extend(zip(scores[allowed].tolist(), ids[allowed].tolist()))
+        exact = {doc for _, doc in sorted(exact, reverse=True)[:k]}
+        found = {doc for doc, _ in index.dense_search(tokenize(query), 0, k, nprobe)}
+        hits += len(exact & found)
+        total += len(exact)
+    return hits / max(total, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 인덱스 벤치마크")
+    parser.add_argument("--passages", type=int, default=1_000_000)
+    parser.add_argument("--dir", default="/tmp/retrieval-bench")
+    parser.add_argument("--reuse", action="store_true", help="이미 만든 인덱스로 검색만 측정")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    if not args.reuse:
+        # 생성 비용이 빌드 시간에 섞이지 않도록 먼저 JSONL 로 (실제 빌드도 파일에서 읽음)
+        source = f"{args.dir}.jsonl"
+        started = time.perf_counter()
+        with open(source, "w", encoding="utf-8") as f:
+            for passage in make_passages(args.passages):
+                f.write(json.dumps(passage, ensure_ascii=False) + "\n")
+        print(f"generate {args.passages:,} passages {time.perf_counter() - started:,.1f}s "
+              f"({os.path.getsize(source) / 2**20:,.0f}MB)")
+        started = time.perf_counter()
+        manifest = IndexBuilder(args.dir).build(read_jsonl(source))
+        elapsed = time.perf_counter() - started
+        print(
+            f"build passages={manifest['passages']:,} terms={manifest['terms']:,} postings={manifest['postings']:,} "
+            f"{elapsed:,.1f}s ({manifest['passages'] / elapsed:,.0f} passages/s) phases={manifest['timings']}"
+        )
+
+    index = RetrievalIndex(args.dir)
+    sizes: Dict[str, int] = {}
+    for name in os.listdir(args.dir):
+        sizes[name.split(".")[0]] = os.path.getsize(os.path.join(args.dir, name))
+    print(f"size {sum(sizes.values()) / 2**20:,.0f}MB " + " ".join(
+        f"{name}={size / 2**20:,.0f}MB" for name, size in sorted(sizes.items(), key=lambda item: -item[1]) if size > 2**20
+    ))
+
+    queries = make_queries(args.queries)
+    print(f"\n{'mode':>8} {'scope':>8} {'qps':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for mode in ("bm25", "dense", "hybrid"):
+        for scope, company in (("public", None), ("company", "c0042")):
+            stats = latency(lambda q: index.search(q, company, k=10, mode=mode), queries)
+            print(f"{mode:>8} {scope:>8} {stats['qps']:>8.0f} {stats['p50']:>8.2f} {stats['p99']:>8.2f}")
+
+    print(f"\n{'nprobe':>8} {'recall@10':>10} {'dense qps':>10}")
+    for nprobe in (4, 8, 16, 32):
+        recall = dense_recall(index, queries[:30], nprobe)
+        stats = latency(lambda q: index.search(q, None, k=10, mode="dense", nprobe=nprobe), queries[:100])
+        print(f"{nprobe:>8} {recall:>10.3f} {stats['qps']:>10.0f}")
+
+    if args.workers > 1:
+        print(f"\n{'workers':>8} {'qps':>8} {'RSS MB':>8} {'PSS MB':>8} {'private MB':>11}   (hybrid, 합계)")
+        for workers in sorted({1, args.workers}):
+            stats = multi_process(args.dir, queries, "hybrid", workers, args.seconds)
+            print(f"{workers:>8} {stats['qps']:>8.0f} {stats['rss_mb']:>8.0f} {stats['pss_mb']:>8.0f} {stats['private_mb']:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
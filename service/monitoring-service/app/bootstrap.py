@@ -0,0 +1,50 @@
+"""
+Monitoring Service 서비스 초기화
+- 저장소 스냅샷/로그 세그먼트 로드와 알림 규칙 컴파일은 시간이 걸리므로,
+  LazyStartup 이 uvicorn 시작 직후 백그라운드에서 이 모듈을 import 한 뒤 services() 에 진입
+"""
+import logging
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from fastapi import FastAPI
+
+from app.domain.alerts.service.alert_engine import AlertEngine
+from app.domain.alerts.service.alert_notifier import WebhookNotifier
+from app.domain.logs.service.log_store import LogStore
+from app.domain.metrics.service.metric_store import MetricStore
+from app.domain.traces.service.trace_store import TraceStore
+
+logger = logging.getLogger("monitoring_service")
+
+
+@asynccontextmanager
+async def services(app: FastAPI):
+    # 중간에 실패하면 그때까지 시작한 것만 역순으로 정리 (지연 시작이 다시 시도할 수 있게)
+    async with AsyncExitStack() as stack:
+        # 지표 시계열 저장소 (METRICS_SNAPSHOT_DIR 의 스냅샷이 있으면 불러옴)
+        store = MetricStore()
+        await store.start()
+        stack.push_async_callback(store.stop)
+        app.state.metric_store = store
+        logger.info(
+            f"✅ 지표 저장소: 해상도 {', '.join(f'{t.name}×{t.slots}' for t in store.tiers)}, "
+            f"최대 시계열 {store.max_series}, 기존 시계열 {store.series}"
+        )
+        # 로그 저장소 (LOG_DIR 의 세그먼트를 불러오고, 색인이 없는 세그먼트는 다시 만듦)
+        log_store = LogStore()
+        await log_store.start()
+        stack.push_async_callback(log_store.stop)
+        app.state.log_store = log_store
+        logger.info(f"✅ 로그 저장소: {log_store.directory}, 세그먼트 {len(log_store.segments)}개")
+        # 스팬 저장소 (최근 trace 는 메모리, 스팬 이름별 지연은 지표 저장소에)
+        app.state.trace_store = TraceStore(metric_store=store)
+        # 알림 규칙 엔진 (지표 저장소가 받는 샘플로 바로 평가, ALERT_RULES_FILE 의 규칙을 불러옴)
+        alert_engine = AlertEngine(metric_store=store, notifier=WebhookNotifier())
+        await alert_engine.start()
+        stack.push_async_callback(alert_engine.stop)
+        app.state.alert_engine = alert_engine
+        logger.info(
+            f"✅ 알림 엔진: 규칙 {len(alert_engine.rules)}개, "
+            f"웹훅 {alert_engine.notifier.url or '없음 (기록만)'}"
+        )
+        yield
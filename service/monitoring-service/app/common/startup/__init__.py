@@ -0,0 +1,3 @@
+from .lazy_startup import LazyStartup, StartupGateMiddleware
+
+__all__ = ["LazyStartup", "StartupGateMiddleware"]
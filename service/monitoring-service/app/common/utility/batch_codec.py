@@ -0,0 +1,50 @@
+"""
+서비스가 보내는 NDJSON 배치 풀기 (로그, 스팬 공용)
+- Content-Encoding: zstd | gzip | 없음, 압축을 푼 크기가 MAX_BATCH_BYTES 를 넘거나 풀 수 없으면 BatchError
+"""
+import zlib
+from typing import Optional
+
+import zstandard
+
+# 압축을 푼 배치 크기 상한 (바이트)
+MAX_BATCH_BYTES = 32 * 1024 * 1024
+
+
+class BatchError(ValueError):
+    pass
+
+
+def _zstd_decompress(body: bytes) -> bytes:
+    # decompress(max_output_size=) 는 프레임 헤더에 원본 크기가 있으면 상한을 무시하므로
+    # 스트림으로 풀면서 상한 + 1 바이트까지만 읽음 (헤더의 크기를 믿고 큰 버퍼를 잡지 않음)
+    chunks = []
+    total = 0
+    with zstandard.ZstdDecompressor().stream_reader(body, read_across_frames=True) as reader:
+        while True:
+            chunk = reader.read(min(1024 * 1024, MAX_BATCH_BYTES + 1 - total))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            total += len(chunk)
+            if total > MAX_BATCH_BYTES:
+                raise BatchError(f"압축을 푼 배치가 {MAX_BATCH_BYTES} 바이트를 넘습니다")
+    return b"".join(chunks)
+
+
+def decode_batch(body: bytes, encoding: Optional[str]) -> bytes:
+    encoding = (encoding or "identity").lower()
+    try:
+        if encoding == "zstd":
+            return _zstd_decompress(body)
+        if encoding == "gzip":
+            decompressor = zlib.decompressobj(wbits=31)
+            raw = decompressor.decompress(body, MAX_BATCH_BYTES)
+            if decompressor.unconsumed_tail:
+                raise BatchError(f"압축을 푼 배치가 {MAX_BATCH_BYTES} 바이트를 넘습니다")
+            return raw
+    except (zstandard.ZstdError, zlib.error) as e:
+        raise BatchError(f"{encoding} 압축 해제 실패: {e}")
+    if encoding == "identity":
+        return body
+    raise BatchError(f"지원하지 않는 Content-Encoding: {encoding}")
@@ -0,0 +1,146 @@
+"""
+알림 규칙과 식
+    식      := 항 비교 숫자 | ratio(항, 항) 비교 숫자
+    항      := 함수(지표이름{라벨 조건, ...})      라벨 조건은 없어도 됨
+    함수    := sum | count | avg | min | max | rate | p50 | p90 | p95 | p99   (ratio 안에서는 분위수 불가)
+    라벨 조건 := label="값" | label!="값" | label=~"정규식" | label!~"정규식"
+    비교    := > | >= | < | <=
+예)
+    ratio(count(span_duration_ms{status="error"}), count(span_duration_ms)) > 0.05   오류율
+    p99(span_duration_ms{service="gateway", name=~"GET .*"}) > 1500                 p99 지연
+    avg(worker_busy_ratio{service="chatbot-service"}) >= 0.9                        포화도
+"""
+import re
+from typing import Dict, List, Literal, NamedTuple, Optional, Tuple
+
+from pydantic import BaseModel, Field, field_validator
+
+FUNCTIONS = ("sum", "count", "avg", "min", "max", "rate", "p50", "p90", "p95", "p99")
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p95": 0.95, "p99": 0.99}
+COMPARATORS = (">=", "<=", ">", "<")
+
+_NAME = r"[A-Za-z_:][A-Za-z0-9_:.]*"
+# 라벨 조건 안 따옴표 속 } , ) 는 그대로 둠 (정규식 \d{3} 등)
+_TERM = re.compile(
+    rf"\s*({'|'.join(FUNCTIONS)})\s*\(\s*({_NAME})\s*(?:\{{((?:[^}}\"]|\"(?:[^\"\\]|\\.)*\")*)\}})?\s*\)\s*"
+)
+_MATCHER = re.compile(rf'\s*({_NAME})\s*(=~|!~|!=|=)\s*"((?:[^"\\]|\\.)*)"\s*(?:,|$)')
+_TAIL = re.compile(r"\s*(>=|<=|>|<)\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*$")
+
+
+class Matcher(NamedTuple):
+    label: str
+    op: str
+    value: str
+
+    def test(self, labels: Dict[str, str]) -> bool:
+        actual = labels.get(self.label, "")
+        if self.op == "=":
+            return actual == self.value
+        if self.op == "!=":
+            return actual != self.value
+        hit = re.fullmatch(self.value, actual) is not None
+        return hit if self.op == "=~" else not hit
+
+
+class Term(NamedTuple):
+    fn: str
+    name: str
+    matchers: Tuple[Matcher, ...]
+
+    def matches(self, labels: Dict[str, str]) -> bool:
+        return all(m.test(labels) for m in self.matchers)
+
+
+class Expression(NamedTuple):
+    # right 가 있으면 ratio(left, right)
+    left: Term
+    right: Optional[Term]
+    op: str
+    threshold: float
+
+    @property
+    def terms(self) -> Tuple[Term, ...]:
+        return (self.left,) if self.right is None else (self.left, self.right)
+
+
+def _term(text: str, pos: int) -> Tuple[Term, int]:
+    found = _TERM.match(text, pos)
+    if found is None:
+        raise ValueError(f"{pos}번째 글자 근처: 함수(지표{{라벨=\"값\"}}) 형식이 아닙니다")
+    fn, name, body = found.groups()
+    matchers = []
+    body = (body or "").strip()
+    at = 0
+    while at < len(body):
+        item = _MATCHER.match(body, at)
+        if item is None:
+            raise ValueError(f"라벨 조건 형식 오류: {body[at:]}")
+        label, op, value = item.groups()
+        value = value.replace('\\"', '"')
+        if op in ("=~", "!~"):
+            try:
+                re.compile(value)
+            except re.error as e:
+                raise ValueError(f"정규식 오류 ({label}): {e}")
+        matchers.append(Matcher(label, op, value))
+        at = item.end()
+    return Term(fn, name, tuple(matchers)), found.end()
+
+
+def parse_expr(text: str) -> Expression:
+    """규칙 식을 Expression 으로 (형식 오류면 ValueError)"""
+    stripped = text.strip()
+    ratio = re.match(r"ratio\s*\(", stripped)
+    if ratio:
+        left, pos = _term(stripped, ratio.end())
+        if not stripped.startswith(",", pos):
+            raise ValueError("ratio(항, 항) 형식이 아닙니다")
+        right, pos = _term(stripped, pos + 1)
+        if not stripped.startswith(")", pos):
+            raise ValueError("ratio(항, 항) 의 닫는 괄호가 없습니다")
+        pos += 1
+        if left.fn in PERCENTILES or right.fn in PERCENTILES:
+            raise ValueError("ratio 안에서는 분위수 함수를 쓸 수 없습니다")
+    else:
+        left, pos = _term(stripped, 0)
+        right = None
+    tail = _TAIL.match(stripped, pos)
+    if tail is None:
+        raise ValueError(f"식 끝에 비교가 필요합니다 ({' | '.join(COMPARATORS)} 숫자)")
+    return Expression(left, right, tail.group(1), float(tail.group(2)))
+
+
+class AlertRule(BaseModel):
+    name: str = Field(..., min_length=1, max_length=128, pattern=r"^[A-Za-z0-9_.:-]+$")
+    expr: str = Field(..., min_length=1, max_length=1000)
+    # 슬라이딩 윈도 길이 (초)
+    window: int = Field(default=300, ge=10, le=86400)
+    # 조건이 이만큼 이어져야 firing (그 전은 pending)
+    for_seconds: int = Field(default=60, ge=0, le=86400)
+    # firing 중 조건이 풀려도 이만큼 이어져야 resolved (시간 히스테리시스)
+    keep_firing_seconds: int = Field(default=120, ge=0, le=86400)
+    # firing 유지 기준값 (값 히스테리시스, 없으면 threshold 와 같음) 예: > 0.05 로 발생, 0.03 이하로 내려가야 해제
+    resolve_threshold: Optional[float] = None
+    # 윈도 안 샘플 수(count 합, ratio 면 분모)가 이보다 적으면 값 없음으로 봄 (트래픽이 적을 때 오류율 출렁임 방지)
+    # 0 이면 샘플이 없어도 평가 (count(...) < 1 같은 트래픽 끊김 알림)
+    min_count: int = Field(default=1, ge=0)
+    # 라벨별로 따로 판단 (예: ["service"] 면 서비스마다 알림 하나)
+    by: List[str] = Field(default_factory=list, max_length=8)
+    severity: Literal["info", "warning", "critical"] = "warning"
+    labels: Dict[str, str] = Field(default_factory=dict, max_length=16)
+    summary: Optional[str] = Field(default=None, max_length=1000)
+
+    @field_validator("expr")
+    @classmethod
+    def check_expr(cls, value):
+        parse_expr(value)
+        return value
+
+    @property
+    def expression(self) -> Expression:
+        return parse_expr(self.expr)
+
+    @property
+    def hold_threshold(self) -> float:
+        return self.resolve_threshold if self.resolve_threshold is not None else self.expression.threshold
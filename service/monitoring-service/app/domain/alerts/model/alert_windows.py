@@ -0,0 +1,159 @@
+"""
+알림 인스턴스(규칙 × 그룹)별 슬라이딩 윈도
+- 윈도 하나 = slots 개 칸의 링 (칸 길이 step = 규칙 window / slots), 칸마다 두 쪽(ratio 의 분자/분모, 아니면 0 쪽만)의
+  sum / count / min / max 를 (인스턴스, 쪽, 칸) 배열로 미리 잡아 둠 (np.zeros 라 쓰기 전에는 메모리를 쓰지 않음)
+- 칸 e (= 시각 // step) 는 e % slots 칸에 들어가고 epoch[행, 칸] 이 그 칸의 e, 더 새 e 가 오면 칸을 비우고 재사용
+- 윈도 합계(sum / count, 분위수 규칙은 히스토그램)는 행마다 따로 들고 있다가
+  샘플이 오면 더하고, 칸을 재사용하거나 칸이 윈도 밖으로 밀려날 때(retire) 그 칸 값을 뺌
+  → 평가 비용이 칸 수와 무관 (min / max 만 평가할 때 칸을 훑음)
+- 분위수 규칙은 로그 눈금 히스토그램 (HIST_BINS 개, 이웃 눈금 비 HIST_GAMMA → 상대 오차 약 ±10%)
+  미리 모은 샘플(count > 1)은 평균값 눈금에 count 만큼 더함
+- 시각은 넣는 쪽에서 지금 이하로 맞춰서 넣음 (미래 칸이 합계에 먼저 들어가지 않게)
+"""
+from typing import Tuple
+
+import numpy as np
+
+HIST_BINS = 128
+HIST_GAMMA = 1.2
+# 0 번 눈금은 이 값 이하 (0, 음수 포함)
+HIST_MIN = 1e-3
+_LOG_GAMMA = np.log(HIST_GAMMA)
+# 눈금 대표값 (기하 중간)
+_BIN_VALUES = np.r_[0.0, HIST_MIN * HIST_GAMMA ** (np.arange(1, HIST_BINS) - 0.5)]
+
+
+def bin_of(values: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bins = np.floor(np.log(np.maximum(values, HIST_MIN) / HIST_MIN) / _LOG_GAMMA) + 1
+    bins[~(values > HIST_MIN)] = 0
+    return np.clip(bins, 0, HIST_BINS - 1).astype(np.int64)
+
+
+class AlertWindows:
+    def __init__(self, capacity: int, slots: int):
+        self.capacity = capacity
+        self.slots = slots
+        shape = (capacity, 2, slots)
+        self.step = np.ones(capacity, np.float64)
+        self.epoch = np.full((capacity, slots), -1, np.int64)
+        self.sum = np.zeros(shape, np.float64)
+        self.count = np.zeros(shape, np.float64)
+        self.min = np.zeros(shape, np.float64)
+        self.max = np.zeros(shape, np.float64)
+        # 윈도 안 칸들의 합 (행, 쪽)
+        self.total_sum = np.zeros((capacity, 2), np.float64)
+        self.total_count = np.zeros((capacity, 2), np.float64)
+        # 분위수 규칙 행만 씀
+        self.histogram = np.zeros(capacity, bool)
+        self.hist = np.zeros((capacity, slots, HIST_BINS), np.float32)
+        self.hist_total = np.zeros((capacity, HIST_BINS), np.float64)
+
+    def reset(self, row: int, window: float, histogram: bool):
+        """행을 새 인스턴스용으로 비움"""
+        self.step[row] = window / self.slots
+        self.epoch[row] = -1
+        self.sum[row] = 0
+        self.count[row] = 0
+        self.total_sum[row] = 0
+        self.total_count[row] = 0
+        if self.histogram[row] or histogram:
+            self.hist[row] = 0
+            self.hist_total[row] = 0
+        self.histogram[row] = histogram
+
+    def _clear(self, r: np.ndarray, c: np.ndarray):
+        """(행, 칸) 들을 윈도 합계에서 빼고 비움 (같은 칸이 여러 번 와도 한 번만)"""
+        flat = np.unique(r * self.slots + c)
+        r, c = flat // self.slots, flat % self.slots
+        np.subtract.at(self.total_sum, r, self.sum[r, :, c])
+        np.subtract.at(self.total_count, r, self.count[r, :, c])
+        self.sum[r, :, c] = 0
+        self.count[r, :, c] = 0
+        hist = self.histogram[r]
+        if hist.any():
+            r, c = r[hist], c[hist]
+            np.subtract.at(self.hist_total, r, self.hist[r, c])
+            self.hist[r, c] = 0
+
+    def add(
+        self,
+        rows: np.ndarray,
+        sides: np.ndarray,
+        ts: np.ndarray,
+        sums: np.ndarray,
+        counts: np.ndarray,
+        mins: np.ndarray,
+        maxs: np.ndarray,
+    ) -> int:
+        """샘플을 (행, 쪽) 윈도의 해당 칸에 누적, 이미 지난 칸이라 버린 샘플 수를 반환"""
+        epochs = np.floor(ts / self.step[rows]).astype(np.int64)
+        cols = epochs % self.slots
+        stale = self.epoch[rows, cols] < epochs
+        if stale.any():
+            r, c = rows[stale], cols[stale]
+            self._clear(r, c)
+            np.maximum.at(self.epoch, (r, c), epochs[stale])
+        keep = self.epoch[rows, cols] == epochs
+        dropped = int(len(keep) - np.count_nonzero(keep))
+        if dropped:
+            rows, sides, cols, sums, counts, mins, maxs = (a[keep] for a in (rows, sides, cols, sums, counts, mins, maxs))
+        cell = (rows, sides, cols)
+        fresh = self.count[cell] == 0
+        if fresh.any():
+            self.min[rows[fresh], sides[fresh], cols[fresh]] = np.inf
+            self.max[rows[fresh], sides[fresh], cols[fresh]] = -np.inf
+        np.add.at(self.sum, cell, sums)
+        np.add.at(self.count, cell, counts)
+        np.add.at(self.total_sum, (rows, sides), sums)
+        np.add.at(self.total_count, (rows, sides), counts)
+        np.minimum.at(self.min, cell, mins)
+        np.maximum.at(self.max, cell, maxs)
+        hist = self.histogram[rows] & (sides == 0)
+        if hist.any():
+            bins = bin_of(sums[hist] / counts[hist])
+            np.add.at(self.hist, (rows[hist], cols[hist], bins), counts[hist])
+            np.add.at(self.hist_total, (rows[hist], bins), counts[hist])
+        return dropped
+
+    def retire(self, rows: np.ndarray, now: float):
+        """윈도 밖으로 밀려난 칸을 합계에서 빼고 비움"""
+        current = np.floor(now / self.step[rows]).astype(np.int64)[:, None]
+        epoch = self.epoch[rows]
+        expired = (epoch >= 0) & (epoch <= current - self.slots)
+        if expired.any():
+            index, c = np.nonzero(expired)
+            r = rows[index]
+            self._clear(r, c)
+            self.epoch[r, c] = -1
+
+    def totals(self, rows: np.ndarray, now: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """행마다 두 쪽의 윈도 sum / count (n, 2), 윈도가 실제로 덮는 초 (n,) — retire 다음에 부름"""
+        step = self.step[rows]
+        # 지난 slots - 1 칸 + 지금 칸에서 흐른 시간
+        covered = (self.slots - 1) * step + (now - np.floor(now / step) * step)
+        return self.total_sum[rows], np.maximum(self.total_count[rows], 0), covered
+
+    def extremes(self, rows: np.ndarray, now: float) -> Tuple[np.ndarray, np.ndarray]:
+        """행마다 두 쪽의 윈도 min / max (n, 2), 값이 없으면 NaN (칸을 훑음)"""
+        current = np.floor(now / self.step[rows]).astype(np.int64)[:, None]
+        epoch = self.epoch[rows]
+        valid = ((epoch > current - self.slots) & (epoch <= current))[:, None, :]
+        filled = valid & (self.count[rows] > 0)
+        low = np.where(filled, self.min[rows], np.inf).min(axis=2)
+        high = np.where(filled, self.max[rows], -np.inf).max(axis=2)
+        return np.where(np.isinf(low), np.nan, low), np.where(np.isinf(high), np.nan, high)
+
+    def quantiles(self, rows: np.ndarray, q: np.ndarray) -> np.ndarray:
+        """행마다 윈도 히스토그램의 q 분위수 (눈금 대표값, 값이 없으면 NaN) — retire 다음에 부름"""
+        cumulative = np.cumsum(self.hist_total[rows], axis=1)
+        total = cumulative[:, -1]
+        index = np.argmax(cumulative >= (q * total)[:, None] - 1e-9, axis=1)
+        return np.where(total > 0.5, _BIN_VALUES[index], np.nan)
+
+    def nbytes(self, rows: int) -> int:
+        """행 rows 개가 차지하는 바이트 (히스토그램은 분위수 규칙 행만)"""
+        fields = ("epoch", "sum", "count", "min", "max", "total_sum", "total_count")
+        per_row = sum(getattr(self, field)[0].nbytes for field in fields)
+        per_hist = self.hist[0].nbytes + self.hist_total[0].nbytes
+        return rows * per_row + int(np.count_nonzero(self.histogram[:rows])) * per_hist
@@ -0,0 +1,592 @@
+"""
+알림 규칙 엔진
+- 규칙 식의 항에 맞는 시계열을 처음 볼 때 한 번 규칙 인스턴스(규칙 × by 라벨 값)에 연결해 두고,
+  (지표 이름별 항 목록을 첫 = 라벨 조건으로 나눠 두어 시계열마다 그 라벨 값에 걸린 항만 맞춰 봄)
+  MetricStore 가 샘플을 받을 때마다(observers) 연결된 인스턴스의 슬라이딩 윈도(AlertWindows)에 더함
+  → 구간을 다시 조회하지 않음, 규칙과 상관없는 시계열의 샘플은 배열 조회 한 번으로 건너뜀
+- 평가: 샘플이 들어온 인스턴스는 받은 자리에서 바로, 그 밖의 변화(윈도가 밀려 값이 바뀜, pending 시간 경과)는
+  ALERT_EVAL_SECONDS 마다 살아 있는 인스턴스 전체를 배열 연산으로 (EVAL_CHUNK 행씩)
+  윈도 합계를 들고 있으므로 평가 비용은 인스턴스 수에 비례 (칸 수와 무관)
+- 상태: inactive → pending (조건 성립) → firing (for_seconds 동안 유지)
+        firing → inactive (resolve_threshold 기준으로 조건이 keep_firing_seconds 동안 풀림, resolved 알림)
+        pending 중 조건이 풀리면 알림 없이 inactive
+- firing / resolved 로 바뀔 때, firing 이 ALERT_REPEAT_SECONDS 이어질 때마다 notifier 로 보냄
+  fingerprint = 규칙 이름 + 그룹 라벨 (notifier 가 이 값으로 중복을 거름)
+- 규칙은 ALERT_RULES_FILE(JSON 목록)에서 읽고 API 로 바꾸면 다시 씀
+  바뀐 규칙의 인스턴스는 처음부터 다시 시작하고, 연결은 그 규칙 것만 고침
+  (이미 본 시계열 중 항에 맞는 것만 MetricStore.select 로 골라 붙이고, 삭제 시 그 규칙에 붙은 시계열에서만 뗌)
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from pydantic import ValidationError
+
+from ..model.alert_model import FUNCTIONS, PERCENTILES, AlertRule, Expression, Term
+from ..model.alert_windows import AlertWindows
+from .alert_notifier import WebhookNotifier
+
+logger = logging.getLogger(__name__)
+
+INACTIVE, PENDING, FIRING = 0, 1, 2
+STATES = ("inactive", "pending", "firing")
+OPS = {">": 0, ">=": 1, "<": 2, "<=": 3}
+FN_CODES = {name: code for code, name in enumerate(FUNCTIONS)}
+MIN_CODE, MAX_CODE = FN_CODES["min"], FN_CODES["max"]
+# 주기 평가 때 한 번에 평가하는 인스턴스 수
+EVAL_CHUNK = 4096
+
+
+def percentiles(values) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"p50": round(pick(0.5), 3), "p95": round(pick(0.95), 3), "max": round(ordered[-1], 3)}
+
+
+def _compare(values: np.ndarray, op: np.ndarray, threshold: np.ndarray) -> np.ndarray:
+    """values (op) threshold, 값이 없으면(NaN) 거짓"""
+    with np.errstate(invalid="ignore"):
+        result = np.select(
+            [op == 0, op == 1, op == 2],
+            [values > threshold, values >= threshold, values < threshold],
+            values <= threshold,
+        )
+    return result & ~np.isnan(values)
+
+
+def _none(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 6)
+
+
+class _Rule:
+    __slots__ = ("rule", "expression", "hold", "instances", "series")
+
+    def __init__(self, rule: AlertRule):
+        self.rule = rule
+        self.expression: Expression = rule.expression
+        # rule.expression / hold_threshold 는 호출마다 식을 다시 파싱하므로 한 번만
+        self.hold = rule.resolve_threshold if rule.resolve_threshold is not None else self.expression.threshold
+        # 그룹 라벨 값 → 인스턴스 행
+        self.instances: Dict[Tuple[str, ...], int] = {}
+        # 이 규칙 인스턴스에 연결된 시계열 번호 (규칙을 지울 때 이 시계열의 연결만 고침)
+        self.series: Set[int] = set()
+
+
+def _index_key(term: Term) -> Optional[Tuple[str, str]]:
+    """항을 나눠 둘 (라벨, 값): 첫 label="값" 조건 (빈 값은 라벨이 없는 시계열에도 맞으므로 제외)"""
+    for matcher in term.matchers:
+        if matcher.op == "=" and matcher.value:
+            return matcher.label, matcher.value
+    return None
+
+
+class _MetricTerms:
+    """한 지표 이름에 걸린 (규칙, 쪽, 항) 목록, 첫 = 조건의 (라벨, 값)별로 나눠 둠"""
+    __slots__ = ("keyed", "rest")
+
+    def __init__(self):
+        self.keyed: Dict[Tuple[str, str], List[Tuple[_Rule, int, Term]]] = {}
+        self.rest: List[Tuple[_Rule, int, Term]] = []
+
+    def add(self, entry: Tuple[_Rule, int, Term]):
+        key = _index_key(entry[2])
+        if key is None:
+            self.rest.append(entry)
+        else:
+            self.keyed.setdefault(key, []).append(entry)
+
+    def discard(self, compiled: _Rule):
+        self.rest = [entry for entry in self.rest if entry[0] is not compiled]
+        for key in [key for key, entries in self.keyed.items() if any(entry[0] is compiled for entry in entries)]:
+            entries = [entry for entry in self.keyed[key] if entry[0] is not compiled]
+            if entries:
+                self.keyed[key] = entries
+            else:
+                del self.keyed[key]
+
+    def __bool__(self) -> bool:
+        return bool(self.rest or self.keyed)
+
+    def candidates(self, labels: Tuple[Tuple[str, str], ...]):
+        """시계열 라벨로 맞춰 볼 항만 (= 조건이 다른 값인 항은 건너뜀)"""
+        yield from self.rest
+        for item in labels:
+            entries = self.keyed.get(item)
+            if entries:
+                yield from entries
+
+
+class AlertEngine:
+    def __init__(
+        self,
+        metric_store,
+        notifier: Optional[WebhookNotifier] = None,
+        rules_file: Optional[str] = None,
+        max_instances: Optional[int] = None,
+        max_groups: Optional[int] = None,
+        slots: Optional[int] = None,
+        eval_interval: Optional[float] = None,
+        repeat_interval: Optional[float] = None,
+    ):
+        self.store = metric_store
+        self.notifier = notifier
+        self.rules_file = rules_file if rules_file is not None else os.getenv("ALERT_RULES_FILE", "data/alert_rules.json")
+        self.max_instances = max_instances or int(os.getenv("ALERT_MAX_INSTANCES", "20000"))
+        self.max_groups = max_groups or int(os.getenv("ALERT_MAX_GROUPS", "1000"))
+        self.eval_interval = eval_interval or float(os.getenv("ALERT_EVAL_SECONDS", "5"))
+        self.repeat_interval = repeat_interval or float(os.getenv("ALERT_REPEAT_SECONDS", "3600"))
+        self.windows = AlertWindows(self.max_instances, slots or int(os.getenv("ALERT_WINDOW_SLOTS", "30")))
+
+        self.rules: Dict[str, _Rule] = {}
+        self._by_metric: Dict[str, _MetricTerms] = {}
+        # 시계열별 연결 상태: 0 = 아직 안 봄, 1 = 맞는 규칙 없음, 2 = _bindings 에 (행, 쪽) 목록
+        self._linked = np.zeros(metric_store.max_series, np.int8)
+        self._bindings: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+        # 인스턴스(행)별 규칙 조건과 상태
+        size = self.max_instances
+        self.rows = 0
+        self._free: List[int] = []
+        self.alive = np.zeros(size, bool)
+        self.state = np.zeros(size, np.int8)
+        self.op = np.zeros(size, np.int8)
+        self.threshold = np.zeros(size)
+        self.hold = np.zeros(size)
+        self.for_seconds = np.zeros(size)
+        self.keep_seconds = np.zeros(size)
+        self.min_count = np.zeros(size)
+        # 쪽(분자/분모)별 함수 코드, ratio 가 아니면 분모는 -1
+        self.fn = np.full((size, 2), -1, np.int8)
+        self.q = np.full(size, np.nan)
+        self.value = np.full(size, np.nan)
+        self.active_at = np.full(size, np.nan)
+        self.fired_at = np.full(size, np.nan)
+        self.clear_at = np.full(size, np.nan)
+        self.notified_at = np.full(size, np.nan)
+        # (규칙 이름, 그룹 라벨, fingerprint)
+        self._info: List[Optional[Tuple[str, Dict[str, str], str]]] = [None] * size
+
+        self._task: Optional[asyncio.Task] = None
+        self.observe_ms: Deque[float] = deque(maxlen=1000)
+        self.evaluate_ms: Deque[float] = deque(maxlen=1000)
+        self.counts = {"samples": 0, "late": 0, "evaluations": 0, "notifications": 0, "unbound_groups": 0}
+        metric_store.observers.append(self.observe)
+
+    # ---- 수명 주기 --------------------------------------------------------
+
+    async def start(self):
+        if self.rules_file:
+            try:
+                for rule in await asyncio.to_thread(self._load_rules):
+                    self._add(rule)
+            except Exception as e:
+                logger.warning(f"⚠️ 알림 규칙 불러오기 실패 (규칙 없이 시작): {type(e).__name__}: {e}")
+        if self.notifier is not None:
+            await self.notifier.start()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.notifier is not None:
+            await self.notifier.stop()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.eval_interval)
+            try:
+                self.evaluate_all()
+            except Exception as e:
+                logger.warning(f"⚠️ 알림 규칙 평가 오류: {type(e).__name__}: {e}")
+
+    # ---- 규칙 -------------------------------------------------------------
+
+    def _load_rules(self) -> List[AlertRule]:
+        if not os.path.exists(self.rules_file):
+            return []
+        with open(self.rules_file, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        rules = []
+        for entry in entries:
+            try:
+                rules.append(AlertRule.model_validate(entry))
+            except ValidationError as e:
+                name = entry.get("name") if isinstance(entry, dict) else None
+                logger.warning(f"⚠️ 알림 규칙 건너뜀 ({name}): {e.error_count()}개 오류")
+        return rules
+
+    def _save_rules(self):
+        if not self.rules_file:
+            return
+        directory = os.path.dirname(self.rules_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp = self.rules_file + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump([r.rule.model_dump(exclude_defaults=True) for r in self.rules.values()], f, ensure_ascii=False, indent=2)
+        os.replace(temp, self.rules_file)
+
+    def put_rule(self, rule: AlertRule) -> Dict[str, Any]:
+        """규칙 추가 (같은 이름이 있으면 바꿈)"""
+        replaced = rule.name in self.rules
+        if replaced:
+            self._remove(rule.name, "규칙 변경")
+        self._add(rule)
+        self._save_rules()
+        return {"name": rule.name, "replaced": replaced, "rules": len(self.rules)}
+
+    def delete_rule(self, name: str) -> bool:
+        if name not in self.rules:
+            return False
+        self._remove(name, "규칙 삭제")
+        self._save_rules()
+        return True
+
+    def _add(self, rule: AlertRule):
+        compiled = _Rule(rule)
+        self.rules[rule.name] = compiled
+        for side, term in enumerate(compiled.expression.terms):
+            self._by_metric.setdefault(term.name, _MetricTerms()).add((compiled, side, term))
+            # 아직 안 본 시계열은 첫 샘플 때 _link 가 이 항까지 맞춰 봄 → 이미 본 시계열만 붙임
+            for series_id in self._matching(term):
+                if self._linked[series_id]:
+                    self._bind(int(series_id), [(compiled, side)], dict(self.store.key_of(int(series_id))[1]))
+
+    def _remove(self, name: str, reason: str):
+        compiled = self.rules[name]
+        now = time.time()
+        for row in compiled.instances.values():
+            if self.state[row] == FIRING:
+                self._notify(row, "resolved", now, reason=reason)
+            self.alive[row] = False
+            self.state[row] = INACTIVE
+            self._info[row] = None
+            self._free.append(row)
+        del self.rules[name]
+        for term in compiled.expression.terms:
+            terms = self._by_metric.get(term.name)
+            if terms is not None:
+                terms.discard(compiled)
+                if not terms:
+                    del self._by_metric[term.name]
+        # 이 규칙에 붙은 시계열에서만 그 행을 뗌 (뗀 행은 _free 로 돌아가 다른 규칙이 다시 씀)
+        removed = np.zeros(self.max_instances, bool)
+        removed[list(compiled.instances.values())] = True
+        for series_id in compiled.series:
+            rows, sides = self._bindings[series_id]
+            keep = ~removed[rows]
+            if keep.any():
+                self._bindings[series_id] = (rows[keep], sides[keep])
+            else:
+                del self._bindings[series_id]
+                self._linked[series_id] = 1
+
+    # ---- 시계열 연결 ------------------------------------------------------
+
+    def _matching(self, term: Term) -> np.ndarray:
+        """이미 등록된 시계열 중 항에 맞는 번호 (= 조건은 MetricStore.select 로, 나머지는 라벨로 확인)"""
+        equal: Dict[str, str] = {}
+        for matcher in term.matchers:
+            if matcher.op == "=" and matcher.value:
+                if equal.setdefault(matcher.label, matcher.value) != matcher.value:
+                    return np.empty(0, np.int64)
+        ids = self.store.select(term.name, equal)
+        if len(equal) == len(term.matchers):
+            return ids
+        return np.array([i for i in ids if term.matches(dict(self.store.key_of(int(i))[1]))], np.int64)
+
+    def _bind(self, series_id: int, matched: List[Tuple[_Rule, int]], labels: Dict[str, str]):
+        """시계열 하나를 맞는 규칙 인스턴스 (행, 쪽) 들에 붙임"""
+        rows, sides = [], []
+        for compiled, side in matched:
+            row = self._instance(compiled, labels)
+            if row >= 0:
+                rows.append(row)
+                sides.append(side)
+                compiled.series.add(series_id)
+        if not rows:
+            return
+        bound = self._bindings.get(series_id)
+        if bound is not None:
+            rows, sides = [*bound[0], *rows], [*bound[1], *sides]
+        self._bindings[series_id] = (np.array(rows, np.int64), np.array(sides, np.int64))
+        self._linked[series_id] = 2
+
+    def _link(self, series_id: int):
+        name, labels = self.store.key_of(series_id)
+        self._linked[series_id] = 1
+        terms = self._by_metric.get(name)
+        if terms:
+            label_map = dict(labels)
+            matched = [(compiled, side) for compiled, side, term in terms.candidates(labels) if term.matches(label_map)]
+            if matched:
+                self._bind(series_id, matched, label_map)
+
+    def _instance(self, compiled: _Rule, labels: Dict[str, str]) -> int:
+        """시계열 라벨이 속하는 그룹의 인스턴스 행 (없으면 만듦, 상한이면 -1)"""
+        rule, expression = compiled.rule, compiled.expression
+        key = tuple(labels.get(label, "") for label in rule.by)
+        row = compiled.instances.get(key)
+        if row is not None:
+            return row
+        if len(compiled.instances) >= self.max_groups or (not self._free and self.rows >= self.max_instances):
+            self.counts["unbound_groups"] += 1
+            return -1
+        if self._free:
+            row = self._free.pop()
+        else:
+            row = self.rows
+            self.rows += 1
+        left, right = expression.left, expression.right
+        self.windows.reset(row, rule.window, left.fn in PERCENTILES)
+        self.alive[row] = True
+        self.state[row] = INACTIVE
+        self.op[row] = OPS[expression.op]
+        self.threshold[row] = expression.threshold
+        self.hold[row] = compiled.hold
+        self.for_seconds[row] = rule.for_seconds
+        self.keep_seconds[row] = rule.keep_firing_seconds
+        self.min_count[row] = rule.min_count
+        self.fn[row] = (FN_CODES[left.fn], FN_CODES[right.fn] if right is not None else -1)
+        self.q[row] = PERCENTILES.get(left.fn, np.nan)
+        for field in (self.value, self.active_at, self.fired_at, self.clear_at, self.notified_at):
+            field[row] = np.nan
+        group = dict(zip(rule.by, key))
+        fingerprint = hashlib.sha1(json.dumps([rule.name, sorted(group.items())]).encode("utf-8")).hexdigest()[:16]
+        self._info[row] = (rule.name, group, fingerprint)
+        compiled.instances[key] = row
+        return row
+
+    # ---- 수집 (MetricStore observer) --------------------------------------
+
+    def observe(self, now, ts, ids, sums, counts, mins, maxs):
+        """MetricStore 가 now 에 받은 샘플 배열 → 연결된 인스턴스 윈도에 더하고 그 인스턴스만 평가"""
+        if not self.rules:
+            return
+        started = time.perf_counter()
+        linked = self._linked[ids]
+        if not linked.all():
+            for series_id in np.unique(ids[linked == 0]):
+                self._link(int(series_id))
+            linked = self._linked[ids]
+        picked = np.flatnonzero(linked == 2)
+        if len(picked):
+            # 샘플 하나 → 그 시계열에 연결된 (행, 쪽) 수만큼 펼침
+            series, inverse = np.unique(ids[picked], return_inverse=True)
+            bound = [self._bindings[int(series_id)] for series_id in series]
+            lengths = np.fromiter((len(rows) for rows, _ in bound), np.int64, len(bound))
+            all_rows = np.concatenate([rows for rows, _ in bound])
+            all_sides = np.concatenate([sides for _, sides in bound])
+            repeat = lengths[inverse.reshape(-1)]
+            offsets = (np.cumsum(lengths) - lengths)[inverse.reshape(-1)]
+            position = np.repeat(offsets - (np.cumsum(repeat) - repeat), repeat) + np.arange(int(repeat.sum()))
+            sample = np.repeat(picked, repeat)
+            rows = all_rows[position]
+            late = self.windows.add(
+                rows,
+                all_sides[position],
+                np.minimum(ts[sample], now),
+                sums[sample].astype(np.float64),
+                counts[sample].astype(np.float64),
+                mins[sample].astype(np.float64),
+                maxs[sample].astype(np.float64),
+            )
+            self.counts["samples"] += len(rows) - late
+            self.counts["late"] += late
+            self._evaluate(np.unique(rows), now)
+        self.observe_ms.append((time.perf_counter() - started) * 1000)
+
+    # ---- 평가 -------------------------------------------------------------
+
+    def evaluate_all(self, now: Optional[float] = None):
+        """살아 있는 인스턴스 전체 평가 (주기 실행)"""
+        now = now or time.time()
+        rows = np.flatnonzero(self.alive[:self.rows])
+        for lo in range(0, len(rows), EVAL_CHUNK):
+            self._evaluate(rows[lo:lo + EVAL_CHUNK], now)
+
+    def _values(self, rows: np.ndarray, now: float) -> np.ndarray:
+        """인스턴스마다 식 왼쪽 값 (min_count 를 못 채우면 NaN)"""
+        self.windows.retire(rows, now)
+        total, count, covered = self.windows.totals(rows, now)
+        fn = self.fn[rows]
+        quantile = ~np.isnan(self.q[rows])
+        # min / max 는 칸을 훑어야 하므로 필요한 행만 (분위수는 추정값을 실제 최소/최대 안으로 자를 때)
+        low, high = np.full((len(rows), 2), np.nan), np.full((len(rows), 2), np.nan)
+        extreme = np.flatnonzero(((fn == MIN_CODE) | (fn == MAX_CODE)).any(axis=1) | quantile)
+        if len(extreme):
+            low[extreme], high[extreme] = self.windows.extremes(rows[extreme], now)
+        columns = {"sum": total, "count": count, "min": low, "max": high, "covered": covered}
+        value = self._apply(fn[:, 0], columns, 0)
+        ratio = fn[:, 1] >= 0
+        if ratio.any():
+            denominator = self._apply(fn[:, 1], columns, 1)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                value = np.where(ratio, value / np.where(denominator == 0, np.nan, denominator), value)
+        if quantile.any():
+            part = np.flatnonzero(quantile)
+            estimate = self.windows.quantiles(rows[part], self.q[rows[part]])
+            # 눈금 대표값이 실제 최소/최대 밖으로 나가지 않게
+            value[part] = np.clip(estimate, low[part, 0], high[part, 0])
+        counted = np.where(ratio, count[:, 1], count[:, 0])
+        value[counted < self.min_count[rows]] = np.nan
+        return value
+
+    @staticmethod
+    def _apply(fn: np.ndarray, columns: Dict[str, np.ndarray], side: int) -> np.ndarray:
+        total, count = columns["sum"][:, side], columns["count"][:, side]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            choices = [total, count, total / count, columns["min"][:, side], columns["max"][:, side], total / columns["covered"]]
+        return np.select([fn == code for code in range(len(choices))], choices, np.nan)
+
+    def _evaluate(self, rows: np.ndarray, now: float):
+        started = time.perf_counter()
+        rows = rows[self.alive[rows]]
+        if not len(rows):
+            return
+        value = self._values(rows, now)
+        op = self.op[rows]
+        condition = _compare(value, op, self.threshold[rows])
+        holding = _compare(value, op, self.hold[rows])
+        state = self.state[rows].copy()
+
+        begin = (state == INACTIVE) & condition
+        self.active_at[rows[begin]] = now
+        state[begin] = PENDING
+        state[(state == PENDING) & ~condition] = INACTIVE
+        fire = (state == PENDING) & (now - self.active_at[rows] >= self.for_seconds[rows])
+        state[fire] = FIRING
+        self.fired_at[rows[fire]] = now
+        firing = (state == FIRING) & ~fire
+        self.clear_at[rows[firing & holding]] = np.nan
+        clearing = firing & ~holding & np.isnan(self.clear_at[rows])
+        self.clear_at[rows[clearing]] = now
+        resolve = firing & ~holding & (now - self.clear_at[rows] >= self.keep_seconds[rows])
+        repeat = firing & ~resolve & (now - self.notified_at[rows] >= self.repeat_interval)
+
+        self.value[rows] = value
+        self.state[rows] = np.where(resolve, INACTIVE, state)
+        for row in rows[fire]:
+            self._notify(int(row), "firing", now)
+        for row in rows[repeat]:
+            self._notify(int(row), "firing", now, repeat=True)
+        for row in rows[resolve]:
+            self._notify(int(row), "resolved", now)
+        done = rows[resolve | ((state == INACTIVE) & ~begin)]
+        for field in (self.active_at, self.fired_at, self.clear_at):
+            field[done] = np.nan
+        self.counts["evaluations"] += len(rows)
+        self.evaluate_ms.append((time.perf_counter() - started) * 1000)
+
+    def _notify(self, row: int, status: str, now: float, repeat: bool = False, reason: Optional[str] = None):
+        name, group, fingerprint = self._info[row]
+        compiled = self.rules[name]
+        rule = compiled.rule
+        value = _none(self.value[row])
+        alert = {
+            "fingerprint": fingerprint,
+            "status": status,
+            "rule": name,
+            "severity": rule.severity,
+            "labels": {**rule.labels, **group, "alertname": name},
+            "summary": rule.summary,
+            "expr": rule.expr,
+            "value": value,
+            "threshold": compiled.expression.threshold,
+            "starts_at": _none(self.fired_at[row]),
+            "ends_at": now if status == "resolved" else None,
+        }
+        if repeat:
+            alert["repeat"] = True
+        if reason:
+            alert["reason"] = reason
+        self.notified_at[row] = now
+        self.counts["notifications"] += 1
+        if status == "firing":
+            if not repeat:
+                logger.warning(f"🚨 알림 발생: {name} {group} 값 {value} ({rule.expr})")
+        else:
+            logger.info(f"✅ 알림 해제: {name} {group}" + (f" ({reason})" if reason else ""))
+        if self.notifier is not None:
+            self.notifier.notify(alert)
+
+    # ---- 조회 -------------------------------------------------------------
+
+    def _view(self, row: int) -> Dict[str, Any]:
+        name, group, fingerprint = self._info[row]
+        return {
+            "fingerprint": fingerprint,
+            "rule": name,
+            "severity": self.rules[name].rule.severity,
+            "state": STATES[self.state[row]],
+            "labels": group,
+            "value": _none(self.value[row]),
+            "active_at": _none(self.active_at[row]),
+            "fired_at": _none(self.fired_at[row]),
+        }
+
+    def alerts(self, state: Optional[str] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        """pending / firing 인스턴스 (state 를 주면 그 상태만), firing 먼저"""
+        states = self.state[:self.rows]
+        mask = self.alive[:self.rows] & (states != INACTIVE)
+        if state:
+            mask &= states == STATES.index(state)
+        rows = np.flatnonzero(mask)
+        rows = rows[np.argsort(-states[rows], kind="stable")]
+        return [self._view(int(row)) for row in rows[:limit]]
+
+    def list_rules(self) -> List[Dict[str, Any]]:
+        result = []
+        for compiled in self.rules.values():
+            rows = np.fromiter(compiled.instances.values(), np.int64, len(compiled.instances))
+            result.append({
+                **compiled.rule.model_dump(),
+                "instances": len(rows),
+                "pending": int(np.count_nonzero(self.state[rows] == PENDING)),
+                "firing": int(np.count_nonzero(self.state[rows] == FIRING)),
+            })
+        return result
+
+    def get_rule(self, name: str, limit: int = 100) -> Optional[Dict[str, Any]]:
+        """규칙과 인스턴스별 현재 값/상태 (값이 큰 순)"""
+        compiled = self.rules.get(name)
+        if compiled is None:
+            return None
+        rows = np.fromiter(compiled.instances.values(), np.int64, len(compiled.instances))
+        rows = rows[np.argsort(-np.nan_to_num(self.value[rows], nan=-np.inf), kind="stable")]
+        return {
+            **compiled.rule.model_dump(),
+            "instances": [self._view(int(row)) for row in rows[:limit]],
+            "truncated": len(rows) > limit,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        alive = self.alive[:self.rows]
+        states = self.state[:self.rows]
+        return {
+            "rules": len(self.rules),
+            "instances": int(np.count_nonzero(alive)),
+            "max_instances": self.max_instances,
+            "pending": int(np.count_nonzero(alive & (states == PENDING))),
+            "firing": int(np.count_nonzero(alive & (states == FIRING))),
+            "linked_series": len(self._bindings),
+            "window_slots": self.windows.slots,
+            "window_bytes": self.windows.nbytes(self.rows),
+            **self.counts,
+            "observe_ms": percentiles(self.observe_ms),
+            "evaluate_ms": percentiles(self.evaluate_ms),
+            "notifier": self.notifier.stats() if self.notifier is not None else None,
+        }
@@ -0,0 +1,129 @@
+"""
+알림 웹훅 전송
+- 엔진이 상태가 바뀐 알림(firing / resolved)을 notify 로 넘기면 fingerprint 별 대기열에 넣기만 함
+  같은 fingerprint 가 아직 대기 중이면 최신 것으로 덮어씀 (짧은 사이 firing → resolved 는 resolved 하나만 나감)
+  마지막으로 보낸 상태와 같으면 (반복 알림이 아니면) 보내지 않음
+- ALERT_NOTIFY_SECONDS 마다 대기열을 묶어 POST ALERT_WEBHOOK_URL (JSON {"receiver", "sent_at", "alerts": [...]})
+  ALERT_WEBHOOK_SECRET 이 있으면 본문 HMAC-SHA256 을 X-Alert-Signature: sha256=<hex> 로 붙임
+- 실패하면 그 묶음을 대기열로 되돌리고 (그 사이 더 새 상태가 들어온 fingerprint 는 빼고) 간격을 최대 60초까지 늘려 재시도
+- URL 이 없으면 보내지 않고 최근 기록(history)에만 남김
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+import urllib.request
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF = 60
+# 한 번에 보내는 알림 수
+MAX_BATCH = 500
+
+
+class WebhookNotifier:
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        secret: Optional[str] = None,
+        interval: Optional[float] = None,
+        queue_size: Optional[int] = None,
+    ):
+        self.url = url if url is not None else os.getenv("ALERT_WEBHOOK_URL", "")
+        self.secret = secret if secret is not None else os.getenv("ALERT_WEBHOOK_SECRET", "")
+        self.interval = interval or float(os.getenv("ALERT_NOTIFY_SECONDS", "1"))
+        self.queue_size = queue_size or int(os.getenv("ALERT_NOTIFY_QUEUE", "10000"))
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._delivered: Dict[str, str] = {}
+        self._backoff = self.interval
+        self._task: Optional[asyncio.Task] = None
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=200)
+        self.counts = {"queued": 0, "coalesced": 0, "suppressed": 0, "dropped": 0, "sent": 0, "batches": 0, "failures": 0}
+
+    # ---- 수명 주기 --------------------------------------------------------
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self._backoff)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"⚠️ 알림 전송 루프 오류: {type(e).__name__}: {e}")
+
+    # ---- 대기열 -----------------------------------------------------------
+
+    def notify(self, alert: Dict[str, Any]):
+        fingerprint = alert["fingerprint"]
+        if fingerprint in self._pending:
+            del self._pending[fingerprint]
+            self.counts["coalesced"] += 1
+        elif not alert.get("repeat") and self._delivered.get(fingerprint) == alert["status"]:
+            self.counts["suppressed"] += 1
+            return
+        self._pending[fingerprint] = alert
+        self.counts["queued"] += 1
+        while len(self._pending) > self.queue_size:
+            self._pending.popitem(last=False)
+            self.counts["dropped"] += 1
+
+    async def flush(self):
+        while self._pending:
+            batch: List[Dict[str, Any]] = []
+            while self._pending and len(batch) < MAX_BATCH:
+                batch.append(self._pending.popitem(last=False)[1])
+            ok = True
+            if self.url:
+                body = json.dumps(
+                    {"receiver": "monitoring-service", "sent_at": time.time(), "alerts": batch},
+                    ensure_ascii=False,
+                ).encode("utf-8")
+                ok = await asyncio.to_thread(self._post, body)
+            if not ok:
+                self.counts["failures"] += 1
+                for alert in reversed(batch):
+                    if alert["fingerprint"] not in self._pending:
+                        self._pending[alert["fingerprint"]] = alert
+                        self._pending.move_to_end(alert["fingerprint"], last=False)
+                self._backoff = min(self._backoff * 2, MAX_BACKOFF)
+                return
+            self._backoff = self.interval
+            self.counts["batches"] += 1
+            self.counts["sent"] += len(batch)
+            for alert in batch:
+                self._delivered[alert["fingerprint"]] = alert["status"]
+                self.history.append({**alert, "delivered_at": time.time(), "webhook": bool(self.url)})
+
+    def _post(self, body: bytes) -> bool:
+        headers = {"Content-Type": "application/json"}
+        if self.secret:
+            digest = hmac.new(self.secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+            headers["X-Alert-Signature"] = f"sha256={digest}"
+        try:
+            request = urllib.request.Request(self.url, data=body, method="POST", headers=headers)
+            with urllib.request.urlopen(request, timeout=5) as response:
+                response.read()
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ 알림 웹훅 전송 실패 ({self.url}): {type(e).__name__}: {e}")
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"url": self.url or None, "pending": len(self._pending), "backoff": self._backoff, **self.counts}
@@ -0,0 +1,176 @@
+"""
+로그 세그먼트 파일 하나 (.seg) 와 그 색인 (.idx)
+- .seg: 블록을 이어 붙인 파일, 블록 = 헤더(BLOCK_HEADER) + zstd 로 따로 압축한 NDJSON (레코드 LOG_BLOCK_RECORDS 개 안팎)
+  블록마다 따로 압축하므로 조회 때 필요한 블록만 os.pread 로 읽어 풀면 됨 (세그먼트 전체를 읽지 않음)
+- 색인: 블록 목록(오프셋, 길이, 레코드 수, 최소/최대 시각) + 필드(INDEXED_FIELDS) 값 → 블록 번호 목록 (역색인)
+  블록 단위라 색인이 작고, 후보 블록을 푼 뒤 레코드를 다시 걸러냄
+- 봉인(seal) 할 때 색인을 .idx (zstd JSON) 로 저장, .idx 가 없으면 (비정상 종료) 블록 헤더를 훑어 색인을 다시 만듦
+"""
+import json
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+import zstandard
+
+INDEXED_FIELDS = ("service", "level", "request_id", "user_id")
+# magic, 압축 길이, 레코드 수, 최소 시각, 최대 시각
+BLOCK_HEADER = struct.Struct("<4sIIdd")
+BLOCK_MAGIC = b"LGB1"
+INDEX_VERSION = 1
+
+Block = Tuple[int, int, int, float, float]  # payload 오프셋, 압축 길이, 레코드 수, 최소/최대 시각
+
+
+class LogSegment:
+    def __init__(self, path: str, start: float):
+        self.path = path
+        self.start = start
+        self.blocks: List[Block] = []
+        self.postings: Dict[str, Dict[str, List[int]]] = {field: {} for field in INDEXED_FIELDS}
+        self.size = 0
+        self.raw_bytes = 0
+        self.sealed = False
+
+    @property
+    def index_path(self) -> str:
+        return self.path[:-4] + ".idx"
+
+    @property
+    def records(self) -> int:
+        return sum(block[2] for block in self.blocks)
+
+    @property
+    def min_ts(self) -> float:
+        return min((block[3] for block in self.blocks), default=self.start)
+
+    @property
+    def max_ts(self) -> float:
+        return max((block[4] for block in self.blocks), default=self.start)
+
+    # ---- 쓰기 ------------------------------------------------------------
+
+    def append(self, records: List[dict], lines: List[bytes], compressor: zstandard.ZstdCompressor):
+        """레코드 묶음을 블록 하나로 압축해 파일 끝에 붙이고 색인에 추가"""
+        raw = b"\n".join(lines)
+        payload = compressor.compress(raw)
+        times = [record["ts"] for record in records]
+        header = BLOCK_HEADER.pack(BLOCK_MAGIC, len(payload), len(records), min(times), max(times))
+        with open(self.path, "ab") as f:
+            f.write(header + payload)
+        block_id = len(self.blocks)
+        self.blocks.append((self.size + BLOCK_HEADER.size, len(payload), len(records), min(times), max(times)))
+        self.size += BLOCK_HEADER.size + len(payload)
+        self.raw_bytes += len(raw)
+        self._index(block_id, records)
+
+    def _index(self, block_id: int, records: List[dict]):
+        for field in INDEXED_FIELDS:
+            postings = self.postings[field]
+            for value in {record.get(field) for record in records}:
+                if value is None:
+                    continue
+                blocks = postings.get(value)
+                if blocks is None:
+                    postings[value] = [block_id]
+                elif blocks[-1] != block_id:
+                    blocks.append(block_id)
+
+    def seal(self):
+        """색인을 .idx 로 저장 (임시 파일 → 교체)"""
+        index = {
+            "version": INDEX_VERSION,
+            "start": self.start,
+            "raw_bytes": self.raw_bytes,
+            "blocks": self.blocks,
+            "postings": self.postings,
+        }
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(zstandard.ZstdCompressor(level=3).compress(json.dumps(index, ensure_ascii=False).encode("utf-8")))
+        os.replace(tmp, self.index_path)
+        self.sealed = True
+
+    def release(self):
+        """봉인된 세그먼트의 역색인을 메모리에서 내림 (블록 목록은 남김, 조회할 때 다시 불러옴)"""
+        if self.sealed:
+            self.postings = {}
+
+    # ---- 읽기 ------------------------------------------------------------
+
+    @classmethod
+    def open(cls, path: str, start: float) -> "LogSegment":
+        """.idx 가 있으면 블록 목록만 (역색인은 조회 때), 없으면 블록을 훑어 색인을 다시 만들고 봉인"""
+        segment = cls(path, start)
+        segment.size = os.path.getsize(path)
+        if os.path.exists(segment.index_path):
+            index = segment._read_index()
+            segment.blocks = [tuple(block) for block in index["blocks"]]
+            segment.raw_bytes = index.get("raw_bytes", 0)
+            segment.postings = {}
+            segment.sealed = True
+            return segment
+        segment._rebuild()
+        segment.seal()
+        return segment
+
+    def _read_index(self) -> dict:
+        with open(self.index_path, "rb") as f:
+            index = json.loads(zstandard.ZstdDecompressor().decompress(f.read()))
+        if index.get("version") != INDEX_VERSION:
+            raise ValueError(f"지원하지 않는 로그 색인 형식: {index.get('version')}")
+        return index
+
+    def load_postings(self):
+        if not self.postings:
+            self.postings = self._read_index()["postings"]
+
+    def _rebuild(self):
+        """블록 헤더를 따라가며 블록 목록과 역색인을 다시 만듦 (잘린 마지막 블록은 잘라 냄)"""
+        offset = 0
+        with open(self.path, "rb") as f:
+            while offset + BLOCK_HEADER.size <= self.size:
+                f.seek(offset)
+                magic, length, count, low, high = BLOCK_HEADER.unpack(f.read(BLOCK_HEADER.size))
+                if magic != BLOCK_MAGIC or offset + BLOCK_HEADER.size + length > self.size:
+                    break
+                block_id = len(self.blocks)
+                self.blocks.append((offset + BLOCK_HEADER.size, length, count, low, high))
+                lines = self.read_block(block_id)
+                self.raw_bytes += sum(len(line) + 1 for line in lines)
+                self._index(block_id, [json.loads(line) for line in lines])
+                offset += BLOCK_HEADER.size + length
+        if offset < self.size:
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+            self.size = offset
+
+    def candidates(
+        self,
+        filters: Dict[str, List[str]],
+        start: Optional[float],
+        end: Optional[float],
+    ) -> List[int]:
+        """필터(필드 → 허용 값 목록, 값끼리는 OR, 필드끼리는 AND)와 구간에 걸리는 블록 번호 (오름차순)"""
+        selected: Optional[set] = None
+        for field, values in filters.items():
+            blocks = set()
+            for value in values:
+                blocks.update(self.postings.get(field, {}).get(value, ()))
+            selected = blocks if selected is None else selected & blocks
+            if not selected:
+                return []
+        ids = sorted(selected) if selected is not None else range(len(self.blocks))
+        return [
+            i for i in ids
+            if (start is None or self.blocks[i][4] >= start) and (end is None or self.blocks[i][3] <= end)
+        ]
+
+    def read_block(self, block_id: int) -> List[bytes]:
+        offset, length, _, _, _ = self.blocks[block_id]
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            payload = os.pread(fd, length, offset)
+        finally:
+            os.close(fd)
+        return zstandard.ZstdDecompressor().decompress(payload).split(b"\n")
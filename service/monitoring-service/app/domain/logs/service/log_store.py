@@ -0,0 +1,337 @@
+"""
+로그 저장소
+- 서비스의 LogShipper 가 보낸 NDJSON 배치(zstd/gzip)를 받아 세그먼트 파일(LogSegment)에 블록 단위로 씀
+- 시간 분할: LOG_DIR/YYYY-MM-DD/<분할 시작 epoch>-<번호>.seg, LOG_SEGMENT_SECONDS(기본 1시간)마다 새 세그먼트,
+  LOG_SEGMENT_MAX_BYTES 를 넘어도 새 세그먼트 (이전 세그먼트는 봉인 → .idx)
+- 받은 레코드는 메모리에 모았다가 LOG_BLOCK_RECORDS 개가 되거나 LOG_FLUSH_SECONDS 가 지나면 블록 하나로 압축해 씀
+- 조회: 구간에 걸리는 세그먼트 → 역색인(service/level/request_id/user_id)으로 후보 블록 → 블록 하나씩 읽어 풀고 걸러서 바로 내보냄
+  (한 번에 메모리에 올라가는 건 블록 하나, 봉인된 세그먼트의 역색인은 최근 LOG_INDEX_CACHE 개만 메모리에 둠)
+- LOG_RETENTION_HOURS 보다 오래된 세그먼트는 주기적으로 지움
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+import zstandard
+
+from app.common.utility.batch_codec import decode_batch
+
+from ..model.log_segment import INDEXED_FIELDS, LogSegment
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+MAX_FIELD_CHARS = 128
+MAX_MESSAGE_CHARS = 8192
+# 보내는 쪽 시계가 이만큼 넘게 앞서 있으면 받은 시각으로 바꿈 (초)
+MAX_CLOCK_SKEW = 60
+
+
+def percentiles(values) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"p50": round(pick(0.5), 3), "p95": round(pick(0.95), 3), "max": round(ordered[-1], 3)}
+
+
+def compact_line(record: dict) -> bytes:
+    """블록에 저장하는 한 줄 (공백 없는 JSON)"""
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class LogStore:
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        segment_seconds: Optional[int] = None,
+        segment_max_bytes: Optional[int] = None,
+        block_records: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        retention_hours: Optional[float] = None,
+        index_cache: Optional[int] = None,
+    ):
+        self.directory = directory or os.getenv("LOG_DIR", "data/logs")
+        self.segment_seconds = segment_seconds or int(os.getenv("LOG_SEGMENT_SECONDS", "3600"))
+        self.segment_max_bytes = segment_max_bytes or int(os.getenv("LOG_SEGMENT_MAX_BYTES", str(256 * 1024 * 1024)))
+        self.block_records = block_records or int(os.getenv("LOG_BLOCK_RECORDS", "1000"))
+        self.flush_interval = flush_interval or float(os.getenv("LOG_FLUSH_SECONDS", "2"))
+        self.retention = (retention_hours or float(os.getenv("LOG_RETENTION_HOURS", "72"))) * 3600
+        self.index_cache = index_cache or int(os.getenv("LOG_INDEX_CACHE", "8"))
+
+        self.segments: List[LogSegment] = []
+        self._active: Optional[LogSegment] = None
+        self._pending: List[dict] = []
+        self._pending_lines: List[bytes] = []
+        self._loaded: "OrderedDict[str, LogSegment]" = OrderedDict()
+        self._compressor = zstandard.ZstdCompressor(level=3)
+        self._task: Optional[asyncio.Task] = None
+        self.ingest_ms: Deque[float] = deque(maxlen=1000)
+        self.query_ms: Deque[float] = deque(maxlen=1000)
+        self.counts = {"batches": 0, "records": 0, "rejected": 0, "blocks": 0, "queries": 0, "expired_segments": 0}
+
+    # ---- 수명 주기 --------------------------------------------------------
+
+    async def start(self):
+        await asyncio.to_thread(self._open_existing)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.flush()
+        if self._active is not None and self._active.blocks:
+            self._active.seal()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.flush()
+                await asyncio.to_thread(self.expire)
+            except Exception as e:
+                logger.warning(f"⚠️ 로그 블록 쓰기 실패: {type(e).__name__}: {e}")
+
+    def _open_existing(self):
+        """디스크의 세그먼트를 시작 시각 순으로 불러옴 (색인이 없던 세그먼트는 다시 만들어 봉인)"""
+        if not os.path.isdir(self.directory):
+            return
+        started = time.perf_counter()
+        found = []
+        for day in sorted(os.listdir(self.directory)):
+            day_dir = os.path.join(self.directory, day)
+            if not os.path.isdir(day_dir):
+                continue
+            for name in os.listdir(day_dir):
+                if name.endswith(".seg"):
+                    start, _, seq = name[:-4].partition("-")
+                    found.append((int(start), int(seq or 0), os.path.join(day_dir, name)))
+        for start, _, path in sorted(found):
+            try:
+                self.segments.append(LogSegment.open(path, start))
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ 로그 세그먼트 불러오기 실패 ({path}): {type(e).__name__}: {e}")
+        logger.info(
+            f"✅ 로그 세그먼트 {len(self.segments)}개 불러옴 "
+            f"(레코드 {sum(s.records for s in self.segments)}개, {time.perf_counter() - started:.1f}s)"
+        )
+
+    # ---- 수집 -------------------------------------------------------------
+
+    def ingest(self, body: bytes, encoding: Optional[str], now: Optional[float] = None) -> Dict[str, int]:
+        """압축된 NDJSON 배치를 받아 메모리 블록에 추가 (블록이 차면 씀), 받은/버린 레코드 수"""
+        started = time.perf_counter()
+        now = now or time.time()
+        raw = decode_batch(body, encoding)
+        accepted = rejected = 0
+        for line in raw.split(b"\n"):
+            if not line.strip():
+                continue
+            record = self._normalize(line, now)
+            if record is None:
+                rejected += 1
+                continue
+            self._pending.append(record)
+            self._pending_lines.append(compact_line(record))
+            accepted += 1
+            if len(self._pending) >= self.block_records:
+                self.flush()
+        self.counts["batches"] += 1
+        self.counts["records"] += accepted
+        self.counts["rejected"] += rejected
+        self.ingest_ms.append((time.perf_counter() - started) * 1000)
+        return {"accepted": accepted, "rejected": rejected}
+
+    def _normalize(self, line: bytes, now: float) -> Optional[dict]:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(entry, dict) or not isinstance(entry.get("msg"), str):
+            return None
+        ts = entry.get("ts")
+        if not isinstance(ts, (int, float)) or ts > now + MAX_CLOCK_SKEW or ts < now - self.retention:
+            ts = now
+        level = str(entry.get("level") or "INFO").upper()
+        record = {
+            "ts": float(ts),
+            "service": str(entry.get("service") or "unknown")[:MAX_FIELD_CHARS],
+            "level": level if level in LEVELS else "INFO",
+            "logger": str(entry.get("logger") or "")[:MAX_FIELD_CHARS],
+            "msg": entry["msg"][:MAX_MESSAGE_CHARS],
+        }
+        for field in ("request_id", "user_id"):
+            if entry.get(field):
+                record[field] = str(entry[field])[:MAX_FIELD_CHARS]
+        return record
+
+    def flush(self):
+        """메모리에 모인 레코드를 블록 하나로 씀 (필요하면 새 세그먼트로)"""
+        if not self._pending:
+            return
+        records, lines = self._pending, self._pending_lines
+        self._pending, self._pending_lines = [], []
+        segment = self._segment_for(time.time())
+        segment.append(records, lines, self._compressor)
+        self.counts["blocks"] += 1
+
+    def _segment_for(self, now: float) -> LogSegment:
+        partition = int(now // self.segment_seconds * self.segment_seconds)
+        active = self._active
+        if active is not None and int(active.start) == partition and active.size < self.segment_max_bytes:
+            return active
+        if active is not None:
+            active.seal()
+            self._evict(active)
+        day = time.strftime("%Y-%m-%d", time.gmtime(partition))
+        os.makedirs(os.path.join(self.directory, day), exist_ok=True)
+        seq = sum(1 for s in self.segments if int(s.start) == partition)
+        path = os.path.join(self.directory, day, f"{partition}-{seq:04d}.seg")
+        self._active = LogSegment(path, partition)
+        self.segments.append(self._active)
+        return self._active
+
+    def expire(self, now: Optional[float] = None):
+        """보존 기간이 지난 봉인 세그먼트 삭제"""
+        cutoff = (now or time.time()) - self.retention
+        for segment in [s for s in self.segments if s.sealed and s.max_ts < cutoff]:
+            self.segments.remove(segment)
+            self._loaded.pop(segment.path, None)
+            for path in (segment.path, segment.index_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            day_dir = os.path.dirname(segment.path)
+            if not os.listdir(day_dir):
+                os.rmdir(day_dir)
+            self.counts["expired_segments"] += 1
+
+    # ---- 조회 -------------------------------------------------------------
+
+    async def _postings(self, segment: LogSegment):
+        """봉인된 세그먼트의 역색인을 불러오고 최근 LOG_INDEX_CACHE 개만 유지"""
+        if not segment.sealed:
+            return
+        if segment.path in self._loaded:
+            self._loaded.move_to_end(segment.path)
+        else:
+            await asyncio.to_thread(segment.load_postings)
+            self._loaded[segment.path] = segment
+        while len(self._loaded) > self.index_cache:
+            _, old = self._loaded.popitem(last=False)
+            old.release()
+
+    def _evict(self, segment: LogSegment):
+        segment.release()
+        self._loaded.pop(segment.path, None)
+
+    async def query(
+        self,
+        filters: Dict[str, List[str]],
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        contains: Optional[str] = None,
+        limit: int = 1000,
+        order: str = "desc",
+    ) -> AsyncIterator[dict]:
+        """
+        조건에 맞는 레코드를 하나씩 내보냄 (desc: 최신부터, asc: 오래된 것부터)
+        filters: 색인 필드 → 허용 값 목록, contains: msg 부분 문자열 (색인 없이 블록을 풀어 확인)
+        """
+        started = time.perf_counter()
+        filters = {field: values for field, values in filters.items() if field in INDEXED_FIELDS and values}
+        descending = order == "desc"
+        emitted = 0
+
+        def matches(record: dict) -> bool:
+            if start is not None and record["ts"] < start:
+                return False
+            if end is not None and record["ts"] > end:
+                return False
+            for field, values in filters.items():
+                if record.get(field) not in values:
+                    return False
+            return contains is None or contains in record["msg"]
+
+        # 저장된 줄은 compact_line 형식이라, 파싱 전에 바이트로 먼저 거름 (json.loads 가 조회 시간 대부분)
+        needles = [[compact_line({field: value})[1:-1] for value in values] for field, values in filters.items()]
+        if contains is not None:
+            needles.append([json.dumps(contains, ensure_ascii=False)[1:-1].encode("utf-8")])
+
+        def maybe(line: bytes) -> bool:
+            return all(any(needle in line for needle in group) for group in needles)
+
+        # 아직 블록으로 쓰지 않은 레코드 (가장 최근)
+        pending = [record for record in self._pending if matches(record)]
+        segments = [
+            s for s in self.segments
+            if s.blocks and (start is None or s.max_ts >= start) and (end is None or s.min_ts <= end)
+        ]
+        if descending:
+            segments.reverse()
+            pending.reverse()
+        try:
+            if descending:
+                for record in pending[:limit]:
+                    yield record
+                emitted += min(len(pending), limit)
+            for segment in segments:
+                if emitted >= limit:
+                    break
+                await self._postings(segment)
+                blocks = segment.candidates(filters, start, end)
+                if descending:
+                    blocks.reverse()
+                for block_id in blocks:
+                    try:
+                        lines = await asyncio.to_thread(segment.read_block, block_id)
+                    except FileNotFoundError:
+                        break  # 조회 중 보존 기간이 지나 지워짐
+                    if descending:
+                        lines.reverse()
+                    for line in lines:
+                        if not maybe(line):
+                            continue
+                        record = json.loads(line)
+                        if matches(record):
+                            yield record
+                            emitted += 1
+                            if emitted >= limit:
+                                break
+                    if emitted >= limit:
+                        break
+            if not descending:
+                for record in pending[:limit - emitted]:
+                    yield record
+        finally:
+            self.counts["queries"] += 1
+            self.query_ms.append((time.perf_counter() - started) * 1000)
+
+    # ---- 상태 -------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        disk = sum(s.size for s in self.segments)
+        raw = sum(s.raw_bytes for s in self.segments)
+        return {
+            "directory": self.directory,
+            "segments": len(self.segments),
+            "stored_records": sum(s.records for s in self.segments),
+            "pending_records": len(self._pending),
+            "disk_bytes": disk,
+            "compression_ratio": round(raw / disk, 2) if disk else None,
+            "oldest": min((s.min_ts for s in self.segments if s.blocks), default=None),
+            "loaded_indexes": len(self._loaded) + (1 if self._active is not None else 0),
+            **self.counts,
+            "ingest_ms": percentiles(self.ingest_ms),
+            "query_ms": percentiles(self.query_ms),
+        }
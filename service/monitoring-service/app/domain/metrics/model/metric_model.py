@@ -0,0 +1,24 @@
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+MAX_BATCH_SAMPLES = 10000
+MAX_LABELS = 16
+
+
+class MetricSample(BaseModel):
+    name: str = Field(..., min_length=1, max_length=200)
+    # count 가 있으면 value 는 count 개 관측값의 합 (클라이언트가 미리 모은 값)
+    value: float
+    count: Optional[int] = Field(default=None, ge=1)
+    min: Optional[float] = None
+    max: Optional[float] = None
+    labels: Dict[str, str] = Field(default_factory=dict, max_length=MAX_LABELS)
+    # epoch 초, 없으면 받은 시각
+    timestamp: Optional[float] = None
+
+
+class MetricBatch(BaseModel):
+    # 모든 샘플에 붙는 라벨 (service 등), 샘플 라벨이 우선
+    labels: Dict[str, str] = Field(default_factory=dict, max_length=MAX_LABELS)
+    samples: List[MetricSample] = Field(..., max_length=MAX_BATCH_SAMPLES)
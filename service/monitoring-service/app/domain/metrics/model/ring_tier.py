@@ -0,0 +1,101 @@
+"""
+해상도 하나의 링 버퍼 (시간 버킷 × 시계열)
+- sum / count / min / max 를 (slots, max_series) 배열로 미리 잡아 둠
+  np.zeros 는 쓰기 전까지 메모리를 쓰지 않으므로 실제 사용량은 등록된 시계열 수에 비례
+- 버킷 b (= 시각 // resolution) 는 b % slots 행에 들어가고 slot_time[행] 이 그 행의 버킷
+  더 새 버킷이 오면 행을 비우고 재사용, 행에 있는 버킷보다 오래된 값(보존 기간 밖)은 버림
+- 행을 비울 때는 sum/count 만 지우고, min/max 는 count 가 0 인 칸에 처음 쓸 때 초기화
+"""
+from typing import Tuple
+
+import numpy as np
+
+FIELDS = ("sum", "count", "min", "max")
+
+
+class RingTier:
+    def __init__(self, resolution: int, slots: int, max_series: int):
+        self.resolution = resolution
+        self.slots = slots
+        self.max_series = max_series
+        shape = (slots, max_series)
+        self.sum = np.zeros(shape, np.float32)
+        self.count = np.zeros(shape, np.uint32)
+        self.min = np.zeros(shape, np.float32)
+        self.max = np.zeros(shape, np.float32)
+        self.slot_time = np.full(slots, -1, np.int64)
+
+    @property
+    def name(self) -> str:
+        return f"{self.resolution}s"
+
+    @property
+    def retention(self) -> int:
+        return self.resolution * self.slots
+
+    def newest(self) -> int:
+        """가장 최근에 쓴 버킷의 시작 시각 (쓴 적이 없으면 -1)"""
+        newest = int(self.slot_time.max())
+        return newest * self.resolution if newest >= 0 else -1
+
+    def add(
+        self,
+        ts: np.ndarray,
+        ids: np.ndarray,
+        sums: np.ndarray,
+        counts: np.ndarray,
+        mins: np.ndarray,
+        maxs: np.ndarray,
+        series: int,
+    ) -> int:
+        """샘플을 해당 버킷에 누적, 보존 기간 밖이라 버린 샘플 수를 반환 (series = 등록된 시계열 수)"""
+        buckets = ts.astype(np.int64) // self.resolution
+        # 한 배치의 버킷 종류는 보통 한두 개
+        for bucket in np.unique(buckets):
+            row = bucket % self.slots
+            if self.slot_time[row] < bucket:
+                self.sum[row, :series] = 0
+                self.count[row, :series] = 0
+                self.slot_time[row] = bucket
+        rows = buckets % self.slots
+        keep = self.slot_time[rows] == buckets
+        dropped = int(len(keep) - np.count_nonzero(keep))
+        if dropped:
+            rows, ids, sums, counts, mins, maxs = (a[keep] for a in (rows, ids, sums, counts, mins, maxs))
+        flat = rows * self.max_series + ids
+        count = self.count.reshape(-1)
+        low, high = self.min.reshape(-1), self.max.reshape(-1)
+        fresh = flat[count[flat] == 0]
+        low[fresh] = np.inf
+        high[fresh] = -np.inf
+        np.add.at(self.sum.reshape(-1), flat, sums)
+        np.add.at(count, flat, counts)
+        np.minimum.at(low, flat, mins)
+        np.maximum.at(high, flat, maxs)
+        return dropped
+
+    def buckets(self, start: float, end: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """[start, end] 구간의 버킷 시작 시각, 행 번호, 그 행이 실제로 그 버킷인지"""
+        last = int(end) // self.resolution
+        first = max(int(start) // self.resolution, last - self.slots + 1)
+        buckets = np.arange(first, last + 1, dtype=np.int64)
+        rows = buckets % self.slots
+        return buckets * self.resolution, rows, self.slot_time[rows] == buckets
+
+    def cells(self, rows: np.ndarray, valid: np.ndarray, ids: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """(버킷 × 시계열) sum, count, min, max 행렬, 값이 없는 칸은 count 0 / min·max NaN"""
+        index = (rows[:, None], ids[None, :])
+        total = self.sum[index]
+        count = self.count[index]
+        total[~valid] = 0
+        count[~valid] = 0
+        empty = count == 0
+        low = self.min[index]
+        high = self.max[index]
+        low[empty] = np.nan
+        high[empty] = np.nan
+        return total, count, low, high
+
+    def nbytes(self, series: int) -> int:
+        """등록된 시계열이 차지하는 바이트"""
+        return self.slots * series * sum(getattr(self, field).itemsize for field in FIELDS)
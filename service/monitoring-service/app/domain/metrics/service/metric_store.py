@@ -0,0 +1,516 @@
+"""
+지표 시계열 저장소
+- 시계열 = 이름 + 라벨, 처음 본 순서대로 번호를 붙이고 라벨 값은 라벨마다 정수 코드 배열로 보관
+  → 시계열 선택/그룹핑이 배열 비교와 np.unique 로 끝남
+- 해상도별 링 버퍼(RingTier)에 sum/count/min/max 를 누적, 기본 METRICS_TIERS="1:300,60:360,3600:168"
+  (1초 5분, 1분 6시간, 1시간 7일), 샘플을 받을 때 모든 해상도 버킷에 함께 더하므로 1s → 1m → 1h 다운샘플링을 따로 돌리지 않음
+- 값의 의미는 보내는 쪽이 정함: 카운터는 증가분(rate = 합 / 초), 게이지/지연은 관측값(count 를 주면 미리 모은 합)
+- 조회: 구간을 담는 가장 촘촘한 해상도를 골라 (버킷 × 시계열) 행렬을 CHUNK_SERIES 개씩 꺼내 그룹 단위로 집계
+  분위수는 구간 안 (버킷 × 시계열) 평균값의 분위수 (그룹별로 정렬 한 번, 선형 보간)
+- 시계열이 METRICS_MAX_SERIES 를 넘으면 새 시계열의 샘플은 버림 (기존 시계열은 계속 받음)
+- observers: 받은 시각과 샘플 배열(시각, 시계열 번호, sum, count, min, max)을 넘겨받는 콜백 (알림 규칙 엔진)
+- 스냅샷: METRICS_SNAPSHOT_SECONDS 마다 METRICS_SNAPSHOT_DIR/metrics.npz 에 저장 (임시 파일 → 교체), 시작할 때 불러옴
+  수집을 멈추지 않고 별도 스레드에서 쓰므로 저장 중 들어온 값이 일부 섞일 수 있음
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..model.metric_model import MetricBatch
+from ..model.ring_tier import FIELDS, RingTier
+
+logger = logging.getLogger(__name__)
+
+AGGREGATES = ("sum", "count", "avg", "min", "max", "rate")
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p95": 0.95, "p99": 0.99}
+SNAPSHOT_FILE = "metrics.npz"
+SNAPSHOT_VERSION = 1
+# 보내는 쪽 시계가 이만큼 넘게 앞서 있으면 버림 (초)
+MAX_CLOCK_SKEW = 60
+# 라벨 이름 종류 상한 (라벨 이름마다 max_series 크기 코드 배열을 잡으므로)
+MAX_LABEL_KEYS = 64
+# 조회 때 한 번에 꺼내는 시계열 수 (버킷 × 시계열 행렬 메모리 상한)
+CHUNK_SERIES = 8192
+
+SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def percentiles(values) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"p50": round(pick(0.5), 3), "p95": round(pick(0.95), 3), "max": round(ordered[-1], 3)}
+
+
+def parse_tiers(spec: str) -> List[Tuple[int, int]]:
+    """"1:300,60:360" → [(1, 300), (60, 360)] (해상도 초:버킷 수, 촘촘한 순)"""
+    tiers = []
+    for part in spec.split(","):
+        resolution, _, slots = part.strip().partition(":")
+        tiers.append((int(resolution), int(slots)))
+    return sorted(tiers)
+
+
+class MetricStore:
+    def __init__(
+        self,
+        tiers: Optional[Sequence[Tuple[int, int]]] = None,
+        max_series: Optional[int] = None,
+        snapshot_dir: Optional[str] = None,
+        snapshot_interval: Optional[float] = None,
+    ):
+        self.max_series = max_series or int(os.getenv("METRICS_MAX_SERIES", "100000"))
+        tiers = tiers or parse_tiers(os.getenv("METRICS_TIERS", "1:300,60:360,3600:168"))
+        self.tiers = [RingTier(resolution, slots, self.max_series) for resolution, slots in tiers]
+        self.snapshot_dir = snapshot_dir if snapshot_dir is not None else os.getenv("METRICS_SNAPSHOT_DIR", "data")
+        self.snapshot_interval = snapshot_interval or float(os.getenv("METRICS_SNAPSHOT_SECONDS", "60"))
+
+        self.series = 0
+        self._ids: Dict[SeriesKey, int] = {}
+        self._keys: List[SeriesKey] = []
+        self._names: Dict[str, int] = {}
+        self._name_list: List[str] = []
+        self.name_of = np.full(self.max_series, -1, np.int32)
+        # 라벨 이름 → 시계열별 값 코드 (-1 = 라벨 없음), 값 → 코드
+        self._label_codes: Dict[str, np.ndarray] = {}
+        self._label_values: Dict[str, Dict[str, int]] = {}
+
+        self.observers: List[Callable[..., None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._saving = False
+        self.snapshot: Dict[str, Any] = {}
+        self.ingest_ms: Deque[float] = deque(maxlen=1000)
+        self.query_ms: Deque[float] = deque(maxlen=1000)
+        self.counts = {"batches": 0, "samples": 0, "over_capacity": 0, "future": 0, "expired": 0, "queries": 0}
+
+    # ---- 수명 주기 --------------------------------------------------------
+
+    async def start(self):
+        if self.snapshot_dir:
+            try:
+                await asyncio.to_thread(self.load_snapshot)
+            except Exception as e:
+                logger.warning(f"⚠️ 지표 스냅샷 불러오기 실패 (빈 저장소로 시작): {type(e).__name__}: {e}")
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await self.save()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            await self.save()
+
+    # ---- 시계열 등록 ------------------------------------------------------
+
+    def _register(self, key: SeriesKey) -> int:
+        if self.series >= self.max_series:
+            return -1
+        name, labels = key
+        for label, _ in labels:
+            if label not in self._label_codes and len(self._label_codes) >= MAX_LABEL_KEYS:
+                return -1
+        series_id = self.series
+        name_id = self._names.get(name)
+        if name_id is None:
+            name_id = self._names[name] = len(self._name_list)
+            self._name_list.append(name)
+        self.name_of[series_id] = name_id
+        for label, value in labels:
+            codes = self._label_codes.get(label)
+            if codes is None:
+                codes = self._label_codes[label] = np.full(self.max_series, -1, np.int32)
+                self._label_values[label] = {}
+            values = self._label_values[label]
+            code = values.get(value)
+            if code is None:
+                code = values[value] = len(values)
+            codes[series_id] = code
+        self._ids[key] = series_id
+        self._keys.append(key)
+        self.series += 1
+        return series_id
+
+    # ---- 수집 -------------------------------------------------------------
+
+    def ingest(self, batch: MetricBatch, now: Optional[float] = None) -> Dict[str, int]:
+        """배치의 샘플을 모든 해상도에 누적, 받은/버린 샘플 수를 반환"""
+        started = time.perf_counter()
+        now = now or time.time()
+        samples = batch.samples
+        size = len(samples)
+        ids = np.empty(size, np.int64)
+        ts = np.empty(size, np.float64)
+        sums = np.empty(size, np.float32)
+        counts = np.empty(size, np.uint32)
+        mins = np.empty(size, np.float32)
+        maxs = np.empty(size, np.float32)
+        common = batch.labels
+        common_items = tuple(sorted(common.items()))
+        over_capacity = future = k = 0
+        for sample in samples:
+            labels = tuple(sorted({**common, **sample.labels}.items())) if sample.labels else common_items
+            key = (sample.name, labels)
+            series_id = self._ids.get(key)
+            if series_id is None:
+                series_id = self._register(key)
+                if series_id < 0:
+                    over_capacity += 1
+                    continue
+            timestamp = sample.timestamp or now
+            if timestamp > now + MAX_CLOCK_SKEW:
+                future += 1
+                continue
+            count = sample.count or 1
+            ids[k] = series_id
+            ts[k] = timestamp
+            sums[k] = sample.value
+            counts[k] = count
+            mins[k] = sample.min if sample.min is not None else sample.value / count
+            maxs[k] = sample.max if sample.max is not None else sample.value / count
+            k += 1
+        expired = 0
+        if k:
+            arrays = (ts[:k], ids[:k], sums[:k], counts[:k], mins[:k], maxs[:k])
+            # 가장 긴 해상도에서도 보존 기간 밖인 샘플만 버린 것으로 셈
+            expired = min(tier.add(*arrays, series=self.series) for tier in self.tiers)
+            for observer in self.observers:
+                observer(now, *arrays)
+        self.counts["batches"] += 1
+        self.counts["samples"] += k - expired
+        self.counts["over_capacity"] += over_capacity
+        self.counts["future"] += future
+        self.counts["expired"] += expired
+        self.ingest_ms.append((time.perf_counter() - started) * 1000)
+        if over_capacity:
+            logger.warning(f"⚠️ 시계열 상한({self.max_series}) 초과로 샘플 {over_capacity}개 버림")
+        return {"accepted": k - expired, "dropped": size - k + expired, "series": self.series}
+
+    # ---- 선택 / 그룹핑 ----------------------------------------------------
+
+    def select(self, name: str, match: Optional[Dict[str, str]] = None) -> np.ndarray:
+        """이름이 같고 라벨이 모두 일치하는 시계열 번호"""
+        name_id = self._names.get(name)
+        if name_id is None:
+            return np.empty(0, np.int64)
+        mask = self.name_of[:self.series] == name_id
+        for label, value in (match or {}).items():
+            code = self._label_values.get(label, {}).get(value)
+            if code is None:
+                return np.empty(0, np.int64)
+            mask &= self._label_codes[label][:self.series] == code
+        return np.flatnonzero(mask)
+
+    def key_of(self, series_id: int) -> SeriesKey:
+        return self._keys[series_id]
+
+    def labels_of(self, series_id: int) -> Dict[str, str]:
+        return dict(self._keys[series_id][1])
+
+    def _groups(self, ids: np.ndarray, by: Optional[List[str]]) -> Tuple[np.ndarray, List[Dict[str, str]]]:
+        """시계열별 그룹 번호와 그룹 라벨 (by 가 없으면 시계열마다 한 그룹)"""
+        if not by:
+            return np.arange(len(ids)), [self.labels_of(int(i)) for i in ids]
+        missing = np.full(len(ids), -1, np.int32)
+        codes = np.stack([self._label_codes[label][ids] if label in self._label_codes else missing for label in by])
+        unique, inverse = np.unique(codes, axis=1, return_inverse=True)
+        names = {label: {code: value for value, code in self._label_values.get(label, {}).items()} for label in by}
+        labels = [
+            {label: names[label][int(code)] for label, code in zip(by, column) if code >= 0}
+            for column in unique.T
+        ]
+        return inverse.reshape(-1), labels
+
+    def _tier_for(self, start: float, now: float) -> RingTier:
+        """start 까지 담고 있는 가장 촘촘한 해상도 (없으면 가장 긴 해상도)"""
+        for tier in self.tiers:
+            if start >= now - tier.retention:
+                return tier
+        return self.tiers[-1]
+
+    def _chunks(self, ids: np.ndarray, groups: np.ndarray):
+        """(버킷 × 시계열) 행렬을 CHUNK_SERIES 개씩 꺼냄 (시계열이 많아도 메모리 상한 유지)"""
+        for lo in range(0, len(ids), CHUNK_SERIES):
+            yield ids[lo:lo + CHUNK_SERIES], groups[lo:lo + CHUNK_SERIES]
+
+    # ---- 조회 -------------------------------------------------------------
+
+    def query(
+        self,
+        name: str,
+        match: Optional[Dict[str, str]],
+        start: float,
+        end: float,
+        agg: str = "avg",
+        by: Optional[List[str]] = None,
+        limit: int = 100,
+    ) -> Dict[str, Any]:
+        """구간 조회: 그룹(by 가 없으면 시계열)마다 버킷별 agg 값"""
+        started = time.perf_counter()
+        tier = self._tier_for(start, time.time())
+        times, rows, valid = tier.buckets(start, end)
+        ids = self.select(name, match)
+        result = {"name": name, "resolution": tier.resolution, "agg": agg, "series": [], "truncated": False}
+        if len(ids):
+            if not by:
+                result["truncated"] = len(ids) > limit
+                ids = ids[:limit]
+            groups, labels = self._groups(ids, by)
+            shape = (len(times), len(labels))
+            total, count = np.zeros(shape), np.zeros(shape)
+            low, high = np.full(shape, np.nan), np.full(shape, np.nan)
+            for chunk, chunk_groups in self._chunks(ids, groups):
+                cells = tier.cells(rows, valid, chunk)
+                order = np.argsort(chunk_groups, kind="stable")
+                sorted_groups = chunk_groups[order]
+                starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+                present = sorted_groups[starts]
+                chunk_total, chunk_count, chunk_low, chunk_high = (m[:, order] for m in cells)
+                total[:, present] += np.add.reduceat(chunk_total, starts, axis=1, dtype=np.float64)
+                count[:, present] += np.add.reduceat(chunk_count, starts, axis=1, dtype=np.float64)
+                low[:, present] = np.fmin(low[:, present], np.fmin.reduceat(chunk_low, starts, axis=1))
+                high[:, present] = np.fmax(high[:, present], np.fmax.reduceat(chunk_high, starts, axis=1))
+            empty = count == 0
+            with np.errstate(invalid="ignore", divide="ignore"):
+                values = {
+                    "sum": np.where(empty, np.nan, total),
+                    "count": np.where(empty, np.nan, count),
+                    "avg": total / count,
+                    "min": low,
+                    "max": high,
+                    "rate": np.where(empty, np.nan, total / tier.resolution),
+                }[agg]
+            if by:
+                result["truncated"] = len(labels) > limit
+            points_of = lambda column: [
+                [int(t), round(float(v), 6)] for t, v in zip(times, column) if not np.isnan(v)
+            ]
+            result["series"] = [
+                {"labels": labels[g], "points": points_of(values[:, g])} for g in range(min(len(labels), limit))
+            ]
+        self._timed(started)
+        return result
+
+    def aggregate(
+        self,
+        name: str,
+        match: Optional[Dict[str, str]],
+        start: float,
+        end: float,
+        fn: str = "avg",
+        by: Optional[List[str]] = None,
+        limit: int = 100,
+    ) -> Dict[str, Any]:
+        """구간 전체를 그룹(by 가 없으면 전체 한 그룹)마다 값 하나로: sum/count/avg/min/max/rate/p50…p99"""
+        started = time.perf_counter()
+        tier = self._tier_for(start, time.time())
+        times, rows, valid = tier.buckets(start, end)
+        ids = self.select(name, match)
+        result = {"name": name, "resolution": tier.resolution, "fn": fn, "groups": [], "truncated": False}
+        if len(ids):
+            if by:
+                groups, labels = self._groups(ids, by)
+            else:
+                groups, labels = np.zeros(len(ids), np.int64), [{}]
+            size = len(labels)
+            if fn in PERCENTILES:
+                values = self._percentile(tier, rows, valid, ids, groups, size, PERCENTILES[fn])
+            else:
+                # 시간 축을 먼저 줄여 시계열마다 값 하나 → 그룹별로 모음
+                parts = [
+                    (
+                        total.sum(axis=0, dtype=np.float64),
+                        count.sum(axis=0, dtype=np.float64),
+                        np.fmin.reduce(low, axis=0),
+                        np.fmax.reduce(high, axis=0),
+                    )
+                    for total, count, low, high in (tier.cells(rows, valid, chunk) for chunk, _ in self._chunks(ids, groups))
+                ]
+                total, count, low, high = (np.concatenate(column) for column in zip(*parts))
+                group_total = np.bincount(groups, weights=total, minlength=size)
+                group_count = np.bincount(groups, weights=count, minlength=size)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    if fn == "min":
+                        values = np.full(size, np.nan)
+                        np.fmin.at(values, groups, low)
+                    elif fn == "max":
+                        values = np.full(size, np.nan)
+                        np.fmax.at(values, groups, high)
+                    else:
+                        values = {
+                            "sum": group_total,
+                            "count": group_count,
+                            "avg": group_total / group_count,
+                            "rate": group_total / (len(times) * tier.resolution),
+                        }[fn]
+            members = np.bincount(groups, minlength=size)
+            # 그룹별이면 값이 큰 순서 (가장 느린/많은 경로부터)
+            order = np.argsort(-np.nan_to_num(values, nan=-np.inf), kind="stable") if by else np.arange(size)
+            result["truncated"] = size > limit
+            result["groups"] = [
+                {
+                    "labels": labels[g],
+                    "value": None if np.isnan(values[g]) else round(float(values[g]), 6),
+                    "series": int(members[g]),
+                }
+                for g in order[:limit]
+            ]
+        self._timed(started)
+        return result
+
+    def _percentile(
+        self,
+        tier: RingTier,
+        rows: np.ndarray,
+        valid: np.ndarray,
+        ids: np.ndarray,
+        groups: np.ndarray,
+        size: int,
+        q: float,
+    ) -> np.ndarray:
+        """그룹마다 (버킷 × 시계열) 평균값의 q 분위수 (모든 그룹을 한 번에 정렬, 선형 보간)"""
+        value_parts, owner_parts = [], []
+        for chunk, chunk_groups in self._chunks(ids, groups):
+            total, count, _, _ = tier.cells(rows, valid, chunk)
+            filled = count > 0
+            value_parts.append(total[filled] / count[filled])
+            owner_parts.append(np.broadcast_to(chunk_groups, count.shape)[filled])
+        values, owner = np.concatenate(value_parts), np.concatenate(owner_parts)
+        order = np.lexsort((values, owner))
+        values = values[order]
+        sizes = np.bincount(owner, minlength=size)
+        offsets = np.cumsum(sizes) - sizes
+        position = q * np.maximum(sizes - 1, 0)
+        low = np.floor(position).astype(np.int64)
+        high = np.minimum(low + 1, np.maximum(sizes - 1, 0))
+        result = np.full(size, np.nan)
+        has = sizes > 0
+        a, b = values[(offsets + low)[has]], values[(offsets + high)[has]]
+        result[has] = a + (b - a) * (position - low)[has]
+        return result
+
+    def list_series(self, name: Optional[str], match: Optional[Dict[str, str]], limit: int = 100) -> Dict[str, Any]:
+        """이름별 시계열 수, name 을 주면 그 이름의 시계열 라벨"""
+        counts = np.bincount(self.name_of[:self.series], minlength=len(self._name_list))
+        result: Dict[str, Any] = {"names": {n: int(c) for n, c in zip(self._name_list, counts)}}
+        if name:
+            ids = self.select(name, match)
+            result["series"] = [self.labels_of(int(i)) for i in ids[:limit]]
+            result["truncated"] = len(ids) > limit
+        return result
+
+    def _timed(self, started: float):
+        self.counts["queries"] += 1
+        self.query_ms.append((time.perf_counter() - started) * 1000)
+
+    # ---- 스냅샷 -----------------------------------------------------------
+
+    async def save(self):
+        if not self.snapshot_dir or self._saving or self.series == 0:
+            return
+        self._saving = True
+        try:
+            # 시계열 목록/버킷 시각은 이벤트 루프에서 고정하고, 큰 배열은 스레드에서 씀
+            state = (self.series, self._keys[:self.series], [tier.slot_time.copy() for tier in self.tiers])
+            self.snapshot = await asyncio.to_thread(self._write_snapshot, *state)
+        except Exception as e:
+            logger.warning(f"⚠️ 지표 스냅샷 저장 실패: {type(e).__name__}: {e}")
+        finally:
+            self._saving = False
+
+    def _write_snapshot(self, series: int, keys: List[SeriesKey], slot_times: List[np.ndarray]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        path = os.path.join(self.snapshot_dir, SNAPSHOT_FILE)
+        meta = {
+            "version": SNAPSHOT_VERSION,
+            "saved_at": time.time(),
+            "series": series,
+            "tiers": [[tier.resolution, tier.slots] for tier in self.tiers],
+            "keys": [[name, [list(item) for item in labels]] for name, labels in keys],
+        }
+        arrays = {"meta": np.frombuffer(json.dumps(meta, ensure_ascii=False).encode("utf-8"), np.uint8)}
+        for tier, slot_time in zip(self.tiers, slot_times):
+            arrays[f"{tier.name}_slot_time"] = slot_time
+            for field in FIELDS:
+                arrays[f"{tier.name}_{field}"] = getattr(tier, field)[:, :series]
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+        info = {
+            "path": path,
+            "saved_at": meta["saved_at"],
+            "series": series,
+            "bytes": os.path.getsize(path),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info(f"💾 지표 스냅샷 저장: 시계열 {series}개, {info['bytes'] / 1e6:.1f}MB, {info['seconds']}s")
+        return info
+
+    def load_snapshot(self) -> bool:
+        path = os.path.join(self.snapshot_dir, SNAPSHOT_FILE)
+        if not os.path.exists(path):
+            return False
+        started = time.perf_counter()
+        with np.load(path) as data:
+            meta = json.loads(bytes(data["meta"]).decode("utf-8"))
+            if meta.get("version") != SNAPSHOT_VERSION:
+                logger.warning(f"⚠️ 지원하지 않는 지표 스냅샷 형식: {meta.get('version')}")
+                return False
+            for name, labels in meta["keys"][:self.max_series]:
+                key = (name, tuple(tuple(item) for item in labels))
+                if key not in self._ids:
+                    self._register(key)
+            series = min(meta["series"], self.series)
+            saved = {resolution: slots for resolution, slots in meta["tiers"]}
+            for tier in self.tiers:
+                if saved.get(tier.resolution) != tier.slots:
+                    logger.warning(f"⚠️ 스냅샷에 {tier.name} × {tier.slots} 해상도가 없어 비워 둠")
+                    continue
+                tier.slot_time[:] = data[f"{tier.name}_slot_time"]
+                for field in FIELDS:
+                    getattr(tier, field)[:, :series] = data[f"{tier.name}_{field}"][:, :series]
+        age = time.time() - meta["saved_at"]
+        logger.info(
+            f"✅ 지표 스냅샷 불러옴: 시계열 {series}개, {age:.0f}초 전 저장, {time.perf_counter() - started:.1f}s"
+        )
+        return True
+
+    # ---- 상태 -------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "series": self.series,
+            "max_series": self.max_series,
+            "names": len(self._name_list),
+            "labels": sorted(self._label_codes),
+            "bytes": sum(tier.nbytes(self.series) for tier in self.tiers),
+            "tiers": [
+                {
+                    "resolution_seconds": tier.resolution,
+                    "slots": tier.slots,
+                    "retention_seconds": tier.retention,
+                    "newest": tier.newest(),
+                }
+                for tier in self.tiers
+            ],
+            **self.counts,
+            "ingest_ms": percentiles(self.ingest_ms),
+            "query_ms": percentiles(self.query_ms),
+            "snapshot": self.snapshot or None,
+        }
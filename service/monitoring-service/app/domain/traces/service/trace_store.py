@@ -0,0 +1,277 @@
+"""
+스팬 저장소
+- 서비스의 SpanExporter 가 보낸 스팬(NDJSON 배치)을 trace id 별로 메모리에 모음
+  최근 TRACE_MAX_TRACES 개 trace 만 유지 (가장 오래전에 스팬이 들어온 trace 부터 버림), trace 당 스팬은 TRACE_MAX_SPANS 개까지
+- 워터폴: 스팬을 부모-자식 순서로 펼쳐 trace 시작 기준 오프셋, 깊이, 자기 시간(자식 구간을 뺀 시간)을 붙임
+  client 스팬 바로 아래 다른 서비스의 server 스팬이 있으면 그 차이를 network_ms 로 (게이트웨이 ↔ 서비스 사이 시간)
+- 스팬 이름별 지연: 받은 스팬을 지표 저장소에 span_duration_ms{service, name, status} 시계열로 넣고
+  breakdown 은 그 구간 집계 (그룹별 건수/평균/최대, 합계가 큰 순)
+"""
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app.common.utility.batch_codec import decode_batch
+from app.domain.metrics.model.metric_model import MAX_BATCH_SAMPLES, MetricBatch, MetricSample
+
+logger = logging.getLogger(__name__)
+
+SPAN_METRIC = "span_duration_ms"
+KINDS = ("server", "client", "internal")
+MAX_FIELD_CHARS = 128
+MAX_ATTRS = 32
+
+
+def percentiles(values) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"p50": round(pick(0.5), 3), "p95": round(pick(0.95), 3), "max": round(ordered[-1], 3)}
+
+
+def _hex(value: Any, length: int) -> Optional[str]:
+    if not isinstance(value, str) or len(value) != length:
+        return None
+    try:
+        int(value, 16)
+    except ValueError:
+        return None
+    return value.lower()
+
+
+class TraceStore:
+    def __init__(self, metric_store=None, max_traces: Optional[int] = None, max_spans: Optional[int] = None):
+        self.metric_store = metric_store
+        self.max_traces = max_traces or int(os.getenv("TRACE_MAX_TRACES", "20000"))
+        self.max_spans = max_spans or int(os.getenv("TRACE_MAX_SPANS", "1000"))
+        self._traces: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self.ingest_ms: Deque[float] = deque(maxlen=1000)
+        self.counts = {"batches": 0, "spans": 0, "rejected": 0, "evicted_traces": 0, "truncated_spans": 0}
+
+    # ---- 수집 -------------------------------------------------------------
+
+    def ingest(self, body: bytes, encoding: Optional[str]) -> Dict[str, int]:
+        started = time.perf_counter()
+        raw = decode_batch(body, encoding)
+        accepted = rejected = 0
+        # (service, name, status) 별 합/개수/최소/최대 → 지표 샘플 하나씩
+        rollup: Dict[tuple, List[float]] = {}
+        for line in raw.split(b"\n"):
+            if not line.strip():
+                continue
+            span = self._normalize(line)
+            if span is None:
+                rejected += 1
+                continue
+            spans = self._traces.get(span["trace_id"])
+            if spans is None:
+                spans = self._traces[span["trace_id"]] = []
+            else:
+                self._traces.move_to_end(span["trace_id"])
+            if len(spans) >= self.max_spans:
+                self.counts["truncated_spans"] += 1
+            else:
+                spans.append(span)
+            accepted += 1
+            key = (span["service"], span["name"], span["status"])
+            duration = span["duration_ms"]
+            entry = rollup.get(key)
+            if entry is None:
+                rollup[key] = [duration, 1, duration, duration]
+            else:
+                entry[0] += duration
+                entry[1] += 1
+                entry[2] = min(entry[2], duration)
+                entry[3] = max(entry[3], duration)
+        while len(self._traces) > self.max_traces:
+            self._traces.popitem(last=False)
+            self.counts["evicted_traces"] += 1
+        if rollup and self.metric_store is not None:
+            samples = [
+                MetricSample(
+                    name=SPAN_METRIC,
+                    value=total,
+                    count=int(count),
+                    min=low,
+                    max=high,
+                    labels={"service": service, "name": name, "status": status},
+                )
+                for (service, name, status), (total, count, low, high) in rollup.items()
+            ]
+            # 스팬 이름 종류가 많으면 (service, name, status) 묶음이 배치 상한을 넘으므로 나눠서
+            for lo in range(0, len(samples), MAX_BATCH_SAMPLES):
+                self.metric_store.ingest(MetricBatch(samples=samples[lo:lo + MAX_BATCH_SAMPLES]))
+        self.counts["batches"] += 1
+        self.counts["spans"] += accepted
+        self.counts["rejected"] += rejected
+        self.ingest_ms.append((time.perf_counter() - started) * 1000)
+        return {"accepted": accepted, "rejected": rejected}
+
+    def _normalize(self, line: bytes) -> Optional[Dict[str, Any]]:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(entry, dict):
+            return None
+        trace_id = _hex(entry.get("trace_id"), 32)
+        span_id = _hex(entry.get("span_id"), 16)
+        start, duration = entry.get("start"), entry.get("duration_ms")
+        if trace_id is None or span_id is None or not isinstance(start, (int, float)) or not isinstance(duration, (int, float)):
+            return None
+        if not isinstance(entry.get("name"), str) or duration < 0:
+            return None
+        span = {
+            "trace_id": trace_id,
+            "span_id": span_id,
+            "parent_id": _hex(entry.get("parent_id"), 16),
+            "name": entry["name"][:MAX_FIELD_CHARS],
+            "service": str(entry.get("service") or "unknown")[:MAX_FIELD_CHARS],
+            "kind": entry.get("kind") if entry.get("kind") in KINDS else "internal",
+            "start": float(start),
+            "duration_ms": float(duration),
+            "status": "error" if entry.get("status") == "error" else "ok",
+        }
+        attrs = entry.get("attrs")
+        if isinstance(attrs, dict):
+            span["attrs"] = {str(k)[:MAX_FIELD_CHARS]: v for k, v in list(attrs.items())[:MAX_ATTRS]}
+        if entry.get("tail"):
+            span["tail"] = True
+        return span
+
+    # ---- 조회 -------------------------------------------------------------
+
+    def waterfall(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        """trace 하나의 스팬을 시작 순 트리로 펼침 (오프셋/깊이/자기 시간/네트워크 시간)"""
+        spans = self._traces.get(trace_id.lower())
+        if not spans:
+            return None
+        by_id = {span["span_id"]: span for span in spans}
+        children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+        for span in spans:
+            parent = span["parent_id"] if span["parent_id"] in by_id else None
+            children.setdefault(parent, []).append(span)
+        for group in children.values():
+            group.sort(key=lambda s: s["start"])
+        origin = min(span["start"] for span in spans)
+        end = max(span["start"] + span["duration_ms"] / 1000 for span in spans)
+
+        rows = []
+        stack = [(span, 0) for span in reversed(children.get(None, []))]
+        while stack:
+            span, depth = stack.pop()
+            kids = children.get(span["span_id"], [])
+            row = {
+                **span,
+                "offset_ms": round((span["start"] - origin) * 1000, 3),
+                "depth": depth,
+                "self_ms": round(max(0.0, span["duration_ms"] - self._covered(kids)), 3),
+            }
+            remote = [k for k in kids if k["kind"] == "server" and k["service"] != span["service"]]
+            if span["kind"] == "client" and remote:
+                row["network_ms"] = round(max(0.0, span["duration_ms"] - max(k["duration_ms"] for k in remote)), 3)
+            rows.append(row)
+            stack.extend((kid, depth + 1) for kid in reversed(kids))
+        return {
+            "trace_id": trace_id.lower(),
+            "duration_ms": round((end - origin) * 1000, 3),
+            "services": sorted({span["service"] for span in spans}),
+            "span_count": len(spans),
+            "errors": sum(1 for span in spans if span["status"] == "error"),
+            "spans": rows,
+        }
+
+    @staticmethod
+    def _covered(spans: List[Dict[str, Any]]) -> float:
+        """자식 구간의 합집합 길이 (ms, 겹치는 구간은 한 번만)"""
+        total, cursor = 0.0, None
+        for span in spans:  # 시작 순
+            start, end = span["start"], span["start"] + span["duration_ms"] / 1000
+            if cursor is None or start >= cursor:
+                total += end - start
+                cursor = end
+            elif end > cursor:
+                total += end - cursor
+                cursor = end
+        return total * 1000
+
+    def recent(
+        self,
+        service: Optional[str] = None,
+        min_ms: float = 0,
+        errors: bool = False,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """최근 trace 요약 (루트 스팬 기준), 최신부터"""
+        result = []
+        for trace_id in reversed(self._traces):
+            spans = self._traces[trace_id]
+            roots = [s for s in spans if s["parent_id"] is None] or spans
+            root = min(roots, key=lambda s: s["start"])
+            has_error = any(s["status"] == "error" for s in spans)
+            if root["duration_ms"] < min_ms or (errors and not has_error):
+                continue
+            if service and all(s["service"] != service for s in spans):
+                continue
+            result.append({
+                "trace_id": trace_id,
+                "root": f"{root['service']} {root['name']}",
+                "start": root["start"],
+                "duration_ms": root["duration_ms"],
+                "spans": len(spans),
+                "services": sorted({s["service"] for s in spans}),
+                "error": has_error,
+                "tail": any(s.get("tail") for s in spans),
+            })
+            if len(result) >= limit:
+                break
+        return result
+
+    def breakdown(
+        self,
+        start: float,
+        end: float,
+        service: Optional[str] = None,
+        limit: int = 100,
+    ) -> Dict[str, Any]:
+        """구간 안 스팬 이름별 건수/평균/최대 (지표 저장소 집계), 총 소요 시간이 큰 순"""
+        match = {"service": service} if service else {}
+        by = ["service", "name"]
+        store = self.metric_store
+        count = store.aggregate(SPAN_METRIC, match, start, end, "count", by, limit=10000)
+        total = store.aggregate(SPAN_METRIC, match, start, end, "sum", by, limit=10000)
+        high = store.aggregate(SPAN_METRIC, match, start, end, "max", by, limit=10000)
+        errors = store.aggregate(SPAN_METRIC, {**match, "status": "error"}, start, end, "count", by, limit=10000)
+        key = lambda group: (group["labels"].get("service"), group["labels"].get("name"))
+        counts = {key(g): g["value"] or 0 for g in count["groups"]}
+        maxima = {key(g): g["value"] for g in high["groups"]}
+        failed = {key(g): g["value"] or 0 for g in errors["groups"]}
+        rows = []
+        for group in total["groups"]:  # 합계가 큰 순
+            k = key(group)
+            n = counts.get(k) or 0
+            rows.append({
+                "service": k[0],
+                "name": k[1],
+                "count": int(n),
+                "errors": int(failed.get(k, 0)),
+                "total_ms": group["value"],
+                "avg_ms": round(group["value"] / n, 3) if n and group["value"] is not None else None,
+                "max_ms": maxima.get(k),
+            })
+        return {"resolution": total["resolution"], "start": start, "end": end, "spans": rows[:limit], "truncated": len(rows) > limit}
+
+    # ---- 상태 -------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "traces": len(self._traces),
+            "max_traces": self.max_traces,
+            "stored_spans": sum(len(spans) for spans in self._traces.values()),
+            **self.counts,
+            "ingest_ms": percentiles(self.ingest_ms),
+        }
@@ -0,0 +1,103 @@
+"""
+Monitoring Service 메인 파일
+"""
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+import logging
+import os
+import sys
+
+from app.common.startup import LazyStartup
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger("monitoring_service")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("🚀 Monitoring Service 시작")
+    # 저장소 로드/알림 엔진 초기화는 백그라운드에서 (헬스체크는 바로 응답, 나머지 요청은 준비될 때까지 대기)
+    startup.start()
+    yield
+    await startup.stop()
+    logger.info("🛑 Monitoring Service 종료")
+
+app = FastAPI(
+    title="Monitoring Service",
+    description="Monitoring Service for EriPotter Project",
+    version="0.1.0",
+    lifespan=lifespan
+)
+
+# CORS 설정 (Gateway 경유 호출이 기본)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=False,
+    allow_methods=["GET", "POST"],
+    allow_headers=["*"],
+)
+
+# 지연 시작: 라우터와 서비스 초기화(app.bootstrap)는 "startup complete" 이후 백그라운드에서
+startup = LazyStartup(app, services="app.bootstrap:services", exempt=("/", "/health", "/health/startup"))
+
+# 기본 루트 경로
+@app.get("/")
+async def root():
+    return {"message": "Monitoring Service", "version": "0.1.0", "status": "running", "service": "monitoring"}
+
+# 헬스 체크 (서비스가 아직 준비 전이거나 초기화가 실패해 재시도 중이면 503)
+@app.get("/health")
+async def health():
+    unready = startup.unready()
+    if unready is not None:
+        return JSONResponse(status_code=503, content={**unready, "service": "monitoring"})
+    return {"status": "healthy", "service": "monitoring"}
+
+# 시작 단계별 소요 시간
+@app.get("/health/startup")
+async def startup_health():
+    """지연 시작 진행 상황: 준비 여부, 시도 횟수, 단계별 ms"""
+    return startup.report()
+
+# 지표 저장소 상태
+@app.get("/health/metrics")
+async def metrics_health():
+    """시계열 수, 메모리, 해상도별 최신 버킷, 수집/조회 지연 p50/p95, 마지막 스냅샷"""
+    return app.state.metric_store.stats()
+
+# 로그 저장소 상태
+@app.get("/health/logs")
+async def logs_health():
+    """세그먼트 수, 디스크 바이트, 압축률, 받은/버린 레코드 수, 수집/조회 지연 p50/p95"""
+    return app.state.log_store.stats()
+
+# 스팬 저장소 상태
+@app.get("/health/traces")
+async def traces_health():
+    """보관 중인 trace/스팬 수, 받은/버린 스팬 수, 수집 지연 p50/p95"""
+    return app.state.trace_store.stats()
+
+# 알림 엔진 상태
+@app.get("/health/alerts")
+async def alerts_health():
+    """규칙/인스턴스 수, pending/firing 수, 연결된 시계열 수, 수집·평가 지연 p50/p95, 웹훅 전송 상태"""
+    return app.state.alert_engine.stats()
+
+# 라우터 등록 (지연 import, 없으면 경고만)
+startup.include_router("app.router.metrics_router:router", "metrics_router")
+startup.include_router("app.router.logs_router:router", "logs_router")
+startup.include_router("app.router.traces_router:router", "traces_router")
+startup.include_router("app.router.alerts_router:router", "alerts_router")
+
+if __name__ == "__main__":
+    import uvicorn
+    port = int(os.getenv("PORT", 8002))
+    logger.info(f"🚀 서버 시작: 포트 {port}")
+    uvicorn.run(app, host="0.0.0.0", port=port)
@@ -0,0 +1,53 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app.domain.alerts.model.alert_model import AlertRule
+
+router = APIRouter(prefix="/alerts", tags=["alerts"])
+
+
+@router.get("")
+async def alerts(
+    request: Request,
+    state: Optional[Literal["pending", "firing"]] = Query(default=None, description="없으면 pending + firing"),
+    limit: int = Query(default=1000, ge=1, le=10000),
+):
+    """지금 pending / firing 인 알림 (firing 먼저)"""
+    return {"alerts": request.app.state.alert_engine.alerts(state, limit)}
+
+
+@router.get("/rules")
+async def list_rules(request: Request):
+    """규칙 목록과 규칙별 인스턴스/pending/firing 수"""
+    return {"rules": request.app.state.alert_engine.list_rules()}
+
+
+@router.post("/rules")
+async def put_rule(rule: AlertRule, request: Request):
+    """규칙 추가 (같은 이름이 있으면 바꾸고 그 규칙의 상태는 처음부터)"""
+    return request.app.state.alert_engine.put_rule(rule)
+
+
+@router.get("/rules/{name}")
+async def get_rule(name: str, request: Request, limit: int = Query(default=100, ge=1, le=1000)):
+    """규칙 하나와 인스턴스(그룹)별 현재 값/상태"""
+    result = request.app.state.alert_engine.get_rule(name, limit)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"규칙 '{name}' 이 없습니다")
+    return result
+
+
+@router.delete("/rules/{name}")
+async def delete_rule(name: str, request: Request):
+    """규칙 삭제 (firing 중이던 알림은 resolved 로 보냄)"""
+    if not request.app.state.alert_engine.delete_rule(name):
+        raise HTTPException(status_code=404, detail=f"규칙 '{name}' 이 없습니다")
+    return {"deleted": name}
+
+
+@router.get("/notifications")
+async def notifications(request: Request, limit: int = Query(default=100, ge=1, le=200)):
+    """최근 보낸 알림 (최신부터, 웹훅 URL 이 없어도 기록)"""
+    history = list(request.app.state.alert_engine.notifier.history)
+    return {"notifications": history[::-1][:limit]}
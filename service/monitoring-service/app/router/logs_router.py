@@ -0,0 +1,58 @@
+import json
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.common.utility.batch_codec import BatchError
+from app.domain.logs.service.log_store import LEVELS
+
+router = APIRouter(prefix="/logs", tags=["logs"])
+
+
+def _values(value: Optional[str]) -> List[str]:
+    """쉼표 구분 값 목록"""
+    return [item.strip() for item in value.split(",") if item.strip()] if value else []
+
+
+@router.post("/push")
+async def push(request: Request):
+    """로그 레코드 묶음 수집 (NDJSON, Content-Encoding: zstd | gzip)"""
+    body = await request.body()
+    try:
+        return request.app.state.log_store.ingest(body, request.headers.get("content-encoding"))
+    except BatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/query")
+async def query(
+    request: Request,
+    service: Optional[str] = Query(default=None, description="서비스 (쉼표 구분, 하나라도 일치)"),
+    level: Optional[str] = Query(default=None, description="레벨 (쉼표 구분, 예: WARNING,ERROR)"),
+    request_id: Optional[str] = Query(default=None, max_length=128),
+    user_id: Optional[str] = Query(default=None, max_length=128),
+    q: Optional[str] = Query(default=None, min_length=1, max_length=200, description="메시지 부분 문자열"),
+    start: Optional[float] = Query(default=None, description="epoch 초"),
+    end: Optional[float] = Query(default=None, description="epoch 초"),
+    limit: int = Query(default=1000, ge=1, le=100000),
+    order: Literal["asc", "desc"] = Query(default="desc"),
+):
+    """조건에 맞는 로그를 NDJSON 으로 스트리밍 (request_id 로 찾으면 게이트웨이 → 서비스 경로가 한 번에 보임)"""
+    levels = [item.upper() for item in _values(level)]
+    unknown = [item for item in levels if item not in LEVELS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 레벨: {', '.join(unknown)}")
+    filters = {
+        "service": _values(service),
+        "level": levels,
+        "request_id": [request_id] if request_id else [],
+        "user_id": [user_id] if user_id else [],
+    }
+    records = request.app.state.log_store.query(filters, start, end, q, limit, order)
+
+    async def lines():
+        async for record in records:
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,85 @@
+import time
+from typing import Dict, List, Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app.domain.metrics.model.metric_model import MetricBatch
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+Agg = Literal["sum", "count", "avg", "min", "max", "rate"]
+Fn = Literal["sum", "count", "avg", "min", "max", "rate", "p50", "p90", "p95", "p99"]
+
+
+def _matchers(match: List[str]) -> Dict[str, str]:
+    """match=label=value (여러 개면 모두 일치)"""
+    matchers = {}
+    for item in match:
+        label, sep, value = item.partition("=")
+        if not sep or not label:
+            raise HTTPException(status_code=400, detail=f"match 형식 오류: {item} (label=value)")
+        matchers[label] = value
+    return matchers
+
+
+def _range(start: Optional[float], end: Optional[float], window: float):
+    end = end or time.time()
+    start = start or end - window
+    if start > end:
+        raise HTTPException(status_code=400, detail="start 가 end 보다 늦습니다")
+    return start, end
+
+
+def _by(by: Optional[str]) -> Optional[List[str]]:
+    return [label.strip() for label in by.split(",") if label.strip()] if by else None
+
+
+@router.post("/push")
+async def push(batch: MetricBatch, request: Request):
+    """지표 샘플 묶음 수집 (게이트웨이/서비스가 주기적으로 보냄)"""
+    return request.app.state.metric_store.ingest(batch)
+
+
+@router.get("/query")
+async def query(
+    request: Request,
+    name: str = Query(..., min_length=1, max_length=200),
+    match: List[str] = Query(default=[]),
+    start: Optional[float] = Query(default=None, description="epoch 초"),
+    end: Optional[float] = Query(default=None, description="epoch 초, 없으면 지금"),
+    window: float = Query(default=900, gt=0, description="start 가 없을 때 end 에서 거슬러 올라갈 초"),
+    agg: Agg = Query(default="avg"),
+    by: Optional[str] = Query(default=None, description="그룹 라벨 (쉼표 구분, 예: service,route)"),
+    limit: int = Query(default=100, ge=1, le=1000),
+):
+    """구간 조회: 그룹(by 가 없으면 시계열)마다 버킷별 값, 해상도는 구간에 맞춰 자동 선택"""
+    start, end = _range(start, end, window)
+    return request.app.state.metric_store.query(name, _matchers(match), start, end, agg, _by(by), limit)
+
+
+@router.get("/aggregate")
+async def aggregate(
+    request: Request,
+    name: str = Query(..., min_length=1, max_length=200),
+    match: List[str] = Query(default=[]),
+    start: Optional[float] = Query(default=None, description="epoch 초"),
+    end: Optional[float] = Query(default=None, description="epoch 초, 없으면 지금"),
+    window: float = Query(default=900, gt=0, description="start 가 없을 때 end 에서 거슬러 올라갈 초"),
+    fn: Fn = Query(default="avg"),
+    by: Optional[str] = Query(default=None, description="그룹 라벨 (쉼표 구분, 예: service,route)"),
+    limit: int = Query(default=100, ge=1, le=1000),
+):
+    """구간 전체를 그룹마다 값 하나로 (by 가 있으면 값이 큰 그룹부터)"""
+    start, end = _range(start, end, window)
+    return request.app.state.metric_store.aggregate(name, _matchers(match), start, end, fn, _by(by), limit)
+
+
+@router.get("/series")
+async def series(
+    request: Request,
+    name: Optional[str] = Query(default=None, max_length=200),
+    match: List[str] = Query(default=[]),
+    limit: int = Query(default=100, ge=1, le=1000),
+):
+    """이름별 시계열 수, name 을 주면 그 이름의 시계열 라벨"""
+    return request.app.state.metric_store.list_series(name, _matchers(match), limit)
@@ -0,0 +1,56 @@
+import time
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app.common.utility.batch_codec import BatchError
+
+router = APIRouter(prefix="/traces", tags=["traces"])
+
+
+@router.post("/push")
+async def push(request: Request):
+    """스팬 묶음 수집 (NDJSON, Content-Encoding: zstd | gzip)"""
+    body = await request.body()
+    try:
+        return request.app.state.trace_store.ingest(body, request.headers.get("content-encoding"))
+    except BatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("")
+async def recent(
+    request: Request,
+    service: Optional[str] = Query(default=None, max_length=128),
+    min_ms: float = Query(default=0, ge=0, description="루트 스팬이 이보다 오래 걸린 trace 만"),
+    errors: bool = Query(default=False, description="오류 스팬이 있는 trace 만"),
+    limit: int = Query(default=50, ge=1, le=1000),
+):
+    """최근 trace 요약 (최신부터)"""
+    return {"traces": request.app.state.trace_store.recent(service, min_ms, errors, limit)}
+
+
+@router.get("/breakdown")
+async def breakdown(
+    request: Request,
+    service: Optional[str] = Query(default=None, max_length=128),
+    start: Optional[float] = Query(default=None, description="epoch 초"),
+    end: Optional[float] = Query(default=None, description="epoch 초, 없으면 지금"),
+    window: float = Query(default=900, gt=0, description="start 가 없을 때 end 에서 거슬러 올라갈 초"),
+    limit: int = Query(default=100, ge=1, le=1000),
+):
+    """스팬 이름별 건수/오류/합계/평균/최대 지연 (합계가 큰 순)"""
+    end = end or time.time()
+    start = start or end - window
+    if start > end:
+        raise HTTPException(status_code=400, detail="start 가 end 보다 늦습니다")
+    return request.app.state.trace_store.breakdown(start, end, service, limit)
+
+
+@router.get("/{trace_id}")
+async def waterfall(trace_id: str, request: Request):
+    """trace 하나의 워터폴 (스팬별 오프셋, 깊이, 자기 시간, client → server 사이 network_ms)"""
+    result = request.app.state.trace_store.waterfall(trace_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"trace '{trace_id}' 가 없습니다 (샘플링되지 않았거나 보존 범위 밖)")
+    return result
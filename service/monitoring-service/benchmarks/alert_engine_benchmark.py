@@ -0,0 +1,218 @@
+"""
+알림 규칙 엔진 벤치마크
+
+    python -m benchmarks.alert_engine_benchmark [--rules 3000] [--series 20000] [--batch 5000] [--seconds 60]
+    python -m benchmarks.alert_engine_benchmark --receiver 9000     # 로컬 웹훅 수신기만 띄움 (ALERT_WEBHOOK_URL=http://127.0.0.1:9000)
+
+- 규칙 --rules 개 (route 별 오류율 / p99 지연 / 포화도를 돌아가며, 모두 by=service) 를 건 상태에서
+  시계열 --series 개에 1초마다 샘플 하나씩 넣을 때 초당 샘플 수를 규칙 없는 저장소와 비교
+- 배치당 엔진 처리 지연(observe), 전체 인스턴스 주기 평가(evaluate_all) 지연, 윈도 메모리
+- 시계열을 처음 보는 첫 1초(연결), 규칙 하나를 바꾸거나 지운 직후 배치 지연 (연결을 그 규칙 것만 고치는지)
+- 로컬 수신기로 웹훅 확인: 한 서비스에 오류를 몰아 넣어 firing 이 오고, 되돌리면 resolved 가 오는지
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+
+from app.domain.alerts.model.alert_model import AlertRule
+from app.domain.alerts.service.alert_engine import AlertEngine
+from app.domain.alerts.service.alert_notifier import WebhookNotifier
+from app.domain.metrics.model.metric_model import MetricBatch, MetricSample
+from app.domain.metrics.service.metric_store import MetricStore
+
+SERVICES = ("gateway", "auth", "assessment", "chatbot", "monitoring")
+ROUTES = 200
+
+
+class Receiver(ThreadingHTTPServer):
+    """받은 웹훅 본문의 alerts 를 모아 두는 로컬 HTTP 서버"""
+
+    def __init__(self, port: int = 0, echo: bool = False):
+        self.alerts: List[dict] = []
+        self.echo = echo
+        super().__init__(("127.0.0.1", port), _Handler)
+
+    def start(self) -> "Receiver":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        alerts = json.loads(body).get("alerts", [])
+        self.server.alerts.extend(alerts)
+        if self.server.echo:
+            for alert in alerts:
+                print(f"{alert['status']:>8} {alert['rule']} {alert['labels']} 값 {alert['value']}")
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def make_rules(count: int) -> List[AlertRule]:
+    rules = []
+    for i in range(count):
+        route = f"/api/r{i % ROUTES}"
+        kind = (i // ROUTES) % 3
+        if kind == 0:
+            expr = f'ratio(count(http_requests{{route="{route}", status=~"5.."}}), count(http_requests{{route="{route}"}})) > 0.05'
+        elif kind == 1:
+            expr = f'p99(http_request_ms{{route="{route}"}}) > {400 + i // (ROUTES * 3)}'
+        else:
+            expr = f'avg(worker_busy_ratio{{route="{route}"}}) >= 0.9'
+        rules.append(AlertRule(name=f"rule-{i}", expr=expr, by=["service"], window=300, for_seconds=30, resolve_threshold=None))
+    return rules
+
+
+def make_samples(series: int, timestamp: float, error_service: str = "") -> List[MetricSample]:
+    """(이름, service, route, instance) 조합을 series 개, 지표 세 가지를 돌아가며"""
+    samples = []
+    for i in range(series):
+        service = SERVICES[i % len(SERVICES)]
+        route = f"/api/r{(i // len(SERVICES)) % ROUTES}"
+        labels = {"service": service, "route": route, "instance": f"i{i // (len(SERVICES) * ROUTES * 3)}"}
+        kind = (i // (len(SERVICES) * ROUTES)) % 3
+        if kind == 0:
+            failing = service == error_service
+            status = "500" if failing or i % 50 == 0 else "200"
+            samples.append(MetricSample(name="http_requests", value=10, count=10, labels={**labels, "status": status}, timestamp=timestamp))
+        elif kind == 1:
+            samples.append(MetricSample(name="http_request_ms", value=float(5 + (i * 7919) % 300), labels=labels, timestamp=timestamp))
+        else:
+            samples.append(MetricSample(name="worker_busy_ratio", value=((i * 31) % 80) / 100, labels=labels, timestamp=timestamp))
+    return samples
+
+
+def run(store: MetricStore, samples: List[MetricSample], batch: int, seconds: int, now: float) -> Tuple[float, float]:
+    """(초당 샘플 수, 첫 1초 처리 시간)"""
+    batches = [MetricBatch(samples=samples[lo:lo + batch]) for lo in range(0, len(samples), batch)]
+    # 첫 1초는 시계열 등록/규칙 연결이 섞여 있어 따로
+    started = time.perf_counter()
+    for b in batches:
+        store.ingest(b, now=now)
+    first = time.perf_counter() - started
+    started = time.perf_counter()
+    for second in range(1, seconds):
+        tick(store, batches, now + second)
+    return len(samples) * (seconds - 1) / (time.perf_counter() - started), first
+
+
+def tick(store: MetricStore, batches: List[MetricBatch], now: float) -> float:
+    """1초치 배치를 넣고 가장 느린 배치 처리 시간(초)"""
+    slowest = 0.0
+    for b in batches:
+        for sample in b.samples:
+            sample.timestamp = now
+        started = time.perf_counter()
+        store.ingest(b, now=now)
+        slowest = max(slowest, time.perf_counter() - started)
+    return slowest
+
+
+def benchmark(args):
+    now = time.time() - args.seconds
+    samples = make_samples(args.series, now)
+    plain = MetricStore(tiers=[(1, 300), (60, 360)], max_series=args.series, snapshot_dir="")
+    baseline, _ = run(plain, samples, args.batch, args.seconds, now)
+    print(f"\n규칙 없음: {baseline:,.0f} 샘플/s")
+
+    store = MetricStore(tiers=[(1, 300), (60, 360)], max_series=args.series, snapshot_dir="")
+    engine = AlertEngine(store, notifier=None, rules_file="", max_instances=max(20000, args.rules * len(SERVICES)))
+    started = time.perf_counter()
+    for rule in make_rules(args.rules):
+        engine.put_rule(rule)
+    print(f"규칙 {args.rules:,}개 등록: {time.perf_counter() - started:.2f}s")
+    samples = make_samples(args.series, now)
+    rate, first = run(store, samples, args.batch, args.seconds, now)
+    stats = engine.stats()
+    print(f"규칙 {args.rules:,}개: {rate:,.0f} 샘플/s (규칙 없음 대비 {rate / baseline:.0%})")
+    print(f"  첫 1초 (시계열 {args.series:,}개 등록 + 연결): {first:.2f}s")
+    print(f"  인스턴스 {stats['instances']:,}개, 연결된 시계열 {stats['linked_series']:,}개, 윈도 {stats['window_bytes'] / 1e6:.1f}MB")
+    print(f"  배치당 엔진 처리 p50 {stats['observe_ms']['p50']}ms, p95 {stats['observe_ms']['p95']}ms")
+    runs = []
+    for _ in range(5):
+        started = time.perf_counter()
+        engine.evaluate_all(now + args.seconds)
+        runs.append((time.perf_counter() - started) * 1000)
+    print(f"  전체 인스턴스 주기 평가: {statistics.median(runs):.1f}ms")
+    print(f"  firing {stats['firing']}, pending {stats['pending']}")
+
+    # 규칙 변경 직후: 바뀐 규칙에 맞는 시계열만 다시 연결하는지 (라벨 조건 없는 규칙 = 한 지표의 시계열 전부)
+    batches = [MetricBatch(samples=samples[lo:lo + args.batch]) for lo in range(0, len(samples), args.batch)]
+    second = now + args.seconds
+    for label, change in (
+        ("규칙 1개 변경", lambda: engine.put_rule(make_rules(1)[0].model_copy(update={"for_seconds": 60}))),
+        ("전체 대상 규칙 추가", lambda: engine.put_rule(AlertRule(name="all-latency", expr="p95(http_request_ms) > 250", by=["service"]))),
+        ("전체 대상 규칙 삭제", lambda: engine.delete_rule("all-latency")),
+    ):
+        started = time.perf_counter()
+        change()
+        changed = time.perf_counter() - started
+        second += 1
+        print(f"  {label}: {changed * 1000:.1f}ms, 직후 배치 최대 {tick(store, batches, second) * 1000:.1f}ms")
+
+
+async def webhook_check(args):
+    receiver = Receiver().start()
+    store = MetricStore(tiers=[(1, 300)], max_series=args.series, snapshot_dir="")
+    notifier = WebhookNotifier(url=receiver.url, secret="")
+    engine = AlertEngine(store, notifier=notifier, rules_file="", repeat_interval=3600)
+    rule = AlertRule(
+        name="error-rate",
+        expr='ratio(count(http_requests{status=~"5.."}), count(http_requests)) > 0.2',
+        by=["service"],
+        window=60,
+        for_seconds=5,
+        keep_firing_seconds=5,
+        resolve_threshold=0.1,
+    )
+    engine.put_rule(rule)
+    now = time.time()
+    for second in range(20):
+        store.ingest(MetricBatch(samples=make_samples(1000, now + second, error_service="chatbot")), now=now + second)
+    engine.evaluate_all(now + 20)
+    await notifier.flush()
+    firing = [a for a in receiver.alerts if a["status"] == "firing"]
+    for second in range(20, 140):
+        store.ingest(MetricBatch(samples=make_samples(1000, now + second)), now=now + second)
+        engine.evaluate_all(now + second)
+    await notifier.flush()
+    resolved = [a for a in receiver.alerts if a["status"] == "resolved"]
+    print("\n로컬 웹훅 수신기")
+    print(f"  firing: {[(a['labels'], a['value']) for a in firing]}")
+    print(f"  resolved: {[(a['labels'], a['value']) for a in resolved]}")
+    print(f"  받은 알림 {len(receiver.alerts)}개 (중복 없음: {len({(a['fingerprint'], a['status']) for a in receiver.alerts}) == len(receiver.alerts)})")
+    receiver.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rules", type=int, default=3000)
+    parser.add_argument("--series", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--receiver", type=int, default=0, help="이 포트로 웹훅 수신기만 띄우고 받은 알림을 출력")
+    args = parser.parse_args()
+    if args.receiver:
+        receiver = Receiver(args.receiver, echo=True)
+        print(f"웹훅 수신 대기: {receiver.url}")
+        receiver.serve_forever()
+        return
+    benchmark(args)
+    asyncio.run(webhook_check(args))
+
+
+if __name__ == "__main__":
+    main()
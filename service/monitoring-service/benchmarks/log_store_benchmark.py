@@ -0,0 +1,110 @@
+"""
+로그 저장소 벤치마크
+
+    python -m benchmarks.log_store_benchmark [--records 1000000] [--batch 500]
+
+- 수집: LogShipper 와 같은 형식(zstd NDJSON, --batch 개 묶음)으로 --records 개를 넣을 때 초당 레코드 수, 압축률
+- 조회: request_id / user_id / level 색인 조회와 색인 없는 부분 문자열 조회의 지연, 읽은 블록 수
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+
+import zstandard
+
+from app.domain.logs.service.log_store import LogStore
+
+SERVICES = ("gateway", "account-service", "assessment-service", "chatbot-service")
+LEVELS = ("INFO",) * 90 + ("WARNING",) * 8 + ("ERROR",) * 2
+MESSAGES = (
+    "🔗 프록시 요청: POST /api/account/login -> http://account-service:8006/login",
+    "✅ 프록시 응답: 200 http://account-service:8006/login",
+    "🔐 Account Service 로그인 요청 수신: user_id={user}, origin=https://sme.eripotter.com",
+    "🔍 사용자 인증 처리: {user}",
+    "📊 평가 점수 계산 완료: company_id=c{company:04d}, 소요 {ms}ms",
+    "❌ 업스트림 연결 실패: {ms}ms 후 시간 초과",
+)
+
+
+def make_batches(records: int, batch: int, now: float):
+    """요청 하나가 서비스 두세 곳에 로그 4~6줄을 남기는 형태"""
+    rng = random.Random(1)
+    compressor = zstandard.ZstdCompressor(level=3)
+    entries = []
+    request = 0
+    while len(entries) < records:
+        request += 1
+        request_id = f"{request:032x}"
+        user = f"user{rng.randint(1, 20000)}"
+        for _ in range(rng.randint(4, 6)):
+            entries.append({
+                "ts": now - records / 1000 + len(entries) / 1000,
+                "service": rng.choice(SERVICES),
+                "level": rng.choice(LEVELS),
+                "logger": "app.main",
+                "msg": rng.choice(MESSAGES).format(user=user, company=rng.randint(1, 5000), ms=rng.randint(1, 900)),
+                "request_id": request_id,
+                "user_id": user,
+            })
+    entries = entries[:records]
+    batches = [
+        compressor.compress("\n".join(json.dumps(e, ensure_ascii=False) for e in entries[lo:lo + batch]).encode("utf-8"))
+        for lo in range(0, len(entries), batch)
+    ]
+    return batches, entries
+
+
+async def run(args):
+    now = time.time()
+    batches, entries = make_batches(args.records, args.batch, now)
+    with tempfile.TemporaryDirectory() as directory:
+        store = LogStore(directory=directory)
+        started = time.perf_counter()
+        for body in batches:
+            store.ingest(body, "zstd", now=now)
+        store.flush()
+        elapsed = time.perf_counter() - started
+        stats = store.stats()
+        print(f"\n수집 (레코드 {args.records:,}개, 배치 {args.batch}개)")
+        print(f"  {args.records / elapsed:,.0f} 레코드/s, 블록 {stats['blocks']:,}개")
+        print(f"  디스크 {stats['disk_bytes'] / 1e6:,.1f}MB, 압축률 {stats['compression_ratio']}x")
+
+        # 봉인 후 다시 열어 디스크 색인 경로로 조회
+        await store.stop()
+        store = LogStore(directory=directory)
+        await store.start()
+        rng = random.Random(2)
+        sample = rng.choice(entries)
+        cases = [
+            ("request_id", {"request_id": [sample["request_id"]]}, None, 100),
+            ("user_id", {"user_id": [sample["user_id"]]}, None, 100),
+            ("level=ERROR 최근 100건", {"level": ["ERROR"]}, None, 100),
+            ("service+level", {"service": ["gateway"], "level": ["WARNING", "ERROR"]}, None, 1000),
+            ("부분 문자열 (색인 없음)", {}, "시간 초과", 1000),
+        ]
+        print(f"\n조회 (중앙값, {args.repeat}회)")
+        print(f"{'조회':>24} {'건수':>6} {'ms':>9}")
+        for label, filters, contains, limit in cases:
+            runs = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                found = [r async for r in store.query(filters, contains=contains, limit=limit)]
+                runs.append((time.perf_counter() - started) * 1000)
+            runs.sort()
+            print(f"{label:>24} {len(found):>6} {runs[len(runs) // 2]:>9.2f}")
+        await store.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로그 저장소 벤치마크")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+지표 저장소 벤치마크
+
+    python -m benchmarks.metric_store_benchmark [--series 100000] [--batch 5000] [--seconds 120]
+
+- 수집: 시계열 --series 개에 1초마다 샘플 하나씩, --batch 개 묶음으로 --seconds 초 분량을 넣을 때 초당 샘플 수와 배치당 지연
+- 조회: 구간 조회 / 전체 집계 / service·route 그룹 집계 / 분위수 지연 (구간 길이별로 고르는 해상도가 달라짐)
+- 메모리: 등록된 시계열이 차지하는 링 버퍼 바이트, 스냅샷 저장/불러오기 시간과 파일 크기
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from typing import List
+
+from app.domain.metrics.model.metric_model import MetricBatch, MetricSample
+from app.domain.metrics.service.metric_store import MetricStore
+
+SERVICES = ("gateway", "auth", "assessment", "chatbot", "monitoring")
+
+
+def make_keys(series: int) -> List[tuple]:
+    """(service, route, instance) 라벨 조합, route 는 서비스마다 200개"""
+    return [
+        (SERVICES[i % len(SERVICES)], f"/api/r{(i // len(SERVICES)) % 200}", f"i{i // (len(SERVICES) * 200)}")
+        for i in range(series)
+    ]
+
+
+def make_batches(keys: List[tuple], batch: int, timestamp: float) -> List[MetricBatch]:
+    samples = [
+        MetricSample(
+            name="http_request_ms",
+            value=float(5 + (i * 7919) % 500),
+            labels={"service": service, "route": route, "instance": instance},
+            timestamp=timestamp,
+        )
+        for i, (service, route, instance) in enumerate(keys)
+    ]
+    return [MetricBatch(samples=samples[lo:lo + batch]) for lo in range(0, len(samples), batch)]
+
+
+def timed(fn, repeat: int) -> float:
+    """repeat 번 실행한 지연의 중앙값 (ms)"""
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - started) * 1000)
+    return statistics.median(runs)
+
+
+def ingest(store: MetricStore, keys: List[tuple], batch: int, seconds: int, now: float):
+    # pydantic 검증은 요청 본문을 받을 때의 비용이라 미리 만들어 두고 저장소 쪽만 잼
+    batches = make_batches(keys, batch, now)
+    print(f"\n수집 (시계열 {len(keys):,}개, 배치 {batch:,}개, {seconds}초 분량)")
+    first = None
+    latencies = []
+    started = time.perf_counter()
+    for second in range(seconds):
+        t = now - seconds + second + 1
+        for b in batches:
+            for sample in b.samples:
+                sample.timestamp = t
+            batch_started = time.perf_counter()
+            store.ingest(b, now=now)
+            latencies.append((time.perf_counter() - batch_started) * 1000)
+        if first is None:
+            # 첫 1초는 시계열 등록이 섞여 있음
+            first = time.perf_counter() - started
+            print(f"  첫 1초 (시계열 등록 포함): {first:.2f}s")
+            started = time.perf_counter()
+    elapsed = time.perf_counter() - started
+    total = len(keys) * (seconds - 1)
+    latencies.sort()
+    print(f"  이후 {seconds - 1}초 분량: {total / elapsed:,.0f} 샘플/s")
+    print(f"  배치당 지연 p50 {latencies[len(latencies) // 2]:.2f}ms, p95 {latencies[int(len(latencies) * 0.95)]:.2f}ms")
+
+
+def queries(store: MetricStore, now: float, repeat: int):
+    print(f"\n조회 (중앙값, {repeat}회)")
+    print(f"{'조회':>36} {'해상도':>6} {'ms':>9}")
+    cases = [
+        ("구간 route=/api/r7 1분", lambda: store.query("http_request_ms", {"route": "/api/r7"}, now - 60, now, "avg")),
+        ("구간 service 그룹 rate 2분", lambda: store.query("http_request_ms", {}, now - 120, now, "rate", ["service"])),
+        ("집계 전체 avg 2분", lambda: store.aggregate("http_request_ms", {}, now - 120, now, "avg")),
+        ("집계 service,route 그룹 max 2분", lambda: store.aggregate("http_request_ms", {}, now - 120, now, "max", ["service", "route"])),
+        ("집계 service=gateway p95 1분", lambda: store.aggregate("http_request_ms", {"service": "gateway"}, now - 60, now, "p95")),
+        ("집계 service 그룹 p99 1분", lambda: store.aggregate("http_request_ms", {}, now - 60, now, "p99", ["service"])),
+        ("집계 전체 avg 1시간 (1m 해상도)", lambda: store.aggregate("http_request_ms", {}, now - 3600, now, "avg")),
+        ("집계 route 그룹 avg 1일 (1h 해상도)", lambda: store.aggregate("http_request_ms", {}, now - 86400, now, "avg", ["route"])),
+    ]
+    for label, fn in cases:
+        result = fn()
+        print(f"{label:>36} {result['resolution']:>5}s {timed(fn, repeat):>9.2f}")
+
+
+async def snapshot(store: MetricStore):
+    with tempfile.TemporaryDirectory() as directory:
+        store.snapshot_dir = directory
+        started = time.perf_counter()
+        await store.save()
+        saved = time.perf_counter() - started
+        restored = MetricStore(tiers=[(t.resolution, t.slots) for t in store.tiers], max_series=store.max_series, snapshot_dir=directory)
+        started = time.perf_counter()
+        restored.load_snapshot()
+        loaded = time.perf_counter() - started
+        assert restored.series == store.series
+    print(f"\n스냅샷: {store.snapshot['bytes'] / 1e6:,.1f}MB, 저장 {saved:.2f}s, 불러오기 {loaded:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="지표 저장소 벤치마크")
+    parser.add_argument("--series", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--seconds", type=int, default=120)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    store = MetricStore(max_series=args.series, snapshot_dir="")
+    now = float(int(time.time()))
+    ingest(store, make_keys(args.series), args.batch, args.seconds, now)
+    stats = store.stats()
+    print(f"  링 버퍼: {stats['bytes'] / 1e6:,.1f}MB ({stats['bytes'] // stats['series']:,} B/시계열)")
+    queries(store, now, args.repeat)
+    asyncio.run(snapshot(store))
+
+
+if __name__ == "__main__":
+    main()